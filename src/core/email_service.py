@@ -15,7 +15,6 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import json
-import os
 import logging
 
 class EmailService:
@@ -70,7 +69,13 @@ class EmailService:
                 # Yeni log faylının yolunu al (timestamp ilə)
                 log_file_path = get_log_file_path('email_service.log', with_timestamp=True)
                 
-                handler = logging.FileHandler(log_file_path, encoding='utf-8', mode='w')
+                try:
+                    from utils.log_rotation import RotatingLogHandler
+                except ImportError:
+                    from src.utils.log_rotation import RotatingLogHandler
+                
+                handler = RotatingLogHandler(log_file_path)
+                file_handler = handler
                 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
                 handler.setFormatter(formatter)
                 logger.addHandler(handler)
@@ -85,7 +90,7 @@ class EmailService:
                                 from src.utils.log_helper import log_to_database_async
                             
                             log_message = self.format(record)
-                            log_file_name = os.path.basename(log_file_path) if log_file_path else None
+                            log_file_name = file_handler.current_file_name
                             log_to_database_async('email_service', log_message, log_file_name)
                         except Exception:
                             pass
@@ -53,6 +53,13 @@ except ImportError:
     from src.core.tenant_manager import SettingsManager, LocalApiLogic
     from src.utils.updater import UpdaterService  # <-- YENİ ƏLAVƏ
 
+# Print intercept'ini aktivləşdir (əvvəllər ui.main_frame importunda edilirdi)
+try:
+    from utils.debug_manager import setup_debug_print_intercept
+except ImportError:
+    from src.utils.debug_manager import setup_debug_print_intercept
+setup_debug_print_intercept()
+
 # cache modulunu cache_manager kimi istifadə edirik
 cache_manager = cache
 
@@ -85,8 +92,15 @@ def setup_logging():
     """Logging konfiqurasiyası - DEBUG səviyyəsi"""
     log_file = get_log_file_path()
     
-    # File handler
-    file_handler = logging.FileHandler(log_file, encoding='utf-8', mode='w')
+    # File handler - ölçü limitində növbəti hissəyə keçir, köhnə hissələr sıxılır
+    try:
+        try:
+            from utils.log_rotation import RotatingLogHandler
+        except ImportError:
+            from src.utils.log_rotation import RotatingLogHandler
+        file_handler = RotatingLogHandler(log_file)
+    except ImportError:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8', mode='w')
     file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_formatter)
     
@@ -104,7 +118,7 @@ def setup_logging():
                     from src.utils.log_helper import log_to_database_async
                 
                 log_message = self.format(record)
-                log_file_name = os.path.basename(log_file) if log_file else None
+                log_file_name = os.path.basename(getattr(file_handler, 'baseFilename', log_file))
                 log_to_database_async('unified_app_debug', log_message, log_file_name)
             except Exception:
                 pass
@@ -192,6 +206,20 @@ def setup_database_connection():
         except Exception as e:
             logging.warning(f"database.py moduluna database konfiqurasiyası göndərilmədi: {e}")
         
+        # Login ekranı göstərilərkən pool bağlantıları arxa fonda əvvəlcədən açılır
+        try:
+            from database.connection_pool import prewarm_connection_pool
+            prewarm_connection_pool()
+        except Exception as e:
+            logging.warning(f"Connection pool əvvəlcədən açıla bilmədi: {e}")
+        
+        # Tenant bazasının sxem miqrasiyaları da arxa fonda yoxlanılır (ilk sorğu onu gözləməsin)
+        try:
+            from database.migrations import migrate_schema_in_background
+            migrate_schema_in_background()
+        except Exception as e:
+            logging.warning(f"Sxem miqrasiyaları başladıla bilmədi: {e}")
+        
         # Təhlükəsizlik: conn_string-i global variable-da saxlamırıq
         # Connection string yalnız runtime-da istifadə olunur, saxlanılmır
         global _current_conn_string
@@ -619,6 +647,27 @@ class UnifiedApplication(tk.Tk):
         except Exception as e:
             print(f"DEBUG: Could not start debug system: {e}")
         
+        # UI donma detektoru: after() heartbeat + watchdog (donan handler-lərin stack-ləri)
+        try:
+            from utils.performance_monitor import start_stall_detector
+            start_stall_detector(self)
+        except Exception as e:
+            print(f"DEBUG: Could not start stall detector: {e}")
+        
+        # Yaddaş/widget sızma diaqnostikası: periodik widget sayımı (tracemalloc debug pəncərəsindən)
+        try:
+            from utils.memory_diagnostics import start_memory_diagnostics
+            start_memory_diagnostics(self)
+        except Exception as e:
+            print(f"DEBUG: Could not start memory diagnostics: {e}")
+        
+        # Metrika ixracına versiya əlavə olunur ki, buraxılışlar müqayisə oluna bilsin
+        try:
+            from utils.metrics import get_metrics_registry
+            get_metrics_registry().set_info('app_version', APP_VERSION)
+        except Exception:
+            pass
+        
         self.session_id = None
         self.login_history_id = None
         self.current_user = None
@@ -1521,6 +1570,13 @@ class UnifiedApplication(tk.Tk):
             except Exception as e:
                 logging.warning(f"Sessiya bağlanarkən xəta: {e}")
 
+        # Pool-dakı açıq bağlantıları bağlayırıq
+        try:
+            from database.connection_pool import close_connection_pool
+            close_connection_pool()
+        except Exception as e:
+            logging.warning(f"Connection pool bağlanarkən xəta: {e}")
+
         # Cache-də "Məni xatırla" seçilibsə, cache-i saxlayırıq
         # Yalnız seçilməyibsə təmizləyirik
         try:
@@ -27,6 +27,27 @@ except ImportError:
     def log_network_operation(*args, **kwargs): pass
     def log_performance(*args, **kwargs): pass
 
+# Metrikalar - şərti import
+try:
+    try:
+        from utils.metrics import timed
+    except ImportError:
+        from src.utils.metrics import timed
+except ImportError:
+    def timed(operation, registry=None):
+        def decorator(func):
+            return func
+        return decorator
+
+# Baza dəyişiklik axını (LISTEN/NOTIFY) - şərti import
+try:
+    try:
+        from database.change_feed import ChangeFeedListener
+    except ImportError:
+        from src.database.change_feed import ChangeFeedListener
+except ImportError:
+    ChangeFeedListener = None
+
 class RealTimeNotifier:
     def __init__(self, tenant_id, server_url="https://mezuniyyet-serverim.onrender.com"):
         self.tenant_id = tenant_id
@@ -40,6 +61,11 @@ class RealTimeNotifier:
         self.change_count = 0
         self.force_refresh = False  # Məcburi refresh üçün
         
+        # Baza LISTEN/NOTIFY dəstəyi (əsas transport)
+        self.change_feed = None
+        self.use_db_listen = False
+        self.db_listen_limited = False  # LISTEN bağlantı limitinə görə açılmadı (heartbeat kifayətdir)
+        
         # WebSocket dəstəyi
         self.websocket = None
         self.use_websocket = False
@@ -60,8 +86,18 @@ class RealTimeNotifier:
         self.is_running = True
         self.connection_status = "connecting"
         
+        # Əvvəlcə bazanın öz dəyişiklik axınını cəhd et (HTTP polling olmadan)
+        if self._try_db_listen():
+            self.use_db_listen = True
+            self.connection_status = "db_listen_connected"
+            logging.info("🟢 LISTEN/NOTIFY realtime sistemi başladıldı")
+        elif self.db_listen_limited:
+            # Bazanın bağlantı limiti dolub: əlavə transport açılmır, dəyişiklikləri
+            # main_frame heartbeat-i (tenant məlumat versiyası) aşkarlayır
+            self.connection_status = "heartbeat_only"
+            logging.info("🟡 Bağlantı limiti dolub - realtime yalnız heartbeat ilə izlənir")
         # WebSocket cəhd et
-        if self._try_websocket():
+        elif self._try_websocket():
             self.use_websocket = True
             self.connection_status = "websocket_connected"
             logging.info("🟢 WebSocket realtime sistemi başladıldı")
@@ -72,6 +108,37 @@ class RealTimeNotifier:
             self.connection_status = "polling_active"
             logging.info("🟡 Polling realtime sistemi başladıldı (çox tez yoxlama)")
         
+    def _try_db_listen(self):
+        """Baza trigger-lərinin göndərdiyi bildirişlərə qulaq asan listener-i başladır"""
+        if ChangeFeedListener is None:
+            return False
+        try:
+            self.change_feed = ChangeFeedListener(self._on_db_change)
+            if self.change_feed.start():
+                return True
+            self.db_listen_limited = self.change_feed.connection_limited
+            self.change_feed = None
+            if not self.db_listen_limited:
+                logging.warning("🔴 LISTEN/NOTIFY qoşulması uğursuz oldu, WebSocket-ə keçilir")
+            return False
+        except Exception as e:
+            logging.error(f"🔴 LISTEN/NOTIFY xətası: {e}")
+            self.change_feed = None
+            return False
+    
+    def _on_db_change(self, change_type, details):
+        """Change feed listener thread-indən gələn dəyişiklik"""
+        self.change_count += 1
+        self.last_successful_check = datetime.now()
+        self.error_count = 0
+        logging.info(f"🟢 DB dəyişiklik alındı (#{self.change_count}): {change_type}")
+        if details.get('reason') == 'connection_limit':
+            # Listener bağlantı limitinə görə dayandı - bundan sonra heartbeat izləyir
+            self.use_db_listen = False
+            self.db_listen_limited = True
+            self.connection_status = "heartbeat_only"
+        self._trigger_refresh(change_type, details)
+    
     def _try_websocket(self):
         """WebSocket qoşulmasını cəhd edir"""
         try:
@@ -173,6 +240,12 @@ class RealTimeNotifier:
         self.is_running = False
         self.connection_status = "stopped"
         
+        # Change feed listener-i dayandır
+        if self.change_feed:
+            self.change_feed.stop()
+            self.change_feed = None
+        self.use_db_listen = False
+        
         # WebSocket bağla
         if self.websocket:
             try:
@@ -251,6 +324,7 @@ class RealTimeNotifier:
             logging.error(f"Dəyişiklik yoxlanarkən xəta: {e}")
             self.error_count += 1
             
+    @timed('notifier.trigger_refresh')
     def _trigger_refresh(self, change_type, details=None):
         """Refresh tələb edir"""
         start_time = time.time()
@@ -355,6 +429,10 @@ class RealTimeNotifier:
         
     def force_immediate_refresh(self):
         """Məcburi dərhal refresh tələb edir"""
+        if self.use_db_listen:
+            # Polling döngüsü işləmir - refresh-i birbaşa tələb et
+            self._trigger_refresh('force_refresh', {'reason': 'manual_force'})
+            return
         self.force_refresh = True
         logging.info("🔄 Məcburi refresh tələb edildi")
         
@@ -370,6 +448,9 @@ class RealTimeNotifier:
             'error_count': self.error_count,
             'check_interval': self.check_interval,
             'force_refresh_pending': self.force_refresh,
+            'use_db_listen': self.use_db_listen,
+            'db_listen_limited': self.db_listen_limited,
+            'db_listen': self.change_feed.get_status() if self.change_feed else None,
             'use_websocket': self.use_websocket,
             'websocket_connected': self.websocket and self.websocket.sock and self.websocket.sock.connected if self.websocket else False
         }
@@ -4,6 +4,9 @@ try:
     from .database import *
     from .connection import *
     from .connection_pool import *
+    from .query_cache import *
+    from .migrations import *
+    from .change_feed import *
     from .manager import *
     # SQLite modulu silindi
     from .command_queries import *
@@ -11,35 +14,76 @@ try:
     from .session_queries import *
     from .error_queries import *
     from .notification_queries import *
+    from .heartbeat_queries import *
     from .user_queries import *
     from .bulk_operations import *
     from .offline_db import *
+    from .employee_store import *
+    from .records import *
+    from .sql_stats import *
+    from .search_index import *
+    from .vacation_index import *
 except ImportError:
     # PyInstaller EXE rejimində alternativ import
     try:
         from database.database import *
         from database.connection import *
         from database.connection_pool import *
+        from database.query_cache import *
+        from database.migrations import *
+        from database.change_feed import *
         from database.manager import *
         from database.command_queries import *
         from database.settings_queries import *
         from database.session_queries import *
         from database.error_queries import *
         from database.notification_queries import *
+        from database.heartbeat_queries import *
         from database.user_queries import *
         from database.bulk_operations import *
         from database.offline_db import *
+        from database.employee_store import *
+        from database.records import *
+        from database.sql_stats import *
+        from database.search_index import *
+        from database.vacation_index import *
     except ImportError:
         # Son alternativ
         from src.database.database import *
         from src.database.connection import *
         from src.database.connection_pool import *
+        from src.database.query_cache import *
+        from src.database.migrations import *
+        from src.database.change_feed import *
         from src.database.manager import *
         from src.database.command_queries import *
         from src.database.settings_queries import *
         from src.database.session_queries import *
         from src.database.error_queries import *
         from src.database.notification_queries import *
+        from src.database.heartbeat_queries import *
         from src.database.user_queries import *
         from src.database.bulk_operations import *
-        from src.database.offline_db import *
\ No newline at end of file
+        from src.database.offline_db import *
+        from src.database.employee_store import *
+        from src.database.records import *
+        from src.database.sql_stats import *
+        from src.database.search_index import *
+        from src.database.vacation_index import *
+
+# Metrikalar: bazaya sorğu göndərən modulların açıq funksiyalarının müddəti və xətaları ölçülür
+# (utils.metrics). Yaddaşdaxili köməkçilər (employee_store, records, indekslər, keş) ölçülmür -
+# onlar isti yoldadır və hər çağırışda registry kilidi onları dəfələrlə yavaşladır.
+_INSTRUMENTED_MODULES = (
+    'database', 'command_queries', 'settings_queries', 'session_queries', 'error_queries',
+    'notification_queries', 'heartbeat_queries', 'user_queries', 'bulk_operations', 'offline_db',
+    'departments_positions_queries', 'system_queries', 'vacation_queries', 'log_storage',
+)
+try:
+    try:
+        from utils.metrics import instrument_package as _instrument_package
+    except ImportError:
+        from src.utils.metrics import instrument_package as _instrument_package
+    _instrument_package(__name__, 'db', include=_INSTRUMENTED_MODULES)
+except ImportError:
+    pass
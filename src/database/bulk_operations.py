@@ -1,21 +1,198 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Toplu Məzuniyyət Silmə Funksiyası
-Performans optimizasiyası üçün bulk operations
+Toplu Əməliyyatlar (bulk operations)
+Çox sətirli dəyişikliklər üçün set-based mühərrik: sətirlər execute_values (və ya
+böyük həcmdə COPY) ilə bir statement-də yazılır, ID siyahıları hissələrə bölünür,
+hər hissə bir transaction-da icra olunur və gedişat progress_callback(done, total, message)
+ilə bildirilir.
 """
 
+import io
+import logging
 import threading
 import time
-from tkinter import messagebox
+from datetime import date, datetime
+from psycopg2.extras import execute_values
 from database.connection import db_connect
-from database.connection_pool import get_connection_pool
+from database.query_cache import invalidates_query_cache
 from utils.debug_manager import debug_log
 
-def bulk_delete_vacations(vacation_ids, admin_name, progress_callback=None):
+# Bir transaction-da işlənən ID/sətir sayı
+DEFAULT_CHUNK_SIZE = 500
+# Bu qədər sətirdən çox olduqda INSERT ... VALUES əvəzinə COPY istifadə olunur
+COPY_THRESHOLD = 2000
+
+NOTIFICATION_COLUMNS = ('recipient_id', 'message', 'related_vacation_id')
+
+
+# --- Mühərrik ---
+
+def iter_chunks(items, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Siyahını chunk_size ölçülü hissələrə bölür"""
+    items = list(items)
+    for start in range(0, len(items), max(1, chunk_size)):
+        yield items[start:start + chunk_size]
+
+
+def _report_progress(progress_callback, done, total, message):
+    if not progress_callback:
+        return
+    try:
+        progress_callback(done, total, message)
+    except Exception as e:
+        logging.debug(f"progress_callback xətası: {e}")
+
+
+def insert_rows(cur, table, columns, rows, returning=None, page_size=DEFAULT_CHUNK_SIZE):
+    """
+    Sətirləri bir INSERT ... VALUES statement-i ilə yazır (çağıranın transaction-ında).
+    returning verilibsə qaytarılan sətirlərin siyahısı, yoxdursa yazılan sətir sayı qaytarılır.
+    """
+    rows = list(rows)
+    if not rows:
+        return [] if returning else 0
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    if returning:
+        sql += f" RETURNING {returning}"
+        return execute_values(cur, sql, rows, page_size=page_size, fetch=True)
+    execute_values(cur, sql, rows, page_size=page_size)
+    return len(rows)
+
+
+def _copy_value(value):
+    """Dəyəri COPY text formatına çevirir"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    text = str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(cur, table, columns, rows):
+    """Sətirləri COPY FROM STDIN ilə yazır (çağıranın transaction-ında); yazılan sətir sayını qaytarır"""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+        count += 1
+    if not count:
+        return 0
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return count
+
+
+def run_chunked(items, work, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                message="Əməliyyat icra olunur...", category='bulk', atomic=False):
+    """
+    items-i hissələrə bölür və hər hissə üçün work(cur, chunk)-u ayrıca transaction-da icra edir.
+    work təsirlənən sətir sayını qaytarmalıdır. Hissələrdən biri uğursuz olarsa, o geri qaytarılır
+    və sonrakılar icra edilmir (əvvəlki hissələr artıq commit olunub).
+    atomic=True olduqda bütün hissələr bir transaction-da icra olunur və sonda bir dəfə commit
+    edilir: xəta olarsa heç nə yazılmır, count və chunks 0 qalır.
+
+    Returns:
+        dict: {'success': bool, 'count': int, 'chunks': int, 'errors': list}
+    """
+    items = list(items)
+    total = len(items)
+    result = {'success': True, 'count': 0, 'chunks': 0, 'errors': []}
+    if not items:
+        return result
+
+    conn = db_connect()
+    if not conn:
+        return {'success': False, 'count': 0, 'chunks': 0, 'errors': ['Database bağlantısı qurula bilmədi']}
+
+    start = time.time()
+    done = 0
+    # Commit olunmamış sətir/hissə sayları - yalnız commit-dən sonra nəticəyə köçürülür
+    pending_count = pending_chunks = 0
+    _report_progress(progress_callback, 0, total, message)
+    try:
+        for chunk in iter_chunks(items, chunk_size):
+            try:
+                with conn.cursor() as cur:
+                    affected = work(cur, chunk)
+                if not atomic:
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                error_msg = f"Toplu əməliyyat xətası ({done}/{total}): {e}"
+                debug_log(category, error_msg, '❌')
+                result['success'] = False
+                result['errors'].append(error_msg)
+                break
+            pending_count += affected or 0
+            pending_chunks += 1
+            if not atomic:
+                result['count'] += pending_count
+                result['chunks'] += pending_chunks
+                pending_count = pending_chunks = 0
+            done += len(chunk)
+            _report_progress(progress_callback, done, total, message)
+
+        if atomic and result['success']:
+            try:
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                error_msg = f"Toplu əməliyyat commit xətası: {e}"
+                debug_log(category, error_msg, '❌')
+                result['success'] = False
+                result['errors'].append(error_msg)
+            else:
+                result['count'] = pending_count
+                result['chunks'] = pending_chunks
+    finally:
+        # close() bağlantını pool-a qaytarır
+        conn.close()
+
+    if result['success']:
+        _report_progress(progress_callback, total, total, "Tamamlandı!")
+    debug_log(category, f"{result['count']} sətir, {result['chunks']} hissə, {(time.time() - start) * 1000:.0f} ms", '✅' if result['success'] else '⚠️')
+    return result
+
+
+def bulk_insert_rows(table, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                     message="Sətirlər yazılır...", category='bulk_insert'):
+    """Çox sətri hissə-hissə yazır: kiçik həcmdə execute_values, böyük həcmdə COPY"""
+    rows = list(rows)
+    writer = copy_rows if len(rows) >= COPY_THRESHOLD else insert_rows
+    return run_chunked(rows, lambda cur, chunk: writer(cur, table, columns, chunk),
+                       chunk_size=COPY_THRESHOLD if writer is copy_rows else chunk_size,
+                       progress_callback=progress_callback, message=message, category=category)
+
+
+# --- Bildirişlər ---
+
+def insert_notifications(cur, notifications):
+    """(recipient_id, message, related_vacation_id) sətirlərini bir statement-də yazır"""
+    return insert_rows(cur, 'notifications', NOTIFICATION_COLUMNS, notifications)
+
+
+def notify_admins(cur, message, related_vacation_id=None):
+    """Bütün adminlərə eyni bildirişi bir INSERT ... SELECT ilə göndərir"""
+    cur.execute("""
+        INSERT INTO notifications (recipient_id, message, related_vacation_id)
+        SELECT id, %s, %s FROM employees WHERE role = 'admin'
+    """, (message, related_vacation_id))
+    return cur.rowcount
+
+
+# --- Məzuniyyətlər ---
+
+@invalidates_query_cache('vacations')
+def bulk_delete_vacations(vacation_ids, admin_name, progress_callback=None, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Toplu məzuniyyət silmə funksiyası
-    Background thread-də işləyir və UI-ni bloklamır
+    Hər hissə bir DELETE ... RETURNING və bir bildiriş INSERT-i ilə silinir
     
     Args:
         vacation_ids: Silinəcək məzuniyyət ID-ləri listi
@@ -30,89 +207,24 @@ def bulk_delete_vacations(vacation_ids, admin_name, progress_callback=None):
     
     debug_log('bulk_delete', f'Toplu silmə başladı: {len(vacation_ids)} məzuniyyət', '🔵')
     
-    # Connection pool istifadə et
-    try:
-        pool = get_connection_pool()
-        if pool:
-            conn = pool.getconn()
-        else:
-            conn = db_connect()
-    except Exception as e:
-        debug_log('bulk_delete', f'Connection pool xətası: {e}', '❌')
-        conn = db_connect()
-    
-    if not conn:
-        return {'success': False, 'deleted_count': 0, 'errors': ['Database bağlantısı qurula bilmədi']}
-    
-    deleted_count = 0
-    errors = []
-    
-    try:
-        with conn.cursor() as cur:
-            # Əvvəlcə silinəcək məzuniyyətlərin məlumatlarını al
-            ids_tuple = tuple(vacation_ids)
-            cur.execute("""
-                SELECT id, employee_id, start_date, end_date 
-                FROM vacations 
-                WHERE id IN %s
-            """, (ids_tuple,))
-            
-            vacations_to_delete = cur.fetchall()
-            
-            if not vacations_to_delete:
-                return {'success': False, 'deleted_count': 0, 'errors': ['Məzuniyyətlər tapılmadı']}
-            
-            # Progress callback-i çağır
-            if progress_callback:
-                progress_callback(0, len(vacations_to_delete), "Məzuniyyətlər silinir...")
-            
-            # Toplu silmə əməliyyatı
-            cur.execute("DELETE FROM vacations WHERE id IN %s", (ids_tuple,))
-            deleted_count = cur.rowcount
-            
-            # Bildirişləri toplu şəkildə əlavə et
-            notifications = []
-            for vac_id, emp_id, start_date, end_date in vacations_to_delete:
-                message = f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu sildi."
-                notifications.append((emp_id, message, None))
-            
-            if notifications:
-                cur.executemany("""
-                    INSERT INTO notifications (recipient_id, message, related_vacation_id) 
-                    VALUES (%s, %s, %s)
-                """, notifications)
-            
-            conn.commit()
-            
-            # Progress callback-i tamamlandı kimi işarələ
-            if progress_callback:
-                progress_callback(len(vacations_to_delete), len(vacations_to_delete), "Tamamlandı!")
-            
-            debug_log('bulk_delete', f'Toplu silmə uğurlu: {deleted_count} məzuniyyət silindi', '✅')
-            
-            return {
-                'success': True, 
-                'deleted_count': deleted_count, 
-                'errors': errors
-            }
-            
-    except Exception as e:
-        conn.rollback()
-        error_msg = f"Toplu silmə xətası: {str(e)}"
-        debug_log('bulk_delete', error_msg, '❌')
-        return {'success': False, 'deleted_count': deleted_count, 'errors': [error_msg]}
+    def delete_chunk(cur, chunk):
+        cur.execute("""
+            DELETE FROM vacations
+            WHERE id = ANY(%s)
+            RETURNING id, employee_id, start_date, end_date
+        """, (list(chunk),))
+        deleted = cur.fetchall()
+        insert_notifications(cur, [
+            (emp_id, f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu sildi.", None)
+            for vac_id, emp_id, start_date, end_date in deleted
+        ])
+        return len(deleted)
     
-    finally:
-        if conn:
-            try:
-                pool = get_connection_pool()
-                if pool:
-                    pool.putconn(conn)
-                else:
-                    conn.close()
-            except Exception as e:
-                debug_log('bulk_delete', f'Connection qaytarılarkən xəta: {e}', '⚠️')
-                conn.close()
+    result = run_chunked(vacation_ids, delete_chunk, chunk_size=chunk_size, progress_callback=progress_callback,
+                         message="Məzuniyyətlər silinir...", category='bulk_delete')
+    if result['success'] and not result['count']:
+        return {'success': False, 'deleted_count': 0, 'errors': ['Məzuniyyətlər tapılmadı']}
+    return {'success': result['success'], 'deleted_count': result['count'], 'errors': result['errors']}
 
 def bulk_delete_vacations_threaded(vacation_ids, admin_name, success_callback=None, error_callback=None, progress_callback=None):
     """
@@ -140,100 +252,36 @@ def bulk_delete_vacations_threaded(vacation_ids, admin_name, success_callback=No
     thread.start()
     return thread
 
-def bulk_update_vacation_status(vacation_ids, new_status, admin_name, progress_callback=None):
+@invalidates_query_cache('vacations')
+def bulk_update_vacation_status(vacation_ids, new_status, admin_name, progress_callback=None, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Toplu məzuniyyət status yeniləmə funksiyası
+    Hər hissə bir UPDATE ... RETURNING və bir bildiriş INSERT-i ilə yenilənir
     """
     if not vacation_ids:
         return {'success': False, 'updated_count': 0, 'errors': ['Məzuniyyət ID-ləri verilməyib']}
     
     debug_log('bulk_update', f'Toplu status yeniləmə başladı: {len(vacation_ids)} məzuniyyət', '🔵')
+    status_az = "Təsdiqləndi" if new_status == 'approved' else "Rədd edildi"
     
-    # Connection pool istifadə et
-    try:
-        pool = get_connection_pool()
-        if pool:
-            conn = pool.getconn()
-        else:
-            conn = db_connect()
-    except Exception as e:
-        debug_log('bulk_update', f'Connection pool xətası: {e}', '❌')
-        conn = db_connect()
-    
-    if not conn:
-        return {'success': False, 'updated_count': 0, 'errors': ['Database bağlantısı qurula bilmədi']}
-    
-    updated_count = 0
-    errors = []
-    
-    try:
-        with conn.cursor() as cur:
-            # Əvvəlcə yenilənəcək məzuniyyətlərin məlumatlarını al
-            ids_tuple = tuple(vacation_ids)
-            cur.execute("""
-                SELECT id, employee_id, start_date, end_date 
-                FROM vacations 
-                WHERE id IN %s
-            """, (ids_tuple,))
-            
-            vacations_to_update = cur.fetchall()
-            
-            if not vacations_to_update:
-                return {'success': False, 'updated_count': 0, 'errors': ['Məzuniyyətlər tapılmadı']}
-            
-            # Progress callback-i çağır
-            if progress_callback:
-                progress_callback(0, len(vacations_to_update), "Statuslar yenilənir...")
-            
-            # Toplu status yeniləmə
-            cur.execute("UPDATE vacations SET status = %s WHERE id IN %s", (new_status, ids_tuple))
-            updated_count = cur.rowcount
-            
-            # Bildirişləri toplu şəkildə əlavə et
-            status_az = "Təsdiqləndi" if new_status == 'approved' else "Rədd edildi"
-            notifications = []
-            
-            for vac_id, emp_id, start_date, end_date in vacations_to_update:
-                message = f"Admin '{admin_name}', sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu '{status_az}' statusu ilə yenilədi."
-                notifications.append((emp_id, message, vac_id))
-            
-            if notifications:
-                cur.executemany("""
-                    INSERT INTO notifications (recipient_id, message, related_vacation_id) 
-                    VALUES (%s, %s, %s)
-                """, notifications)
-            
-            conn.commit()
-            
-            # Progress callback-i tamamlandı kimi işarələ
-            if progress_callback:
-                progress_callback(len(vacations_to_update), len(vacations_to_update), "Tamamlandı!")
-            
-            debug_log('bulk_update', f'Toplu status yeniləmə uğurlu: {updated_count} məzuniyyət yeniləndi', '✅')
-            
-            return {
-                'success': True, 
-                'updated_count': updated_count, 
-                'errors': errors
-            }
-            
-    except Exception as e:
-        conn.rollback()
-        error_msg = f"Toplu status yeniləmə xətası: {str(e)}"
-        debug_log('bulk_update', error_msg, '❌')
-        return {'success': False, 'updated_count': updated_count, 'errors': [error_msg]}
+    def update_chunk(cur, chunk):
+        cur.execute("""
+            UPDATE vacations SET status = %s
+            WHERE id = ANY(%s)
+            RETURNING id, employee_id, start_date, end_date
+        """, (new_status, list(chunk)))
+        updated = cur.fetchall()
+        insert_notifications(cur, [
+            (emp_id, f"Admin '{admin_name}', sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu '{status_az}' statusu ilə yenilədi.", vac_id)
+            for vac_id, emp_id, start_date, end_date in updated
+        ])
+        return len(updated)
     
-    finally:
-        if conn:
-            try:
-                pool = get_connection_pool()
-                if pool:
-                    pool.putconn(conn)
-                else:
-                    conn.close()
-            except Exception as e:
-                debug_log('bulk_update', f'Connection qaytarılarkən xəta: {e}', '⚠️')
-                conn.close()
+    result = run_chunked(vacation_ids, update_chunk, chunk_size=chunk_size, progress_callback=progress_callback,
+                         message="Statuslar yenilənir...", category='bulk_update')
+    if result['success'] and not result['count']:
+        return {'success': False, 'updated_count': 0, 'errors': ['Məzuniyyətlər tapılmadı']}
+    return {'success': result['success'], 'updated_count': result['count'], 'errors': result['errors']}
 
 def bulk_update_vacation_status_threaded(vacation_ids, new_status, admin_name, success_callback=None, error_callback=None, progress_callback=None):
     """
@@ -259,3 +307,60 @@ def bulk_update_vacation_status_threaded(vacation_ids, new_status, admin_name, s
     thread = threading.Thread(target=_bulk_update_worker, daemon=True)
     thread.start()
     return thread
+
+
+# --- Yeni məzuniyyət ili ---
+
+@invalidates_query_cache('employees', 'vacations')
+def bulk_start_new_vacation_year(employee_ids, default_days=30, archive_all=False, progress_callback=None,
+                                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Seçilmiş işçilər üçün yeni məzuniyyət ili: keçən illərin təsdiqlənmiş məzuniyyətləri arxivə
+    köçürülür və məzuniyyət hüququ default_days-ə bərabərləşdirilir - hər hissə üçün iki statement.
+    archive_all=True olduqda bütün işçilərin köhnə məzuniyyətləri (ilk hissədə) arxivlənir.
+    Arxivləmə və yeniləmə bir transaction-dadır: xəta olarsa heç bir dəyişiklik qalmır.
+
+    Returns:
+        dict: {'success': bool, 'updated_count': int, 'archived_count': int, 'errors': list}
+    """
+    if not employee_ids:
+        return {'success': False, 'updated_count': 0, 'archived_count': 0, 'errors': ['İşçi ID-ləri verilməyib']}
+    
+    current_year = date.today().year
+    archived = {'count': 0, 'global_done': False}
+    
+    def rollover_chunk(cur, chunk):
+        chunk = list(chunk)
+        if archive_all:
+            if not archived['global_done']:
+                cur.execute("UPDATE vacations SET is_archived = TRUE WHERE EXTRACT(YEAR FROM start_date) < %s AND status = 'approved'", (current_year,))
+                archived['count'] += cur.rowcount
+                archived['global_done'] = True
+        else:
+            cur.execute("""
+                UPDATE vacations SET is_archived = TRUE
+                WHERE status = 'approved' AND EXTRACT(YEAR FROM start_date) < %s AND employee_id = ANY(%s)
+            """, (current_year, chunk))
+            archived['count'] += cur.rowcount
+        cur.execute("UPDATE employees SET total_vacation_days = %s WHERE id = ANY(%s)", (default_days, chunk))
+        return cur.rowcount
+    
+    result = run_chunked(employee_ids, rollover_chunk, chunk_size=chunk_size, progress_callback=progress_callback,
+                         message="Yeni məzuniyyət ili başladılır...", category='bulk_new_year', atomic=True)
+    return {
+        'success': result['success'],
+        'updated_count': result['count'],
+        # Geri qaytarılmış transaction-ın arxiv sayı hesablanmır
+        'archived_count': archived['count'] if result['success'] else 0,
+        'errors': result['errors'],
+    }
+
+
+# --- Sistem əmrləri ---
+
+def bulk_issue_commands(user_ids, command_type, command_value=None, progress_callback=None):
+    """Hər istifadəçi üçün system_commands sətri yazır (execute_values/COPY); yazılan sayı qaytarır"""
+    rows = [(user_id, command_type, command_value) for user_id in user_ids]
+    return bulk_insert_rows('system_commands', ('target_user_id', 'command_type', 'command_value'), rows,
+                            progress_callback=progress_callback, message="Əmrlər göndərilir...",
+                            category='bulk_commands')
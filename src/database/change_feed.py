@@ -0,0 +1,326 @@
+# change_feed.py - PostgreSQL LISTEN/NOTIFY dəyişiklik axını
+#
+# Cədvəl trigger-ləri (miqrasiya 007) hər dəyişiklikdə CHANGE_FEED_CHANNEL kanalına
+# yığcam JSON göndərir: {"table": ..., "op": ..., "id": ..., "version": ...}.
+# ChangeFeedListener ayrıca (pool-dan kənar) bağlantıda LISTEN edir, bildirişləri
+# ayrıca thread-də oxuyur və RealTimeNotifier-in callback formatına
+# (change_type, details) çevirib ötürür. HTTP polling lazım olmur, gecikmə
+# bazanın özünün bildiriş gecikməsi qədərdir.
+#
+# Bağlantı xərci: LISTEN sessiyaya bağlıdır, ona görə hər açıq müştəri pool-dan əlavə
+# bir daimi (pooler-siz) bağlantı tutur - N müştəri = N bağlantı, üstəlik hər müştərinin
+# pool-u (DEFAULT_MAX_CONNECTIONS-a qədər). Neon-da birbaşa bağlantı limiti compute
+# ölçüsündən asılıdır; limit dolanda ("too many connections") listener yenidən cəhd
+# etmir (connection_limited=True) və RealTimeNotifier heartbeat-in məlumat versiyası
+# yoxlamasına keçir ki, bu müştəri limiti daha da sıxışdırmasın.
+
+import json
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from .connection_pool import get_connection_pool
+from .migrations import CHANGE_FEED_CHANNEL, ensure_schema_migrated, is_migration_applied
+from .query_cache import clear_query_cache, invalidate_query_cache
+
+CHANGE_FEED_MIGRATION = 7
+
+# Bildirişləri gözləmə addımı (saniyə) - stop() bu qədər müddətdə cavab verir
+POLL_TIMEOUT = 0.5
+# Eyni anda gələn bildirişləri bir callback-də birləşdirmək üçün qısa pəncərə (saniyə)
+COALESCE_WINDOW = 0.03
+# Boş bağlantını yoxlama intervalı - Neon boş bağlantıları bağlayır
+KEEPALIVE_INTERVAL = 60
+# Yenidən qoşulma gecikməsi (eksponensial artır)
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+
+# (cədvəl, əməliyyat) -> main_frame._refresh_on_change-in tanıdığı change_type
+_TABLE_PREFIXES = {
+    'employees': 'employee',
+    'vacations': 'vacation',
+    'departments': 'department',
+    'positions': 'position',
+    'notifications': 'notification',
+}
+_OP_SUFFIXES = {
+    'INSERT': 'created',
+    'UPDATE': 'updated',
+    'DELETE': 'deleted',
+}
+
+
+def change_type_for(table, op):
+    """Trigger payload-ının cədvəl/əməliyyatını change_type-a çevirir (məs. vacations/UPDATE -> vacation_updated)"""
+    prefix = _TABLE_PREFIXES.get(table, table)
+    suffix = _OP_SUFFIXES.get(op, 'changed')
+    return f"{prefix}_{suffix}"
+
+
+def parse_payload(payload):
+    """NOTIFY payload-ını dict-ə çevirir; tanınmayan format üçün None"""
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or 'table' not in data:
+        return None
+    return data
+
+
+def coalesce_changes(payloads):
+    """
+    Bir dəfədə oxunan bildirişləri change_type üzrə qruplaşdırır.
+    Toplu UPDATE yüzlərlə bildiriş göndərə bilər - UI isə hər change_type üçün bir refresh alır.
+    Qaytarır: [(change_type, details)] - ilk gəliş sırası ilə.
+    """
+    grouped = {}
+    for data in payloads:
+        change_type = change_type_for(data.get('table'), data.get('op'))
+        details = grouped.get(change_type)
+        if details is None:
+            details = grouped[change_type] = {
+                'source': 'db_listen',
+                'table': data.get('table'),
+                'op': data.get('op'),
+                'ids': [],
+                'version': data.get('version'),
+            }
+        row_id = data.get('id')
+        if row_id is not None and row_id not in details['ids']:
+            details['ids'].append(row_id)
+        version = data.get('version')
+        if version is not None and (details['version'] is None or version > details['version']):
+            details['version'] = version
+    return list(grouped.items())
+
+
+# PostgreSQL too_many_connections SQLSTATE-i və müvafiq mesajlar (pgcode bağlantı xətalarında boş ola bilər)
+_CONNECTION_LIMIT_PGCODE = '53300'
+_CONNECTION_LIMIT_MESSAGES = ('too many connections', 'remaining connection slots are reserved')
+
+
+def is_connection_limit_error(error):
+    """Xəta bazanın bağlantı limitinin dolmasındandırmı (yenidən cəhd mənasızdır)"""
+    if getattr(error, 'pgcode', None) == _CONNECTION_LIMIT_PGCODE:
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _CONNECTION_LIMIT_MESSAGES)
+
+
+def _listener_connect_params(params):
+    """
+    LISTEN üçün bağlantı parametrləri.
+    Neon-un "-pooler" host-u PgBouncer transaction rejimindədir və LISTEN-i saxlamır,
+    ona görə də birbaşa (pooler-siz) host istifadə olunur.
+    """
+    params = dict(params)
+    host = params.get('host') or ''
+    if '-pooler.' in host:
+        params['host'] = host.replace('-pooler.', '.', 1)
+    return params
+
+
+class ChangeFeedListener:
+    """
+    Dəyişiklik axınına qulaq asan thread.
+    callback(change_type, details) listener thread-indən çağırılır - UI tərəfi
+    özü after() ilə Tk thread-inə keçməlidir (RealTimeNotifier callback-i bunu edir).
+    """
+
+    def __init__(self, callback, connection_params=None, channel=CHANGE_FEED_CHANNEL):
+        self.callback = callback
+        self.connection_params = connection_params
+        self.channel = channel
+        self.conn = None
+        self.thread = None
+        self.is_running = False
+        self.is_connected = False
+        self.notification_count = 0
+        self.delivered_count = 0
+        self.reconnect_count = 0
+        self.last_notification_at = None
+        self.last_version = None
+        self.last_error = None
+        self.connection_limited = False
+        self._stop_event = threading.Event()
+        self._connected_event = threading.Event()
+
+    # --- Bağlantı ---
+
+    def _resolve_params(self):
+        if self.connection_params:
+            return self.connection_params
+        pool = get_connection_pool()
+        return pool.connection_params if pool else None
+
+    def _connect(self):
+        params = self._resolve_params()
+        if not params:
+            raise psycopg2.OperationalError("connection parametrləri təyin edilməyib")
+        conn = psycopg2.connect(**_listener_connect_params(params))
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def _close_connection(self):
+        conn, self.conn = self.conn, None
+        self.is_connected = False
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # --- Həyat dövrü ---
+
+    def start(self, wait_timeout=5.0):
+        """
+        Listener thread-ini başladır və ilk LISTEN-in uğurlu olmasını gözləyir.
+        Sxemdə change_feed trigger-ləri yoxdursa və ya qoşulmaq alınmasa False qaytarır
+        (o zaman RealTimeNotifier köhnə transportlara keçir).
+        """
+        if self.is_running:
+            return self.is_connected
+        ensure_schema_migrated()
+        if not is_migration_applied(CHANGE_FEED_MIGRATION):
+            logging.info("Change feed trigger-ləri bazada yoxdur - LISTEN transportu istifadə edilmir")
+            return False
+
+        self._stop_event.clear()
+        self._connected_event.clear()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="db-change-feed")
+        self.thread.start()
+        if not self._connected_event.wait(wait_timeout) or not self.is_connected:
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        """Listener-i dayandırır və bağlantını bağlayır"""
+        self.is_running = False
+        self._stop_event.set()
+        self._connected_event.set()
+        thread = self.thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=POLL_TIMEOUT * 2 + 1)
+        self.thread = None
+        self._close_connection()
+
+    def _run(self):
+        delay = RECONNECT_MIN_DELAY
+        first_attempt = True
+        while not self._stop_event.is_set():
+            try:
+                self.conn = self._connect()
+                self.is_connected = True
+                self.last_error = None
+                if not first_attempt:
+                    self.reconnect_count += 1
+                    # Bağlantı qopanda bildirişlər itmiş ola bilər - tam yenilənmə tələb olunur
+                    clear_query_cache()
+                    self._deliver('change_feed_resync', {'source': 'db_listen', 'reason': 'reconnected'})
+                logging.info(f"🟢 Change feed: '{self.channel}' kanalına qulaq asılır")
+                self._connected_event.set()
+                delay = RECONNECT_MIN_DELAY
+                self._listen_loop()
+            except Exception as e:
+                self.last_error = str(e)
+                if is_connection_limit_error(e):
+                    # Yenidən cəhd limiti daha da sıxışdırır - heartbeat transportuna keçilir
+                    self.connection_limited = True
+                    logging.warning(f"Change feed: bazanın bağlantı limiti dolub, LISTEN dayandırılır: {e}")
+                else:
+                    logging.warning(f"Change feed bağlantı xətası: {e}")
+            finally:
+                self._close_connection()
+
+            if self.connection_limited:
+                if not first_attempt:
+                    # Bildirişlər artıq gəlməyəcək - UI bir dəfə tam yenilənsin, sonra heartbeat izləyir
+                    clear_query_cache()
+                    self._deliver('change_feed_resync', {'source': 'db_listen', 'reason': 'connection_limit'})
+                self._connected_event.set()
+                break
+
+            if first_attempt:
+                first_attempt = False
+                if not self._connected_event.is_set():
+                    # start() bu nəticəni gözləyir - ilk cəhd uğursuzdursa digər transporta keçilir
+                    self._connected_event.set()
+                    self.is_running = False
+                    return
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        self.is_running = False
+
+    def _listen_loop(self):
+        conn = self.conn
+        last_activity = time.monotonic()
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([conn], [], [], POLL_TIMEOUT)
+            if not readable:
+                if time.monotonic() - last_activity >= KEEPALIVE_INTERVAL:
+                    # Qopmuş bağlantı burada xəta verir və _run yenidən qoşulur
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    last_activity = time.monotonic()
+                continue
+
+            conn.poll()
+            # Eyni transaction-dan gələn bildirişlərin qalanını da götür
+            if COALESCE_WINDOW:
+                time.sleep(COALESCE_WINDOW)
+                conn.poll()
+            last_activity = time.monotonic()
+            payloads = []
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                data = parse_payload(notify.payload)
+                if data is not None:
+                    payloads.append(data)
+            if not payloads:
+                continue
+            self.notification_count += len(payloads)
+            self.last_notification_at = time.time()
+            # Digər müştərilərin yazdıqları: dəyişən cədvəllərin keşlənmiş sorğuları etibarsızdır
+            invalidate_query_cache(*{data.get('table') for data in payloads})
+            for change_type, details in coalesce_changes(payloads):
+                if details.get('version') is not None:
+                    self.last_version = details['version']
+                self._deliver(change_type, details)
+
+    def _deliver(self, change_type, details):
+        if not self.callback:
+            return
+        try:
+            self.callback(change_type, details)
+            self.delivered_count += 1
+        except Exception as e:
+            logging.error(f"Change feed callback xətası: {e}")
+
+    def get_status(self):
+        """Listener statistikası (RealTimeNotifier.get_status üçün)"""
+        return {
+            'channel': self.channel,
+            'is_running': self.is_running,
+            'is_connected': self.is_connected,
+            'notification_count': self.notification_count,
+            'delivered_count': self.delivered_count,
+            'reconnect_count': self.reconnect_count,
+            'last_notification_at': self.last_notification_at,
+            'last_version': self.last_version,
+            'last_error': self.last_error,
+            'connection_limited': self.connection_limited,
+        }
+
+
+__all__ = ['ChangeFeedListener', 'CHANGE_FEED_MIGRATION', 'change_type_for', 'coalesce_changes',
+           'is_connection_limit_error', 'parse_payload']
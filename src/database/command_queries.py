@@ -4,37 +4,23 @@ import psycopg2
 from tkinter import messagebox
 from datetime import datetime, timedelta
 from .connection import db_connect
+from .bulk_operations import bulk_issue_commands
+
+def _issue_commands(user_ids, command_type, command_value=None):
+    # Bütün əmrlər toplu mühərriklə bir (və ya bir neçə hissəli) INSERT ilə yazılır
+    result = bulk_issue_commands(user_ids, command_type, command_value)
+    if not result['success']:
+        messagebox.showerror("Baza Xətası", f"Əmr göndərərkən xəta baş verdi:\n{'; '.join(result['errors'])}")
+    return result['count']
 
 def issue_timed_logout_command(user_ids, minutes):
     if not user_ids: return 0
-    conn = db_connect()
-    if not conn: return 0
-    try:
-        with conn.cursor() as cur:
-            logout_time = datetime.now() + timedelta(minutes=minutes)
-            for user_id in user_ids:
-                cur.execute("INSERT INTO system_commands (target_user_id, command_type, command_value) VALUES (%s, 'TIMED_LOGOUT', %s)", (user_id, logout_time.isoformat()))
-            conn.commit()
-            return len(user_ids)
-    except psycopg2.Error as e:
-        messagebox.showerror("Baza Xətası", f"Əmr göndərərkən xəta baş verdi:\n{e}"); conn.rollback(); return 0
-    finally:
-        if conn: conn.close()
+    logout_time = datetime.now() + timedelta(minutes=minutes)
+    return _issue_commands(user_ids, 'TIMED_LOGOUT', logout_time.isoformat())
 
 def issue_immediate_logout_command(user_ids):
     if not user_ids: return 0
-    conn = db_connect()
-    if not conn: return 0
-    try:
-        with conn.cursor() as cur:
-            for user_id in user_ids:
-                cur.execute("INSERT INTO system_commands (target_user_id, command_type) VALUES (%s, 'IMMEDIATE_LOGOUT')", (user_id,))
-            conn.commit()
-            return len(user_ids)
-    except psycopg2.Error as e:
-        messagebox.showerror("Baza Xətası", f"Əmr göndərərkən xəta baş verdi:\n{e}"); conn.rollback(); return 0
-    finally:
-        if conn: conn.close()
+    return _issue_commands(user_ids, 'IMMEDIATE_LOGOUT')
 
 def get_pending_commands(user_id):
     conn = db_connect()
@@ -3,15 +3,26 @@
 import psycopg2
 import logging
 from tkinter import messagebox
+from .connection_pool import initialize_connection_pool, close_connection_pool
+from .migrations import ensure_schema_migrated
 
 _active_connection_params = {}
 
+# psycopg2.connect()-ə ötürülən parametrlər
+_VALID_CONNECT_KEYS = ['dbname', 'user', 'password', 'host', 'port', 'connect_timeout', 'sslmode', 'channel_binding']
+
 def clear_connection_params():
     """Clear connection parameters from memory (təhlükəsizlik üçün)"""
     global _active_connection_params
     _active_connection_params.clear()
+    # Pool-dakı açıq bağlantılar da bağlanır
+    close_connection_pool()
     logging.info("Database konfiqurasiyası yaddaşdan təmizləndi")
 
+def _get_connect_params():
+    """_active_connection_params-dan yalnız psycopg2.connect() üçün keçərli parametrləri seçir"""
+    return {key: value for key, value in _active_connection_params.items() if key in _VALID_CONNECT_KEYS}
+
 def set_connection_params(connection_string: str):
     """
     Aktiv şirkətin qoşulma məlumatlarını qlobal olaraq təyin edir.
@@ -113,6 +124,9 @@ def set_connection_params(connection_string: str):
             if 'channel_binding' not in connection_params:
                 connection_params['channel_binding'] = 'prefer'
 
+        # Pool yeni parametrlərlə hazırlanır (eyni parametrlərdirsə mövcud pool saxlanılır)
+        initialize_connection_pool(_get_connect_params())
+
     except (IndexError, ValueError) as e:
         messagebox.showerror("Format Error", f"Connection string is not in correct format: {e}")
         raise ValueError("Connection string is not in correct format.") from e
@@ -139,24 +153,13 @@ def db_connect():
         return None
     
     try:
-        # PostgreSQL üçün - database_type və connection_string parametrlərini çıxarırıq
-        connection_params = _active_connection_params.copy()
-        connection_params.pop("database_type", None)
-        connection_params.pop("connection_string", None)
-        
-        # Əlavə təhlükəsizlik: bütün qeyri-dəstəklənən parametrləri çıxarırıq
-        valid_params = {}
-        valid_keys = ['dbname', 'user', 'password', 'host', 'port', 'connect_timeout', 'sslmode', 'channel_binding']
-        for key, value in connection_params.items():
-            if key in valid_keys:
-                valid_params[key] = value
-        
-        print(f"🔵 DEBUG db_connect: psycopg2.connect() çağırılır...")
-        # Təhlükəsizlik: Parametrlərin adları gizlədilir, yalnız sayı göstərilir
-        param_count = len(valid_params)
-        print(f"🔵 DEBUG db_connect: Database parametrləri sayı: {param_count}")
-        conn = psycopg2.connect(**valid_params)
-        print(f"✅ DEBUG db_connect: Connection uğurlu!")
+        # Bağlantı paylaşılan pool-dan götürülür (hər çağırışda yeni TLS qoşulması açılmır).
+        # Parametrlər dəyişməyibsə, initialize_connection_pool mövcud pool-u qaytarır.
+        valid_params = _get_connect_params()
+        pool = initialize_connection_pool(valid_params)
+        # Tenant bazasının sxemi pool başına bir dəfə miqrasiya olunur (sonrakı çağırışlarda dərhal qayıdır)
+        ensure_schema_migrated(pool)
+        conn = pool.getconn()
         return conn
     except psycopg2.OperationalError as e:
         error_msg = f"Database qoşulması uğursuz (OperationalError): {e}"
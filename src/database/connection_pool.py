@@ -1,82 +1,395 @@
 # connection_pool.py - Database connection pooling
+#
+# Bütün sorğu modulları bağlantını db_connect() vasitəsilə alır, db_connect isə
+# bağlantını bu pool-dan götürür. Qaytarılan obyekt PooledConnection-dur:
+# onun close() metodu bağlantını bağlamır, pool-a geri qaytarır. Beləliklə
+# mövcud "conn = db_connect() ... finally: conn.close()" kodu dəyişmədən
+# pool-dan istifadə edir və hər sorğu üçün yeni TLS bağlantısı açılmır.
 
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
 import logging
 import threading
 import time
+from collections import deque
 from contextlib import contextmanager
 
+from .sql_stats import InstrumentedConnection
+
+# Pool parametrləri (saniyə)
+DEFAULT_MIN_CONNECTIONS = 2
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_ACQUIRE_TIMEOUT = 15        # Boş bağlantı gözləmə limiti
+DEFAULT_HEALTH_CHECK_IDLE = 30      # Bu qədər boş qalan bağlantı verilməzdən əvvəl yoxlanılır
+DEFAULT_MAX_IDLE_TIME = 240         # Neon boş bağlantıları ~5 dəq sonra bağlayır
+DEFAULT_MAX_LIFETIME = 1800         # Köhnə bağlantılar yenisi ilə əvəz olunur
+RECLAIM_POLL_INTERVAL = 1.0         # Gözləyən getconn atılmış bağlantıları bu qədərdən bir yoxlayır
+
+
+class _PoolEntry:
+    """Pool-dakı fiziki bağlantı və onun vaxt məlumatları"""
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """
+    Pool-dan götürülmüş bağlantı üçün proxy.
+    psycopg2 connection-un bütün atributlarını ötürür, close() isə bağlantını
+    pool-a qaytarır.
+    """
+
+    def __init__(self, pool, entry):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_entry', entry)
+        object.__setattr__(self, '_released', False)
+
+    @property
+    def raw_connection(self):
+        return self._entry.conn
+
+    @property
+    def closed(self):
+        if self._released:
+            return 1
+        return self._entry.conn.closed
+
+    def close(self):
+        """Bağlantını pool-a qaytarır (fiziki bağlantı açıq qalır)"""
+        if self._released:
+            return
+        object.__setattr__(self, '_released', True)
+        self._pool._release(self._entry)
+
+    def __getattr__(self, name):
+        if self._released:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._entry.conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._entry.conn, name, value)
+
+    def __enter__(self):
+        self._entry.conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._entry.conn.__exit__(exc_type, exc_value, traceback)
+
+    def __del__(self):
+        # close() çağırılmadan atılmış bağlantı geri alınmalıdır ki, pool tükənməsin.
+        # __del__ istənilən thread-də (o cümlədən pool kilidi tutulmuşkən) işləyə bilər, ona
+        # görə burada rollback və kilid yoxdur: bağlantı yalnız növbəyə qoyulur
+        # (deque.append atomikdir), getconn onu _release ilə qaytarır.
+        try:
+            if not self._released:
+                object.__setattr__(self, '_released', True)
+                self._pool._reclaim.append(self._entry)
+        except Exception:
+            pass
+
+
 class DatabaseConnectionPool:
-    def __init__(self, connection_params, min_connections=2, max_connections=10):
-        self.connection_params = connection_params
+    def __init__(self, connection_params, min_connections=DEFAULT_MIN_CONNECTIONS,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT,
+                 health_check_idle=DEFAULT_HEALTH_CHECK_IDLE, max_idle_time=DEFAULT_MAX_IDLE_TIME,
+                 max_lifetime=DEFAULT_MAX_LIFETIME):
+        self.connection_params = dict(connection_params)
         self.min_connections = min_connections
         self.max_connections = max_connections
-        self.pool = None
+        self.acquire_timeout = acquire_timeout
+        self.health_check_idle = health_check_idle
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+
+        self._idle = deque()
+        self._reclaim = deque()     # close() çağırılmadan atılmış bağlantılar (PooledConnection.__del__)
+        self._in_use = 0
+        self._opening = 0
+        self._closed = False
         self._lock = threading.Lock()
-        self._initialize_pool()
-    
-    def _initialize_pool(self):
-        """Connection pool-u yaradır"""
+        self._available = threading.Condition(self._lock)
+
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_health_checks': 0,
+            'leaked': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'total_acquire_ms': 0.0,
+        }
+        logging.info(f"Database connection pool yaradıldı: {self.min_connections}-{self.max_connections}")
+
+    # --- Fiziki bağlantılar ---
+
+    def _open_connection(self):
+        # Sorğular SQL statistikası üçün ölçülür (sql_stats)
+        conn = psycopg2.connect(connection_factory=InstrumentedConnection, **self.connection_params)
+        with self._lock:
+            self._stats['created'] += 1
+        return _PoolEntry(conn)
+
+    @staticmethod
+    def _discard(entry):
+        try:
+            if not entry.conn.closed:
+                entry.conn.close()
+        except Exception as e:
+            logging.debug(f"Bağlantı bağlanarkən xəta: {e}")
+
+    def _is_expired(self, entry, now):
+        if entry.conn.closed:
+            return True
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        if self.max_idle_time and now - entry.last_used > self.max_idle_time:
+            return True
+        return False
+
+    def _is_healthy(self, entry, now):
+        """Uzun müddət boş qalmış bağlantını SELECT 1 ilə yoxlayır"""
+        if now - entry.last_used < self.health_check_idle:
+            return True
         try:
-            self.pool = pool.ThreadedConnectionPool(
-                minconn=self.min_connections,
-                maxconn=self.max_connections,
-                **self.connection_params
-            )
-            logging.info(f"Database connection pool yaradıldı: {self.min_connections}-{self.max_connections}")
+            with entry.conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            entry.conn.rollback()
+            return True
         except Exception as e:
-            logging.error(f"Connection pool yaradılarkən xəta: {e}")
-            self.pool = None
-    
+            logging.info(f"Pool bağlantısı yoxlamadan keçmədi, yenisi açılır: {e}")
+            return False
+
+    # --- Əsas API ---
+
+    def prewarm(self, count=None):
+        """Minimum sayda bağlantını əvvəlcədən açır (login ekranında çağırılır)"""
+        target = self.min_connections if count is None else count
+        opened = 0
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._in_use + self._opening >= min(target, self.max_connections):
+                    break
+                self._opening += 1
+            try:
+                entry = self._open_connection()
+            except Exception as e:
+                logging.warning(f"Pool əvvəlcədən qızdırılarkən xəta: {e}")
+                with self._available:
+                    self._opening -= 1
+                    self._available.notify()
+                break
+            with self._available:
+                self._opening -= 1
+                if self._closed:
+                    self._discard(entry)
+                    break
+                self._idle.append(entry)
+                self._available.notify()
+            opened += 1
+        if opened:
+            logging.info(f"Pool-da {opened} bağlantı əvvəlcədən açıldı")
+        return opened
+
+    def getconn(self, timeout=None):
+        """
+        Pool-dan yoxlanılmış bağlantı götürür.
+        Bütün bağlantılar istifadədədirsə, `timeout` saniyə gözləyir və sonra PoolError atır.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            self._drain_reclaimed()
+            entry = None
+            open_new = False
+            with self._available:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                while self._idle:
+                    candidate = self._idle.pop()  # LIFO: ən son istifadə edilən ən "isti" bağlantıdır
+                    if self._is_expired(candidate, time.monotonic()):
+                        self._stats['recycled'] += 1
+                        self._discard(candidate)
+                        continue
+                    entry = candidate
+                    self._in_use += 1
+                    break
+                if entry is None:
+                    if self._in_use + self._opening < self.max_connections:
+                        self._opening += 1
+                        open_new = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats['timeouts'] += 1
+                            raise PoolError(f"connection pool exhausted ({self.max_connections} in use)")
+                        if not waited:
+                            waited = True
+                            self._stats['waits'] += 1
+                        self._available.wait(min(remaining, RECLAIM_POLL_INTERVAL))
+                        continue
+
+            if open_new:
+                try:
+                    entry = self._open_connection()
+                finally:
+                    with self._available:
+                        self._opening -= 1
+                        if entry is not None:
+                            self._in_use += 1
+                        else:
+                            self._available.notify()
+            elif not self._is_healthy(entry, time.monotonic()):
+                with self._available:
+                    self._in_use -= 1
+                    self._stats['failed_health_checks'] += 1
+                    self._available.notify()
+                self._discard(entry)
+                continue
+
+            elapsed_ms = (time.monotonic() - start) * 1000
+            with self._lock:
+                self._stats['checkouts'] += 1
+                self._stats['total_acquire_ms'] += elapsed_ms
+                if waited:
+                    self._stats['total_wait_ms'] += elapsed_ms
+                    self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], elapsed_ms)
+            return PooledConnection(self, entry)
+
+    def putconn(self, conn):
+        """Bağlantını pool-a qaytarır (conn.close() ilə eynidir)"""
+        conn.close()
+
+    def _drain_reclaimed(self):
+        """__del__-in növbəyə qoyduğu bağlantıları pool-a qaytarır (kilidsiz çağırılmalıdır)"""
+        while True:
+            try:
+                entry = self._reclaim.popleft()
+            except IndexError:
+                return
+            self._release(entry, leaked=True)
+
+    def _release(self, entry, leaked=False):
+        conn = entry.conn
+        reusable = not conn.closed
+        if reusable:
+            try:
+                # Yarımçıq transaction növbəti istifadəçiyə keçməməlidir
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except Exception:
+                reusable = False
+
+        with self._available:
+            self._in_use -= 1
+            if leaked:
+                self._stats['leaked'] += 1
+            if reusable and not self._closed:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            else:
+                self._discard(entry)
+            self._available.notify()
+
+        if leaked:
+            logging.warning("Pool bağlantısı close() çağırılmadan atıldı və geri alındı")
+
     @contextmanager
     def get_connection(self):
         """Thread-safe connection alır"""
-        conn = None
+        conn = self.getconn()
         try:
-            if self.pool:
-                conn = self.pool.getconn()
-                yield conn
-            else:
-                # Pool yoxdursa, normal connection yaradır
-                conn = psycopg2.connect(**self.connection_params)
-                yield conn
-        except Exception as e:
-            logging.error(f"Database connection xətası: {e}")
-            raise
+            yield conn
         finally:
-            if conn:
-                try:
-                    if self.pool:
-                        self.pool.putconn(conn)
-                    else:
-                        conn.close()
-                except Exception as e:
-                    logging.warning(f"Connection bağlanarkən xəta: {e}")
-    
+            conn.close()
+
+    def get_stats(self):
+        """Pool statistikası: istifadədə olan/boş bağlantılar və gözləmə vaxtları"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_use'] = self._in_use
+            stats['reclaim_pending'] = len(self._reclaim)
+            stats['idle'] = len(self._idle)
+            stats['opening'] = self._opening
+            stats['max_connections'] = self.max_connections
+        checkouts = stats['checkouts'] or 1
+        stats['avg_acquire_ms'] = round(stats['total_acquire_ms'] / checkouts, 2)
+        stats['avg_wait_ms'] = round(stats['total_wait_ms'] / stats['waits'], 2) if stats['waits'] else 0.0
+        return stats
+
     def close(self):
         """Pool-u bağlayır"""
-        if self.pool:
-            self.pool.closeall()
-            logging.info("Database connection pool bağlandı")
+        with self._available:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        self._drain_reclaimed()
+        for entry in idle:
+            self._discard(entry)
+        logging.info("Database connection pool bağlandı")
 
 # Global pool instance
 _connection_pool = None
+_pool_lock = threading.Lock()
 
 def initialize_connection_pool(connection_params):
-    """Global connection pool-u yaradır"""
+    """
+    Global connection pool-u yaradır.
+    Parametrlər dəyişibsə (başqa şirkət), köhnə pool bağlanır və yenisi yaradılır.
+    """
     global _connection_pool
-    if _connection_pool is None:
-        _connection_pool = DatabaseConnectionPool(connection_params)
-    return _connection_pool
+    old_pool = None
+    with _pool_lock:
+        if _connection_pool is not None and _connection_pool.connection_params != dict(connection_params):
+            old_pool = _connection_pool
+            _connection_pool = None
+        if _connection_pool is None:
+            _connection_pool = DatabaseConnectionPool(connection_params)
+        pool = _connection_pool
+    if old_pool:
+        old_pool.close()
+    return pool
 
 def get_connection_pool():
     """Global connection pool-u qaytarır"""
     return _connection_pool
 
+def prewarm_connection_pool(background=True):
+    """Bağlantıları əvvəlcədən açır ki, ilk ekran yenilənməsi qoşulmanı gözləməsin"""
+    pool = _connection_pool
+    if pool is None:
+        return None
+    if not background:
+        return pool.prewarm()
+    thread = threading.Thread(target=pool.prewarm, daemon=True, name="db-pool-prewarm")
+    thread.start()
+    return thread
+
+def get_connection_pool_stats():
+    """Global pool-un statistikasını qaytarır (pool yoxdursa boş dict)"""
+    pool = _connection_pool
+    return pool.get_stats() if pool else {}
+
 def close_connection_pool():
     """Global connection pool-u bağlayır"""
     global _connection_pool
-    if _connection_pool:
-        _connection_pool.close()
-        _connection_pool = None 
\ No newline at end of file
+    with _pool_lock:
+        pool = _connection_pool
+        _connection_pool = None
+    if pool:
+        pool.close()
@@ -4,10 +4,18 @@ import psycopg2
 import bcrypt
 import logging
 # messagebox import silindi - thread-safe deyil, exception fırlatmaq lazımdır
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import uuid # Sessiya ID-ləri üçün
 import os
+import threading
+import time
 from utils.text_formatter import format_name, format_full_name
+from .connection_pool import initialize_connection_pool, close_connection_pool, get_connection_pool
+from .migrations import (ensure_schema_migrated, get_applied_migrations, is_migration_applied,
+                         DATA_VERSION_MIGRATION, DELTA_SYNC_MIGRATION)
+from .employee_store import EmployeeStore
+from .records import Employee, Vacation
+from .query_cache import cached_query, invalidates_query_cache, invalidate_query_cache, clear_query_cache
 
 # Logging səviyyəsini ERROR-a təyin edirik - performans üçün
 logging.getLogger().setLevel(logging.ERROR)
@@ -30,11 +38,16 @@ def clear_connection_params():
     """Clear connection string from memory (təhlükəsizlik üçün)"""
     global _connection_string
     _connection_string = None
+    _reset_tenant_sync_state()
+    close_connection_pool()
     logging.info("Database konfiqurasiyası yaddaşdan təmizləndi")
 
 def set_connection_params(connection_string):
     """Connection string-i təyin edir"""
     global _connection_string
+    if connection_string != _connection_string:
+        # Başqa baza - əvvəlki sinxronizasiya vəziyyəti etibarsızdır
+        _reset_tenant_sync_state()
     _connection_string = connection_string
     # Təhlükəsizlik: Connection string log-larda göstərilmir
     logging.info("Database konfiqurasiyası təyin edildi")
@@ -44,10 +57,19 @@ def set_connection_params(connection_string):
         try:
             from .connection import set_connection_params as set_conn_params
             set_conn_params(connection_string)
+            return
         except ImportError:
             logging.warning("connection.py modulu tapılmadı")
         except Exception as e:
             logging.warning(f"connection.py moduluna göndərmə xətası: {e}")
+    
+    # connection.py formatı tanımayıbsa, connection string DSN kimi pool-a verilir.
+    # Pool yalnız burada (parametrlər təyin olunanda) yaradılır - db_connect onu yenidən qurmur
+    if connection_string:
+        params = {'dsn': connection_string}
+        if 'postgresql' in connection_string:
+            params['connect_timeout'] = 10
+        initialize_connection_pool(params)
 
 def get_connection_params():
     """Connection string-i qaytarır"""
@@ -75,44 +97,34 @@ def get_connection_params():
     return None
 
 def db_connect():
-    """Veritabanına qoşulur"""
+    """
+    Veritabanına qoşulur.
+    Bağlantı paylaşılan connection pool-dan götürülür; conn.close() onu pool-a qaytarır.
+    Pool bağlantı verə bilmirsə (tükənib, keçici xəta) None qaytarılır - pool burada
+    yenidən yaradılmır, çünki bu, digər thread-lərin götürdüyü bağlantıları bağlayardı.
+    """
     try:
         # DEBUG: Connection cəhdi başladı - debug mesajlarını azaldıq
         # log_signal_sent("database_connection_attempt", {}, "database")
         
-        # Əvvəlcə öz connection string-imizlə cəhd et
-        conn_string = get_connection_params()
-        if conn_string:
+        # Əsas yol: connection.py modulunun pool-u (set_connection_params orada da çağırılıb)
+        try:
+            from .connection import db_connect as conn_connect, _active_connection_params
+            if _active_connection_params:
+                return conn_connect()
+        except ImportError:
+            logging.warning("connection.py modulu tapılmadı")
+        
+        # connection.py formatı tanımayıbsa, set_connection_params DSN ilə qurduğu pool istifadə olunur
+        pool = get_connection_pool()
+        if pool is not None and get_connection_params():
             # Təhlükəsizlik: Database konfiqurasiyası log-larda göstərilmir
             logging.info("Veritabanına qoşulma cəhdi başladı")
-            # Connection timeout əlavə edirik
-            if 'postgresql' in conn_string:
-                conn = psycopg2.connect(conn_string, connect_timeout=10)
-            else:
-                conn = psycopg2.connect(conn_string)
+            ensure_schema_migrated(pool)
+            conn = pool.getconn()
             logging.info("Veritabanına uğurla qoşuldu")
-            
-            # DEBUG: Uğurlu connection - debug mesajlarını azaldıq
-            # log_signal_sent("database_connection_success", {"method": "direct"}, "database")
-            
             return conn
         
-        # Əgər öz connection string-imiz yoxdursa, connection.py modulundan cəhd et
-        try:
-            from .connection import db_connect as conn_connect
-            conn = conn_connect()
-            if conn:
-                logging.info("connection.py modulu vasitəsilə baza qoşulması uğurlu oldu")
-                
-                # DEBUG: Uğurlu connection - debug mesajlarını azaldıq
-                # log_signal_sent("database_connection_success", {"method": "connection_module"}, "database")
-                
-                return conn
-        except ImportError:
-            logging.warning("connection.py modulu tapılmadı")
-        except Exception as e:
-            logging.warning(f"connection.py modulu ilə qoşulma xətası: {e}")
-        
         # DEBUG: Connection string tapılmadı
         log_error("connection_string_not_found", "Connection string təyin edilməyib", None, "database")
         
@@ -124,7 +136,7 @@ def db_connect():
         logging.warning(f"Veritabanı qoşulma xətası: {e}")
         return None
     except psycopg2.Error as e:
-        # DEBUG: Digər PostgreSQL xətaları
+        # DEBUG: Digər PostgreSQL xətaları (pool tükənməsi də daxil olmaqla)
         log_error("database_error", f"PostgreSQL xətası: {e}", None, "database")
         logging.error(f"PostgreSQL xətası: {e}")
         return None
@@ -461,6 +473,7 @@ def get_user_by_id(user_id):
         if conn: conn.close()
     return user_data
 
+@invalidates_query_cache('employees')
 def update_user_profile(user_id, user_data):
     """İstifadəçi profil məlumatlarını yeniləyir."""
     conn = db_connect()
@@ -512,6 +525,7 @@ def update_user_profile(user_id, user_data):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def create_new_user(name, username, password, role='user', total_days=30, max_sessions=1, email=None, first_name=None, last_name=None, father_name=None, phone_number=None, birth_date=None, fin_code=None, department_id=None, position_id=None, hire_date=None, salary=None, address=None, emergency_contact=None):
     logging.info(f"💾 [DB] create_new_user çağırıldı: Username={username}, Email={email}")
     print(f"💾 [DB] create_new_user çağırıldı: Username={username}, Email={email}")
@@ -552,52 +566,8 @@ def create_new_user(name, username, password, role='user', total_days=30, max_se
                     print(f"⚠️ [DB] Email artıq mövcuddur: {email}")
                     messagebox.showerror("Xəta", f"'{email}' email ünvanı artıq istifadə olunur.")
                     return False
-            
-            # Yeni sütunları əlavə et (əgər yoxdursa)
-            # Əvvəlcə mövcud sütunları yoxlayırıq
-            cur.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND table_schema = 'public'
-            """)
-            existing_columns = [row[0] for row in cur.fetchall()]
-            
-            new_columns = [
-                ("email", "TEXT"),
-                ("first_name", "TEXT"),
-                ("last_name", "TEXT"),
-                ("father_name", "TEXT"),
-                ("phone_number", "TEXT"),
-                ("birth_date", "DATE"),
-                ("profile_image", "TEXT"),
-                ("fin_code", "TEXT"),
-                ("department_id", "INTEGER"),
-                ("position_id", "INTEGER"),
-                ("hire_date", "DATE"),
-                ("salary", "REAL"),
-                ("address", "TEXT"),
-                ("emergency_contact", "TEXT"),
-                ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-            ]
-            
-            # Yalnız mövcud olmayan sütunları əlavə edirik
-            columns_to_add = [col for col in new_columns if col[0] not in existing_columns]
-            
-            if columns_to_add:
-                for column_name, column_type in columns_to_add:
-                    try:
-                        cur.execute(f"ALTER TABLE employees ADD COLUMN {column_name} {column_type}")
-                        print(f"✅ {column_name} sütunu PostgreSQL cədvəlinə əlavə edildi")
-                    except psycopg2.errors.DuplicateColumn:
-                        # Sütun artıq mövcuddur
-                        pass
-                
-                # Sütun əlavə etmə əməliyyatlarını commit edirik
-                conn.commit()
-            else:
-                print("✅ Bütün sütunlar artıq mövcuddur")
         
-        # İndi yeni istifadəçini əlavə edirik
+        # İndi yeni istifadəçini əlavə edirik (əlavə sütunlar 001 miqrasiyası ilə yaradılıb)
         logging.info(f"📝 [DB] INSERT sorgusu hazırlanır: Username={username}, Email={email}")
         print(f"📝 [DB] INSERT sorgusu hazırlanır: Username={username}, Email={email}")
         
@@ -658,6 +628,7 @@ def create_new_user(name, username, password, role='user', total_days=30, max_se
         print(f"🔌 [DB] Database bağlantısı bağlandı")
     return success
 
+@invalidates_query_cache('employees')
 def update_employee(emp_id, new_name, total_days, max_sessions):
     conn = db_connect()
     if not conn: return False
@@ -683,6 +654,7 @@ def update_employee(emp_id, new_name, total_days, max_sessions):
         if conn: conn.close()
     return False
 
+@invalidates_query_cache('employees')
 def update_employee_full(emp_id, employee_data):
     """İşçinin bütün məlumatlarını yeniləyir"""
     print(f"DEBUG: update_employee_full çağırıldı - emp_id: {emp_id}, employee_data: {employee_data}")
@@ -813,6 +785,7 @@ def update_employee_full(emp_id, employee_data):
         if conn: conn.close()
     return False
 
+@invalidates_query_cache('employees')
 def delete_employee(emp_id):
     conn = db_connect()
     if not conn: return False
@@ -838,6 +811,7 @@ def delete_employee(emp_id):
         if conn: conn.close()
     return False
 
+@invalidates_query_cache('employees')
 def set_user_activity(user_id, new_status):
     conn = db_connect()
     if not conn: return False
@@ -983,6 +957,7 @@ def get_employee_by_email(email):
     return None
 
 
+@invalidates_query_cache('employees')
 def update_employee_system_settings(emp_id, new_role, vacation_days, max_sessions, new_username):
     """İşçinin sistem tənzimləmələrini yeniləyir"""
     conn = db_connect()
@@ -1004,22 +979,7 @@ def update_employee_system_settings(emp_id, new_role, vacation_days, max_session
             return False
         
         with conn.cursor() as cur:
-            # Əvvəlcə umumi_gun sütununun mövcudluğunu yoxlayırıq və əgər yoxdursa əlavə edirik
-            try:
-                cur.execute("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'employees' AND column_name = 'umumi_gun'
-                """)
-                if not cur.fetchone():
-                    logging.info("umumi_gun sütunu əlavə edilir...")
-                    cur.execute("ALTER TABLE employees ADD COLUMN umumi_gun INTEGER DEFAULT 30")
-                    conn.commit()
-                    logging.info("umumi_gun sütunu uğurla əlavə edildi")
-            except Exception as e:
-                logging.warning(f"umumi_gun sütunu yoxlanarkən xəta: {e}")
-            
-            # Sistem tənzimləmələrini yenilə
+            # Sistem tənzimləmələrini yenilə (umumi_gun sütunu 001 miqrasiyası ilə yaradılıb)
             cur.execute("""
                 UPDATE employees SET 
                     role = %s, total_vacation_days = %s, umumi_gun = %s, max_sessions = %s, username = %s
@@ -1142,8 +1102,14 @@ def change_employee_password_admin(employee_id, new_password):
         if conn: conn.close()
     return False
 
-def load_data_for_user(current_user, force_refresh=False):
-    """Bütün işçilərin məlumatlarını və aktiv sessiya saylarını gətirir."""
+def load_data_for_user(current_user, force_refresh=False, full_reload=False):
+    """
+    Bütün işçilərin məlumatlarını və aktiv sessiya saylarını gətirir.
+    
+    Əvvəlki yükləmədən sinxronizasiya vəziyyəti qalıbsa, yalnız dəyişmiş sətirlər
+    (updated_at watermark-dan sonrakılar) və silinmiş ID-lər gətirilib birləşdirilir.
+    full_reload=True olduqda bütün cədvəllər yenidən oxunur.
+    """
     # monitor_operation decorator-ını şərti olaraq import et
     try:
         try:
@@ -1159,7 +1125,7 @@ def load_data_for_user(current_user, force_refresh=False):
     
     @monitor_operation("load_data_for_user")
     def _load_data():
-        logging.info(f"load_data_for_user başladı. İstifadəçi: {current_user['name']} (ID: {current_user['id']}, Rol: {current_user['role']}), force_refresh: {force_refresh}")
+        logging.info(f"load_data_for_user başladı. İstifadəçi: {current_user['name']} (ID: {current_user['id']}, Rol: {current_user['role']}), force_refresh: {force_refresh}, full_reload: {full_reload}")
         
         # OPTİMALLAŞDIRMA: hide sütununu yalnız lazım olduqda yoxla
         # Bu əməliyyat hər dəfə çağırılmamalıdır - cache edilməlidir
@@ -1180,10 +1146,292 @@ def load_data_for_user(current_user, force_refresh=False):
                 # Cache-i etibarsız et
                 cache.invalidate_cache()
         
+        if not full_reload:
+            data = _perform_incremental_load(current_user)
+            if data is not None:
+                return data
+        
         return _perform_database_load(current_user)
     
     return _load_data()
 
+# --- DELTA SİNXRONİZASİYA ---
+# employees və vacations cədvəllərində updated_at trigger ilə yenilənir,
+# silinmiş sətirlər isə sync_deleted_rows cədvəlinə yazılır. Klient son
+# sinxronizasiyanın server vaxtını (watermark) yadda saxlayır və növbəti dəfə
+# yalnız ondan sonra dəyişmiş sətirləri gətirir.
+
+# Eyni vaxtda commit olunan transaction-ları buraxmamaq üçün watermark-dan geriyə örtük
+DELTA_SYNC_OVERLAP_SECONDS = 5
+# Hər halda bu intervalda bir dəfə tam yükləmə edilir (təhlükəsizlik üçün)
+DELTA_FULL_RESYNC_SECONDS = 900
+# sync_deleted_rows-da qeydlər bu qədər saxlanılır
+DELTA_TOMBSTONE_RETENTION_DAYS = 7
+
+_EMPLOYEE_COLUMNS = """id, name, total_vacation_days, is_active, max_sessions,
+                               first_name, last_name, father_name, email, phone_number,
+                               birth_date, address, position, department, hire_date, salary, profile_image, role, username,
+                               fin_code, department_id, position_id"""
+_VACATION_COLUMNS = "id, employee_id, start_date, end_date, note, is_inactive, created_at, status"
+
+_delta_sync_lock = threading.Lock()
+_delta_sync_state = None
+_delta_sync_schema_checked = False
+_delta_sync_supported = True
+
+def _reset_tenant_sync_state():
+    """Tenant dəyişdikdə delta sinxronizasiya vəziyyətini, sorğu keşini və sxem yoxlamasını sıfırlayır"""
+    global _delta_sync_schema_checked, _delta_sync_supported
+    reset_delta_sync_state()
+    clear_query_cache()
+    _delta_sync_schema_checked = False
+    _delta_sync_supported = True
+
+def reset_delta_sync_state():
+    """Delta sinxronizasiya vəziyyətini silir - növbəti yükləmə tam olacaq"""
+    global _delta_sync_state
+    with _delta_sync_lock:
+        _delta_sync_state = None
+
+def ensure_delta_sync_schema():
+    """
+    Delta sinxronizasiya sxemi (updated_at, trigger-lər, sync_deleted_rows) 005 miqrasiyası ilə yaradılır.
+    Burada yalnız miqrasiyanın tətbiq olunduğu yoxlanılır və köhnə tombstone-lar təmizlənir (tenant başına bir dəfə).
+    """
+    global _delta_sync_schema_checked, _delta_sync_supported
+    
+    # OPTİMALLAŞDIRMA: Yalnız bir dəfə yoxla - cache edilmiş nəticə
+    if _delta_sync_schema_checked:
+        return _delta_sync_supported
+    
+    # db_connect() pool-u miqrasiya edir - tətbiq olunmuş miqrasiyalar ondan sonra məlumdur
+    conn = db_connect()
+    if not conn: return False
+    
+    if not is_migration_applied(DELTA_SYNC_MIGRATION):
+        conn.close()
+        # Miqrasiya yoxlaması alınmayıbsa (siyahı boşdur) mənfi nəticə cache edilmir -
+        # növbəti çağırış yenidən yoxlayır
+        if not get_applied_migrations():
+            return False
+        logging.warning("Delta sinxronizasiya miqrasiyası tətbiq olunmayıb, tam yükləmə istifadə olunacaq")
+        _delta_sync_supported = False
+        _delta_sync_schema_checked = True
+        return False
+    
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM sync_deleted_rows WHERE deleted_at < LOCALTIMESTAMP - make_interval(days => %s)",
+                (DELTA_TOMBSTONE_RETENTION_DAYS,)
+            )
+        conn.commit()
+        _delta_sync_supported = True
+    except psycopg2.Error as e:
+        conn.rollback()
+        logging.warning(f"Köhnə tombstone-lar təmizlənə bilmədi: {e}")
+        _delta_sync_supported = True
+    finally:
+        if conn: conn.close()
+    
+    _delta_sync_schema_checked = True
+    return _delta_sync_supported
+
+def _data_version_sql():
+    """Tenant məlumat versiyası üçün SQL ifadəsi (miqrasiya tətbiq olunmayıbsa NULL)"""
+    if is_migration_applied(DATA_VERSION_MIGRATION):
+        return "(SELECT version FROM tenant_data_version WHERE id = 1)"
+    return "NULL::bigint"
+
+def get_tenant_data_version():
+    """
+    Tenant məlumatlarının cari versiyasını qaytarır (employees, vacations, departments,
+    positions və active_sessions dəyişdikcə trigger ilə artır). Dəstəklənmirsə None.
+    """
+    if not is_migration_applied(DATA_VERSION_MIGRATION):
+        return None
+    conn = db_connect()
+    if not conn: return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT version FROM tenant_data_version WHERE id = 1")
+            row = cur.fetchone()
+            return row[0] if row else None
+    except psycopg2.Error as e:
+        logging.warning(f"Məlumat versiyası oxuna bilmədi: {e}")
+        return None
+    finally:
+        if conn: conn.close()
+
+def get_loaded_data_version():
+    """Son yüklənmiş (delta sinxronizasiya anbarındakı) məlumatların versiyası"""
+    state = _delta_sync_state
+    return state.get('data_version') if state else None
+
+def _seed_delta_sync_state(current_user, store, watermark, sessions_signature, data_version=None):
+    """Tam yükləmədən sonra delta sinxronizasiya vəziyyətini qurur"""
+    global _delta_sync_state
+    if watermark is None or not _delta_sync_supported:
+        return
+    with _delta_sync_lock:
+        _delta_sync_state = {
+            'user_key': (current_user['id'], current_user['role'].strip()),
+            'store': store,
+            'watermark': watermark,
+            'sessions_signature': sessions_signature,
+            'data_version': data_version,
+            'full_loaded_at': time.monotonic(),
+        }
+
+_SESSIONS_SIGNATURE_SQL = "(SELECT md5(COALESCE(string_agg(user_id::text, ',' ORDER BY user_id), '')) FROM active_sessions)"
+
+def _perform_incremental_load(current_user):
+    """
+    Son sinxronizasiyadan bəri dəyişmiş işçi/məzuniyyət sətirlərini gətirib əvvəlki
+    EmployeeStore-un surətinə birləşdirir. Delta mümkün deyilsə None qaytarır (tam yükləmə lazımdır).
+    Dəyişiklik yoxdursa, yalnız bir kiçik sorğu icra olunur və eyni anbar qaytarılır.
+    """
+    global _delta_sync_state
+    if not ensure_delta_sync_schema():
+        return None
+    
+    user_key = (current_user['id'], current_user['role'].strip())
+    is_admin = user_key[1] == 'admin'
+    
+    with _delta_sync_lock:
+        state = _delta_sync_state
+        if (state is None or state['user_key'] != user_key
+                or time.monotonic() - state['full_loaded_at'] > DELTA_FULL_RESYNC_SECONDS):
+            return None
+        
+        conn = db_connect()
+        if not conn:
+            return None
+        
+        try:
+            with conn.cursor() as cur:
+                # 0) Tenant versiyası dəyişməyibsə heç nə oxumağa ehtiyac yoxdur
+                data_version_sql = _data_version_sql()
+                if state.get('data_version') is not None:
+                    cur.execute(f"SELECT {data_version_sql}")
+                    current_version = cur.fetchone()[0]
+                    if current_version == state['data_version']:
+                        conn.commit()
+                        logging.info(f"Delta sinxronizasiya: məlumat versiyası dəyişməyib ({current_version})")
+                        return state['store']
+                
+                # 1) Bir sorğu ilə nəyin dəyişdiyini yoxlayırıq (indeksli EXISTS-lər)
+                since = state['watermark'] - timedelta(seconds=DELTA_SYNC_OVERLAP_SECONDS)
+                cur.execute(f"""
+                    SELECT clock_timestamp()::timestamp,
+                           EXISTS (SELECT 1 FROM employees WHERE updated_at > %(since)s),
+                           EXISTS (SELECT 1 FROM vacations WHERE updated_at > %(since)s),
+                           EXISTS (SELECT 1 FROM sync_deleted_rows WHERE deleted_at > %(since)s),
+                           {_SESSIONS_SIGNATURE_SQL},
+                           {data_version_sql}
+                """, {'since': since})
+                new_watermark, employees_changed, vacations_changed, rows_deleted, sessions_signature, data_version = cur.fetchone()
+                sessions_changed = sessions_signature != state['sessions_signature']
+                if employees_changed or vacations_changed or rows_deleted:
+                    # Başqa müştərinin yazdıqları - bu cədvəllərdən keşlənmiş sorğular köhnəlib
+                    invalidate_query_cache('employees', 'vacations')
+                
+                if not (employees_changed or vacations_changed or rows_deleted or sessions_changed):
+                    conn.commit()
+                    state['watermark'] = new_watermark
+                    state['data_version'] = data_version
+                    logging.info("Delta sinxronizasiya: dəyişiklik yoxdur")
+                    return state['store']
+                
+                own_filter = "" if is_admin else " AND id = %(user_id)s"
+                own_vac_filter = "" if is_admin else " AND employee_id = %(user_id)s"
+                params = {'since': since, 'user_id': current_user['id']}
+                
+                # Surət üzərində işləyirik: UI köhnə anbarı oxumağa davam edə bilər
+                store = state['store'].clone()
+                
+                session_counts = None
+                if sessions_changed or employees_changed:
+                    cur.execute("SELECT user_id, COUNT(*) FROM active_sessions GROUP BY user_id")
+                    session_counts = dict(cur.fetchall())
+                
+                # 2) Silinmiş sətirlər
+                if rows_deleted:
+                    cur.execute("SELECT table_name, row_id FROM sync_deleted_rows WHERE deleted_at > %(since)s", params)
+                    for table_name, row_id in cur.fetchall():
+                        if table_name == 'employees':
+                            store.remove_employee(row_id)
+                        elif table_name == 'vacations':
+                            store.remove_vacation(row_id)
+                
+                # 3) Dəyişmiş işçilər (gizlədilmiş işçilər modeldən çıxarılır)
+                new_employee_ids = []
+                changed_employees = 0
+                if employees_changed:
+                    cur.execute(f"""
+                        SELECT {_EMPLOYEE_COLUMNS}, hide
+                        FROM employees
+                        WHERE updated_at > %(since)s{own_filter}
+                    """, params)
+                    for row in cur.fetchall():
+                        emp_id, hidden = row[0], row[-1]
+                        changed_employees += 1
+                        if hidden:
+                            store.remove_employee(emp_id)
+                            continue
+                        if store.get_by_id(emp_id) is None:
+                            new_employee_ids.append(emp_id)
+                        store.upsert_employee(emp_id, Employee.from_row(row[:-1], session_counts))
+                
+                # Yeni görünən işçilərin (məs. gizlədilməsi ləğv edilən) bütün məzuniyyətləri
+                if new_employee_ids:
+                    cur.execute(f"""
+                        SELECT {_VACATION_COLUMNS}
+                        FROM vacations
+                        WHERE employee_id = ANY(%s) AND is_archived = FALSE
+                    """, (new_employee_ids,))
+                    for vac in cur.fetchall():
+                        store.upsert_vacation(vac[1], Vacation.from_row(vac))
+                
+                # 4) Dəyişmiş məzuniyyətlər (arxivlənənlər modeldən çıxarılır)
+                changed_vacations = 0
+                if vacations_changed:
+                    cur.execute(f"""
+                        SELECT {_VACATION_COLUMNS}, is_archived
+                        FROM vacations
+                        WHERE updated_at > %(since)s{own_vac_filter}
+                    """, params)
+                    for row in cur.fetchall():
+                        changed_vacations += 1
+                        store.remove_vacation(row[0])
+                        if not row[-1]:
+                            store.upsert_vacation(row[1], Vacation.from_row(row[:-1]))
+                
+                # 5) Aktiv sessiya sayları
+                if session_counts is not None:
+                    for emp_id in list(store.ids()):
+                        store.update_employee_fields(emp_id, active_session_count=session_counts.get(emp_id, 0))
+            
+            conn.commit()
+            state.update({
+                'store': store,
+                'watermark': new_watermark,
+                'sessions_signature': sessions_signature,
+                'data_version': data_version,
+            })
+            logging.info(f"Delta sinxronizasiya: {changed_employees} işçi, {changed_vacations} məzuniyyət dəyişikliyi birləşdirildi")
+            return store
+        except Exception as e:
+            logging.warning(f"Delta sinxronizasiya xətası, tam yükləməyə keçilir: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            _delta_sync_state = None
+            return None
+        finally:
+            if conn: conn.close()
+
 def _perform_database_load(current_user):
     """Database-dən məlumatları yükləyir"""
     # OPTİMALLAŞDIRMA: İşçi məzuniyyət günlərini yoxlama yalnız lazım olduqda işləsin
@@ -1193,6 +1441,7 @@ def _perform_database_load(current_user):
     # check_and_fix_employee_vacation_days()  # ŞƏRTLİ: Yalnız lazım olduqda çağır
     
     logging.info("Database məlumatları yüklənir...")
+    delta_sync = ensure_delta_sync_schema()
     
     try:
         conn = db_connect()
@@ -1201,9 +1450,22 @@ def _perform_database_load(current_user):
             return {}
         
         logging.info("Veritabanı qoşulması uğurlu oldu")
-        data = {}
+        data = EmployeeStore()
+        watermark = None
+        sessions_signature = None
+        data_version = None
         
         with conn.cursor() as cur:
+            # Delta sinxronizasiya üçün başlanğıc nöqtəsi (oxumadan əvvəlki server vaxtı)
+            if delta_sync:
+                try:
+                    cur.execute(f"SELECT clock_timestamp()::timestamp, {_SESSIONS_SIGNATURE_SQL}, {_data_version_sql()}")
+                    watermark, sessions_signature, data_version = cur.fetchone()
+                except Exception as e:
+                    logging.warning(f"Sinxronizasiya watermark-ı alınarkən xəta: {e}")
+                    conn.rollback()
+                    watermark = None
+            
             # Aktiv sessiya saylarını alırıq
             try:
                 cur.execute("SELECT user_id, COUNT(*) FROM active_sessions GROUP BY user_id")
@@ -1217,22 +1479,16 @@ def _perform_database_load(current_user):
             try:
                 if current_user['role'].strip() == 'admin':
                     # Admin bütün işçiləri görə bilər
-                    cur.execute("""
-                        SELECT id, name, total_vacation_days, is_active, max_sessions,
-                               first_name, last_name, father_name, email, phone_number,
-                               birth_date, address, position, department, hire_date, salary, profile_image, role, username,
-                               fin_code, department_id, position_id
+                    cur.execute(f"""
+                        SELECT {_EMPLOYEE_COLUMNS}
                         FROM employees 
                         WHERE hide IS NULL OR hide = FALSE 
                         ORDER BY name
                     """)
                 else:
                     # Adi istifadəçi yalnız öz məlumatını görə bilər
-                    cur.execute("""
-                        SELECT id, name, total_vacation_days, is_active, max_sessions,
-                               first_name, last_name, father_name, email, phone_number,
-                               birth_date, address, position, department, hire_date, salary, profile_image, role, username,
-                               fin_code, department_id, position_id
+                    cur.execute(f"""
+                        SELECT {_EMPLOYEE_COLUMNS}
                         FROM employees 
                         WHERE id = %s AND (hide IS NULL OR hide = FALSE)
                     """, (current_user['id'],))
@@ -1241,34 +1497,8 @@ def _perform_database_load(current_user):
                 logging.info(f"İşçi sayı: {len(employees)}")
                 
                 for emp in employees:
-                    emp_id, name, total_days, is_active, max_sessions, first_name, last_name, father_name, email, phone_number, birth_date, address, position, department, hire_date, salary, profile_image, role, username, fin_code, department_id, position_id = emp
-                    
-                    # İşçi məlumatlarını dictionary-ə əlavə edirik
-                    data[name] = {
-                        'db_id': emp_id,
-                        'umumi_gun': total_days or 30,  # Default 30 gün
-                        'is_active': bool(is_active),
-                        'max_sessions': max_sessions or 1,
-                        'active_session_count': session_counts.get(emp_id, 0),
-                        'goturulen_icazeler': [],
-                        'first_name': first_name or '',
-                        'last_name': last_name or '',
-                        'father_name': father_name or '',
-                        'email': email or '',
-                        'phone_number': phone_number or '',
-                        'birth_date': birth_date.strftime('%Y-%m-%d') if birth_date else '',
-                        'address': address or '',
-                        'position': position or '',
-                        'department': department or '',
-                        'hire_date': hire_date.strftime('%Y-%m-%d') if hire_date else '',
-                        'salary': salary or '',
-                        'profile_image': profile_image or '',
-                        'role': role or 'user',
-                        'username': username or '',
-                        'fin_code': fin_code if fin_code is not None else '',
-                        'department_id': department_id if department_id is not None else '',
-                        'position_id': position_id if position_id is not None else ''
-                    }
+                    # İşçi məlumatlarını anbara əlavə edirik (ID, ad, şöbə və status üzrə indekslənir)
+                    data.upsert_employee(emp[0], Employee.from_row(emp, session_counts))
                 
                 logging.info(f"✅ {len(data)} işçi məlumatı yükləndi")
                 
@@ -1280,16 +1510,16 @@ def _perform_database_load(current_user):
             try:
                 if current_user['role'].strip() == 'admin':
                     # Admin bütün məzuniyyətləri görə bilər
-                    cur.execute("""
-                        SELECT id, employee_id, start_date, end_date, note, is_inactive, created_at, status 
+                    cur.execute(f"""
+                        SELECT {_VACATION_COLUMNS}
                         FROM vacations 
                         WHERE is_archived = FALSE 
                         ORDER BY start_date
                     """)
                 else:
                     # Adi istifadəçi yalnız öz məzuniyyətlərini görə bilər
-                    cur.execute("""
-                        SELECT id, employee_id, start_date, end_date, note, is_inactive, created_at, status 
+                    cur.execute(f"""
+                        SELECT {_VACATION_COLUMNS}
                         FROM vacations 
                         WHERE employee_id = %s AND is_archived = FALSE 
                         ORDER BY start_date
@@ -1299,36 +1529,21 @@ def _perform_database_load(current_user):
                 logging.info(f"Məzuniyyət sayı: {len(vacations)}")
                 
                 for vac in vacations:
-                    vac_id, employee_id, start_date, end_date, note, is_inactive, created_at, status = vac
-                    
-                    # İşçi adını tapırıq
-                    employee_name = None
-                    for name, emp_data in data.items():
-                        if emp_data['db_id'] == employee_id:
-                            employee_name = name
-                            break
-                    
-                    if employee_name:
-                        # Məzuniyyət məlumatlarını əlavə edirik
-                        vacation_data = {
-                            'db_id': vac_id,
-                            'baslama': start_date,
-                            'bitme': end_date,
-                            'qeyd': note or '',
-                            'aktiv_deyil': bool(is_inactive),
-                            'yaradilma_tarixi': created_at,
-                            'status': status or 'pending'
-                        }
-                        data[employee_name]['goturulen_icazeler'].append(vacation_data)
+                    # Məzuniyyət işçiyə ID üzrə birbaşa bağlanır (O(1)), siyahı tarixə görə sıralı qalır
+                    data.upsert_vacation(vac[1], Vacation.from_row(vac))
                 
                 logging.info("Məzuniyyət məlumatları emal edildi")
                 
             except Exception as e:
                 logging.error(f"Məzuniyyət məlumatları alınarkən xəta: {e}")
+                watermark = None
             
         conn.commit()
         logging.info(f"✅ Database məlumatları uğurla yükləndi: {len(data)} işçi")
         
+        # Növbəti yeniləmələr yalnız dəyişiklikləri gətirəcək
+        _seed_delta_sync_state(current_user, data, watermark, sessions_signature, data_version)
+        
         # TƏHLÜKƏSİZLİK: İşçi məlumatları heç vaxt cache edilmir!
         # Bu məlumatlar həssas məlumatlardır və yerli faylda saxlanılmamalıdır
         logging.info("TƏHLÜKƏSİZLİK: İşçi məlumatları cache edilmir - həssas məlumatlar yerli faylda saxlanılmır")
@@ -1345,6 +1560,7 @@ def _perform_database_load(current_user):
 
 # --- MƏZUNİYYƏT (VACATION) FUNKSİYALARI ---
 
+@invalidates_query_cache('vacations')
 def add_vacation(employee_id, employee_name, vac_data, requested_by_role):
     # DEBUG: Sorğu göndərilməyə başladı
     print(f"🔵 DEBUG add_vacation: Funksiya çağırıldı - employee_id={employee_id}, employee_name={employee_name}")
@@ -1388,12 +1604,10 @@ def add_vacation(employee_id, employee_name, vac_data, requested_by_role):
                 (employee_id, vac_data['baslama'], vac_data['bitme'], vac_data['qeyd'], vac_data['yaradilma_tarixi'], status))
             vac_id = cur.fetchone()[0]
             if status == 'pending':
-                # Admin ID-lərini alırıq
-                cur.execute("SELECT id FROM employees WHERE role = 'admin'")
-                admin_ids = [row[0] for row in cur.fetchall()]
+                # Bütün adminlərə bildiriş - bir INSERT ... SELECT ilə
+                from .bulk_operations import notify_admins
                 message = f"İşçi '{employee_name}' yeni məzuniyyət sorğusu göndərdi."
-                for admin_id in admin_ids: 
-                    create_notification(admin_id, message, vac_id, cur)
+                notify_admins(cur, message, vac_id)
         conn.commit()
         
         # DEBUG: Uğurlu əlavə etmə
@@ -1434,6 +1648,7 @@ def add_vacation(employee_id, employee_name, vac_data, requested_by_role):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('vacations')
 def update_vacation(vac_id, vac_data, admin_name):
     conn = db_connect()
     if not conn: 
@@ -1463,6 +1678,7 @@ def update_vacation(vac_id, vac_data, admin_name):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('vacations')
 def update_vacation_status(vac_id, new_status, admin_name):
     conn = db_connect()
     if not conn: return
@@ -1492,6 +1708,7 @@ def update_vacation_status(vac_id, new_status, admin_name):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('vacations')
 def delete_vacation(vac_id, admin_name):
     conn = db_connect()
     if not conn: return False
@@ -1527,6 +1744,7 @@ def delete_vacation(vac_id, admin_name):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('vacations')
 def toggle_vacation_activity(vac_id, new_status, admin_name):
     conn = db_connect()
     if not conn: return
@@ -1545,6 +1763,7 @@ def toggle_vacation_activity(vac_id, new_status, admin_name):
         if conn: conn.close()
 
 # --- ARXİVLƏMƏ FUNKSİYALARI ---
+@cached_query(ttl=60, tags=('employees', 'vacations'))
 def get_employees_with_archivable_vacations():
     conn = db_connect()
     if not conn: return []
@@ -1566,25 +1785,16 @@ def get_employees_with_archivable_vacations():
         if conn: conn.close()
     return employees
 
-def start_new_vacation_year(employee_ids, default_days=30):
-    conn = db_connect()
-    if not conn: return False
-    try:
-        with conn.cursor() as cur:
-            # Köhnə məzuniyyətləri arxivə edirik
-            current_year = date.today().year
-            cur.execute("UPDATE vacations SET is_archived = TRUE WHERE EXTRACT(YEAR FROM start_date) < %s AND status = 'approved'", (current_year,))
-            
-            # İşçilərin məzuniyyət günlərini yeniləyirik
-            for emp_id in employee_ids:
-                cur.execute("UPDATE employees SET total_vacation_days = %s WHERE id = %s", (default_days, emp_id))
-            
-        conn.commit()
-        return True
-    except psycopg2.Error as e: messagebox.showerror("Baza Xətası", f"Yeni il başladılarkən xəta: \n{e}")
-    finally:
-        if conn: conn.close()
-    return False
+@invalidates_query_cache('employees', 'vacations')
+def start_new_vacation_year(employee_ids, default_days=30, progress_callback=None):
+    # Köhnə məzuniyyətlər arxivə köçürülür, işçilərin məzuniyyət günləri hissə-hissə toplu UPDATE ilə yenilənir
+    from .bulk_operations import bulk_start_new_vacation_year
+    result = bulk_start_new_vacation_year(employee_ids, default_days, archive_all=True, progress_callback=progress_callback)
+    if not result['success']:
+        from tkinter import messagebox
+        logging.error(f"Yeni il başladılarkən xəta: {'; '.join(result['errors'])}")
+        messagebox.showerror("Baza Xətası", f"Yeni il başladılarkən xəta: \n{'; '.join(result['errors'])}")
+    return result['success']
 
 def load_archived_vacations_for_year(employee_id, year):
     conn = db_connect()
@@ -1705,6 +1915,7 @@ def check_and_fix_employee_vacation_days():
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def fix_all_employee_vacation_days():
     """Bütün işçilərin məzuniyyət günlərini 30-a təyin edir"""
     conn = db_connect()
@@ -1725,6 +1936,7 @@ def fix_all_employee_vacation_days():
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def hide_employee(emp_id, admin_password, current_admin_id):
     """İşçini gizlədir (hide=true) - admin parolu tələb edir"""
     conn = db_connect()
@@ -1766,6 +1978,7 @@ def hide_employee(emp_id, admin_password, current_admin_id):
         if conn: conn.close()
     return False
 
+@invalidates_query_cache('employees')
 def unhide_employee(emp_id):
     """İşçini göstərir (hide=false)"""
     conn = db_connect()
@@ -1793,6 +2006,7 @@ def unhide_employee(emp_id):
         if conn: conn.close()
     return False
 
+@invalidates_query_cache('employees', 'vacations')
 def permanently_delete_employee(emp_id, admin_password, current_admin_id):
     """İşçini həqiqətən silir - admin parolu tələb edir"""
     conn = db_connect()
@@ -1834,6 +2048,7 @@ def permanently_delete_employee(emp_id, admin_password, current_admin_id):
         if conn: conn.close()
     return False
 
+@cached_query(tags=('employees',))
 def get_hidden_employees():
     """Gizlənmiş işçiləri gətirir"""
     conn = db_connect()
@@ -1848,44 +2063,6 @@ def get_hidden_employees():
         if conn: conn.close()
     return []
 
-# Cache üçün global dəyişən
-_hide_column_checked = False
-
 def ensure_hide_column_exists():
-    """employees cədvəlində hide sütununun olub-olmadığını yoxlayır və əgər yoxdursa əlavə edir"""
-    global _hide_column_checked
-    
-    # OPTİMALLAŞDIRMA: Yalnız bir dəfə yoxla - cache edilmiş nəticə
-    if _hide_column_checked:
-        return True
-    
-    conn = db_connect()
-    if not conn: return False
-    
-    try:
-        with conn.cursor() as cur:
-            # hide sütununun olub-olmadığını yoxlayırıq
-            cur.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND column_name = 'hide'
-            """)
-            result = cur.fetchone()
-            
-            if not result:
-                # hide sütunu yoxdur, əlavə edirik
-                cur.execute("ALTER TABLE employees ADD COLUMN hide BOOLEAN DEFAULT FALSE")
-                conn.commit()
-                logging.info("hide sütunu employees cədvəlinə əlavə edildi")
-                _hide_column_checked = True
-                return True
-            else:
-                logging.debug("hide sütunu artıq mövcuddur")
-                _hide_column_checked = True
-                return True
-                
-    except psycopg2.Error as e:
-        logging.error(f"hide sütunu əlavə edilərkən xəta: {e}")
-        return False
-    finally:
-        if conn: conn.close()
\ No newline at end of file
+    """hide sütunu 001 miqrasiyası ilə yaradılır; köhnə çağırışlar üçün saxlanılıb"""
+    return ensure_schema_migrated()
@@ -6,86 +6,24 @@
 
 import psycopg2
 from .connection import db_connect
+from .migrations import ensure_schema_migrated, is_migration_applied, DEFAULT_DEPARTMENTS, DEFAULT_POSITIONS
+from .query_cache import cached_query, invalidates_query_cache
+
+DEPARTMENTS_MIGRATION = 3  # migrations.py: 003_departments_positions
 
 def check_tables_exist():
-    """Şöbə və vəzifə cədvəllərinin mövcudluğunu yoxlayır"""
-    conn = db_connect()
-    if not conn:
-        return False
-    
-    try:
-        with conn.cursor() as cur:
-            # Hər iki cədvəlin mövcudluğunu yoxla
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'departments'
-                ) AND EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'positions'
-                )
-            """)
-            result = cur.fetchone()
-            return result[0] if result else False
-    except psycopg2.Error as e:
-        print(f"Cədvəl yoxlaması xətası: {e}")
-        return False
-    finally:
-        conn.close()
+    """Şöbə və vəzifə cədvəlləri 003 miqrasiyası ilə yaradılır - miqrasiyanın tətbiq olunduğunu yoxlayır"""
+    return ensure_schema_migrated() and is_migration_applied(DEPARTMENTS_MIGRATION)
 
 def create_departments_table():
-    """Şöbələr cədvəlini yaradır"""
-    conn = db_connect()
-    if not conn:
-        return False
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS departments (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL UNIQUE,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
-            return True
-    except psycopg2.Error as e:
-        print(f"Şöbələr cədvəli yaradıla bilmədi: {e}")
-        return False
-    finally:
-        if conn:
-            conn.close()
+    """Şöbələr cədvəli 003 miqrasiyası ilə yaradılır; köhnə çağırışlar üçün saxlanılıb"""
+    return check_tables_exist()
 
 def create_positions_table():
-    """Vəzifələr cədvəlini yaradır"""
-    conn = db_connect()
-    if not conn:
-        return False
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS positions (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL UNIQUE,
-                    department_id INTEGER REFERENCES departments(id) ON DELETE SET NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
-            return True
-    except psycopg2.Error as e:
-        print(f"Vəzifələr cədvəli yaradıla bilmədi: {e}")
-        return False
-    finally:
-        if conn:
-            conn.close()
+    """Vəzifələr cədvəli 003 miqrasiyası ilə yaradılır; köhnə çağırışlar üçün saxlanılıb"""
+    return check_tables_exist()
 
+@invalidates_query_cache('departments')
 def add_department(name, description=None):
     """Yeni şöbə əlavə edir"""
     conn = db_connect()
@@ -110,6 +48,7 @@ def add_department(name, description=None):
         if conn:
             conn.close()
 
+@invalidates_query_cache('positions')
 def add_position(name, department_id=None, description=None):
     """Yeni vəzifə əlavə edir"""
     conn = db_connect()
@@ -134,6 +73,7 @@ def add_position(name, department_id=None, description=None):
         if conn:
             conn.close()
 
+@cached_query(tags=('departments',))
 def get_all_departments():
     """Bütün şöbələri gətirir"""
     conn = db_connect()
@@ -155,6 +95,7 @@ def get_all_departments():
         if conn:
             conn.close()
 
+@cached_query(tags=('positions', 'departments'))
 def get_all_positions():
     """Bütün vəzifələri gətirir"""
     conn = db_connect()
@@ -177,6 +118,7 @@ def get_all_positions():
         if conn:
             conn.close()
 
+@invalidates_query_cache('departments', 'positions')
 def update_department(department_id, name, description=None):
     """Şöbəni yeniləyir"""
     conn = db_connect()
@@ -202,6 +144,7 @@ def update_department(department_id, name, description=None):
         if conn:
             conn.close()
 
+@invalidates_query_cache('positions')
 def update_position(position_id, name, department_id=None, description=None):
     """Vəzifəni yeniləyir"""
     conn = db_connect()
@@ -227,6 +170,7 @@ def update_position(position_id, name, department_id=None, description=None):
         if conn:
             conn.close()
 
+@invalidates_query_cache('departments', 'positions')
 def delete_department(department_id):
     """Şöbəni silir"""
     conn = db_connect()
@@ -253,6 +197,7 @@ def delete_department(department_id):
         if conn:
             conn.close()
 
+@invalidates_query_cache('positions')
 def delete_position(position_id):
     """Vəzifəni silir"""
     conn = db_connect()
@@ -271,6 +216,7 @@ def delete_position(position_id):
         if conn:
             conn.close()
 
+@cached_query(tags=('departments',))
 def get_departments_for_combo():
     """Combo box üçün şöbələr siyahısını gətirir"""
     conn = db_connect()
@@ -288,6 +234,7 @@ def get_departments_for_combo():
         if conn:
             conn.close()
 
+@cached_query(tags=('positions',))
 def get_positions_for_combo():
     """Combo box üçün vəzifələr siyahısını gətirir"""
     conn = db_connect()
@@ -306,42 +253,18 @@ def get_positions_for_combo():
             conn.close()
 
 def initialize_default_data():
-    """Default şöbə və vəzifələri əlavə edir"""
-    # Default şöbələr
-    default_departments = [
-        ("İnsan Resursları", "İnsan resursları idarəetməsi"),
-        ("Maliyyə", "Maliyyə və mühasibatlıq"),
-        ("İT", "İnformasiya texnologiyaları"),
-        ("Marketinq", "Marketinq və satış"),
-        ("İstehsal", "İstehsal və keyfiyyət"),
-        ("Rəhbərlik", "Rəhbərlik və idarəetmə")
-    ]
-    
-    # Default vəzifələr
-    default_positions = [
-        ("Direktor", None, "Direktor"),
-        ("Baş direktor", None, "Baş direktor"),
-        ("Menecer", None, "Menecer"),
-        ("Mühasib", 2, "Mühasib"),  # Maliyyə şöbəsi
-        ("Proqramçı", 3, "Proqramçı"),  # İT şöbəsi
-        ("Dizayner", 4, "Dizayner"),  # Marketinq şöbəsi
-        ("Operator", 5, "Operator"),  # İstehsal şöbəsi
-        ("HR mütəxəssisi", 1, "HR mütəxəssisi"),  # İnsan Resursları
-        ("Satış meneceri", 4, "Satış meneceri"),  # Marketinq
-        ("Texnik", 5, "Texnik")  # İstehsal
-    ]
-    
-    # Cədvəlləri yarat
-    create_departments_table()
-    create_positions_table()
+    """Default şöbə və vəzifələri əlavə edir (yeni bazada 003 miqrasiyası bunu avtomatik edir)"""
+    if not check_tables_exist():
+        return
     
     # Default şöbələri əlavə et
-    for dept_name, dept_desc in default_departments:
+    for dept_name, dept_desc in DEFAULT_DEPARTMENTS:
         add_department(dept_name, dept_desc)
     
-    # Default vəzifələri əlavə et
-    for pos_name, dept_id, pos_desc in default_positions:
-        add_position(pos_name, dept_id, pos_desc)
+    # Default vəzifələri əlavə et (şöbə adı ID-yə çevrilir)
+    department_ids = {dept[1]: dept[0] for dept in get_all_departments()}
+    for pos_name, dept_name, pos_desc in DEFAULT_POSITIONS:
+        add_position(pos_name, department_ids.get(dept_name), pos_desc)
     
     print("Default şöbə və vəzifələr əlavə edildi")
 
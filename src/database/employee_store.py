@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İşçi/Məzuniyyət Yaddaş Anbarı (Employee Store)
+İndekslənmiş in-memory model - loader, real-time handler-lər və UI eyni strukturdan oxuyur
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import date
+
+try:
+    from .records import Employee, Vacation
+except ImportError:
+    from database.records import Employee, Vacation
+
+NO_DEPARTMENT = 'Şöbə təyin edilməyib'
+
+# İşçi statusları (siyahıdakı rəngli sətirlərə uyğundur)
+STATUS_INACTIVE = 'inactive'   # Hesab deaktivdir
+STATUS_ONLINE = 'online'       # Aktiv sessiyası var
+STATUS_ACTIVE = 'active'       # Aktiv, amma hazırda sistemdə deyil
+
+
+def employee_status(record):
+    """İşçi qeydindən statusu hesablayır"""
+    if not record.get('is_active', True):
+        return STATUS_INACTIVE
+    if record.get('active_session_count', 0) > 0:
+        return STATUS_ONLINE
+    return STATUS_ACTIVE
+
+
+def _vacation_sort_key(vacation):
+    # Anbardakı məzuniyyətlərin tarixləri artıq date obyektidir (records.Vacation)
+    start = vacation.get('baslama')
+    if start is None:
+        return (1, date.min, vacation.get('db_id') or 0)
+    return (0, start, vacation.get('db_id') or 0)
+
+
+class EmployeeStore(Mapping):
+    """
+    İşçilər üçün indekslənmiş anbar.
+
+    - Əsas indeks: işçi ID-si -> qeyd (self.data formatında dict)
+    - İkinci dərəcəli indekslər: ad, şöbə, status
+    - Hər işçinin məzuniyyətləri başlama tarixinə görə sıralı saxlanılır
+    - Məzuniyyət ID-si -> işçi ID-si indeksi
+
+    Mapping interfeysi işçi ID-si üzrədir (eyni adlı işçilər bir-birini örtmür, len() işçi
+    sayıdır); ad üzrə axtarış ikinci dərəcəli indekslə get_by_name/id_of/ids_named ilədir.
+    clone() copy-on-write surəti qaytarır: arxa fon thread-i surəti dəyişərkən UI köhnə
+    anbarı təhlükəsiz oxuya bilir.
+    """
+
+    def __init__(self):
+        self._by_id = {}
+        self._ids_by_name = {}
+        self._ids_by_department = {}
+        self._ids_by_status = {}
+        self._vacation_keys = {}
+        self._vacation_owner = {}
+        self._owned = set()
+
+    # --- Yaratma ---
+
+    @classmethod
+    def from_name_dict(cls, data):
+        """Köhnə ad üzrə dict-dən (məs. keş faylı) və ya başqa anbardan anbar qurur"""
+        if isinstance(data, EmployeeStore):
+            return data
+        store = cls()
+        if not data:
+            return store
+        for name, record in data.items():
+            if not isinstance(record, Mapping):
+                continue
+            emp_id = record.get('db_id')
+            if emp_id is None:
+                continue
+            vacations = record.get('goturulen_icazeler') or []
+            record = Employee.from_mapping(record)
+            if 'name' not in record and isinstance(name, str):
+                record['name'] = name
+            store.upsert_employee(emp_id, record)
+            for vacation in vacations:
+                store.upsert_vacation(emp_id, vacation)
+        return store
+
+    def clone(self):
+        """Copy-on-write surət: qeydlər paylaşılır, ilk dəyişiklikdə kopyalanır"""
+        other = EmployeeStore.__new__(EmployeeStore)
+        other._by_id = dict(self._by_id)
+        other._ids_by_name = {key: set(ids) for key, ids in self._ids_by_name.items()}
+        other._ids_by_department = {key: set(ids) for key, ids in self._ids_by_department.items()}
+        other._ids_by_status = {key: set(ids) for key, ids in self._ids_by_status.items()}
+        other._vacation_keys = dict(self._vacation_keys)
+        other._vacation_owner = dict(self._vacation_owner)
+        other._owned = set()
+        return other
+
+    def _own(self, emp_id):
+        """Qeydi və onun məzuniyyət siyahısını bu anbar üçün kopyalayır (yazmadan əvvəl)"""
+        record = self._by_id[emp_id]
+        if emp_id not in self._owned:
+            record = record.copy()
+            record['goturulen_icazeler'] = list(record['goturulen_icazeler'])
+            self._by_id[emp_id] = record
+            self._vacation_keys[emp_id] = list(self._vacation_keys.get(emp_id, []))
+            self._owned.add(emp_id)
+        return record
+
+    # --- İndeks köməkçiləri ---
+
+    @staticmethod
+    def _index_add(index, key, emp_id):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = {emp_id}
+        else:
+            ids.add(emp_id)
+
+    @staticmethod
+    def _index_discard(index, key, emp_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(emp_id)
+            if not ids:
+                del index[key]
+
+    def _unindex(self, emp_id, record):
+        self._index_discard(self._ids_by_name, record.get('name'), emp_id)
+        self._index_discard(self._ids_by_department, record.get('department') or NO_DEPARTMENT, emp_id)
+        self._index_discard(self._ids_by_status, employee_status(record), emp_id)
+
+    def _index(self, emp_id, record):
+        self._index_add(self._ids_by_name, record.get('name'), emp_id)
+        self._index_add(self._ids_by_department, record.get('department') or NO_DEPARTMENT, emp_id)
+        self._index_add(self._ids_by_status, employee_status(record), emp_id)
+
+    # --- İşçilər ---
+
+    def upsert_employee(self, emp_id, record):
+        """
+        İşçini əlavə edir və ya yeniləyir.
+        Mövcud işçinin məzuniyyətləri saxlanılır (qeyddəki 'goturulen_icazeler' nəzərə alınmır);
+        məzuniyyətlər upsert_vacation/remove_vacation ilə idarə olunur.
+        """
+        record = Employee.from_mapping(record)
+        record['db_id'] = emp_id
+        old = self._by_id.get(emp_id)
+        if old is not None:
+            self._unindex(emp_id, old)
+            record['goturulen_icazeler'] = list(old['goturulen_icazeler'])
+            self._vacation_keys[emp_id] = list(self._vacation_keys.get(emp_id, []))
+        else:
+            record['goturulen_icazeler'] = []
+            self._vacation_keys[emp_id] = []
+        self._by_id[emp_id] = record
+        self._owned.add(emp_id)
+        self._index(emp_id, record)
+        return record
+
+    def update_employee_fields(self, emp_id, **fields):
+        """İşçinin bir neçə sahəsini yeniləyir (məs. active_session_count)"""
+        if emp_id not in self._by_id:
+            return None
+        record = self._by_id[emp_id]
+        if all(record.get(key) == value for key, value in fields.items()):
+            return record
+        self._unindex(emp_id, record)
+        record = self._own(emp_id)
+        record.update(fields)
+        self._index(emp_id, record)
+        return record
+
+    def remove_employee(self, emp_id):
+        """İşçini və onun məzuniyyətlərini silir"""
+        record = self._by_id.pop(emp_id, None)
+        if record is None:
+            return None
+        self._unindex(emp_id, record)
+        self._drop_vacations_of(emp_id, record)
+        self._vacation_keys.pop(emp_id, None)
+        self._owned.discard(emp_id)
+        return record
+
+    def _drop_vacations_of(self, emp_id, record):
+        for vacation in record.get('goturulen_icazeler', []):
+            if self._vacation_owner.get(vacation.get('db_id')) == emp_id:
+                del self._vacation_owner[vacation['db_id']]
+
+    # --- Məzuniyyətlər ---
+
+    def upsert_vacation(self, employee_id, vacation):
+        """Məzuniyyəti əlavə edir və ya yeniləyir; siyahı başlama tarixinə görə sıralı qalır"""
+        if employee_id not in self._by_id:
+            return False
+        if not isinstance(vacation, Vacation):
+            vacation = Vacation(vacation)
+        vac_id = vacation.get('db_id')
+        if vac_id is not None and vac_id in self._vacation_owner:
+            self.remove_vacation(vac_id)
+        record = self._own(employee_id)
+        keys = self._vacation_keys[employee_id]
+        key = _vacation_sort_key(vacation)
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        record['goturulen_icazeler'].insert(position, vacation)
+        if vac_id is not None:
+            self._vacation_owner[vac_id] = employee_id
+        return True
+
+    def remove_vacation(self, vac_id):
+        """Məzuniyyəti ID üzrə silir"""
+        employee_id = self._vacation_owner.pop(vac_id, None)
+        if employee_id is None or employee_id not in self._by_id:
+            return None
+        record = self._own(employee_id)
+        vacations = record['goturulen_icazeler']
+        keys = self._vacation_keys[employee_id]
+        for position in range(len(vacations)):
+            if vacations[position].get('db_id') == vac_id:
+                del keys[position]
+                return vacations.pop(position)
+        return None
+
+    def get_vacation(self, vac_id):
+        employee_id = self._vacation_owner.get(vac_id)
+        if employee_id is None:
+            return None
+        for vacation in self._by_id[employee_id]['goturulen_icazeler']:
+            if vacation.get('db_id') == vac_id:
+                return vacation
+        return None
+
+    def vacation_owner(self, vac_id):
+        return self._vacation_owner.get(vac_id)
+
+    def vacations_for(self, emp_id):
+        record = self._by_id.get(emp_id)
+        return record['goturulen_icazeler'] if record else []
+
+    def vacations_starting_between(self, emp_id, start, end):
+        """İşçinin [start, end] aralığında başlayan məzuniyyətləri (sıralı siyahıda bisect)"""
+        keys = self._vacation_keys.get(emp_id)
+        if not keys:
+            return []
+        lo = bisect_left(keys, (0, start))
+        hi = bisect_right(keys, (0, end, float('inf')))
+        return self._by_id[emp_id]['goturulen_icazeler'][lo:hi]
+
+    def iter_vacations(self):
+        """(işçi qeydi, məzuniyyət) cütlərini qaytarır"""
+        for record in self._by_id.values():
+            for vacation in record['goturulen_icazeler']:
+                yield record, vacation
+
+    # --- Sorğular ---
+
+    def get_by_id(self, emp_id):
+        return self._by_id.get(emp_id)
+
+    def name_of(self, emp_id):
+        record = self._by_id.get(emp_id)
+        return record.get('name') if record else None
+
+    def id_of(self, name):
+        """Adın ilk (ən kiçik ID-li) işçisi; eyni adlı işçilər üçün ids_named"""
+        ids = self._ids_by_name.get(name)
+        return min(ids) if ids else None
+
+    def ids_named(self, name):
+        return self._ids_by_name.get(name, set())
+
+    def get_by_name(self, name, default=None):
+        emp_id = self.id_of(name)
+        return self._by_id[emp_id] if emp_id is not None else default
+
+    def has_name(self, name):
+        return name in self._ids_by_name
+
+    def names(self):
+        return self._ids_by_name.keys()
+
+    def ids(self):
+        return self._by_id.keys()
+
+    def departments(self):
+        """Şöbə adlarının sıralı siyahısı"""
+        return sorted(self._ids_by_department)
+
+    def ids_in_department(self, department):
+        return self._ids_by_department.get(department or NO_DEPARTMENT, set())
+
+    def employees_in_department(self, department):
+        """Şöbədəki işçilər (ad, qeyd) cütləri, ada görə sıralı"""
+        records = [self._by_id[emp_id] for emp_id in self.ids_in_department(department)]
+        records.sort(key=lambda record: record.get('name') or '')
+        return [(record.get('name'), record) for record in records]
+
+    def ids_with_status(self, status):
+        return self._ids_by_status.get(status, set())
+
+    def status_counts(self):
+        return {status: len(ids) for status, ids in self._ids_by_status.items()}
+
+    def department_counts(self):
+        return {department: len(ids) for department, ids in self._ids_by_department.items()}
+
+    def by_name(self):
+        """Ad üzrə adi dict (ad üzrə işləyən köhnə pəncərələr üçün; eyni adda ilk işçi)"""
+        return {name: self._by_id[min(ids)] for name, ids in self._ids_by_name.items()}
+
+    def copy(self):
+        """ID üzrə adi dict surəti"""
+        return dict(self._by_id)
+
+    # --- Mapping (işçi ID-si üzrə) ---
+
+    def __getitem__(self, emp_id):
+        return self._by_id[emp_id]
+
+    def __contains__(self, emp_id):
+        return emp_id in self._by_id
+
+    def __iter__(self):
+        return iter(list(self._by_id))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __repr__(self):
+        return f"EmployeeStore(employees={len(self._by_id)}, vacations={len(self._vacation_owner)})"
@@ -1,71 +1,17 @@
 # database/error_queries.py
 
 import psycopg2
+from psycopg2.extras import execute_values
 from .connection import db_connect
+from .migrations import ensure_schema_migrated, is_migration_applied
+from .log_storage import LOG_CHUNKS_MIGRATION, LOG_SEGMENTS_MIGRATION, assemble_log_contents, insert_segments
 
 def create_user_logs_table():
-    """İstifadəçi log faylları üçün cədvəl yaradır"""
-    conn = db_connect()
-    if not conn: return False
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS user_application_logs (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER REFERENCES employees(id) ON DELETE CASCADE,
-                    log_type VARCHAR(50) NOT NULL,
-                    log_content TEXT NOT NULL,
-                    log_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    log_file_name VARCHAR(255),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # İndekslər
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_user_logs_user_id ON user_application_logs(user_id)
-            """)
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_user_logs_timestamp ON user_application_logs(log_timestamp)
-            """)
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_user_logs_type ON user_application_logs(log_type)
-            """)
-            
-            # Log silmə siqnalları üçün cədvəl
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS log_deletion_signals (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER REFERENCES employees(id) ON DELETE CASCADE,
-                    log_file_name VARCHAR(255),
-                    log_type VARCHAR(50),
-                    signal_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    processed BOOLEAN DEFAULT FALSE,
-                    processed_at TIMESTAMP,
-                    created_by_user_id INTEGER REFERENCES employees(id) ON DELETE SET NULL
-                )
-            """)
-            # İndekslər
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_log_deletion_signals_user_id ON log_deletion_signals(user_id)
-            """)
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_log_deletion_signals_processed ON log_deletion_signals(processed)
-            """)
-            
-            conn.commit()
-            return True
-    except psycopg2.Error as e:
-        print(f"user_application_logs cədvəli yaradılarkən xəta: {e}")
-        conn.rollback()
-        return False
-    finally:
-        if conn: conn.close()
+    """İstifadəçi log cədvəlləri 002 miqrasiyası ilə yaradılır; köhnə çağırışlar üçün saxlanılıb"""
+    return ensure_schema_migrated()
 
 def log_to_database(user_id, log_type, log_content, log_file_name=None):
     """Log məlumatını verilənlər bazasına yazır"""
-    # Əvvəlcə cədvəlin mövcudluğunu yoxla və yarat
-    create_user_logs_table()
-    
     conn = db_connect()
     if not conn: return False
     try:
@@ -109,40 +55,269 @@ def log_to_database(user_id, log_type, log_content, log_file_name=None):
     finally:
         if conn: conn.close()
 
-def get_user_logs(user_id=None, log_type=None, limit=1000):
-    """İstifadəçi log fayllarını gətirir"""
+# Köhnə sxem (011-dən əvvəl): fayl adı olan qeydlərə sətirlər log_content-ə əlavə olunur,
+# qalanları yeni qeyd kimi yazılır - hamısı bir statement-də
+_APPEND_LOGS_SQL = """
+    WITH batch (user_id, log_type, log_content, log_file_name) AS (VALUES %s),
+    appended AS (
+        UPDATE user_application_logs l
+           SET log_content = l.log_content || chr(10) || b.log_content,
+               log_timestamp = CURRENT_TIMESTAMP
+          FROM batch b
+         WHERE b.log_file_name IS NOT NULL
+           AND l.user_id = b.user_id AND l.log_file_name = b.log_file_name
+        RETURNING l.user_id, l.log_file_name
+    )
+    INSERT INTO user_application_logs (user_id, log_type, log_content, log_file_name)
+    SELECT b.user_id, b.log_type, b.log_content, b.log_file_name
+      FROM batch b
+     WHERE b.log_file_name IS NULL
+        OR NOT EXISTS (SELECT 1 FROM appended a
+                        WHERE a.user_id = b.user_id AND a.log_file_name = b.log_file_name)
+"""
+_APPEND_LOGS_TEMPLATE = "(%s::integer, %s::varchar, %s::text, %s::varchar)"
+
+def _get_log_headers(cur, entries):
+    """
+    Partiyadakı fayllar üçün başlıq qeydlərinin ID-ləri; olmayanlar yaradılır.
+    Fayl adı olmayan sətirlər üçün hər dəfə yeni başlıq yaradılır.
+    Qaytarır: (ID-lər partiya sırası ilə, mövcud başlıqların ID-ləri)
+    """
+    named = [(user_id, log_file_name) for user_id, _, _, log_file_name in entries if log_file_name]
+    existing = {}
+    if named:
+        cur.execute("""
+            SELECT DISTINCT ON (l.user_id, l.log_file_name) l.user_id, l.log_file_name, l.id
+            FROM user_application_logs l
+            JOIN unnest(%s::integer[], %s::varchar[]) AS b(user_id, log_file_name)
+              ON l.user_id = b.user_id AND l.log_file_name = b.log_file_name
+            ORDER BY l.user_id, l.log_file_name, l.id
+        """, ([user_id for user_id, _ in named], [log_file_name for _, log_file_name in named]))
+        existing = {(user_id, log_file_name): log_id for user_id, log_file_name, log_id in cur.fetchall()}
+
+    missing = [entry for entry in entries if not entry[3] or (entry[0], entry[3]) not in existing]
+    created = []
+    if missing:
+        created = [row[0] for row in execute_values(cur, """
+            INSERT INTO user_application_logs (user_id, log_type, log_content, log_file_name) VALUES %s
+            RETURNING id
+        """, [(user_id, log_type, '', log_file_name) for user_id, log_type, _, log_file_name in missing],
+            page_size=len(missing), fetch=True)]
+
+    created_iter = iter(created)
+    log_ids = [existing[(entry[0], entry[3])] if entry[3] and (entry[0], entry[3]) in existing else next(created_iter)
+               for entry in entries]
+    return log_ids, list(existing.values())
+
+def append_logs_batch(entries):
+    """
+    Log sətirlərini toplu yazır (utils.log_shipper işçisi çağırır).
+    entries: [(user_id, log_type, log_content, log_file_name)] - hər (user_id, log_file_name) bir dəfə.
+    011 miqrasiyasından sonra hər fayl üçün bir sıxılmış seqment əlavə olunur (böyük TEXT yenidən yazılmır).
+    Uğursuzluqda psycopg2.Error qaldırır ki, göndərici partiyanı yenidən növbəyə qoysun.
+    """
+    if not entries:
+        return 0
     conn = db_connect()
-    if not conn: return []
+    if not conn:
+        raise psycopg2.OperationalError("Log yazmaq üçün bağlantı alınmadı")
     try:
         with conn.cursor() as cur:
-            query = """
-                SELECT l.id, l.user_id, emp.username, l.log_type, l.log_content, 
-                       l.log_timestamp, l.log_file_name
+            if is_migration_applied(LOG_SEGMENTS_MIGRATION):
+                log_ids, existing_ids = _get_log_headers(cur, entries)
+                insert_segments(cur, [(log_id, None, None, log_content + '\n')
+                                      for log_id, (_, _, log_content, _) in zip(log_ids, entries)])
+                if existing_ids:
+                    cur.execute("UPDATE user_application_logs SET log_timestamp = CURRENT_TIMESTAMP WHERE id = ANY(%s)",
+                                (existing_ids,))
+            else:
+                execute_values(cur, _APPEND_LOGS_SQL, entries, template=_APPEND_LOGS_TEMPLATE, page_size=len(entries))
+        conn.commit()
+        return len(entries)
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def _stored_size_sql():
+    """Logun saxlanılan (açılmış) ölçüsü - siyahıda məzmunu oxumadan göstərmək üçün"""
+    parts = ["octet_length(l.log_content)"]
+    if is_migration_applied(LOG_CHUNKS_MIGRATION):
+        parts.append("COALESCE((SELECT SUM(c.chunk_size) FROM user_log_chunks c WHERE c.log_id = l.id), 0)")
+    if is_migration_applied(LOG_SEGMENTS_MIGRATION):
+        parts.append("COALESCE((SELECT SUM(s.chunk_size) FROM user_log_segments s WHERE s.log_id = l.id), 0)")
+    return " + ".join(parts)
+
+def _log_filters(user_id, log_type, limit):
+    query = """
                 FROM user_application_logs l
                 LEFT JOIN employees emp ON l.user_id = emp.id
                 WHERE 1=1
             """
-            params = []
-            
-            if user_id:
-                query += " AND l.user_id = %s"
-                params.append(user_id)
-            
-            if log_type:
-                query += " AND l.log_type = %s"
-                params.append(log_type)
-            
-            query += " ORDER BY l.log_timestamp DESC LIMIT %s"
-            params.append(limit)
-            
-            cur.execute(query, params)
-            return cur.fetchall()
+    params = []
+    
+    if user_id:
+        query += " AND l.user_id = %s"
+        params.append(user_id)
+    
+    if log_type:
+        query += " AND l.log_type = %s"
+        params.append(log_type)
+    
+    query += " ORDER BY l.log_timestamp DESC LIMIT %s"
+    params.append(limit)
+    return query, params
+
+def _assemble_contents(cur, inline_contents):
+    return assemble_log_contents(
+        cur, inline_contents,
+        chunks_table=is_migration_applied(LOG_CHUNKS_MIGRATION),
+        segments_table=is_migration_applied(LOG_SEGMENTS_MIGRATION),
+    )
+
+def get_user_logs(user_id=None, log_type=None, limit=1000):
+    """İstifadəçi log fayllarını tam məzmunu ilə gətirir (ixrac üçün; siyahı üçün get_user_log_index)"""
+    conn = db_connect()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            filters, params = _log_filters(user_id, log_type, limit)
+            cur.execute(f"""
+                SELECT l.id, l.user_id, emp.username, l.log_type, l.log_content,
+                       l.log_timestamp, l.log_file_name
+                {filters}
+            """, params)
+            rows = cur.fetchall()
+            contents = _assemble_contents(cur, {row[0]: row[4] for row in rows})
+            return [row[:4] + (contents.get(row[0], row[4]),) + row[5:] for row in rows]
     except psycopg2.Error as e:
         print(f"Log faylları gətirilərkən xəta: {e}")
         return []
     finally:
         if conn: conn.close()
 
+def get_user_log_index(user_id=None, log_type=None, limit=1000):
+    """
+    Log siyahısı məzmunsuz: [(id, user_id, username, log_type, log_timestamp, log_file_name, size_bytes)].
+    Məzmun yalnız log açılanda get_log_content ilə alınır.
+    """
+    conn = db_connect()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            filters, params = _log_filters(user_id, log_type, limit)
+            cur.execute(f"""
+                SELECT l.id, l.user_id, emp.username, l.log_type, l.log_timestamp, l.log_file_name,
+                       {_stored_size_sql()}
+                {filters}
+            """, params)
+            return cur.fetchall()
+    except psycopg2.Error as e:
+        print(f"Log siyahısı gətirilərkən xəta: {e}")
+        return []
+    finally:
+        if conn: conn.close()
+
+def get_log_content(log_id):
+    """Bir logun tam məzmununu gətirir və açır; tapılmasa None"""
+    conn = db_connect()
+    if not conn: return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT log_content FROM user_application_logs WHERE id = %s", (log_id,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return _assemble_contents(cur, {log_id: row[0]}).get(log_id, row[0])
+    except psycopg2.Error as e:
+        print(f"Log məzmunu gətirilərkən xəta: {e}")
+        return None
+    finally:
+        if conn: conn.close()
+
+def get_log_sync_state(user_id, log_file_names):
+    """
+    Log fayllarının serverdəki sinxronizasiya vəziyyəti (məzmun oxunmur, yalnız metadata).
+    Qaytarır: {log_file_name: (log_id, synced_bytes, has_inline_content)}
+    synced_bytes - yüklənmiş hissələrin sonu; has_inline_content - fayl log göndərici və ya köhnə
+    yükləmə ilə yazılıb (belə fayllar hissə-hissə yüklənmir).
+    """
+    if not log_file_names:
+        return {}
+    conn = db_connect()
+    if not conn:
+        return None
+    synced_sql = ["(SELECT MAX(c.chunk_offset + c.chunk_size) FROM user_log_chunks c WHERE c.log_id = l.id)"]
+    inline_sql = "l.log_content <> ''"
+    if is_migration_applied(LOG_SEGMENTS_MIGRATION):
+        synced_sql.append("(SELECT MAX(s.chunk_offset + s.chunk_size) FROM user_log_segments s "
+                          "WHERE s.log_id = l.id AND s.chunk_offset IS NOT NULL)")
+        inline_sql += " OR EXISTS (SELECT 1 FROM user_log_segments s WHERE s.log_id = l.id AND s.chunk_offset IS NULL)"
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT l.log_file_name, l.id, GREATEST({', '.join(synced_sql)}), {inline_sql}
+                FROM user_application_logs l
+                WHERE l.user_id = %s AND l.log_file_name = ANY(%s)
+                ORDER BY l.id
+            """, (user_id, list(log_file_names)))
+            state = {}
+            for log_file_name, log_id, synced_bytes, has_inline_content in cur.fetchall():
+                # Köhnə dublikat qeydlər: ilki əsasdır, hər hansında məzmun varsa fayl "inline" sayılır
+                if log_file_name in state:
+                    first = state[log_file_name]
+                    state[log_file_name] = (first[0], first[1], first[2] or has_inline_content)
+                else:
+                    state[log_file_name] = (log_id, synced_bytes or 0, has_inline_content)
+            return state
+    except psycopg2.Error as e:
+        print(f"Log sinxronizasiya vəziyyəti alınarkən xəta: {e}")
+        return None
+    finally:
+        if conn: conn.close()
+
+def upload_log_chunks(user_id, log_type, log_file_name, log_id, chunks, reset=False):
+    """
+    Faylın yeni bayt aralıqlarını yükləyir: chunks = [(chunk_offset, chunk_size, content)].
+    log_id None-dursa başlıq qeydi yaradılır. reset=True faylın əvvəlki hissələrini silir
+    (fayl yerli olaraq əvəz olunubsa). Hamısı bir transaction-dadır; log_id qaytarır.
+    011 miqrasiyasından sonra hissələr sıxılmış seqment kimi yazılır.
+    """
+    conn = db_connect()
+    if not conn:
+        return None
+    segments = is_migration_applied(LOG_SEGMENTS_MIGRATION)
+    try:
+        with conn.cursor() as cur:
+            if log_id is None:
+                cur.execute("""
+                    INSERT INTO user_application_logs (user_id, log_type, log_content, log_file_name)
+                    VALUES (%s, %s, '', %s) RETURNING id
+                """, (user_id, log_type, log_file_name))
+                log_id = cur.fetchone()[0]
+            else:
+                if reset:
+                    cur.execute("DELETE FROM user_log_chunks WHERE log_id = %s", (log_id,))
+                    if segments:
+                        cur.execute("DELETE FROM user_log_segments WHERE log_id = %s AND chunk_offset IS NOT NULL", (log_id,))
+                cur.execute("UPDATE user_application_logs SET log_timestamp = CURRENT_TIMESTAMP WHERE id = %s", (log_id,))
+            if chunks and segments:
+                insert_segments(cur, [(log_id, offset, size, content) for offset, size, content in chunks])
+            elif chunks:
+                execute_values(cur, """
+                    INSERT INTO user_log_chunks (log_id, chunk_offset, chunk_size, content) VALUES %s
+                    ON CONFLICT (log_id, chunk_offset) DO NOTHING
+                """, [(log_id, offset, size, content) for offset, size, content in chunks])
+        conn.commit()
+        return log_id
+    except psycopg2.Error as e:
+        print(f"Log hissələri yüklənərkən xəta: {e}")
+        conn.rollback()
+        return None
+    finally:
+        if conn: conn.close()
+
 def get_log_users():
     """Log faylı olan istifadəçilərin siyahısını qaytarır"""
     conn = db_connect()
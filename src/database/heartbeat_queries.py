@@ -0,0 +1,71 @@
+# database/heartbeat_queries.py
+#
+# Heartbeat - müştərinin periodik yoxlamaları üçün vahid sorğu.
+# Əvvəllər hər müştəri ayrıca sorğularla system_commands (5 san), notifications (60 san)
+# və employees/vacations (30 san) cədvəllərini yoxlayırdı - hər biri ayrıca bağlantı ilə.
+# İndi bir bağlantıda bir SELECT bunların hamısını qaytarır: gözləyən əmr, oxunmamış
+# bildirişlərin sayı və tenant məlumatlarının versiyası. UI yalnız dəyişən hissəni yeniləyir.
+
+import psycopg2
+import logging
+from .connection import db_connect
+from .migrations import DATA_VERSION_MIGRATION, DELTA_SYNC_MIGRATION, is_migration_applied
+
+# Tenant məlumat versiyası sayğacı (008 miqrasiyası)
+_DATA_VERSION_COUNTER_SQL = "(SELECT version FROM tenant_data_version WHERE id = 1)"
+
+# Köhnə sxem üçün: ən son dəyişiklik/silinmə vaxtı (delta sync trigger-ləri saxlayır)
+_DATA_VERSION_SQL = """
+    GREATEST(
+        (SELECT MAX(updated_at) FROM employees),
+        (SELECT MAX(updated_at) FROM vacations),
+        (SELECT MAX(deleted_at) FROM sync_deleted_rows)
+    )
+"""
+
+_HEARTBEAT_SQL = """
+    SELECT
+        (SELECT json_build_object('id', id, 'type', command_type, 'value', command_value)
+           FROM system_commands
+          WHERE target_user_id = %(user_id)s AND is_executed = FALSE
+          ORDER BY created_at DESC
+          LIMIT 1) AS pending_command,
+        (SELECT COUNT(*) FROM notifications
+          WHERE recipient_id = %(user_id)s AND is_read = FALSE) AS unread_count,
+        {data_version} AS data_version
+"""
+
+
+def _heartbeat_sql():
+    if is_migration_applied(DATA_VERSION_MIGRATION):
+        data_version = _DATA_VERSION_COUNTER_SQL
+    elif is_migration_applied(DELTA_SYNC_MIGRATION):
+        data_version = _DATA_VERSION_SQL
+    else:
+        data_version = "NULL"
+    return _HEARTBEAT_SQL.format(data_version=data_version)
+
+
+def get_heartbeat(user_id):
+    """
+    İstifadəçi üçün heartbeat məlumatlarını bir sorğu ilə qaytarır:
+    {'command': {'id', 'type', 'value'} və ya None, 'unread_count': int, 'data_version': ...}
+    Bağlantı və ya sorğu xətasında None qaytarır (növbəti heartbeat yenidən cəhd edir).
+    """
+    conn = db_connect()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_heartbeat_sql(), {'user_id': user_id})
+            pending_command, unread_count, data_version = cur.fetchone()
+        return {
+            'command': pending_command,
+            'unread_count': unread_count or 0,
+            'data_version': data_version,
+        }
+    except psycopg2.Error as e:
+        logging.warning(f"Heartbeat sorğusu xətası: {e}")
+        return None
+    finally:
+        conn.close()
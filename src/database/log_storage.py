@@ -0,0 +1,326 @@
+# log_storage.py - Sıxılmış log saxlanması, aylıq partisiyalar və retention
+#
+# Log məzmunu user_log_segments cədvəlində zlib ilə sıxılmış BYTEA seqmentlər kimi
+# saxlanılır (miqrasiya 011). Cədvəl created_at üzrə aylıq partisiyalara bölünüb:
+# köhnə loglar sətir-sətir DELETE ilə deyil, bütöv partisiyanın DROP edilməsi ilə
+# silinir. user_application_logs yalnız başlıq (fayl, növ, istifadəçi) saxlayır;
+# məzmun yalnız konkret log açılanda açılır (assemble_log_contents).
+# 011-dən əvvəl yazılmış inline log_content və user_log_chunks məzmunu texniki xidmət
+# zamanı hissə-hissə seqmentlərə köçürülür (backfill_legacy_log_content), ona görə köhnə
+# məlumat da öz ayının partisiyası ilə birlikdə silinir.
+
+import logging
+import re
+import threading
+import weakref
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from .connection import db_connect
+from .connection_pool import get_connection_pool
+from .migrations import ensure_schema_migrated, is_migration_applied
+
+LOG_CHUNKS_MIGRATION = 10    # migrations.py: 010_user_log_chunks (sıxılmamış, köhnə)
+LOG_SEGMENTS_MIGRATION = 11  # migrations.py: 011_compressed_log_segments
+
+LOG_RETENTION_MONTHS = 3     # bu qədər aydan köhnə log partisiyaları silinir
+PARTITIONS_AHEAD = 2         # cari aydan əlavə əvvəlcədən yaradılan partisiya sayı
+COMPRESSION_LEVEL = 6
+BACKFILL_BATCH = 200         # bir transaction-da seqmentlərə köçürülən köhnə log sayı
+BACKFILL_MAX_BATCHES = 25    # bir texniki xidmətdə ən çox bu qədər partiya (qalanı növbəti dəfə)
+
+SEGMENTS_TABLE = 'user_log_segments'
+DEFAULT_PARTITION = 'user_log_segments_default'
+_PARTITION_RE = re.compile(r'^user_log_segments_p(\d{4})(\d{2})$')
+
+# Eyni anda bir neçə müştəri texniki xidmət etməsin (pg_try_advisory_xact_lock açarı)
+MAINTENANCE_LOCK_KEY = 0x4D455A4C  # 'MEZL'
+
+
+# --- Sıxılma ---
+
+def decompress_bytes(data):
+    """BYTEA dəyərini (bytes/memoryview) mətnə açır"""
+    if data is None:
+        return ''
+    return zlib.decompress(bytes(data)).decode('utf-8', errors='replace')
+
+
+def insert_segments(cur, segments):
+    """
+    Seqmentləri sıxıb yazır: segments = [(log_id, chunk_offset, chunk_size, text)].
+    chunk_offset/chunk_size - fayl sinxronizasiyası üçün lokal fayldakı bayt aralığı;
+    canlı göndərilən sətirlər üçün chunk_offset None, chunk_size None (mətnin ölçüsü götürülür).
+    """
+    rows = []
+    for log_id, chunk_offset, chunk_size, text in segments:
+        raw = text.encode('utf-8')
+        rows.append((log_id, chunk_offset, len(raw) if chunk_size is None else chunk_size,
+                     psycopg2.Binary(zlib.compress(raw, COMPRESSION_LEVEL))))
+    if rows:
+        execute_values(cur, f"""
+            INSERT INTO {SEGMENTS_TABLE} (log_id, chunk_offset, chunk_size, content_z) VALUES %s
+        """, rows, page_size=len(rows))
+    return len(rows)
+
+
+def assemble_log_contents(cur, inline_contents, chunks_table=True, segments_table=True):
+    """
+    Logların tam məzmununu yığır: {log_id: mətn}.
+    inline_contents: {log_id: user_application_logs.log_content}
+    Sıra: sinxronlaşdırılmış fayl hissələri (offset üzrə) -> köhnə inline məzmun -> canlı seqmentlər
+    (yaranma vaxtı üzrə).
+    """
+    log_ids = list(inline_contents)
+    if not log_ids:
+        return {}
+    synced = defaultdict(list)
+    live = defaultdict(list)
+    if chunks_table:
+        cur.execute("SELECT log_id, chunk_offset, content FROM user_log_chunks WHERE log_id = ANY(%s)", (log_ids,))
+        for log_id, chunk_offset, content in cur.fetchall():
+            synced[log_id].append((chunk_offset, content))
+    if segments_table:
+        cur.execute(f"SELECT log_id, chunk_offset, created_at, id, content_z FROM {SEGMENTS_TABLE} "
+                    f"WHERE log_id = ANY(%s)", (log_ids,))
+        for log_id, chunk_offset, created_at, segment_id, content_z in cur.fetchall():
+            if chunk_offset is None:
+                # Köçürülmüş köhnə inline məzmun ən erkən canlı seqmentdən əvvəlki vaxtla yazılır
+                live[log_id].append(((created_at, segment_id), content_z))
+            else:
+                synced[log_id].append((chunk_offset, content_z))
+
+    contents = {}
+    for log_id, inline in inline_contents.items():
+        parts = [content if isinstance(content, str) else decompress_bytes(content)
+                 for _, content in sorted(synced.get(log_id, ()), key=lambda item: item[0])]
+        if inline:
+            parts.append(inline if inline.endswith('\n') or not live.get(log_id) else inline + '\n')
+        parts.extend(decompress_bytes(content) for _, content in sorted(live.get(log_id, ()), key=lambda item: item[0]))
+        contents[log_id] = ''.join(parts)
+    return contents
+
+
+# --- Partisiyalar ---
+
+def _add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    return f"{SEGMENTS_TABLE}_p{month_start.year:04d}{month_start.month:02d}"
+
+
+def create_log_partitions(cur, first_month, count):
+    """first_month-dan başlayaraq count aylıq partisiya yaradır (mövcud olanlar ötürülür)"""
+    created = []
+    month_start = date(first_month.year, first_month.month, 1)
+    for _ in range(count):
+        next_month = _add_months(month_start, 1)
+        name = partition_name(month_start)
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f'public.{name}',))
+        if not cur.fetchone()[0]:
+            cur.execute(f"""
+                CREATE TABLE {name} PARTITION OF {SEGMENTS_TABLE}
+                FOR VALUES FROM ('{month_start.isoformat()}') TO ('{next_month.isoformat()}')
+            """)
+            created.append(name)
+        month_start = next_month
+    return created
+
+
+def list_log_partitions(cur):
+    """[(partisiya adı, ayın ilk günü)] - default partisiya daxil deyil"""
+    cur.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+    """, (SEGMENTS_TABLE,))
+    partitions = []
+    for (name,) in cur.fetchall():
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def drop_expired_log_partitions(cur, retention_months=LOG_RETENTION_MONTHS, today=None):
+    """
+    Retention müddətindən köhnə partisiyaları bütöv silir (DROP TABLE - sətir DELETE-i yoxdur).
+    Həmin müddətdə yeni məzmun almamış başlıq qeydləri də silinir (seqmentləri cascade ilə).
+    """
+    today = today or date.today()
+    cutoff = _add_months(date(today.year, today.month, 1), -retention_months)
+    dropped = []
+    for name, month_start in list_log_partitions(cur):
+        if _add_months(month_start, 1) <= cutoff:
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+            dropped.append(name)
+    # Default partisiyaya düşmüş (partisiyası olmayan aydan) köhnə seqmentlər - adətən boşdur
+    cur.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < %s", (cutoff,))
+    cur.execute("DELETE FROM user_application_logs WHERE log_timestamp < %s", (cutoff,))
+    removed_logs = cur.rowcount
+    return dropped, removed_logs
+
+
+# --- Köhnə məzmunun köçürülməsi ---
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def backfill_legacy_log_content(cur, batch_size=BACKFILL_BATCH, retention_months=LOG_RETENTION_MONTHS,
+                                chunks_table=True, today=None):
+    """
+    Bir partiya köhnə logun inline log_content və user_log_chunks məzmununu sıxılmış seqmentlərə
+    köçürür və mənbəni təmizləyir. Seqmentlər məzmunun yazıldığı ayın partisiyasına düşür
+    (partisiya lazımdırsa yaradılır), ona görə retention zamanı sətir DELETE-i deyil, DROP ilə
+    silinir. Retention müddətindən köhnə loglar köçürülmür - onlar onsuz da silinəcək.
+    Köçürülən log sayını qaytarır (0 - köçürüləcək heç nə qalmayıb).
+    """
+    today = today or date.today()
+    cutoff = _add_months(_month_start(today), -retention_months)
+    chunks_filter = " OR EXISTS (SELECT 1 FROM user_log_chunks c WHERE c.log_id = l.id)" if chunks_table else ""
+    cur.execute(f"""
+        SELECT l.id, l.log_content, l.log_timestamp
+        FROM user_application_logs l
+        WHERE l.log_timestamp >= %s AND (l.log_content <> ''{chunks_filter})
+        ORDER BY l.id
+        LIMIT %s
+        FOR UPDATE OF l SKIP LOCKED
+    """, (cutoff, batch_size))
+    logs = cur.fetchall()
+    if not logs:
+        return 0
+    log_ids = [row[0] for row in logs]
+    floor = datetime(cutoff.year, cutoff.month, cutoff.day)
+
+    rows = []
+    if chunks_table:
+        # Eyni offset-li seqment artıq varsa (011-dən sonra yenidən yüklənib) hissə sadəcə silinir
+        cur.execute(f"""
+            SELECT c.log_id, c.chunk_offset, c.chunk_size, c.content, c.created_at
+            FROM user_log_chunks c
+            WHERE c.log_id = ANY(%s) AND NOT EXISTS (
+                SELECT 1 FROM {SEGMENTS_TABLE} s WHERE s.log_id = c.log_id AND s.chunk_offset = c.chunk_offset
+            )
+        """, (log_ids,))
+        for log_id, chunk_offset, chunk_size, content, created_at in cur.fetchall():
+            rows.append((log_id, chunk_offset, chunk_size, content, max(created_at or floor, floor)))
+
+    cur.execute(f"""
+        SELECT log_id, MIN(created_at) FROM {SEGMENTS_TABLE}
+        WHERE log_id = ANY(%s) AND chunk_offset IS NULL
+        GROUP BY log_id
+    """, (log_ids,))
+    first_live = dict(cur.fetchall())
+    for log_id, content, log_timestamp in logs:
+        if not content:
+            continue
+        created_at = log_timestamp or floor
+        if log_id in first_live:
+            # Inline məzmun canlı seqmentlərdən əvvəl yazılıb - sıra saxlanılsın (assemble_log_contents kimi)
+            created_at = min(created_at, first_live[log_id] - timedelta(microseconds=1))
+            if not content.endswith('\n'):
+                content += '\n'
+        rows.append((log_id, None, None, content, max(created_at, floor)))
+
+    for month_start in sorted({_month_start(row[4]) for row in rows}):
+        create_log_partitions(cur, month_start, 1)
+    if rows:
+        values = []
+        for log_id, chunk_offset, chunk_size, content, created_at in rows:
+            raw = content.encode('utf-8')
+            values.append((log_id, chunk_offset, len(raw) if chunk_size is None else chunk_size,
+                           psycopg2.Binary(zlib.compress(raw, COMPRESSION_LEVEL)), created_at))
+        execute_values(cur, f"""
+            INSERT INTO {SEGMENTS_TABLE} (log_id, chunk_offset, chunk_size, content_z, created_at) VALUES %s
+        """, values, page_size=len(values))
+    cur.execute("UPDATE user_application_logs SET log_content = '' WHERE id = ANY(%s) AND log_content <> ''", (log_ids,))
+    if chunks_table:
+        cur.execute("DELETE FROM user_log_chunks WHERE log_id = ANY(%s)", (log_ids,))
+    return len(logs)
+
+
+def _run_backfill(retention_months):
+    """Köhnə məzmunu partiyalarla köçürür (hər partiya ayrıca transaction); köçürülən log sayı"""
+    chunks_table = is_migration_applied(LOG_CHUNKS_MIGRATION)
+    moved = 0
+    for _ in range(BACKFILL_MAX_BATCHES):
+        conn = db_connect()
+        if not conn:
+            break
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (MAINTENANCE_LOCK_KEY,))
+                if not cur.fetchone()[0]:
+                    conn.rollback()
+                    break
+                count = backfill_legacy_log_content(cur, retention_months=retention_months,
+                                                    chunks_table=chunks_table)
+            conn.commit()
+        except psycopg2.Error as e:
+            conn.rollback()
+            logging.warning(f"Köhnə log məzmunu seqmentlərə köçürülə bilmədi: {e}")
+            break
+        finally:
+            conn.close()
+        moved += count
+        if count < BACKFILL_BATCH:
+            break
+    return moved
+
+
+# --- Texniki xidmət ---
+
+_maintained_pools = weakref.WeakSet()
+_maintenance_lock = threading.Lock()
+
+
+def run_log_maintenance(retention_months=LOG_RETENTION_MONTHS, force=False):
+    """
+    Gələcək ayların partisiyalarını yaradır, köhnələrini silir və köhnə inline/hissə məzmununu
+    seqmentlərə köçürür (tenant başına prosesdə bir dəfə - uğurla commit olunandan sonra qeyd edilir).
+    Başqa müştəri eyni anda edirsə, ötürülür.
+    Nəticə: {'created', 'dropped', 'removed_logs', 'backfilled'} və ya None.
+    """
+    pool = get_connection_pool()
+    if pool is None or not ensure_schema_migrated(pool) or not is_migration_applied(LOG_SEGMENTS_MIGRATION):
+        return None
+    with _maintenance_lock:
+        if pool in _maintained_pools and not force:
+            return None
+
+    conn = db_connect()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (MAINTENANCE_LOCK_KEY,))
+            if not cur.fetchone()[0]:
+                conn.rollback()
+                return None
+            created = create_log_partitions(cur, date.today(), PARTITIONS_AHEAD + 1)
+            dropped, removed_logs = drop_expired_log_partitions(cur, retention_months)
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logging.warning(f"Log saxlanması texniki xidməti uğursuz oldu: {e}")
+        return None
+    finally:
+        conn.close()
+    with _maintenance_lock:
+        _maintained_pools.add(pool)
+
+    backfilled = _run_backfill(retention_months)
+    if created or dropped or removed_logs or backfilled:
+        logging.info(f"Log saxlanması: {len(created)} partisiya yaradıldı, {len(dropped)} silindi, "
+                     f"{removed_logs} köhnə log qeydi silindi, {backfilled} köhnə log seqmentlərə köçürüldü")
+    return {'created': created, 'dropped': dropped, 'removed_logs': removed_logs, 'backfilled': backfilled}
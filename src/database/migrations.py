@@ -0,0 +1,552 @@
+# migrations.py - Versiyalı sxem miqrasiyaları
+#
+# Sxem dəyişiklikləri əvvəllər sorğu yolunda edilirdi (information_schema yoxlamaları,
+# hər log yazılışında CREATE TABLE IF NOT EXISTS və s.). İndi bütün DDL nömrələnmiş
+# miqrasiyalardadır: hər tenant bazası üçün qoşulma zamanı bir dəfə yoxlanılır,
+# tətbiq olunmamış miqrasiyalar sıra ilə icra edilir və schema_migrations cədvəlinə
+# yazılır. Yeni sxem dəyişikliyi = MIGRATIONS siyahısının sonuna yeni nömrə.
+#
+# Miqrasiyalar idempotent yazılıb (IF NOT EXISTS), çünki köhnə bazalarda həmin
+# sütun/cədvəllər runtime yoxlamaları ilə artıq yaradılmış ola bilər.
+
+import psycopg2
+import logging
+import threading
+import time
+import weakref
+from datetime import date
+from .connection_pool import get_connection_pool
+
+# Eyni anda qoşulan müştərilər miqrasiyanı paralel icra etməsin (pg_advisory_xact_lock açarı)
+MIGRATION_LOCK_KEY = 0x4D455A55  # 'MEZU'
+# Bazaya qoşulmaq alınmadıqda yenidən cəhd intervalı (saniyə)
+MIGRATION_RETRY_SECONDS = 60
+
+# Yeni tenant bazasında yaradılan default şöbə və vəzifələr
+DEFAULT_DEPARTMENTS = [
+    ("İnsan Resursları", "İnsan resursları idarəetməsi"),
+    ("Maliyyə", "Maliyyə və mühasibatlıq"),
+    ("İT", "İnformasiya texnologiyaları"),
+    ("Marketinq", "Marketinq və satış"),
+    ("İstehsal", "İstehsal və keyfiyyət"),
+    ("Rəhbərlik", "Rəhbərlik və idarəetmə")
+]
+
+# (vəzifə, şöbə adı, təsvir)
+DEFAULT_POSITIONS = [
+    ("Direktor", None, "Direktor"),
+    ("Baş direktor", None, "Baş direktor"),
+    ("Menecer", None, "Menecer"),
+    ("Mühasib", "Maliyyə", "Mühasib"),
+    ("Proqramçı", "İT", "Proqramçı"),
+    ("Dizayner", "Marketinq", "Dizayner"),
+    ("Operator", "İstehsal", "Operator"),
+    ("HR mütəxəssisi", "İnsan Resursları", "HR mütəxəssisi"),
+    ("Satış meneceri", "Marketinq", "Satış meneceri"),
+    ("Texnik", "İstehsal", "Texnik")
+]
+
+DEFAULT_APP_VERSION = '6.8-final-unified-tkinter'
+
+
+# --- Miqrasiyalar ---
+
+def _m001_employee_columns(cur):
+    """create_new_user, update_employee_system_settings və ensure_hide_column_exists-in əlavə etdiyi sütunlar"""
+    columns = [
+        ("email", "TEXT"),
+        ("first_name", "TEXT"),
+        ("last_name", "TEXT"),
+        ("father_name", "TEXT"),
+        ("phone_number", "TEXT"),
+        ("birth_date", "DATE"),
+        ("profile_image", "TEXT"),
+        ("fin_code", "TEXT"),
+        ("department_id", "INTEGER"),
+        ("position_id", "INTEGER"),
+        ("hire_date", "DATE"),
+        ("salary", "REAL"),
+        ("address", "TEXT"),
+        ("emergency_contact", "TEXT"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("umumi_gun", "INTEGER DEFAULT 30"),
+        ("hide", "BOOLEAN DEFAULT FALSE"),
+    ]
+    for column_name, column_type in columns:
+        cur.execute(f"ALTER TABLE employees ADD COLUMN IF NOT EXISTS {column_name} {column_type}")
+
+
+def _m002_user_logs(cur):
+    """İstifadəçi log faylları və log silmə siqnalları cədvəlləri"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_application_logs (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES employees(id) ON DELETE CASCADE,
+            log_type VARCHAR(50) NOT NULL,
+            log_content TEXT NOT NULL,
+            log_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            log_file_name VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_user_id ON user_application_logs(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_timestamp ON user_application_logs(log_timestamp)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_type ON user_application_logs(log_type)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS log_deletion_signals (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES employees(id) ON DELETE CASCADE,
+            log_file_name VARCHAR(255),
+            log_type VARCHAR(50),
+            signal_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed BOOLEAN DEFAULT FALSE,
+            processed_at TIMESTAMP,
+            created_by_user_id INTEGER REFERENCES employees(id) ON DELETE SET NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_log_deletion_signals_user_id ON log_deletion_signals(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_log_deletion_signals_processed ON log_deletion_signals(processed)")
+
+
+def _m003_departments_positions(cur):
+    """Şöbə/vəzifə cədvəlləri; cədvəllər yeni yaradılırsa default məlumatlar əlavə olunur"""
+    cur.execute("SELECT to_regclass('public.departments') IS NULL")
+    created = cur.fetchone()[0]
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS departments (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL UNIQUE,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS positions (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL UNIQUE,
+            department_id INTEGER REFERENCES departments(id) ON DELETE SET NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    if not created:
+        return
+    for name, description in DEFAULT_DEPARTMENTS:
+        cur.execute(
+            "INSERT INTO departments (name, description) VALUES (%s, %s) ON CONFLICT (name) DO NOTHING",
+            (name, description)
+        )
+    for name, department_name, description in DEFAULT_POSITIONS:
+        cur.execute("""
+            INSERT INTO positions (name, department_id, description)
+            VALUES (%s, (SELECT id FROM departments WHERE name = %s), %s)
+            ON CONFLICT (name) DO NOTHING
+        """, (name, department_name, description))
+
+
+def _m004_app_version(cur):
+    """Proqram versiyası cədvəli (get_latest_version əvvəllər onu sorğu zamanı yaradırdı)"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS app_version (
+            id INTEGER PRIMARY KEY,
+            latest_version TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute(
+        "INSERT INTO app_version (id, latest_version) VALUES (1, %s) ON CONFLICT (id) DO NOTHING",
+        (DEFAULT_APP_VERSION,)
+    )
+
+
+def _m005_delta_sync(cur):
+    """Delta sinxronizasiya: updated_at sütunları, trigger-lər və silinmiş sətirlər cədvəli"""
+    cur.execute("ALTER TABLE employees ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+    cur.execute("ALTER TABLE vacations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sync_deleted_rows (
+            id BIGSERIAL PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            deleted_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()::timestamp
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_employees_updated_at ON employees (updated_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_vacations_updated_at ON vacations (updated_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sync_deleted_rows_deleted_at ON sync_deleted_rows (deleted_at)")
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION sync_touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := clock_timestamp()::timestamp;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION sync_record_deletion() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_deleted_rows (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Köhnə versiyanın artıq yaratdığı trigger-lər təkrar yaradılmır
+    cur.execute("""
+        SELECT tgname FROM pg_trigger
+        WHERE tgname IN ('trg_employees_touch', 'trg_vacations_touch',
+                         'trg_employees_deleted', 'trg_vacations_deleted')
+    """)
+    existing_triggers = {row[0] for row in cur.fetchall()}
+    for table in ('employees', 'vacations'):
+        if f'trg_{table}_touch' not in existing_triggers:
+            cur.execute(f"""
+                CREATE TRIGGER trg_{table}_touch BEFORE INSERT OR UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION sync_touch_updated_at()
+            """)
+        if f'trg_{table}_deleted' not in existing_triggers:
+            cur.execute(f"""
+                CREATE TRIGGER trg_{table}_deleted AFTER DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION sync_record_deletion()
+            """)
+
+
+def _m006_hot_path_indexes(cur):
+    """Tez-tez işləyən sorğular üçün kompozit indekslər"""
+    # Məzuniyyət siyahısı/arxiv/gözləyən sorğular: employee_id + is_archived + status filtri, start_date sıralaması
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vacations_employee_archived_status_start
+        ON vacations (employee_id, is_archived, status, start_date)
+    """)
+    # Oxunmamış bildirişlərin sayı (hər polling-də)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_recipient_read ON notifications (recipient_id, is_read)")
+    # Aktiv sessiya sayları və çıxış əmrləri
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_active_sessions_user_id ON active_sessions (user_id)")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_system_commands_target_executed
+        ON system_commands (target_user_id, is_executed)
+    """)
+    # Giriş tarixçəsi (istifadəçi üzrə, vaxta görə sıralı)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_login_history_user_time ON login_history (user_id, login_time)")
+
+
+# LISTEN/NOTIFY kanalı (change_feed.ChangeFeedListener bu kanala qulaq asır)
+CHANGE_FEED_CHANNEL = 'mezuniyyet_changes'
+CHANGE_FEED_TABLES = ('employees', 'vacations', 'departments', 'positions', 'notifications')
+
+
+def _m007_change_feed(cur):
+    """Dəyişiklik axını: hər sətir dəyişikliyində yığcam pg_notify (table, op, id, version)"""
+    # version = transaction ID-si: eyni transaction-dakı bildirişlər eyni versiyanı daşıyır
+    cur.execute(f"""
+        CREATE OR REPLACE FUNCTION change_feed_notify() RETURNS trigger AS $$
+        DECLARE
+            row_id INTEGER;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_id := OLD.id;
+            ELSE
+                row_id := NEW.id;
+            END IF;
+            PERFORM pg_notify('{CHANGE_FEED_CHANNEL}', json_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'id', row_id,
+                'version', txid_current()
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cur.execute(
+        "SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s)",
+        ([f'trg_{table}_change_feed' for table in CHANGE_FEED_TABLES],)
+    )
+    existing_triggers = {row[0] for row in cur.fetchall()}
+    for table in CHANGE_FEED_TABLES:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f'public.{table}',))
+        if not cur.fetchone()[0] or f'trg_{table}_change_feed' in existing_triggers:
+            continue
+        cur.execute(f"""
+            CREATE TRIGGER trg_{table}_change_feed AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION change_feed_notify()
+        """)
+
+
+# Tenant məlumat versiyasını artıran cədvəllər (active_sessions işçilərin onlayn statusu üçündür)
+DATA_VERSION_TABLES = ('employees', 'vacations', 'departments', 'positions', 'active_sessions')
+
+
+def _m008_tenant_data_version(cur):
+    """Tenant üzrə monoton artan məlumat versiyası - hər dəyişən statement-dən sonra +1"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tenant_data_version (
+            id SMALLINT PRIMARY KEY CHECK (id = 1),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("INSERT INTO tenant_data_version (id, version) VALUES (1, 1) ON CONFLICT (id) DO NOTHING")
+    # Statement səviyyəli trigger: toplu UPDATE də versiyanı bir dəfə artırır.
+    # Transition cədvəlləri (REFERENCING) ilə heç bir sətrə toxunmayan statement-lər
+    # (məs. WHERE-i boş nəticə verən UPDATE/DELETE) versiyanı artırmır - əks halda boş
+    # yeniləmələr bütün müştərilərin delta sinxronizasiyasını boş yerə işə salardı.
+    # Sətir transaction-la birlikdə commit olunur, ona görə də oxunan versiya həmişə görünən məlumata uyğundur.
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION bump_tenant_data_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                IF NOT EXISTS (SELECT 1 FROM new_rows) THEN
+                    RETURN NULL;
+                END IF;
+            ELSIF TG_OP = 'DELETE' THEN
+                IF NOT EXISTS (SELECT 1 FROM old_rows) THEN
+                    RETURN NULL;
+                END IF;
+            END IF;
+            UPDATE tenant_data_version
+               SET version = version + 1, updated_at = clock_timestamp()::timestamp
+             WHERE id = 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Transition cədvəlli trigger yalnız bir hadisəyə bağlana bilər - hər hadisə üçün ayrıca trigger
+    events = (
+        ('ins', 'INSERT', 'REFERENCING NEW TABLE AS new_rows'),
+        ('upd', 'UPDATE', 'REFERENCING NEW TABLE AS new_rows'),
+        ('del', 'DELETE', 'REFERENCING OLD TABLE AS old_rows'),
+        ('trunc', 'TRUNCATE', ''),
+    )
+    cur.execute(
+        "SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s)",
+        ([f'trg_{table}_data_version_{suffix}' for table in DATA_VERSION_TABLES for suffix, _, _ in events],)
+    )
+    existing_triggers = {row[0] for row in cur.fetchall()}
+    for table in DATA_VERSION_TABLES:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f'public.{table}',))
+        if not cur.fetchone()[0]:
+            continue
+        for suffix, event, referencing in events:
+            name = f'trg_{table}_data_version_{suffix}'
+            if name in existing_triggers:
+                continue
+            cur.execute(f"""
+                CREATE TRIGGER {name} AFTER {event} ON {table} {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_tenant_data_version()
+            """)
+
+
+def _m009_user_logs_file_index(cur):
+    """Log göndərici faylın sətirlərini mövcud qeydə əlavə edir - (user_id, log_file_name) axtarışı üçün indeks"""
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_logs_user_file
+        ON user_application_logs (user_id, log_file_name)
+    """)
+
+
+def _m010_user_log_chunks(cur):
+    """Log fayllarının inkremental sinxronizasiyası: faylın əlavə olunan bayt aralıqları ayrıca sətirlərdə"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_log_chunks (
+            id BIGSERIAL PRIMARY KEY,
+            log_id INTEGER NOT NULL REFERENCES user_application_logs(id) ON DELETE CASCADE,
+            chunk_offset BIGINT NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (log_id, chunk_offset)
+        )
+    """)
+
+
+# Miqrasiya 011-də əvvəlcədən yaradılan aylıq partisiyalar (cari ay + bu qədər sonrakı).
+# Miqrasiya dondurulub: log_storage-dakı sabitlər dəyişsə də burada dəyişməməlidir.
+M011_PARTITIONS_AHEAD = 2
+
+
+def _m011_compressed_log_segments(cur):
+    """
+    Sıxılmış log seqmentləri: zlib BYTEA, created_at üzrə aylıq partisiyalar.
+    Köhnə loglar partisiyanın DROP edilməsi ilə silinir (log_storage.run_log_maintenance).
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_log_segments (
+            id BIGSERIAL,
+            log_id INTEGER NOT NULL REFERENCES user_application_logs(id) ON DELETE CASCADE,
+            chunk_offset BIGINT,
+            chunk_size INTEGER NOT NULL,
+            content_z BYTEA NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_log_segments_log_id ON user_log_segments (log_id, chunk_offset)")
+    cur.execute("CREATE TABLE IF NOT EXISTS user_log_segments_default PARTITION OF user_log_segments DEFAULT")
+    # Partisiya adı: user_log_segments_pYYYYMM, aralıq [ayın 1-i, növbəti ayın 1-i)
+    cur.execute("SELECT date_trunc('month', CURRENT_DATE)::date")
+    month_start = cur.fetchone()[0]
+    for _ in range(M011_PARTITIONS_AHEAD + 1):
+        next_month = date(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS user_log_segments_p{month_start.year:04d}{month_start.month:02d}
+            PARTITION OF user_log_segments
+            FOR VALUES FROM ('{month_start.isoformat()}') TO ('{next_month.isoformat()}')
+        """)
+        month_start = next_month
+
+
+# (versiya, ad, funksiya) - versiyalar artan sırada olmalıdır və heç vaxt dəyişdirilməməlidir
+MIGRATIONS = (
+    (1, 'employee_columns', _m001_employee_columns),
+    (2, 'user_logs', _m002_user_logs),
+    (3, 'departments_positions', _m003_departments_positions),
+    (4, 'app_version', _m004_app_version),
+    (5, 'delta_sync', _m005_delta_sync),
+    (6, 'hot_path_indexes', _m006_hot_path_indexes),
+    (7, 'change_feed', _m007_change_feed),
+    (8, 'tenant_data_version', _m008_tenant_data_version),
+    (9, 'user_logs_file_index', _m009_user_logs_file_index),
+    (10, 'user_log_chunks', _m010_user_log_chunks),
+    (11, 'compressed_log_segments', _m011_compressed_log_segments),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Digər modulların yoxladığı miqrasiya versiyaları (is_migration_applied üçün)
+DELTA_SYNC_MIGRATION = 5        # 005_delta_sync
+DATA_VERSION_MIGRATION = 8      # 008_tenant_data_version
+
+
+# --- İcraçı ---
+
+def _read_applied_versions(conn):
+    """schema_migrations-dan tətbiq olunmuş versiyaları oxuyur; cədvəl yoxdursa None"""
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT version FROM schema_migrations")
+            versions = {row[0] for row in cur.fetchall()}
+        conn.rollback()
+        return versions
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return None
+
+
+def apply_migrations(conn):
+    """
+    Tətbiq olunmamış miqrasiyaları sıra ilə icra edir və tətbiq olunmuş versiyaların set-ini qaytarır.
+    Sxem aktualdırsa yalnız bir SELECT icra olunur. Hər miqrasiya ayrıca transaction-dadır;
+    biri uğursuz olsa, sonrakılar (ondan asılı ola bilər) icra edilmir.
+    """
+    applied = _read_applied_versions(conn)
+    if applied is not None and all(version in applied for version, _, _ in MIGRATIONS):
+        return applied
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+    applied = set(applied or ())
+
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        start = time.monotonic()
+        try:
+            with conn.cursor() as cur:
+                # Başqa müştəri eyni anda miqrasiya edirsə, onun bitməsini gözləyirik
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone() is None:
+                    migrate(cur)
+                    cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                    logging.info(f"Miqrasiya {version:03d}_{name} tətbiq edildi ({(time.monotonic() - start) * 1000:.0f} ms)")
+            conn.commit()
+            applied.add(version)
+        except psycopg2.Error as e:
+            conn.rollback()
+            logging.error(f"Miqrasiya {version:03d}_{name} uğursuz oldu: {e}")
+            break
+    return applied
+
+
+# Pool (tenant) -> tətbiq olunmuş versiyalar. Pool tenant dəyişəndə yenidən yaradılır,
+# ona görə də yeni tenant avtomatik olaraq yenidən yoxlanılır.
+_applied_by_pool = weakref.WeakKeyDictionary()
+_failed_at_by_pool = weakref.WeakKeyDictionary()
+_migration_lock = threading.Lock()
+
+
+def ensure_schema_migrated(pool=None):
+    """
+    Aktiv tenant bazasının sxemini aktual vəziyyətə gətirir (pool başına bir dəfə).
+    db_connect() hər çağırışda bunu çağırır; yoxlama edilibsə dərhal qayıdır.
+    """
+    pool = pool or get_connection_pool()
+    if pool is None:
+        return False
+    if pool in _applied_by_pool:
+        return True
+
+    with _migration_lock:
+        if pool in _applied_by_pool:
+            return True
+        failed_at = _failed_at_by_pool.get(pool)
+        if failed_at is not None and time.monotonic() - failed_at < MIGRATION_RETRY_SECONDS:
+            return False
+
+        conn = None
+        try:
+            conn = pool.getconn()
+            applied = apply_migrations(conn)
+        except Exception as e:
+            logging.warning(f"Sxem miqrasiyaları yoxlanıla bilmədi: {e}")
+            _failed_at_by_pool[pool] = time.monotonic()
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+
+        _applied_by_pool[pool] = frozenset(applied)
+        _failed_at_by_pool.pop(pool, None)
+        return True
+
+
+def migrate_schema_in_background():
+    """Login ekranında miqrasiyaları arxa fonda yoxlayır ki, ilk sorğu onu gözləməsin"""
+    if get_connection_pool() is None:
+        return None
+    thread = threading.Thread(target=ensure_schema_migrated, daemon=True, name="db-schema-migrate")
+    thread.start()
+    return thread
+
+
+def get_applied_migrations():
+    """Aktiv tenant üçün tətbiq olunmuş miqrasiya versiyaları"""
+    pool = get_connection_pool()
+    if pool is None:
+        return frozenset()
+    return _applied_by_pool.get(pool, frozenset())
+
+
+def is_migration_applied(version):
+    """Verilən versiyalı miqrasiya aktiv tenant bazasında tətbiq olunubmu"""
+    return version in get_applied_migrations()
+
+
+def get_schema_version():
+    """Ardıcıl tətbiq olunmuş ən böyük miqrasiya versiyası (heç biri yoxdursa 0)"""
+    applied = get_applied_migrations()
+    current = 0
+    for version, _, _ in MIGRATIONS:
+        if version not in applied:
+            break
+        current = version
+    return current
@@ -0,0 +1,237 @@
+# query_cache.py - Sorğu nəticələri üçün read-through keş
+#
+# Nadir dəyişən sorğular (şöbələr, vəzifələr, versiya, gizli işçilər və s.) hər
+# pəncərə açılanda bazaya yenidən gedirdi. @cached_query ilə işarələnmiş funksiyanın
+# nəticəsi (funksiya, arqumentlər) açarı ilə yaddaşda saxlanılır:
+#   - TTL: hər girişin ömrü var, köhnəlmiş giriş oxunanda atılır
+#   - LRU: giriş sayı məhduddur, ən çox vaxt istifadə olunmayan çıxarılır
+#   - Teqlər: hər giriş cədvəl adları ilə teqlənir; yazan funksiyalar
+#     (@invalidates_query_cache) və change feed həmin teqləri etibarsız edir
+# Keş tenant-a bağlıdır - baza dəyişəndə clear_query_cache() çağırılır.
+
+import copy
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 300  # saniyə
+
+
+class QueryCache:
+    """
+    Thread-safe TTL + LRU keş, teq üzrə etibarsızlaşdırma ilə.
+    Statistika (hits/misses/evictions/invalidations) debug alətlərində göstərilir.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()   # açar -> (expires_at, value, tags)
+        self._keys_by_tag = {}          # teq -> {açar}
+        self._lock = threading.RLock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._function_stats = {}       # funksiya adı -> [hits, misses]
+
+    # --- Daxili ---
+
+    def _unlink(self, key, tags):
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _count(self, name, hit):
+        if name is None:
+            return
+        stats = self._function_stats.get(name)
+        if stats is None:
+            stats = self._function_stats[name] = [0, 0]
+        stats[0 if hit else 1] += 1
+
+    # --- Əsas əməliyyatlar ---
+
+    def get(self, key, name=None):
+        """(tapıldı, dəyər) qaytarır; köhnəlmiş giriş atılır"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, tags = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._count(name, True)
+                    return True, value
+                del self._entries[key]
+                self._unlink(key, tags)
+                self.expirations += 1
+            self.misses += 1
+            self._count(name, False)
+            return False, None
+
+    def set(self, key, value, ttl=None, tags=(), generation=None):
+        """
+        Dəyəri saxlayır. generation verilibsə və sorğu icra olunarkən etibarsızlaşdırma
+        baş veribsə, köhnə nəticə yazılmır (yarış vəziyyətinə qarşı).
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._unlink(key, old[2])
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                keys = self._keys_by_tag.get(tag)
+                if keys is None:
+                    self._keys_by_tag[tag] = {key}
+                else:
+                    keys.add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (_, _, old_tags) = self._entries.popitem(last=False)
+                self._unlink(old_key, old_tags)
+                self.evictions += 1
+            return True
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def invalidate_tags(self, *tags):
+        """Verilmiş teqlərdən hər hansı birini daşıyan bütün girişləri silir; silinən sayı qaytarır"""
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._unlink(key, entry[2])
+                        removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self):
+        """Bütün girişləri silir (statistika saxlanılır)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+            self._function_stats.clear()
+
+    def get_stats(self):
+        """Keş statistikası (debug pəncərəsi üçün)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'tags': sorted(self._keys_by_tag),
+                'functions': {name: {'hits': hits, 'misses': misses}
+                              for name, (hits, misses) in self._function_stats.items()},
+            }
+
+
+_query_cache = QueryCache()
+
+
+def get_query_cache():
+    return _query_cache
+
+
+def _make_key(name, args, kwargs):
+    if kwargs:
+        return (name, args, tuple(sorted(kwargs.items())))
+    return (name, args)
+
+
+def _is_cacheable(value):
+    # Sorğu funksiyaları xətada None və ya [] qaytarır - belə nəticələr keşlənmir
+    return value is not None and value != [] and value != ()
+
+
+def cached_query(ttl=DEFAULT_TTL, tags=()):
+    """
+    Read-through keş dekoratoru.
+    Açar funksiyanın adı və arqumentləridir (hashable olmalıdır). Tapılan dəyərin
+    səthi surəti qaytarılır ki, çağıran siyahını dəyişsə keş pozulmasın.
+    """
+    def decorator(func):
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = _make_key(name, args, kwargs)
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            found, value = _query_cache.get(key, name)
+            if found:
+                return copy.copy(value)
+            generation = _query_cache.generation
+            value = func(*args, **kwargs)
+            if _is_cacheable(value):
+                _query_cache.set(key, copy.copy(value), ttl=ttl, tags=tags, generation=generation)
+            return value
+
+        wrapper.cache_tags = tuple(tags)
+        return wrapper
+    return decorator
+
+
+def invalidates_query_cache(*tags):
+    """Yazan funksiya üçün dekorator: funksiya bitəndən sonra (nəticədən asılı olmayaraq) teqləri etibarsız edir"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate_query_cache(*tags)
+        return wrapper
+    return decorator
+
+
+def invalidate_query_cache(*tags):
+    """Teqlər üzrə keşi etibarsız edir (məs. invalidate_query_cache('departments'))"""
+    removed = _query_cache.invalidate_tags(*tags)
+    if removed:
+        logging.debug(f"Sorğu keşi: {removed} giriş etibarsız edildi ({', '.join(tags)})")
+    return removed
+
+
+def clear_query_cache():
+    """Bütün sorğu keşini təmizləyir (tenant dəyişəndə)"""
+    _query_cache.clear()
+
+
+def get_query_cache_stats():
+    return _query_cache.get_stats()
+
+
+__all__ = [
+    'QueryCache', 'cached_query', 'invalidates_query_cache', 'invalidate_query_cache',
+    'clear_query_cache', 'get_query_cache', 'get_query_cache_stats',
+]
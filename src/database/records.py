@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İşçi və Məzuniyyət Qeydləri (Employee / Vacation records)
+__slots__ əsaslı yığcam qeydlər. dict interfeysi saxlanılır (record['department'],
+record.get(...), dict(record)), ona görə də mövcud UI kodu dəyişmədən işləyir.
+Tarixlər bazadan gələndə bir dəfə parse olunur, təkrarlanan sətirlər (şöbə, vəzifə,
+status, rol) intern edilir.
+"""
+
+import sys
+from collections.abc import MutableMapping
+from datetime import date, datetime
+
+
+def intern_text(value):
+    """Təkrarlanan sətirləri intern edir (None -> '')"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def parse_date(value):
+    """Tarixi date obyektinə çevirir (date, datetime, 'YYYY-MM-DD', ISO, 'DD.MM.YYYY'); alınmasa None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            if 'T' in text or ' ' in text:
+                return datetime.fromisoformat(text.replace('Z', '+00:00')).date()
+            if '.' in text:
+                return datetime.strptime(text, '%d.%m.%Y').date()
+            return date.fromisoformat(text)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_timestamp(value):
+    """Yaradılma tarixi kimi sahələr üçün: datetime/date saxlanılır, sətir bir dəfə parse olunur"""
+    if isinstance(value, (datetime, date)):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            if 'T' in text or ' ' in text:
+                return datetime.fromisoformat(text.replace('Z', '+00:00'))
+            return date.fromisoformat(text)
+        except ValueError:
+            return value
+    return value
+
+
+class _Record(MutableMapping):
+    """
+    Sabit sahələri __slots__-da saxlayan qeyd.
+    Təyin edilməmiş sahə dict-dəki olmayan açar kimi davranır; sxemdə olmayan
+    açarlar (məs. UI-ın əlavə etdiyi 'employee_name') ayrıca kiçik dict-də saxlanılır.
+    """
+    __slots__ = ('_extra',)
+
+    _FIELDS = ()
+    _FIELD_SET = frozenset()
+    _NORMALIZERS = {}
+
+    def __init__(self, values=None, **fields):
+        self._extra = None
+        if values:
+            for key, value in values.items():
+                self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_mapping(cls, values):
+        """dict-dən (və ya başqa qeyddən) yeni qeyd yaradır"""
+        if isinstance(values, cls):
+            return values.copy()
+        return cls(values)
+
+    def copy(self):
+        """dict.copy() kimi səthi surət"""
+        other = self.__class__.__new__(self.__class__)
+        for field in self._FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                object.__setattr__(other, field, value)
+        other._extra = dict(self._extra) if self._extra else None
+        return other
+
+    # --- Mapping ---
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            return getattr(self, key, default)
+        extra = self._extra
+        return extra.get(key, default) if extra else default
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            normalize = self._NORMALIZERS.get(key)
+            object.__setattr__(self, key, normalize(value) if normalize else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            if getattr(self, key, _MISSING) is _MISSING:
+                raise KeyError(key)
+            object.__delattr__(self, key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for field in self._FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        count = sum(1 for field in self._FIELDS if getattr(self, field, _MISSING) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+
+_MISSING = object()
+
+
+class Vacation(_Record):
+    """goturulen_icazeler siyahısının elementi (başlama/bitmə həmişə date obyektidir)"""
+    __slots__ = ('db_id', 'baslama', 'bitme', 'qeyd', 'aktiv_deyil', 'yaradilma_tarixi', 'status')
+
+    _FIELDS = __slots__
+    _FIELD_SET = frozenset(__slots__)
+    _NORMALIZERS = {
+        'baslama': parse_date,
+        'bitme': parse_date,
+        'yaradilma_tarixi': parse_timestamp,
+        'status': intern_text,
+    }
+
+    @classmethod
+    def from_row(cls, vac):
+        """vacations sətrindən (id, employee_id, start_date, end_date, note, is_inactive, created_at, status)"""
+        vac_id, employee_id, start_date, end_date, note, is_inactive, created_at, status = vac
+        return cls(
+            db_id=vac_id,
+            baslama=start_date,
+            bitme=end_date,
+            qeyd=note or '',
+            aktiv_deyil=bool(is_inactive),
+            yaradilma_tarixi=created_at,
+            status=status or 'pending',
+        )
+
+    @property
+    def duration_days(self):
+        """Məzuniyyət müddəti (bitmə günü daxil); tarix yoxdursa 0"""
+        start = getattr(self, 'baslama', None)
+        end = getattr(self, 'bitme', None)
+        if start is None or end is None:
+            return 0
+        return max(0, (end - start).days + 1)
+
+
+class Employee(_Record):
+    """self.data-dakı işçi qeydi"""
+    __slots__ = ('db_id', 'name', 'umumi_gun', 'is_active', 'max_sessions', 'active_session_count',
+                 'goturulen_icazeler', 'first_name', 'last_name', 'father_name', 'email', 'phone_number',
+                 'birth_date', 'address', 'position', 'department', 'hire_date', 'salary', 'profile_image',
+                 'role', 'username', 'fin_code', 'department_id', 'position_id')
+
+    _FIELDS = __slots__
+    _FIELD_SET = frozenset(__slots__)
+    _NORMALIZERS = {
+        'department': intern_text,
+        'position': intern_text,
+        'role': intern_text,
+    }
+
+    @classmethod
+    def from_row(cls, emp, session_counts):
+        """employees sətrini (_EMPLOYEE_COLUMNS sırası ilə) qeydə çevirir"""
+        emp_id, name, total_days, is_active, max_sessions, first_name, last_name, father_name, email, phone_number, birth_date, address, position, department, hire_date, salary, profile_image, role, username, fin_code, department_id, position_id = emp
+        return cls(
+            db_id=emp_id,
+            name=name,
+            umumi_gun=total_days or 30,  # Default 30 gün
+            is_active=bool(is_active),
+            max_sessions=max_sessions or 1,
+            active_session_count=session_counts.get(emp_id, 0),
+            goturulen_icazeler=[],
+            first_name=first_name or '',
+            last_name=last_name or '',
+            father_name=father_name or '',
+            email=email or '',
+            phone_number=phone_number or '',
+            birth_date=birth_date.strftime('%Y-%m-%d') if birth_date else '',
+            address=address or '',
+            position=position,
+            department=department,
+            hire_date=hire_date.strftime('%Y-%m-%d') if hire_date else '',
+            salary=salary or '',
+            profile_image=profile_image or '',
+            role=role or 'user',
+            username=username or '',
+            fin_code=fin_code if fin_code is not None else '',
+            department_id=department_id if department_id is not None else '',
+            position_id=position_id if position_id is not None else '',
+        )
+
+
+__all__ = ['Employee', 'Vacation', 'intern_text', 'parse_date', 'parse_timestamp']
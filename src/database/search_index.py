@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İşçi Axtarış İndeksi (Search Index)
+Ad, istifadəçi adı, şöbə, vəzifə və FİN kod üzrə indeks - hər düymə basılışında bütün
+anbarı gəzmək əvəzinə:
+  - sözlərin sıralı siyahısında bisect ilə prefiks axtarışı
+  - trigram -> işçi ID-ləri postinqləri ilə söz ortasında alt-sətir axtarışı
+Mətnlər Azərbaycan qaydası ilə kiçildilir (İ -> i, I -> ı, Ə -> ə) və diakritikasız
+formaya salınır (ı/ə/ö/ü/ş/ç/ğ -> i/e/o/u/s/c/g), ona görə "Əliyev", "eliyev" və
+"ƏLİYEV" eyni cür tapılır; diakritika ilə dəqiq uyğunluq əlavə bal alır.
+İndeks EmployeeStore-dan sync() ilə artımlı yenilənir (yalnız dəyişən işçilər) və
+arxa fon thread-indən istifadə oluna bilər (daxili kilid).
+"""
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+# (sahə, çəki) - ad uyğunluğu şöbə uyğunluğundan yuxarıda sıralanır
+SEARCH_FIELDS = (
+    ('name', 5),
+    ('fin_code', 4),
+    ('username', 3),
+    ('position', 2),
+    ('department', 1),
+)
+
+# Uyğunluq növləri üzrə bal
+MATCH_EXACT = 4       # söz tam bərabərdir
+MATCH_PREFIX = 3      # söz sorğu ilə başlayır
+MATCH_SUBSTRING = 1   # sorğu sözün ortasındadır
+DIACRITIC_BONUS = 1   # diakritika ilə də uyğundur (məs. "Əli" yazılıb, "Əli" tapılıb)
+
+MAX_RESULTS = 2000
+
+_UPPER_AZ = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII_AZ = str.maketrans('ıəöüşçğ', 'ieouscg')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def az_fold(text):
+    """Azərbaycan qaydası ilə kiçik hərf: İ -> i, I -> ı (str.lower() 'İ'-ni 'i̇' edir)"""
+    if not text:
+        return ''
+    return unicodedata.normalize('NFC', str(text)).translate(_UPPER_AZ).lower()
+
+
+def az_key(text):
+    """Axtarış açarı: az_fold + diakritikasız forma (ı/ə/ö/ü/ş/ç/ğ -> i/e/o/u/s/c/g)"""
+    return az_fold(text).translate(_ASCII_AZ)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Field:
+    __slots__ = ('weight', 'strict', 'key', 'tokens')
+
+    def __init__(self, weight, value):
+        self.weight = weight
+        self.strict = az_fold(value)
+        self.key = self.strict.translate(_ASCII_AZ)
+        self.tokens = _TOKEN_RE.findall(self.key)
+
+
+class SearchIndex:
+    """İşçi ID-si üzrə axtarış indeksi (sıralı sözlər + trigram postinqləri)"""
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = fields
+        self._docs = {}          # emp_id -> (imza, [_Field, ...], sıralama adı)
+        self._tokens = []        # sıralı (söz, emp_id)
+        self._trigrams = {}      # trigram -> {emp_id}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --- Yeniləmə ---
+
+    def _signature(self, record):
+        return tuple(str(record.get(field) or '') for field, _ in self.fields)
+
+    def _add(self, emp_id, signature, pending_tokens=None):
+        """pending_tokens verilibsə sözlər ora yığılır və çağıran bir dəfə sıralayır (toplu sync)"""
+        fields = [_Field(weight, value) for (_, weight), value in zip(self.fields, signature)]
+        self._docs[emp_id] = (signature, fields, fields[0].key)
+        for token in {token for field in fields for token in field.tokens}:
+            if pending_tokens is None:
+                insort(self._tokens, (token, emp_id))
+            else:
+                pending_tokens.append((token, emp_id))
+        for trigram in set().union(*(_trigrams(field.key) for field in fields)):
+            ids = self._trigrams.get(trigram)
+            if ids is None:
+                self._trigrams[trigram] = {emp_id}
+            else:
+                ids.add(emp_id)
+
+    def _remove(self, emp_id):
+        entry = self._docs.pop(emp_id, None)
+        if entry is None:
+            return
+        fields = entry[1]
+        for token in {token for field in fields for token in field.tokens}:
+            position = bisect_left(self._tokens, (token, emp_id))
+            if position < len(self._tokens) and self._tokens[position] == (token, emp_id):
+                del self._tokens[position]
+        for trigram in set().union(*(_trigrams(field.key) for field in fields)):
+            ids = self._trigrams.get(trigram)
+            if ids is not None:
+                ids.discard(emp_id)
+                if not ids:
+                    del self._trigrams[trigram]
+
+    def update(self, emp_id, record):
+        """Bir işçini indeksə əlavə edir və ya yeniləyir (sahələr dəyişməyibsə heç nə etmir)"""
+        signature = self._signature(record)
+        with self._lock:
+            entry = self._docs.get(emp_id)
+            if entry is not None and entry[0] == signature:
+                return False
+            self._remove(emp_id)
+            self._add(emp_id, signature)
+            return True
+
+    def remove(self, emp_id):
+        with self._lock:
+            self._remove(emp_id)
+
+    def sync(self, store):
+        """
+        İndeksi EmployeeStore ilə uyğunlaşdırır: yalnız əlavə olunan, silinən və axtarış
+        sahələri dəyişən işçilər yenidən indekslənir. (əlavə, silinən, dəyişən) sayını qaytarır.
+        """
+        added = changed = 0
+        pending_tokens = []
+        with self._lock:
+            seen = set()
+            for emp_id in list(store.ids()):
+                record = store.get_by_id(emp_id)
+                if record is None:
+                    continue
+                seen.add(emp_id)
+                signature = self._signature(record)
+                entry = self._docs.get(emp_id)
+                if entry is not None and entry[0] == signature:
+                    continue
+                if entry is None:
+                    added += 1
+                else:
+                    changed += 1
+                    self._remove(emp_id)
+                self._add(emp_id, signature, pending_tokens)
+            if pending_tokens:
+                self._tokens.extend(pending_tokens)
+                self._tokens.sort()
+            removed = [emp_id for emp_id in self._docs if emp_id not in seen]
+            for emp_id in removed:
+                self._remove(emp_id)
+        return added, len(removed), changed
+
+    # --- Axtarış ---
+
+    def _prefix_candidates(self, term):
+        ids = set()
+        tokens = self._tokens
+        position = bisect_left(tokens, (term,))
+        while position < len(tokens) and tokens[position][0].startswith(term):
+            ids.add(tokens[position][1])
+            position += 1
+        return ids
+
+    def _short_substring_candidates(self, term):
+        """1-2 hərfli söz üçün trigram yoxdur - sahə açarlarında alt-sətir axtarışı (məs. "li" -> "Əli")"""
+        return {emp_id for emp_id, (_, fields, _) in self._docs.items()
+                if any(term in field.key for field in fields)}
+
+    def _candidates(self, term):
+        """Sorğu sözünə uyğun ola biləcək işçilər (sonra _score ilə yoxlanılır)"""
+        if len(term) < 3:
+            return self._short_substring_candidates(term)
+        ids = self._prefix_candidates(term)
+        postings = sorted((self._trigrams.get(trigram, ()) for trigram in _trigrams(term)), key=len)
+        if postings and postings[0]:
+            substring_ids = set(postings[0])
+            for other in postings[1:]:
+                substring_ids &= other
+                if not substring_ids:
+                    break
+            ids |= substring_ids
+        return ids
+
+    @staticmethod
+    def _score(fields, term, strict_term):
+        """Sorğu sözünün işçi üzrə ən yaxşı balı (uyğun deyilsə 0)"""
+        best = 0
+        for field in fields:
+            if term not in field.key:
+                continue
+            kind = MATCH_SUBSTRING
+            for token in field.tokens:
+                if token == term:
+                    kind = MATCH_EXACT
+                    break
+                if token.startswith(term):
+                    kind = MATCH_PREFIX
+            score = field.weight * kind
+            if strict_term in field.strict:
+                score += DIACRITIC_BONUS
+            best = max(best, score)
+        return best
+
+    def search(self, query, limit=MAX_RESULTS):
+        """
+        Sorğunu icra edir: hər söz hansısa sahədə uyğun gəlməlidir (AND).
+        [(emp_id, bal), ...] - bala görə azalan, bərabər bal ada görə sıralı.
+        """
+        strict_terms = _TOKEN_RE.findall(az_fold(query))
+        if not strict_terms:
+            return []
+        terms = [term.translate(_ASCII_AZ) for term in strict_terms]
+        with self._lock:
+            # Ən seçici sözdən başla - sonrakı sözlər yalnız namizədləri daraldır
+            candidate_sets = sorted((self._candidates(term) for term in terms), key=len)
+            candidates = candidate_sets[0]
+            for other in candidate_sets[1:]:
+                candidates = candidates & other
+                if not candidates:
+                    return []
+            results = []
+            for emp_id in candidates:
+                _, fields, sort_name = self._docs[emp_id]
+                total = 0
+                for term, strict_term in zip(terms, strict_terms):
+                    score = self._score(fields, term, strict_term)
+                    if not score:
+                        break
+                    total += score
+                else:
+                    results.append((-total, sort_name, emp_id))
+        results.sort()
+        return [(emp_id, -negative_score) for negative_score, _, emp_id in results[:limit]]
+
+
+_search_index = None
+_search_index_store = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index(store=None):
+    """
+    Paylaşılan indeks. store verilibsə və son sinxronlaşdırılan anbar deyilsə, indeks onunla
+    uyğunlaşdırılır (anbar copy-on-write olduğu üçün hər yeni surət yalnız bir dəfə yoxlanılır).
+    """
+    global _search_index, _search_index_store
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex()
+        if store is not None and store is not _search_index_store:
+            _search_index.sync(store)
+            _search_index_store = store
+        return _search_index
+
+
+def search_employees(store, query, limit=MAX_RESULTS):
+    """İndeksi anbarla uyğunlaşdırıb sorğunu icra edir (arxa fon thread-indən çağırıla bilər)"""
+    return get_search_index(store).search(query, limit)
+
+
+__all__ = [
+    'SEARCH_FIELDS',
+    'az_fold',
+    'az_key',
+    'SearchIndex',
+    'get_search_index',
+    'search_employees',
+]
@@ -0,0 +1,320 @@
+# sql_stats.py - SQL səviyyəsində ölçmə: müddət, sətir sayı, çağıran funksiya, N+1
+#
+# Pool-un açdığı bağlantılar InstrumentedConnection ilə yaradılır; onun cursor()
+# metodu (istənilən cursor_factory üçün) execute/executemany-ni ölçən cursor qaytarır.
+# Hər statement normallaşdırılır (literallar -> ?, IN/VALUES siyahıları yığılır) və:
+#   - normallaşdırılmış mətn üzrə toplanır (çağırış sayı, cəmi/maks müddət, sətirlər)
+#   - ən yavaş TOP_SLOW icra ayrıca saxlanılır (debug pəncərəsində göstərilir)
+#   - bir UI əməliyyatı daxilində eyni statement N_PLUS_ONE_THRESHOLD dəfədən çox
+#     təkrarlanırsa N+1 kimi qeyd olunur
+# UI əməliyyatı sql_action() ilə açıq göstərilə bilər; göstərilməyibsə eyni thread-də
+# ACTION_IDLE_GAP saniyədən az fasilə ilə gələn statement-lər bir əməliyyat sayılır.
+
+import heapq
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from psycopg2 import extensions
+
+SQL_STATS_ENABLED = True
+
+TOP_SLOW = 25                 # ən yavaş icraların sayı
+TOP_STATEMENTS = 50           # cəmi vaxta görə göstərilən statement sayı
+MAX_STATEMENTS = 2000         # yadda saxlanılan fərqli statement sayı
+N_PLUS_ONE_THRESHOLD = 5      # bir əməliyyatda bu qədər təkrar N+1 sayılır
+ACTION_IDLE_GAP = 1.0         # açıq əməliyyat yoxdursa, bu fasilədən sonra yeni əməliyyat başlayır
+MAX_NORMALIZE_CHARS = 4000    # uzun (execute_values) sorğular yalnız bu qədər normallaşdırılır
+_NORMALIZE_CACHE_SIZE = 1024
+
+_INFRA_FILES = (os.path.normcase(os.path.abspath(__file__)),)
+_INFRA_MARKERS = (os.sep + 'psycopg2' + os.sep, os.sep + 'contextlib.py')
+
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\(\w+\)s|%s')
+_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ROWS_RE = re.compile(r'(\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+|(\(\?\))(?:\s*,\s*\(\?\))+')
+_ARRAY_RE = re.compile(r'ARRAY\[[^\]]*\]', re.I)
+_SPACE_RE = re.compile(r'\s+')
+
+_normalize_cache = {}
+
+
+def normalize_sql(query):
+    """Statement-in forması: literallar və parametrlər ?, siyahılar (?...), boşluqlar sıxılır"""
+    if not isinstance(query, (bytes, str)):
+        query = str(query)
+    # execute_values bütün sətirləri mətnə yazır (MB-larla) - decode/keşdən əvvəl kəsilir
+    truncated = len(query) > MAX_NORMALIZE_CHARS
+    if truncated:
+        query = query[:MAX_NORMALIZE_CHARS]
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', errors='replace')
+    if not truncated:
+        cached = _normalize_cache.get(query)
+        if cached is not None:
+            return cached
+    text = _COMMENT_RE.sub(' ', query)
+    text = _STRING_RE.sub('?', text)
+    text = _PARAM_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _ARRAY_RE.sub('ARRAY[?...]', text)
+    text = _LIST_RE.sub('(?...)', text)
+    text = _ROWS_RE.sub(lambda m: (m.group(1) or m.group(2)) + ', ...', text)
+    text = _SPACE_RE.sub(' ', text).strip()
+    if truncated:
+        # Uzun statement-lər keşlənmir - hər biri unikal olduğu üçün keşi yalnız doldurardı
+        return text + ' …'
+    if len(_normalize_cache) >= _NORMALIZE_CACHE_SIZE:
+        _normalize_cache.clear()
+    _normalize_cache[query] = text
+    return text
+
+
+def _find_callers():
+    """(çağıran sorğu funksiyası, database paketindən kənardakı ilk çağıran) - 'modul.funksiya:sətir'"""
+    frame = sys._getframe(2)
+    caller = origin = None
+    database_dir = os.path.dirname(_INFRA_FILES[0])
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename not in _INFRA_FILES and not any(marker in filename for marker in _INFRA_MARKERS):
+            label = f"{os.path.splitext(os.path.basename(filename))[0]}.{frame.f_code.co_name}:{frame.f_lineno}"
+            if caller is None:
+                caller = label
+            if not filename.startswith(database_dir):
+                origin = label
+                break
+        frame = frame.f_back
+    return caller or '?', origin or caller or '?'
+
+
+class _StatementStats:
+    __slots__ = ('sql', 'calls', 'errors', 'total', 'max', 'rows', 'callers')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.callers = Counter()
+
+
+class _Action:
+    __slots__ = ('name', 'explicit', 'last_at', 'counts', 'flagged')
+
+    def __init__(self, name, explicit):
+        self.name = name
+        self.explicit = explicit
+        self.last_at = time.monotonic()
+        self.counts = Counter()
+        self.flagged = set()
+
+
+class SqlStats:
+    """Statement statistikası, ən yavaş icralar və N+1 qeydləri (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+            self._slowest = []           # min-heap: (müddət, seq, qeyd)
+            self._n_plus_one = {}        # (sql, əməliyyat) -> qeyd
+            self._seq = 0
+            self.total_statements = 0
+            self.total_seconds = 0.0
+
+    # --- UI əməliyyatı ---
+
+    def begin_action(self, name):
+        stack = getattr(self._local, 'actions', None)
+        if stack is None:
+            stack = self._local.actions = []
+        stack.append(_Action(name, True))
+
+    def end_action(self):
+        stack = getattr(self._local, 'actions', None)
+        if stack:
+            stack.pop()
+
+    def _current_action(self, origin):
+        stack = getattr(self._local, 'actions', None)
+        if stack:
+            return stack[-1]
+        action = getattr(self._local, 'implicit', None)
+        now = time.monotonic()
+        if action is None or now - action.last_at > ACTION_IDLE_GAP:
+            action = self._local.implicit = _Action(origin.rsplit(':', 1)[0], False)
+        action.last_at = now
+        return action
+
+    # --- Qeyd ---
+
+    def record(self, query, duration, rows, failed=False):
+        sql = normalize_sql(query)
+        caller, origin = _find_callers()
+        action = self._current_action(origin)
+        action.counts[sql] += 1
+        repeats = action.counts[sql]
+
+        with self._lock:
+            self.total_statements += 1
+            self.total_seconds += duration
+            stats = self._statements.get(sql)
+            if stats is None:
+                if len(self._statements) >= MAX_STATEMENTS:
+                    # Ən az vaxt aparan statement atılır
+                    del self._statements[min(self._statements, key=lambda key: self._statements[key].total)]
+                stats = self._statements[sql] = _StatementStats(sql)
+            stats.calls += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            if rows is not None and rows > 0:
+                stats.rows += rows
+            if failed:
+                stats.errors += 1
+            stats.callers[caller] += 1
+
+            self._seq += 1
+            entry = (duration, self._seq, {
+                'sql': sql, 'duration': duration, 'rows': rows, 'caller': caller,
+                'origin': origin, 'action': action.name, 'at': time.time(), 'failed': failed,
+            })
+            if len(self._slowest) < TOP_SLOW:
+                heapq.heappush(self._slowest, entry)
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+            if repeats >= N_PLUS_ONE_THRESHOLD:
+                key = (sql, action.name)
+                issue = self._n_plus_one.get(key)
+                if issue is None:
+                    issue = self._n_plus_one[key] = {
+                        'sql': sql, 'action': action.name, 'caller': caller,
+                        'occurrences': 0, 'max_repeats': 0,
+                    }
+                if sql not in action.flagged:
+                    action.flagged.add(sql)
+                    issue['occurrences'] += 1
+                    logging.warning(f"SQL N+1 şübhəsi: '{action.name}' əməliyyatında eyni sorğu "
+                                    f"{repeats}+ dəfə ({caller}): {sql[:120]}")
+                issue['max_repeats'] = max(issue['max_repeats'], repeats)
+
+    # --- Oxuma ---
+
+    def get_stats(self, top=TOP_STATEMENTS):
+        with self._lock:
+            statements = sorted(self._statements.values(), key=lambda item: item.total, reverse=True)[:top]
+            return {
+                'total_statements': self.total_statements,
+                'total_seconds': self.total_seconds,
+                'statements': [{
+                    'sql': item.sql,
+                    'calls': item.calls,
+                    'errors': item.errors,
+                    'total': item.total,
+                    'avg': item.total / item.calls if item.calls else 0.0,
+                    'max': item.max,
+                    'rows': item.rows,
+                    'callers': [name for name, _ in item.callers.most_common(3)],
+                } for item in statements],
+                'slowest': [dict(entry[2]) for entry in sorted(self._slowest, reverse=True)],
+                'n_plus_one': sorted((dict(issue) for issue in self._n_plus_one.values()),
+                                     key=lambda issue: issue['max_repeats'], reverse=True),
+            }
+
+
+_sql_stats = SqlStats()
+
+
+def _instrumented_execute(method):
+    def wrapper(self, query, vars=None):
+        if not SQL_STATS_ENABLED:
+            return method(self, query, vars)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = method(self, query, vars)
+            failed = False
+            return result
+        finally:
+            try:
+                _sql_stats.record(query, time.perf_counter() - started, self.rowcount, failed)
+            except Exception as e:
+                logging.debug(f"SQL statistikası qeyd olunmadı: {e}")
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+_cursor_classes = {}
+_cursor_classes_lock = threading.Lock()
+
+
+def instrumented_cursor_class(base):
+    """base cursor sinfinin execute/executemany-ni ölçən alt sinfi (keşlənir)"""
+    cls = _cursor_classes.get(base)
+    if cls is None:
+        with _cursor_classes_lock:
+            cls = _cursor_classes.get(base)
+            if cls is None:
+                cls = type(f"Instrumented{base.__name__}", (base,), {
+                    'execute': _instrumented_execute(base.execute),
+                    'executemany': _instrumented_execute(base.executemany),
+                })
+                _cursor_classes[base] = cls
+    return cls
+
+
+class InstrumentedConnection(extensions.connection):
+    """cursor() həmişə ölçən cursor qaytarır (cursor_factory verilibsə onun alt sinfi)"""
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get('cursor_factory') or self.cursor_factory or extensions.cursor
+        kwargs['cursor_factory'] = instrumented_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
+
+@contextmanager
+def sql_action(name):
+    """
+    Blok daxilindəki sorğular bir UI əməliyyatı sayılır (N+1 aşkarlanması üçün).
+    Dekorator kimi də işləyir: @sql_action('ui.on_employee_select') - əməliyyat funksiyanın
+    işlədiyi thread-də açılır, ona görə arxa fon yükləmələrində thread funksiyası bəzədilir.
+    """
+    _sql_stats.begin_action(name)
+    try:
+        yield
+    finally:
+        _sql_stats.end_action()
+
+
+def set_sql_stats_enabled(enabled):
+    global SQL_STATS_ENABLED
+    SQL_STATS_ENABLED = bool(enabled)
+
+
+def get_sql_stats():
+    return _sql_stats.get_stats()
+
+
+def reset_sql_stats():
+    _sql_stats.reset()
+
+
+__all__ = [
+    'InstrumentedConnection', 'instrumented_cursor_class', 'normalize_sql', 'sql_action',
+    'set_sql_stats_enabled', 'get_sql_stats', 'reset_sql_stats',
+]
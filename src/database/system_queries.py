@@ -5,9 +5,12 @@ import psycopg2
 from tkinter import messagebox
 from datetime import date
 from .connection import db_connect, _active_connection_params
+from .bulk_operations import bulk_start_new_vacation_year
+from .query_cache import cached_query, invalidates_query_cache
 
 # --- ARXİVLƏMƏ FUNKSİYALARI ---
 
+@cached_query(ttl=60, tags=('employees', 'vacations'))
 def get_employees_with_archivable_vacations():
     """Arxivlənə bilən məzuniyyətləri olan işçilərin siyahısını qaytarır."""
     conn = db_connect()
@@ -33,33 +36,18 @@ def get_employees_with_archivable_vacations():
         if conn:
             conn.close()
 
-def start_new_vacation_year(employee_ids, default_days=30):
+@invalidates_query_cache('employees', 'vacations')
+def start_new_vacation_year(employee_ids, default_days=30, progress_callback=None):
     """Seçilmiş işçilər üçün yeni məzuniyyət ili başladır."""
     if not employee_ids:
         return False
         
-    conn = db_connect()
-    if not conn:
+    result = bulk_start_new_vacation_year(employee_ids, default_days, progress_callback=progress_callback)
+    if not result['success']:
+        messagebox.showerror("Baza Xətası", f"Yeni məzuniyyət ilinə başlarkən xəta baş verdi:\n{'; '.join(result['errors'])}")
         return False
-        
-    try:
-        with conn.cursor() as cur:
-            current_year = date.today().year
-            ids_tuple = tuple(employee_ids)
-            cur.execute("UPDATE vacations SET is_archived = TRUE WHERE status = 'approved' AND EXTRACT(YEAR FROM start_date) < %s AND employee_id IN %s", (current_year, ids_tuple))
-            archived_count = cur.rowcount
-            cur.execute("UPDATE employees SET total_vacation_days = %s WHERE id IN %s", (default_days, ids_tuple))
-            updated_employees = cur.rowcount
-            conn.commit()
-        messagebox.showinfo("Əməliyyat Uğurlu", f"{updated_employees} işçinin məzuniyyət hüququ yeniləndi və {archived_count} köhnə məzuniyyət arxivləşdirildi.")
-        return True
-    except psycopg2.Error as e:
-        messagebox.showerror("Baza Xətası", f"Yeni məzuniyyət ilinə başlarkən xəta baş verdi:\n{e}")
-        conn.rollback()
-        return False
-    finally:
-        if conn:
-            conn.close()
+    messagebox.showinfo("Əməliyyat Uğurlu", f"{result['updated_count']} işçinin məzuniyyət hüququ yeniləndi və {result['archived_count']} köhnə məzuniyyət arxivləşdirildi.")
+    return True
 
 def load_archived_vacations_for_year(employee_id, year):
     """İşçinin seçilmiş ilə aid arxiv məlumatlarını gətirir."""
@@ -92,6 +80,7 @@ def load_archived_vacations_for_year(employee_id, year):
 
 # --- VERSİYA FUNKSİYASI ---
 
+@cached_query(ttl=600, tags=('app_version',))
 def get_latest_version():
     """Verilənlər bazasından proqramın ən son versiyasını gətirir."""
     conn = db_connect()
@@ -101,30 +90,7 @@ def get_latest_version():
     try:
         # PostgreSQL connection
         with conn.cursor() as cur:
-            # Əvvəlcə app_version cədvəlinin mövcudluğunu yoxla
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = 'app_version'
-                )
-            """)
-            table_exists = cur.fetchone()[0]
-            
-            if not table_exists:
-                # Cədvəl yoxdursa yarat
-                cur.execute("""
-                    CREATE TABLE app_version (
-                        id INTEGER PRIMARY KEY,
-                        latest_version TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                # Default versiya əlavə et
-                cur.execute("INSERT INTO app_version (id, latest_version) VALUES (1, '6.8-final-unified-tkinter')")
-                conn.commit()
-                return '6.8-final-unified-tkinter'
-            
+            # app_version cədvəli 004 miqrasiyası ilə yaradılır
             cur.execute("SELECT latest_version FROM app_version WHERE id = 1")
             result = cur.fetchone()
             return result[0] if result else None
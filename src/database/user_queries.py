@@ -6,8 +6,10 @@ import psycopg2
 from tkinter import messagebox
 from .connection import db_connect, _active_connection_params
 from .session_queries import get_active_session_counts
+from .query_cache import cached_query, invalidates_query_cache
 
 # --- VERSİYA FUNKSİYASI ---
+@cached_query(ttl=600, tags=('app_version',))
 def get_latest_version():
     """Verilənlər bazasından proqramın ən son versiyasını gətirir."""
     conn = db_connect()
@@ -16,32 +18,7 @@ def get_latest_version():
         
     try:
         with conn.cursor() as cur:
-            # Cədvəlin mövcudluğunu yoxla
-            cur.execute(
-                """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                      AND table_name = 'app_version'
-                )
-                """
-            )
-            table_exists = cur.fetchone()[0]
-            if not table_exists:
-                cur.execute(
-                    """
-                    CREATE TABLE app_version (
-                        id INTEGER PRIMARY KEY,
-                        latest_version TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-                )
-                cur.execute(
-                    "INSERT INTO app_version (id, latest_version) VALUES (1, '6.8-final-unified-tkinter')"
-                )
-                conn.commit()
-                return '6.8-final-unified-tkinter'
+            # app_version cədvəli 004 miqrasiyası ilə yaradılır
             cur.execute("SELECT latest_version FROM app_version WHERE id = 1")
             result = cur.fetchone()
             return result[0] if result else None
@@ -103,6 +80,7 @@ def get_user_by_id(user_id):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def update_user_profile(user_id, user_data):
     """İstifadəçi profil məlumatlarını yeniləyir."""
     conn = db_connect()
@@ -148,6 +126,7 @@ def update_user_profile(user_id, user_data):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def create_new_user(name, username, password, role='user', total_days=30, max_sessions=1, email=None, first_name=None, last_name=None, father_name=None, phone_number=None, birth_date=None, fin_code=None, department_id=None, position_id=None, hire_date=None, salary=None, address=None, emergency_contact=None):
     """Yeni istifadəçi yaradır."""
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
@@ -168,52 +147,7 @@ def create_new_user(name, username, password, role='user', total_days=30, max_se
                     messagebox.showerror("Xəta", f"'{email}' email ünvanı artıq istifadə olunur.")
                     return False
         
-        # PostgreSQL üçün yeni sütunları əlavə et (əgər yoxdursa)
-        # Əvvəlcə mövcud sütunları yoxlayırıq
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND table_schema = 'public'
-            """)
-            existing_columns = [row[0] for row in cur.fetchall()]
-            
-            new_columns = [
-                ("email", "TEXT"),
-                ("first_name", "TEXT"),
-                ("last_name", "TEXT"),
-                ("father_name", "TEXT"),
-                ("phone_number", "TEXT"),
-                ("birth_date", "DATE"),
-                ("profile_image", "TEXT"),
-                ("fin_code", "TEXT"),
-                ("department_id", "INTEGER"),
-                ("position_id", "INTEGER"),
-                ("hire_date", "DATE"),
-                ("salary", "REAL"),
-                ("address", "TEXT"),
-                ("emergency_contact", "TEXT"),
-                ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-            ]
-            
-            # Yalnız mövcud olmayan sütunları əlavə edirik
-            columns_to_add = [col for col in new_columns if col[0] not in existing_columns]
-            
-            if columns_to_add:
-                for column_name, column_type in columns_to_add:
-                    try:
-                        cur.execute(f"ALTER TABLE employees ADD COLUMN {column_name} {column_type}")
-                        print(f"✅ {column_name} sütunu PostgreSQL cədvəlinə əlavə edildi")
-                    except psycopg2.errors.DuplicateColumn:
-                        # Sütun artıq mövcuddur
-                        pass
-                
-                # Sütun əlavə etmə əməliyyatlarını commit edirik
-                conn.commit()
-            else:
-                print("✅ Bütün sütunlar artıq mövcuddur")
-        
-        # İndi yeni istifadəçini əlavə edirik
+        # İndi yeni istifadəçini əlavə edirik (əlavə sütunlar 001 miqrasiyası ilə yaradılıb)
         with conn.cursor() as cur:
             cur.execute("""
                 INSERT INTO employees (
@@ -238,6 +172,7 @@ def create_new_user(name, username, password, role='user', total_days=30, max_se
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def update_employee(emp_id, new_name, total_days, max_sessions):
     """İşçi məlumatını yeniləyir."""
     conn = db_connect()
@@ -251,6 +186,7 @@ def update_employee(emp_id, new_name, total_days, max_sessions):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def delete_employee(emp_id):
     """(YENİ ƏLAVƏ EDİLDİ) İşçini verilənlər bazasından silir."""
     conn = db_connect()
@@ -264,6 +200,7 @@ def delete_employee(emp_id):
     finally:
         if conn: conn.close()
 
+@invalidates_query_cache('employees')
 def set_user_activity(user_id, new_status):
     """İstifadəçinin aktiv statusunu dəyişir."""
     conn = db_connect()
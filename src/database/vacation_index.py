@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Məzuniyyət İnterval İndeksi (Vacation Index)
+"X günü / [a, b] aralığında kim məzuniyyətdədir" sorğuları üçün sıralı uc nöqtələr indeksi:
+  - başlama tarixinə görə sıralı siyahı + ən uzun məzuniyyətin müddəti: aralıqla kəsişən
+    məzuniyyətlər yalnız [a - max_müddət, b] pəncərəsində axtarılır (bisect)
+  - bitmə tarixinə görə sıralı siyahı: bir gündəki məzuniyyət sayı O(log n)
+  - şöbə üzrə açar dəstləri: şöbə daxilində üst-üstə düşmə yoxlaması
+Əlavə/düzəliş/silmə artımlıdır (add/remove); EmployeeStore ilə sync() yalnız dəyişən
+məzuniyyətləri yeniləyir. Açarlar (məzuniyyət ID-si) öz aralarında müqayisə oluna bilməlidir.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+try:
+    from .employee_store import NO_DEPARTMENT
+except ImportError:
+    from database.employee_store import NO_DEPARTMENT
+
+ONE_DAY = timedelta(days=1)
+
+Absence = namedtuple('Absence', 'key start end employee_id department vacation')
+
+
+def counts_as_absence(vacation):
+    """Təqvimdə/yoxlamalarda nəzərə alınan məzuniyyət: təsdiqlənmiş və deaktiv edilməmiş"""
+    return vacation.get('status') == 'approved' and not vacation.get('aktiv_deyil', False)
+
+
+class VacationIndex:
+    """Məzuniyyət aralıqları üzrə indeks (bax modul sənədi)"""
+
+    def __init__(self):
+        self._entries = {}               # açar -> Absence
+        self._starts = []                # sıralı (başlama, açar)
+        self._ends = []                  # sıralı (bitmə, açar)
+        self._lengths = Counter()        # müddət (gün fərqi) -> say
+        self._max_length = 0
+        self._by_department = {}         # şöbə -> {açar}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    # --- Yeniləmə ---
+
+    def add(self, key, start, end, employee_id=None, department=None, vacation=None):
+        """Məzuniyyəti əlavə edir; açar artıq varsa köhnə aralığı əvəz edir (düzəliş)"""
+        if start is None or end is None or end < start:
+            self.remove(key)
+            return False
+        department = department or NO_DEPARTMENT
+        with self._lock:
+            self._remove(key)
+            entry = Absence(key, start, end, employee_id, department, vacation)
+            self._entries[key] = entry
+            insort(self._starts, (start, key))
+            insort(self._ends, (end, key))
+            length = (end - start).days
+            self._lengths[length] += 1
+            if length > self._max_length:
+                self._max_length = length
+            ids = self._by_department.get(department)
+            if ids is None:
+                self._by_department[department] = {key}
+            else:
+                ids.add(key)
+        return True
+
+    def remove(self, key):
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        del self._starts[bisect_left(self._starts, (entry.start, key))]
+        del self._ends[bisect_left(self._ends, (entry.end, key))]
+        length = (entry.end - entry.start).days
+        self._lengths[length] -= 1
+        if not self._lengths[length]:
+            del self._lengths[length]
+            if length == self._max_length:
+                self._max_length = max(self._lengths) if self._lengths else 0
+        ids = self._by_department.get(entry.department)
+        if ids is not None:
+            ids.discard(key)
+            if not ids:
+                del self._by_department[entry.department]
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._starts.clear()
+            self._ends.clear()
+            self._lengths.clear()
+            self._max_length = 0
+            self._by_department.clear()
+
+    def sync(self, store):
+        """
+        İndeksi EmployeeStore ilə uyğunlaşdırır (açar - məzuniyyət ID-si). Yalnız əlavə olunan,
+        silinən və tarixi/statusu/şöbəsi dəyişən məzuniyyətlər yenilənir.
+        (əlavə/dəyişən, silinən) sayını qaytarır.
+        """
+        updated = 0
+        with self._lock:
+            seen = set()
+            for record, vacation in store.iter_vacations():
+                key = vacation.get('db_id')
+                if key is None or not counts_as_absence(vacation):
+                    continue
+                start, end = vacation.get('baslama'), vacation.get('bitme')
+                if start is None or end is None or end < start:
+                    continue
+                seen.add(key)
+                employee_id = record.get('db_id')
+                department = record.get('department') or NO_DEPARTMENT
+                entry = self._entries.get(key)
+                if (entry is not None and entry.start == start and entry.end == end
+                        and entry.employee_id == employee_id and entry.department == department):
+                    if entry.vacation is not vacation:
+                        self._entries[key] = entry._replace(vacation=vacation)
+                    continue
+                self.add(key, start, end, employee_id, department, vacation)
+                updated += 1
+            removed = [key for key in self._entries if key not in seen]
+            for key in removed:
+                self._remove(key)
+        return updated, len(removed)
+
+    @classmethod
+    def from_store(cls, store):
+        index = cls()
+        index.sync(store)
+        return index
+
+    # --- Sorğular ---
+
+    def _candidates(self, first, last, department=None):
+        """[first, last] aralığı ilə kəsişən qeydlər, başlama tarixinə görə sıralı"""
+        if department is not None:
+            keys = self._by_department.get(department or NO_DEPARTMENT)
+            if not keys:
+                return []
+        else:
+            keys = None
+        lo = bisect_left(self._starts, (first - timedelta(days=self._max_length),))
+        hi = bisect_left(self._starts, (last + ONE_DAY,))
+        entries = self._entries
+        result = []
+        for position in range(lo, hi):
+            key = self._starts[position][1]
+            if keys is not None and key not in keys:
+                continue
+            entry = entries[key]
+            if entry.end >= first:
+                result.append(entry)
+        return result
+
+    def overlapping(self, first, last, department=None, exclude_employee=None):
+        """[first, last] aralığında (ən azı bir gün) məzuniyyətdə olanlar"""
+        with self._lock:
+            entries = self._candidates(first, last, department)
+        if exclude_employee is not None:
+            entries = [entry for entry in entries if entry.employee_id != exclude_employee]
+        return entries
+
+    def absent_on(self, day, department=None):
+        """day günü məzuniyyətdə olanlar (stabbing sorğusu)"""
+        return self.overlapping(day, day, department)
+
+    def count_on(self, day):
+        """day günü məzuniyyətdə olanların sayı - O(log n): başlamış - artıq bitmiş"""
+        with self._lock:
+            started = bisect_left(self._starts, (day + ONE_DAY,))
+            finished = bisect_left(self._ends, (day,))
+        return started - finished
+
+    def department_overlaps(self, department, start, end, exclude_employee=None):
+        """Eyni şöbədə [start, end] ilə üst-üstə düşən məzuniyyətlər (təsdiq yoxlaması üçün)"""
+        return self.overlapping(start, end, department or NO_DEPARTMENT, exclude_employee)
+
+    def daily_counts(self, first, last, department=None, exclude_employee=None):
+        """[first, last] aralığının hər günü üçün məzuniyyətdə olanların sayı (fərq massivi, O(k + D))"""
+        days = (last - first).days + 1
+        if days <= 0:
+            return []
+        deltas = [0] * (days + 1)
+        for entry in self.overlapping(first, last, department, exclude_employee):
+            deltas[(max(entry.start, first) - first).days] += 1
+            deltas[(min(entry.end, last) - first).days + 1] -= 1
+        counts = []
+        running = 0
+        for delta in deltas[:days]:
+            running += delta
+            counts.append(running)
+        return counts
+
+    def max_concurrent(self, first, last, department=None, exclude_employee=None):
+        """(eyni gündə ən çox məzuniyyətdə olan say, həmin ilk gün); boşdursa (0, None)"""
+        counts = self.daily_counts(first, last, department, exclude_employee)
+        if not counts:
+            return 0, None
+        peak = max(counts)
+        if not peak:
+            return 0, None
+        return peak, first + timedelta(days=counts.index(peak))
+
+
+_vacation_index = None
+_vacation_index_store = None
+_vacation_index_lock = threading.Lock()
+
+
+def get_vacation_index(store=None):
+    """
+    Paylaşılan indeks. store verilibsə və son sinxronlaşdırılan anbar deyilsə, indeks onunla
+    uyğunlaşdırılır (anbar copy-on-write olduğu üçün hər yeni surət yalnız bir dəfə yoxlanılır).
+    """
+    global _vacation_index, _vacation_index_store
+    with _vacation_index_lock:
+        if _vacation_index is None:
+            _vacation_index = VacationIndex()
+        if store is not None and store is not _vacation_index_store:
+            _vacation_index.sync(store)
+            _vacation_index_store = store
+        return _vacation_index
+
+
+__all__ = [
+    'Absence',
+    'VacationIndex',
+    'counts_as_absence',
+    'get_vacation_index',
+]
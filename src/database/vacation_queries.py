@@ -3,6 +3,7 @@ import psycopg2
 from tkinter import messagebox
 from .connection import db_connect, _active_connection_params
 from .notification_queries import create_notification, _get_admin_ids
+from .bulk_operations import notify_admins
 
 def add_vacation(employee_id, employee_name, vac_data, requested_by_role):
     """Verilənlər bazasına yeni məzuniyyət sorğusu əlavə edir."""
@@ -13,39 +14,19 @@ def add_vacation(employee_id, employee_name, vac_data, requested_by_role):
     status = 'approved' if requested_by_role == 'admin' else 'pending'
     try:
         # PostgreSQL üçün emal
-            cursor = conn.execute(
-                "INSERT INTO vacations (employee_id, start_date, end_date, note, created_at, status) VALUES (?, ?, ?, ?, ?, ?)",
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO vacations (employee_id, start_date, end_date, note, created_at, status) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
                 (employee_id, vac_data['baslama'], vac_data['bitme'], vac_data['qeyd'], vac_data['yaradilma_tarixi'], status)
             )
-            vac_id = cursor.lastrowid
+            vac_id = cur.fetchone()[0]
             
             # Əgər sorğunu işçi göndəribsə, adminlərə bildiriş getsin
             if status == 'pending':
-                admin_cursor = conn.execute("SELECT id FROM employees WHERE role = 'admin'")
-                admin_ids = [row[0] for row in admin_cursor.fetchall()]
                 message = f"İşçi '{employee_name}' yeni məzuniyyət sorğusu göndərdi."
-                for admin_id in admin_ids:
-                    conn.execute(
-                        "INSERT INTO notifications (recipient_id, message, related_vacation_id) VALUES (?, ?, ?)",
-                        (admin_id, message, vac_id)
-                    )
+                notify_admins(cur, message, vac_id)
             conn.commit()
-        else:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO vacations (employee_id, start_date, end_date, note, created_at, status) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
-                    (employee_id, vac_data['baslama'], vac_data['bitme'], vac_data['qeyd'], vac_data['yaradilma_tarixi'], status)
-                )
-                vac_id = cur.fetchone()[0]
-                
-                # Əgər sorğunu işçi göndəribsə, adminlərə bildiriş getsin
-                if status == 'pending':
-                    admin_ids = _get_admin_ids(cur)
-                    message = f"İşçi '{employee_name}' yeni məzuniyyət sorğusu göndərdi."
-                    for admin_id in admin_ids:
-                        create_notification(admin_id, message, vac_id, cur)
-                conn.commit()
-            
+        
     except psycopg2.Error as e:
         messagebox.showerror("Baza Xətası", f"Məzuniyyət əlavə edilərkən xəta baş verdi:\n{e}")
         conn.rollback()
@@ -61,33 +42,18 @@ def update_vacation(vac_id, vac_data, admin_name):
         
     try:
         # PostgreSQL üçün emal
-            cursor = conn.execute(
-                "UPDATE vacations SET start_date=?, end_date=?, note=? WHERE id=?",
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE vacations SET start_date=%s, end_date=%s, note=%s WHERE id=%s RETURNING employee_id",
                 (vac_data['baslama'], vac_data['bitme'], vac_data['qeyd'], vac_id)
             )
-            recipient_cursor = conn.execute("SELECT employee_id FROM vacations WHERE id = ?", (vac_id,))
-            recipient_id = recipient_cursor.fetchone()[0]
+            recipient_id = cur.fetchone()[0]
             
             # Dəyişiklik haqqında işçiyə bildiriş göndər
             message = f"Admin '{admin_name}' sizin {vac_data['baslama']} tarixli məzuniyyət sorğunuzda dəyişiklik etdi."
-            conn.execute(
-                "INSERT INTO notifications (recipient_id, message, related_vacation_id) VALUES (?, ?, ?)",
-                (recipient_id, message, vac_id)
-            )
+            create_notification(recipient_id, message, vac_id, cur)
             conn.commit()
-        else:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE vacations SET start_date=%s, end_date=%s, note=%s WHERE id=%s RETURNING employee_id",
-                    (vac_data['baslama'], vac_data['bitme'], vac_data['qeyd'], vac_id)
-                )
-                recipient_id = cur.fetchone()[0]
-                
-                # Dəyişiklik haqqında işçiyə bildiriş göndər
-                message = f"Admin '{admin_name}' sizin {vac_data['baslama']} tarixli məzuniyyət sorğunuzda dəyişiklik etdi."
-                create_notification(recipient_id, message, vac_id, cur)
-                conn.commit()
-            
+        
     except psycopg2.Error as e:
         messagebox.showerror("Baza Xətası", f"Məzuniyyət yenilənərkən xəta baş verdi:\n{e}")
         conn.rollback()
@@ -103,33 +69,18 @@ def update_vacation_status(vac_id, new_status, admin_name):
         
     try:
         # PostgreSQL üçün emal
-            conn.execute(
-                "UPDATE vacations SET status = ? WHERE id = ?",
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE vacations SET status = %s WHERE id = %s RETURNING employee_id, start_date, end_date",
                 (new_status, vac_id)
             )
-            recipient_cursor = conn.execute("SELECT employee_id, start_date, end_date FROM vacations WHERE id = ?", (vac_id,))
-            recipient_id, start_date, end_date = recipient_cursor.fetchone()
+            recipient_id, start_date, end_date = cur.fetchone()
             
             status_az = "Təsdiqləndi" if new_status == 'approved' else "Rədd edildi"
-            message = f"Admin '{admin_name}', sizin {start_date} - {end_date} arası sorğunuzu '{status_az}' statusu ilə yenilədi."
-            conn.execute(
-                "INSERT INTO notifications (recipient_id, message, related_vacation_id) VALUES (?, ?, ?)",
-                (recipient_id, message, vac_id)
-            )
+            message = f"Admin '{admin_name}', sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu '{status_az}' statusu ilə yenilədi."
+            create_notification(recipient_id, message, vac_id, cur)
             conn.commit()
-        else:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE vacations SET status = %s WHERE id = %s RETURNING employee_id, start_date, end_date",
-                    (new_status, vac_id)
-                )
-                recipient_id, start_date, end_date = cur.fetchone()
-                
-                status_az = "Təsdiqləndi" if new_status == 'approved' else "Rədd edildi"
-                message = f"Admin '{admin_name}', sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu '{status_az}' statusu ilə yenilədi."
-                create_notification(recipient_id, message, vac_id, cur)
-                conn.commit()
-            
+        
     except psycopg2.Error as e:
         messagebox.showerror("Baza Xətası", f"Məzuniyyət statusu yenilənərkən xəta baş verdi:\n{e}")
         conn.rollback()
@@ -145,36 +96,20 @@ def delete_vacation(vac_id, admin_name):
         
     try:
         # PostgreSQL üçün emal
-            result_cursor = conn.execute("SELECT employee_id, start_date, end_date FROM vacations WHERE id = ?", (vac_id,))
-            result = result_cursor.fetchone()
+        with conn.cursor() as cur:
+            cur.execute("SELECT employee_id, start_date, end_date FROM vacations WHERE id = %s", (vac_id,))
+            result = cur.fetchone()
             if result:
                 recipient_id, start_date, end_date = result
                 
                 # Əvvəlcə sil, sonra bildiriş göndər
-                conn.execute("DELETE FROM vacations WHERE id = ?", (vac_id,))
+                cur.execute("DELETE FROM vacations WHERE id = %s", (vac_id,))
                 
-                message = f"Admin '{admin_name}' sizin {start_date} - {end_date} arası sorğunuzu sildi."
+                message = f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu sildi."
                 # Məzuniyyət silindiyi üçün `related_vacation_id` NULL olacaq
-                conn.execute(
-                    "INSERT INTO notifications (recipient_id, message, related_vacation_id) VALUES (?, ?, ?)",
-                    (recipient_id, message, None)
-                )
+                create_notification(recipient_id, message, None, cur)
             conn.commit()
-        else:
-            with conn.cursor() as cur:
-                cur.execute("SELECT employee_id, start_date, end_date FROM vacations WHERE id = %s", (vac_id,))
-                result = cur.fetchone()
-                if result:
-                    recipient_id, start_date, end_date = result
-                    
-                    # Əvvəlcə sil, sonra bildiriş göndər
-                    cur.execute("DELETE FROM vacations WHERE id = %s", (vac_id,))
-                    
-                    message = f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')} arası sorğunuzu sildi."
-                    # Məzuniyyət silindiyi üçün `related_vacation_id` NULL olacaq
-                    create_notification(recipient_id, message, None, cur)
-                conn.commit()
-            
+        
     except psycopg2.Error as e:
         messagebox.showerror("Baza Xətası", f"Məzuniyyət silinərkən xəta baş verdi:\n{e}")
         conn.rollback()
@@ -190,33 +125,18 @@ def toggle_vacation_activity(vac_id, new_status, admin_name):
         
     try:
         # PostgreSQL üçün emal
-            conn.execute(
-                "UPDATE vacations SET is_inactive = ? WHERE id = ?",
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE vacations SET is_inactive = %s WHERE id = %s RETURNING employee_id, start_date, end_date",
                 (new_status, vac_id)
             )
-            recipient_cursor = conn.execute("SELECT employee_id, start_date, end_date FROM vacations WHERE id = ?", (vac_id,))
-            recipient_id, start_date, end_date = recipient_cursor.fetchone()
+            recipient_id, start_date, end_date = cur.fetchone()
             
             status_az = "deaktiv" if new_status else "aktiv"
-            message = f"Admin '{admin_name}' sizin {start_date} tarixli təsdiqlənmiş məzuniyyətinizi '{status_az}' etdi."
-            conn.execute(
-                "INSERT INTO notifications (recipient_id, message, related_vacation_id) VALUES (?, ?, ?)",
-                (recipient_id, message, vac_id)
-            )
+            message = f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} tarixli təsdiqlənmiş məzuniyyətinizi '{status_az}' etdi."
+            create_notification(recipient_id, message, vac_id, cur)
             conn.commit()
-        else:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE vacations SET is_inactive = %s WHERE id = %s RETURNING employee_id, start_date, end_date",
-                    (new_status, vac_id)
-                )
-                recipient_id, start_date, end_date = cur.fetchone()
-                
-                status_az = "deaktiv" if new_status else "aktiv"
-                message = f"Admin '{admin_name}' sizin {start_date.strftime('%d.%m.%Y')} tarixli təsdiqlənmiş məzuniyyətinizi '{status_az}' etdi."
-                create_notification(recipient_id, message, vac_id, cur)
-                conn.commit()
-            
+        
     except psycopg2.Error as e:
         messagebox.showerror("Baza Xətası", f"Status dəyişdirilərkən xəta baş verdi:\n{e}")
         conn.rollback()
@@ -274,6 +194,7 @@ def get_pending_vacation_requests(user_id=None):
     requests = []
     try:
         # PostgreSQL üçün emal
+        with conn.cursor() as cur:
             # SQL sorğusunun əsas hissəsi
             sql = """
                 SELECT v.employee_id, e.name, v.start_date, v.end_date 
@@ -285,45 +206,19 @@ def get_pending_vacation_requests(user_id=None):
 
             # Əgər funksiyaya user_id göndərilibsə, sorğuya şərt əlavə et
             if user_id:
-                sql += " AND v.employee_id = ?"
+                sql += " AND v.employee_id = %s"
                 params.append(user_id)
             
             sql += " ORDER BY v.created_at ASC"
-            cursor = conn.execute(sql, params)
+            cur.execute(sql, tuple(params))
 
-            for row in cursor.fetchall():
+            for row in cur.fetchall():
                 requests.append({
                     'employee_id': row[0],
                     'employee': row[1],
                     'start_date': row[2],
                     'end_date': row[3]
                 })
-        else:
-            with conn.cursor() as cur:
-                # SQL sorğusunun əsas hissəsi
-                sql = """
-                    SELECT v.employee_id, e.name, v.start_date, v.end_date 
-                    FROM vacations v
-                    JOIN employees e ON v.employee_id = e.id
-                    WHERE v.status = 'pending'
-                """
-                params = []
-
-                # Əgər funksiyaya user_id göndərilibsə, sorğuya şərt əlavə et
-                if user_id:
-                    sql += " AND v.employee_id = %s"
-                    params.append(user_id)
-                
-                sql += " ORDER BY v.created_at ASC"
-                cur.execute(sql, tuple(params))
-
-                for row in cur.fetchall():
-                    requests.append({
-                        'employee_id': row[0],
-                        'employee': row[1],
-                        'start_date': row[2],
-                        'end_date': row[3]
-                    })
         return requests
     except Exception as e:
         messagebox.showerror("Baza Xətası", f"Gözləmədə olan sorğular alınarkən xəta baş verdi:\n{e}")
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""pytest konfiqurasiyası: src qovluğu import yoluna əlavə olunur (ensure_departments_positions.py kimi)"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# utils.cache APPDATA qovluğunu import zamanı oxuyur (Windows-dan kənarda təyin olunmayıb)
+os.environ.setdefault('APPDATA', tempfile.gettempdir())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.bulk_operations testləri: hissələrə bölmə, commit/rollback sayları və yeni il keçidi"""
+
+import importlib
+
+import pytest
+
+bulk = importlib.import_module('database.bulk_operations')
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((sql, params))
+        if self.conn.fail_on and self.conn.fail_on in sql and len(self.conn.statements) > self.conn.fail_after:
+            raise RuntimeError('uğursuz statement')
+        self.rowcount = len(params[-1]) if params and isinstance(params[-1], list) else 3
+
+
+class FakeConnection:
+    def __init__(self, fail_on=None, fail_after=0):
+        self.fail_on = fail_on
+        self.fail_after = fail_after
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    holder = {}
+
+    def connect():
+        return holder['conn']
+
+    monkeypatch.setattr(bulk, 'db_connect', connect)
+    monkeypatch.setattr(bulk, 'debug_log', lambda *args, **kwargs: None)
+    return holder
+
+
+def test_iter_chunks_splits_by_size():
+    assert list(bulk.iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(bulk.iter_chunks([], 2)) == []
+
+
+def test_run_chunked_commits_each_chunk_and_counts(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+    progress = []
+    result = bulk.run_chunked(range(5), lambda cur, chunk: len(chunk), chunk_size=2,
+                              progress_callback=lambda done, total, msg: progress.append(done))
+    assert result == {'success': True, 'count': 5, 'chunks': 3, 'errors': []}
+    assert conn.commits == 3 and conn.closed
+    assert progress == [0, 2, 4, 5, 5]
+
+
+def test_run_chunked_keeps_only_committed_chunks_on_failure(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+
+    def work(cur, chunk):
+        if 4 in chunk:
+            raise RuntimeError('sındı')
+        return len(chunk)
+
+    result = bulk.run_chunked(range(6), work, chunk_size=2)
+    assert not result['success']
+    assert result['count'] == 4 and result['chunks'] == 2
+    assert conn.commits == 2 and conn.rollbacks == 1
+    assert '4/6' in result['errors'][0]
+
+
+def test_run_chunked_atomic_rolls_back_everything(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+
+    def work(cur, chunk):
+        if 4 in chunk:
+            raise RuntimeError('sındı')
+        return len(chunk)
+
+    result = bulk.run_chunked(range(6), work, chunk_size=2, atomic=True)
+    assert not result['success']
+    assert result['count'] == 0 and result['chunks'] == 0
+    assert conn.commits == 0 and conn.rollbacks == 1
+
+
+def test_run_chunked_atomic_commits_once(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+    result = bulk.run_chunked(range(5), lambda cur, chunk: len(chunk), chunk_size=2, atomic=True)
+    assert result == {'success': True, 'count': 5, 'chunks': 3, 'errors': []}
+    assert conn.commits == 1
+
+
+def test_run_chunked_without_connection(fake_db):
+    fake_db['conn'] = None
+    result = bulk.run_chunked([1], lambda cur, chunk: 1)
+    assert not result['success'] and result['count'] == 0
+
+
+def test_new_year_rollover_is_one_transaction(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+    result = bulk.bulk_start_new_vacation_year([1, 2, 3], default_days=28, chunk_size=2)
+    assert result['success']
+    assert result['updated_count'] == 3 and result['archived_count'] == 3
+    assert conn.commits == 1
+    assert sum('UPDATE employees' in sql for sql, _ in conn.statements) == 2
+
+
+def test_new_year_rollover_failure_reports_nothing_archived(fake_db):
+    # İkinci hissənin işçi yeniləməsi uğursuz olur - birinci hissənin arxivi də geri qaytarılır
+    conn = fake_db['conn'] = FakeConnection(fail_on='UPDATE employees', fail_after=2)
+    result = bulk.bulk_start_new_vacation_year([1, 2, 3], chunk_size=2)
+    assert not result['success']
+    assert result['updated_count'] == 0 and result['archived_count'] == 0
+    assert conn.commits == 0 and conn.rollbacks == 1
+
+
+def test_new_year_rollover_archives_globally_once(fake_db):
+    conn = fake_db['conn'] = FakeConnection()
+    result = bulk.bulk_start_new_vacation_year([1, 2, 3], archive_all=True, chunk_size=1)
+    assert result['success'] and result['archived_count'] == 3
+    assert sum('UPDATE vacations' in sql for sql, _ in conn.statements) == 1
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.change_feed testləri: payload-ların oxunması, birləşdirilməsi və bağlantı limiti"""
+
+import importlib
+import json
+
+import psycopg2
+
+change_feed = importlib.import_module('database.change_feed')
+
+
+def test_change_type_for_maps_table_and_op():
+    assert change_feed.change_type_for('vacations', 'UPDATE') == 'vacation_updated'
+    assert change_feed.change_type_for('employees', 'DELETE') == 'employee_deleted'
+    assert change_feed.change_type_for('audit', 'TRUNCATE') == 'audit_changed'
+
+
+def test_parse_payload_rejects_unknown_formats():
+    assert change_feed.parse_payload(json.dumps({'table': 'employees', 'op': 'INSERT', 'id': 1}))['id'] == 1
+    assert change_feed.parse_payload('not json') is None
+    assert change_feed.parse_payload(json.dumps([1, 2])) is None
+    assert change_feed.parse_payload(json.dumps({'op': 'INSERT'})) is None
+    assert change_feed.parse_payload(None) is None
+
+
+def test_coalesce_changes_groups_by_type_in_arrival_order():
+    payloads = [
+        {'table': 'vacations', 'op': 'UPDATE', 'id': 5, 'version': 10},
+        {'table': 'employees', 'op': 'INSERT', 'id': 1, 'version': 11},
+        {'table': 'vacations', 'op': 'UPDATE', 'id': 6, 'version': 13},
+        {'table': 'vacations', 'op': 'UPDATE', 'id': 5, 'version': 12},
+        {'table': 'vacations', 'op': 'DELETE', 'id': 7},
+    ]
+    changes = change_feed.coalesce_changes(payloads)
+    assert [change_type for change_type, _ in changes] == ['vacation_updated', 'employee_created', 'vacation_deleted']
+    updated = changes[0][1]
+    assert updated['ids'] == [5, 6]
+    assert updated['version'] == 13
+    assert updated['source'] == 'db_listen'
+    assert changes[2][1]['version'] is None
+
+
+def test_is_connection_limit_error_by_code_or_message():
+    class PgError(Exception):
+        pgcode = '53300'
+
+    assert change_feed.is_connection_limit_error(PgError('x'))
+    assert change_feed.is_connection_limit_error(psycopg2.OperationalError('FATAL: too many connections for role'))
+    assert change_feed.is_connection_limit_error(Exception('remaining connection slots are reserved for superuser'))
+    assert not change_feed.is_connection_limit_error(psycopg2.OperationalError('timeout expired'))
+
+
+def test_listener_uses_direct_host_instead_of_pooler():
+    params = {'host': 'ep-x-pooler.eu.aws.neon.tech', 'dbname': 'db'}
+    assert change_feed._listener_connect_params(params)['host'] == 'ep-x.eu.aws.neon.tech'
+    assert params['host'] == 'ep-x-pooler.eu.aws.neon.tech'
+
+
+def test_connection_limit_stops_retrying(monkeypatch):
+    listener = change_feed.ChangeFeedListener(callback=None, connection_params={'host': 'db'})
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        raise psycopg2.OperationalError('FATAL: too many connections')
+
+    monkeypatch.setattr(listener, '_connect', connect)
+    listener._run()
+    assert attempts == [1]
+    assert listener.connection_limited and not listener.is_running
+    assert listener._connected_event.is_set()
+    assert listener.get_status()['connection_limited']
+
+
+def test_connection_limit_after_reconnect_requests_one_resync(monkeypatch):
+    delivered = []
+    listener = change_feed.ChangeFeedListener(callback=lambda *args: delivered.append(args),
+                                              connection_params={'host': 'db'})
+    attempts = []
+
+    class Conn:
+        def close(self):
+            pass
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            return Conn()
+        raise psycopg2.OperationalError('FATAL: too many connections')
+
+    def listen_loop():
+        raise psycopg2.OperationalError('server closed the connection unexpectedly')
+
+    monkeypatch.setattr(listener, '_connect', connect)
+    monkeypatch.setattr(listener, '_listen_loop', listen_loop)
+    monkeypatch.setattr(change_feed, 'clear_query_cache', lambda: None)
+    monkeypatch.setattr(listener._stop_event, 'wait', lambda delay: False)
+    listener._run()
+    assert len(attempts) == 2
+    assert delivered == [('change_feed_resync', {'source': 'db_listen', 'reason': 'connection_limit'})]
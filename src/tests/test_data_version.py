@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tenant məlumat versiyası testləri: 008 miqrasiyasının trigger-ləri və dəyişməz versiyada qısa yol"""
+
+import importlib
+from datetime import datetime
+
+import pytest
+
+from database.employee_store import EmployeeStore
+
+db_module = importlib.import_module('database.database')
+migrations = importlib.import_module('database.migrations')
+
+
+class RecordingCursor:
+    def __init__(self, existing_triggers=(), missing_tables=(), rows=()):
+        self.existing_triggers = set(existing_triggers)
+        self.missing_tables = set(missing_tables)
+        self.rows = list(rows)
+        self.executed = []
+        self._last = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append(' '.join(sql.split()))
+        self._last = (sql, params)
+
+    def fetchall(self):
+        return [(name,) for name in self.existing_triggers]
+
+    def fetchone(self):
+        sql, params = self._last
+        if 'to_regclass' in sql:
+            return (params[0].split('.', 1)[1] not in self.missing_tables,)
+        return self.rows.pop(0)
+
+
+class Connection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _triggers(cur):
+    return [sql for sql in cur.executed if sql.startswith('CREATE TRIGGER')]
+
+
+def test_migration_creates_one_statement_trigger_per_event():
+    cur = RecordingCursor()
+    migrations._m008_tenant_data_version(cur)
+    triggers = _triggers(cur)
+    assert len(triggers) == len(migrations.DATA_VERSION_TABLES) * 4
+    assert all('FOR EACH STATEMENT' in sql for sql in triggers)
+    assert ('CREATE TRIGGER trg_employees_data_version_upd AFTER UPDATE ON employees '
+            'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT') in ' '.join(triggers)
+    assert ('CREATE TRIGGER trg_vacations_data_version_del AFTER DELETE ON vacations '
+            'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT') in ' '.join(triggers)
+
+
+def test_bump_function_ignores_statements_without_rows():
+    cur = RecordingCursor()
+    migrations._m008_tenant_data_version(cur)
+    function_sql = next(sql for sql in cur.executed if 'FUNCTION bump_tenant_data_version' in sql)
+    assert 'IF NOT EXISTS (SELECT 1 FROM new_rows) THEN RETURN NULL;' in function_sql
+    assert 'IF NOT EXISTS (SELECT 1 FROM old_rows) THEN RETURN NULL;' in function_sql
+
+
+def test_migration_skips_existing_triggers_and_missing_tables():
+    cur = RecordingCursor(existing_triggers={'trg_employees_data_version_ins'}, missing_tables={'positions'})
+    migrations._m008_tenant_data_version(cur)
+    names = [sql.split()[2] for sql in _triggers(cur)]
+    assert 'trg_employees_data_version_ins' not in names
+    assert not any(name.startswith('trg_positions_') for name in names)
+    assert len(names) == (len(migrations.DATA_VERSION_TABLES) - 1) * 4 - 1
+
+
+def test_tenant_data_version_requires_migration(monkeypatch):
+    monkeypatch.setattr(db_module, 'is_migration_applied', lambda version: False)
+    monkeypatch.setattr(db_module, 'db_connect', lambda: pytest.fail('bağlantı açılmamalıdır'))
+    assert db_module.get_tenant_data_version() is None
+    assert db_module._data_version_sql() == 'NULL::bigint'
+
+    monkeypatch.setattr(db_module, 'is_migration_applied', lambda version: version == db_module.DATA_VERSION_MIGRATION)
+    monkeypatch.setattr(db_module, 'db_connect', lambda: Connection(RecordingCursor(rows=[(17,)])))
+    assert db_module.get_tenant_data_version() == 17
+
+
+def test_unchanged_version_skips_delta_queries(monkeypatch):
+    store = EmployeeStore()
+    admin = {'id': 1, 'role': 'admin'}
+    monkeypatch.setattr(db_module, 'ensure_delta_sync_schema', lambda: True)
+    monkeypatch.setattr(db_module, 'is_migration_applied', lambda version: True)
+    monkeypatch.setattr(db_module, '_delta_sync_supported', True)
+    monkeypatch.setattr(db_module, '_delta_sync_state', None)
+    db_module._seed_delta_sync_state(admin, store, datetime(2025, 5, 1), 'sig', data_version=17)
+
+    cur = RecordingCursor(rows=[(17,)])
+    monkeypatch.setattr(db_module, 'db_connect', lambda: Connection(cur))
+    assert db_module._perform_incremental_load(admin) is store
+    assert cur.executed == ['SELECT (SELECT version FROM tenant_data_version WHERE id = 1)']
+    assert db_module.get_loaded_data_version() == 17
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.database.db_connect testləri: pool bağlantı verə bilməyəndə yenidən yaradılmır"""
+
+import importlib
+
+import pytest
+
+db_module = importlib.import_module('database.database')
+connection_module = importlib.import_module('database.connection')
+
+
+class FakePool:
+    def __init__(self):
+        self.handed_out = 0
+
+    def getconn(self):
+        self.handed_out += 1
+        return 'conn'
+
+
+@pytest.fixture
+def pool_calls(monkeypatch):
+    """initialize_connection_pool çağırışlarını qeyd edir (real pool/baza açılmır)"""
+    calls = []
+    pool = FakePool()
+
+    def initialize(params):
+        calls.append(dict(params))
+        return pool
+
+    monkeypatch.setattr(db_module, 'initialize_connection_pool', initialize)
+    monkeypatch.setattr(db_module, 'get_connection_pool', lambda: pool if calls else None)
+    monkeypatch.setattr(db_module, 'ensure_schema_migrated', lambda pool: True)
+    monkeypatch.setattr(db_module, '_connection_string', None)
+    monkeypatch.setattr(db_module, '_reset_tenant_sync_state', lambda: None)
+    monkeypatch.setattr(connection_module, '_active_connection_params', {})
+    return calls, pool
+
+
+def test_exhausted_shared_pool_returns_none_without_reinitializing(monkeypatch, pool_calls):
+    calls, _ = pool_calls
+    monkeypatch.setattr(connection_module, '_active_connection_params', {'host': 'db', 'dbname': 'x'})
+    monkeypatch.setattr(connection_module, 'db_connect', lambda: None)
+    monkeypatch.setattr(db_module, '_connection_string', 'postgresql://u:p@db/x')
+    assert db_module.db_connect() is None
+    assert calls == []
+
+
+def test_dsn_pool_is_created_when_params_are_set(pool_calls):
+    calls, pool = pool_calls
+    db_module.set_connection_params('host=db dbname=x')
+    assert calls == [{'dsn': 'host=db dbname=x'}]
+    assert db_module.db_connect() == 'conn'
+    assert db_module.db_connect() == 'conn'
+    assert len(calls) == 1 and pool.handed_out == 2
+
+
+def test_no_params_returns_none(pool_calls):
+    calls, _ = pool_calls
+    assert db_module.db_connect() is None
+    assert calls == []
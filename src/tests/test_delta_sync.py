@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.database delta sinxronizasiya testləri: watermark, tombstone-lar və birləşmə"""
+
+import importlib
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.employee_store import EmployeeStore
+
+db_module = importlib.import_module('database.database')
+
+WATERMARK = datetime(2025, 5, 1, 12, 0, 0)
+NEW_WATERMARK = WATERMARK + timedelta(minutes=1)
+ADMIN = {'id': 1, 'role': 'admin '}
+
+
+class ScriptedCursor:
+    """execute-ları qeyd edir, fetchone/fetchall cavablarını ssenaridən sıra ilə qaytarır"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        if self.conn.fail_on and self.conn.fail_on in sql:
+            raise RuntimeError('sorğu uğursuz')
+
+    def fetchone(self):
+        return self.conn.replies.pop(0)
+
+    def fetchall(self):
+        return self.conn.replies.pop(0)
+
+
+class ScriptedConnection:
+    def __init__(self, replies, fail_on=None):
+        self.replies = list(replies)
+        self.fail_on = fail_on
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return ScriptedCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def employee_row(emp_id, name, hidden=False):
+    return (emp_id, name, 30, True, 1, '', '', '', '', '', None, '', None, 'İT', None, None, '', 'user', '', None, None, None, hidden)
+
+
+def vacation_row(vac_id, emp_id, start, archived=False):
+    return (vac_id, emp_id, start, start + timedelta(days=4), '', False, None, 'approved', archived)
+
+
+@pytest.fixture
+def base_store():
+    return EmployeeStore.from_name_dict({
+        'Əli': {'db_id': 1, 'department': 'İT', 'goturulen_icazeler': [
+            {'db_id': 10, 'baslama': '2025-03-01', 'bitme': '2025-03-05', 'status': 'approved'},
+        ]},
+        'Aygün': {'db_id': 2, 'department': 'İT', 'goturulen_icazeler': [
+            {'db_id': 11, 'baslama': '2025-04-01', 'bitme': '2025-04-05', 'status': 'approved'},
+        ]},
+    })
+
+
+@pytest.fixture
+def delta(monkeypatch, base_store):
+    monkeypatch.setattr(db_module, 'ensure_delta_sync_schema', lambda: True)
+    monkeypatch.setattr(db_module, 'is_migration_applied', lambda version: False)
+    monkeypatch.setattr(db_module, 'invalidate_query_cache', lambda *tags: None)
+    monkeypatch.setattr(db_module, '_delta_sync_supported', True)
+    monkeypatch.setattr(db_module, '_delta_sync_state', None)
+    db_module._seed_delta_sync_state(ADMIN, base_store, WATERMARK, 'sig')
+
+    def run(replies, fail_on=None):
+        conn = ScriptedConnection(replies, fail_on)
+        monkeypatch.setattr(db_module, 'db_connect', lambda: conn)
+        return db_module._perform_incremental_load(ADMIN), conn
+    return run
+
+
+def test_no_changes_keeps_store_and_advances_watermark(delta, base_store):
+    store, conn = delta([(NEW_WATERMARK, False, False, False, 'sig', None)])
+    assert store is base_store
+    assert len(conn.executed) == 1
+    assert conn.executed[0][1] == {'since': WATERMARK - timedelta(seconds=db_module.DELTA_SYNC_OVERLAP_SECONDS)}
+    assert db_module._delta_sync_state['watermark'] == NEW_WATERMARK
+
+
+def test_tombstones_and_changed_rows_merge_into_a_copy(delta, base_store):
+    store, conn = delta([
+        (NEW_WATERMARK, True, True, True, 'sig', None),
+        [(1, 1), (2, 1)],                                      # active_sessions
+        [('employees', 2), ('vacations', 99)],                  # sync_deleted_rows
+        [employee_row(1, 'Əli Həsənov'), employee_row(3, 'Rəşad')],
+        [vacation_row(30, 3, date(2025, 6, 1))[:-1]],           # yeni görünən işçinin məzuniyyətləri
+        [vacation_row(10, 1, date(2025, 3, 1), archived=True),
+         vacation_row(12, 1, date(2025, 8, 1))],
+    ])
+    assert store is not base_store
+    assert sorted(store) == [1, 3]
+    assert store[1]['name'] == 'Əli Həsənov'
+    assert store[1]['active_session_count'] == 1 and store[3]['active_session_count'] == 0
+    assert [v['db_id'] for v in store.vacations_for(1)] == [12]
+    assert [v['db_id'] for v in store.vacations_for(3)] == [30]
+    # Köhnə anbar dəyişmir (UI onu oxumağa davam edə bilər)
+    assert sorted(base_store) == [1, 2] and base_store[1]['name'] == 'Əli'
+    assert db_module._delta_sync_state['store'] is store
+    assert conn.commits == 1
+
+
+def test_hidden_employee_is_removed(delta):
+    store, _ = delta([
+        (NEW_WATERMARK, True, False, False, 'sig', None),
+        [],
+        [employee_row(2, 'Aygün', hidden=True)],
+    ])
+    assert sorted(store) == [1]
+
+
+def test_failure_resets_state_for_full_load(delta, base_store):
+    store, conn = delta([(NEW_WATERMARK, False, False, True, 'sig', None)], fail_on='SELECT table_name')
+    assert store is None
+    assert conn.rollbacks == 1
+    assert db_module._delta_sync_state is None
+
+
+def test_other_user_needs_full_load(delta, monkeypatch):
+    conn_used = []
+    monkeypatch.setattr(db_module, 'db_connect', lambda: conn_used.append(1))
+    assert db_module._perform_incremental_load({'id': 2, 'role': 'user'}) is None
+    assert not conn_used
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.employee_store.EmployeeStore testləri"""
+
+from datetime import date
+
+import pytest
+
+from database.employee_store import (NO_DEPARTMENT, STATUS_ACTIVE, STATUS_INACTIVE, STATUS_ONLINE,
+                                     EmployeeStore)
+
+
+@pytest.fixture
+def store():
+    return EmployeeStore.from_name_dict({
+        'Əli Məmmədov': {
+            'db_id': 1, 'department': 'Maliyyə', 'is_active': True,
+            'goturulen_icazeler': [
+                {'db_id': 11, 'baslama': '2025-07-01', 'bitme': '2025-07-10', 'status': 'approved'},
+                {'db_id': 10, 'baslama': '2025-03-01', 'bitme': '2025-03-05', 'status': 'approved'},
+            ],
+        },
+        'Aygün Həsənova': {'db_id': 2, 'department': 'İT', 'active_session_count': 1},
+        'Rəşad Quliyev': {'db_id': 3, 'is_active': False},
+    })
+
+
+def test_indexes_by_name_department_and_status(store):
+    assert len(store) == 3
+    assert store[1]['name'] == 'Əli Məmmədov'
+    assert store.get_by_name('Əli Məmmədov')['db_id'] == 1
+    assert store.id_of('Aygün Həsənova') == 2
+    assert store.name_of(3) == 'Rəşad Quliyev'
+    assert store.departments() == sorted(['Maliyyə', 'İT', NO_DEPARTMENT])
+    assert store.ids_in_department(None) == {3}
+    assert store.ids_with_status(STATUS_ONLINE) == {2}
+    assert store.ids_with_status(STATUS_INACTIVE) == {3}
+    assert store.ids_with_status(STATUS_ACTIVE) == {1}
+
+
+def test_vacations_sorted_and_parsed(store):
+    vacations = store.vacations_for(1)
+    assert [vacation['db_id'] for vacation in vacations] == [10, 11]
+    assert vacations[0]['baslama'] == date(2025, 3, 1)
+    assert store.vacation_owner(11) == 1
+    assert [v['db_id'] for v in store.vacations_starting_between(1, date(2025, 6, 1), date(2025, 12, 31))] == [11]
+
+
+def test_upsert_and_remove_vacation(store):
+    store.upsert_vacation(1, {'db_id': 12, 'baslama': date(2025, 5, 1), 'bitme': date(2025, 5, 2), 'status': 'pending'})
+    assert [v['db_id'] for v in store.vacations_for(1)] == [10, 12, 11]
+    # Eyni ID ilə yenidən yazmaq köhnəsini əvəz edir və sıranı yeniləyir
+    store.upsert_vacation(1, {'db_id': 12, 'baslama': date(2025, 12, 1), 'bitme': date(2025, 12, 2)})
+    assert [v['db_id'] for v in store.vacations_for(1)] == [10, 11, 12]
+    removed = store.remove_vacation(10)
+    assert removed['db_id'] == 10
+    assert store.vacation_owner(10) is None
+    assert store.remove_vacation(10) is None
+    assert store.upsert_vacation(99, {'db_id': 50}) is False
+
+
+def test_update_fields_reindexes_status_and_department(store):
+    store.update_employee_fields(1, active_session_count=2)
+    assert 1 in store.ids_with_status(STATUS_ONLINE)
+    store.upsert_employee(1, {'name': 'Əli Məmmədov', 'department': 'İT'})
+    assert store.ids_in_department('İT') == {1, 2}
+    assert 'Maliyyə' not in store.departments()
+    # upsert_employee məzuniyyətləri saxlayır
+    assert [v['db_id'] for v in store.vacations_for(1)] == [10, 11]
+
+
+def test_remove_employee_drops_vacation_owners(store):
+    store.remove_employee(1)
+    assert 1 not in store and not store.has_name('Əli Məmmədov')
+    assert store.vacation_owner(11) is None
+    assert store.get_vacation(11) is None
+
+
+def test_clone_is_copy_on_write(store):
+    original_record = store.get_by_id(1)
+    copy = store.clone()
+    assert copy.get_by_id(1) is original_record  # dəyişiklikdən əvvəl paylaşılır
+
+    copy.upsert_vacation(1, {'db_id': 20, 'baslama': date(2025, 1, 1), 'bitme': date(2025, 1, 2)})
+    copy.update_employee_fields(2, department='Maliyyə')
+    copy.remove_employee(3)
+
+    assert [v['db_id'] for v in store.vacations_for(1)] == [10, 11]
+    assert [v['db_id'] for v in copy.vacations_for(1)] == [20, 10, 11]
+    assert store.get_by_id(2)['department'] == 'İT'
+    assert store.ids_in_department('İT') == {2}
+    assert 3 in store and 3 not in copy
+    assert store.vacation_owner(20) is None
+
+
+def test_iter_vacations_yields_owner_records(store):
+    pairs = [(record['db_id'], vacation['db_id']) for record, vacation in store.iter_vacations()]
+    assert sorted(pairs) == [(1, 10), (1, 11)]
+
+
+def test_same_name_employees_do_not_shadow_each_other(store):
+    store.upsert_employee(4, {'name': 'Əli Məmmədov', 'department': 'İT'})
+    assert len(store) == 4
+    assert sorted(store) == [1, 2, 3, 4]
+    assert store[4]['department'] == 'İT'
+    assert store.ids_named('Əli Məmmədov') == {1, 4}
+    assert store.get_by_name('Əli Məmmədov')['db_id'] == 1
+    assert store.by_name()['Əli Məmmədov']['db_id'] == 1
+    store.remove_employee(1)
+    assert store.get_by_name('Əli Məmmədov')['db_id'] == 4
+    assert store.get_by_name('Yoxdur', {}) == {}
+
+
+def test_from_name_dict_accepts_id_keyed_dict():
+    store = EmployeeStore.from_name_dict({7: {'db_id': 7, 'name': 'Leyla'}, 8: {'db_id': 8, 'name': 'Leyla'}})
+    assert len(store) == 2 and store.ids_named('Leyla') == {7, 8}
+    assert EmployeeStore.from_name_dict(store) is store
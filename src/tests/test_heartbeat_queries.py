@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.heartbeat_queries testləri: sxemə görə SQL seçimi və nəticənin oxunması"""
+
+import importlib
+
+import psycopg2
+import pytest
+
+heartbeat = importlib.import_module('database.heartbeat_queries')
+migrations = importlib.import_module('database.migrations')
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        if isinstance(self.conn.row, Exception):
+            raise self.conn.row
+        self.conn.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.conn.row
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+def _applied(monkeypatch, *versions):
+    monkeypatch.setattr(heartbeat, 'is_migration_applied', lambda version: version in versions)
+
+
+def test_migration_versions_come_from_migrations():
+    names = {version: name for version, name, _ in migrations.MIGRATIONS}
+    assert heartbeat.DELTA_SYNC_MIGRATION is migrations.DELTA_SYNC_MIGRATION
+    assert heartbeat.DATA_VERSION_MIGRATION is migrations.DATA_VERSION_MIGRATION
+    assert names[migrations.DELTA_SYNC_MIGRATION] == 'delta_sync'
+    assert names[migrations.DATA_VERSION_MIGRATION] == 'tenant_data_version'
+
+
+@pytest.mark.parametrize('applied, expected', [
+    ((5, 8), 'tenant_data_version WHERE id = 1'),
+    ((5,), 'MAX(updated_at) FROM employees'),
+    ((), 'NULL AS data_version'),
+])
+def test_heartbeat_sql_follows_schema(monkeypatch, applied, expected):
+    _applied(monkeypatch, *applied)
+    assert expected in heartbeat._heartbeat_sql()
+
+
+def test_get_heartbeat_parses_row(monkeypatch):
+    _applied(monkeypatch, 5, 8)
+    command = {'id': 3, 'type': 'logout', 'value': None}
+    conn = FakeConnection((command, None, 42))
+    monkeypatch.setattr(heartbeat, 'db_connect', lambda: conn)
+    assert heartbeat.get_heartbeat(7) == {'command': command, 'unread_count': 0, 'data_version': 42}
+    assert conn.executed[0][1] == {'user_id': 7}
+    assert conn.closed
+
+
+def test_get_heartbeat_returns_none_on_error(monkeypatch):
+    _applied(monkeypatch)
+    conn = FakeConnection(psycopg2.OperationalError('bağlantı kəsildi'))
+    monkeypatch.setattr(heartbeat, 'db_connect', lambda: conn)
+    assert heartbeat.get_heartbeat(7) is None
+    assert conn.closed
+
+
+def test_get_heartbeat_without_connection(monkeypatch):
+    monkeypatch.setattr(heartbeat, 'db_connect', lambda: None)
+    assert heartbeat.get_heartbeat(7) is None
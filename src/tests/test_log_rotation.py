@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.log_rotation testləri: hissə adları, sıxılmanın təxirə salınması və qovluq limiti"""
+
+import gzip
+import os
+import time
+
+from utils.log_rotation import LogRotator, RotatingLogFile, next_part_path
+from utils.log_sync import MANIFEST_NAME, LogSyncManifest
+
+
+def _write(path, size, age=3600):
+    path.write_bytes(b'x' * size)
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return path
+
+
+def _mark_synced(directory, *paths):
+    manifest = LogSyncManifest(str(directory / MANIFEST_NAME.format(user_id=1)))
+    for path in paths:
+        manifest.set(path.name, {'offset': path.stat().st_size})
+    manifest.save()
+
+
+def test_next_part_path_skips_existing_and_compressed(tmp_path):
+    base = tmp_path / 'debug_console_1.log'
+    assert next_part_path(str(base)) == str(tmp_path / 'debug_console_1_part2.log')
+    (tmp_path / 'debug_console_1_part2.log.gz').write_bytes(b'')
+    assert next_part_path(str(base)) == str(tmp_path / 'debug_console_1_part3.log')
+    assert next_part_path(str(tmp_path / 'debug_console_1_part3.log')) == str(tmp_path / 'debug_console_1_part4.log')
+
+
+def test_compress_defers_unsynced_part(tmp_path):
+    rotator = LogRotator()
+    part = _write(tmp_path / 'debug_console_1.log', 100)
+    rotator._compress(str(part))
+    assert part.exists() and str(part) in rotator._deferred
+
+    _mark_synced(tmp_path, part)
+    rotator._deferred.clear()
+    rotator._compress(str(part))
+    assert not part.exists()
+    with gzip.open(str(part) + '.gz', 'rb') as compressed:
+        assert compressed.read() == b'x' * 100
+    assert rotator.compressed == 1
+
+
+def test_dir_limit_deletes_oldest_synced_files_first(tmp_path):
+    rotator = LogRotator(max_dir_bytes=250)
+    oldest = _write(tmp_path / 'debug_console_1.log.gz', 100, age=7200)
+    middle = _write(tmp_path / 'metrics_1.prom', 100, age=5000)
+    newest = _write(tmp_path / 'debug_console_2.log.gz', 100, age=3600)
+    rotator._enforce_dir_limit(str(tmp_path))
+    assert not oldest.exists()
+    assert middle.exists() and newest.exists()
+    assert rotator.deleted == 1 and rotator.freed_bytes == 100
+
+
+def test_dir_limit_keeps_active_deferred_unsynced_and_fresh_files(tmp_path):
+    rotator = LogRotator(max_dir_bytes=0)
+    active = _write(tmp_path / 'debug_console_1.log', 100)
+    deferred = _write(tmp_path / 'debug_console_2.log', 100)
+    unsynced = _write(tmp_path / 'debug_console_3.log', 100)
+    fresh = _write(tmp_path / 'metrics_1.prom', 100, age=0)
+    synced = _write(tmp_path / 'debug_console_4.log', 100)
+    _mark_synced(tmp_path, deferred, synced)
+    rotator.register(str(active))
+    rotator._deferred.add(str(deferred))
+
+    rotator._enforce_dir_limit(str(tmp_path))
+    assert active.exists() and deferred.exists() and unsynced.exists() and fresh.exists()
+    assert not synced.exists()
+    assert (tmp_path / MANIFEST_NAME.format(user_id=1)).exists()
+
+
+def test_rotating_log_file_switches_part_by_bytes(tmp_path, monkeypatch):
+    rotator = LogRotator()
+    monkeypatch.setattr('utils.log_rotation.get_log_rotator', lambda: rotator)
+    # Arxa fon thread-i başladılmır - növbəyə qoyulanlar yoxlanılır
+    monkeypatch.setattr(rotator, '_ensure_thread', lambda: None)
+
+    log_file = RotatingLogFile(str(tmp_path / 'debug_console_1.log'), max_bytes=10)
+    log_file.write('ə' * 4)         # 8 bayt
+    log_file.write('ab')            # limitə çatır, amma aşmır
+    log_file.write('c')
+    log_file.close()
+
+    queued = [rotator._queue.get_nowait() for _ in range(rotator._queue.qsize())]
+    assert queued == [('cleanup', str(tmp_path)), ('compress', str(tmp_path / 'debug_console_1.log'))]
+    assert log_file.name == 'debug_console_1_part2.log'
+    assert (tmp_path / 'debug_console_1_part2.log').read_text(encoding='utf-8') == 'c'
+    assert not rotator._active
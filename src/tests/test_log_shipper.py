@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.log_shipper testləri: prioritetlər, növbə limiti, partiyalar və təkrar cəhd"""
+
+from utils import log_shipper
+from utils.log_shipper import (PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, LogShipper,
+                               classify_priority)
+
+
+def test_classify_priority_prefers_error_markers():
+    assert classify_priority('debug_console', '❌ bağlantı xətası') == PRIORITY_HIGH
+    assert classify_priority('debug_console', 'adi sətir') == PRIORITY_LOW
+    assert classify_priority('email_service', 'göndərildi') == PRIORITY_NORMAL
+    assert classify_priority('naməlum', 'sətir') == PRIORITY_NORMAL
+
+
+def test_full_queue_drops_oldest_lower_priority_line():
+    shipper = LogShipper(max_queue_size=2)
+    assert shipper.enqueue(1, 'debug_console', 'köhnə debug')
+    assert shipper.enqueue(1, 'email_service', 'email')
+    assert shipper.enqueue(1, 'debug_console', 'ERROR sındı')
+    assert [item[4] for item in shipper._take_batch()] == ['email', 'ERROR sındı']
+    assert shipper.dropped[PRIORITY_LOW] == 1
+
+
+def test_full_queue_rejects_line_when_nothing_lower_exists():
+    shipper = LogShipper(max_queue_size=1)
+    assert shipper.enqueue(1, 'email_service', 'ERROR birinci')
+    assert shipper.enqueue(1, 'debug_console', 'debug') is False
+    assert shipper.dropped[PRIORITY_LOW] == 1
+    assert shipper.get_stats()['queued'] == 1
+
+
+def test_pressure_rejects_low_priority_above_high_water():
+    shipper = LogShipper(max_queue_size=4)
+    shipper._pressure = True
+    for number in range(3):
+        shipper.enqueue(1, 'email_service', f'email {number}')
+    assert shipper.enqueue(1, 'debug_console', 'debug') is False
+    assert shipper.enqueue(1, 'email_service', 'email 3')
+
+
+def test_empty_content_is_ignored():
+    shipper = LogShipper()
+    assert shipper.enqueue(1, 'debug_console', '') is False
+    assert shipper.enqueued == 0
+
+
+def test_take_batch_keeps_arrival_order_and_caps_size(monkeypatch):
+    monkeypatch.setattr(log_shipper, 'MAX_BATCH_LINES', 3)
+    shipper = LogShipper()
+    for content in ('a', 'ERROR b', 'c', 'ERROR d', 'e'):
+        shipper.enqueue(1, 'debug_console', content)
+    assert [item[4] for item in shipper._take_batch()] == ['a', 'ERROR b', 'c']
+    assert shipper._size == 2
+    assert [item[4] for item in shipper._take_batch()] == ['ERROR d', 'e']
+
+
+def test_group_entries_joins_lines_per_file():
+    items = [
+        (PRIORITY_LOW, 1, 7, 'debug_console', 'a', 'debug_console_1.log'),
+        (PRIORITY_LOW, 2, 7, 'email_service', 'b', None),
+        (PRIORITY_HIGH, 3, 7, 'debug_console', 'c', 'debug_console_1.log'),
+        (PRIORITY_LOW, 4, 8, 'debug_console', 'd', 'debug_console_1.log'),
+    ]
+    assert LogShipper.group_entries(items) == [
+        (7, 'debug_console', 'a\nc', 'debug_console_1.log'),
+        (7, 'email_service', 'b', None),
+        (8, 'debug_console', 'd', 'debug_console_1.log'),
+    ]
+
+
+def test_worker_writes_one_grouped_batch_on_flush():
+    batches = []
+    shipper = LogShipper(writer=batches.append, flush_interval=60)
+    shipper.start()
+    try:
+        shipper.enqueue(1, 'debug_console', 'a', 'f.log')
+        shipper.enqueue(1, 'debug_console', 'b', 'f.log')
+        assert shipper.flush(timeout=2.0)
+    finally:
+        shipper.stop()
+    assert batches == [[(1, 'debug_console', 'a\nb', 'f.log')]]
+    assert shipper.written == 2 and shipper.batches == 1
+
+
+def test_failed_batch_is_requeued_and_retried(monkeypatch):
+    monkeypatch.setattr(log_shipper, 'RETRY_MIN_DELAY', 0.01)
+    attempts = []
+
+    def writer(entries):
+        attempts.append(entries)
+        if len(attempts) == 1:
+            raise RuntimeError('baza əlçatmazdır')
+
+    # Uğursuzluqdan sonra növbəti cəhd flush_interval-da olur
+    shipper = LogShipper(writer=writer, flush_interval=0.05)
+    shipper.start()
+    try:
+        shipper.enqueue(1, 'debug_console', 'a', 'f.log')
+        assert shipper.flush(timeout=2.0)
+    finally:
+        shipper.stop()
+    assert len(attempts) == 2 and attempts[0] == attempts[1]
+    assert shipper.failed_batches == 1 and shipper.written == 1
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.log_storage testləri: seqmentlərin açılıb yığılması və aylıq partisiyalar"""
+
+import importlib
+import zlib
+from datetime import date, datetime
+
+log_storage = importlib.import_module('database.log_storage')
+
+
+def z(text):
+    return memoryview(zlib.compress(text.encode('utf-8')))
+
+
+class FakeCursor:
+    """SQL-in başlanğıcına görə hazır cavab qaytarır; icra olunanları qeyd edir"""
+
+    def __init__(self, replies=None, existing=()):
+        self.replies = replies or {}
+        self.existing = set(existing)
+        self.executed = []
+        self._last = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        self.executed.append(sql)
+        self._last = (sql, params)
+        if sql.startswith('DELETE FROM user_application_logs'):
+            self.rowcount = 4
+
+    def fetchone(self):
+        sql, params = self._last
+        return (params[0].split('.', 1)[1] in self.existing,)
+
+    def fetchall(self):
+        sql, _ = self._last
+        for prefix, rows in self.replies.items():
+            if sql.startswith(prefix):
+                return rows
+        return []
+
+
+def test_decompress_bytes_handles_memoryview_and_none():
+    assert log_storage.decompress_bytes(z('Salam ə')) == 'Salam ə'
+    assert log_storage.decompress_bytes(None) == ''
+
+
+def test_assemble_orders_synced_then_inline_then_live():
+    cur = FakeCursor(replies={
+        'SELECT log_id, chunk_offset, content FROM user_log_chunks': [
+            (1, 10, 'ikinci hissə\n'),
+            (1, 0, 'birinci hissə\n'),
+        ],
+        'SELECT log_id, chunk_offset, created_at, id, content_z': [
+            (1, None, datetime(2025, 5, 2), 8, z('canlı 2\n')),
+            (1, None, datetime(2025, 5, 1), 9, z('canlı 1\n')),
+            (1, 20, datetime(2025, 5, 1), 7, z('sıxılmış hissə\n')),
+            (2, None, datetime(2025, 5, 1), 10, z('yalnız canlı')),
+        ],
+    })
+    contents = log_storage.assemble_log_contents(cur, {1: 'inline', 2: '', 3: 'tək'})
+    assert contents[1] == 'birinci hissə\nikinci hissə\nsıxılmış hissə\ninline\ncanlı 1\ncanlı 2\n'
+    assert contents[2] == 'yalnız canlı'
+    assert contents[3] == 'tək'
+
+
+def test_assemble_skips_missing_tables_and_empty_input():
+    cur = FakeCursor()
+    assert log_storage.assemble_log_contents(cur, {}) == {}
+    assert log_storage.assemble_log_contents(cur, {1: 'x'}, chunks_table=False, segments_table=False) == {1: 'x'}
+    assert cur.executed == []
+
+
+def test_month_arithmetic_and_partition_names():
+    assert log_storage._add_months(date(2025, 11, 1), 2) == date(2026, 1, 1)
+    assert log_storage._add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert log_storage.partition_name(date(2025, 3, 1)) == 'user_log_segments_p202503'
+
+
+def test_create_log_partitions_skips_existing():
+    cur = FakeCursor(existing={'user_log_segments_p202512'})
+    created = log_storage.create_log_partitions(cur, date(2025, 11, 17), 3)
+    assert created == ['user_log_segments_p202511', 'user_log_segments_p202601']
+    assert ("CREATE TABLE user_log_segments_p202601 PARTITION OF user_log_segments "
+            "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')") in cur.executed
+
+
+def test_drop_expired_partitions_respects_retention():
+    cur = FakeCursor(replies={'SELECT c.relname': [
+        ('user_log_segments_p202503',),
+        ('user_log_segments_p202501',),
+        ('user_log_segments_p202502',),
+        ('user_log_segments_default',),
+    ]})
+    dropped, removed = log_storage.drop_expired_log_partitions(cur, retention_months=3, today=date(2025, 5, 20))
+    assert dropped == ['user_log_segments_p202501']
+    assert removed == 4
+    assert 'DROP TABLE IF EXISTS user_log_segments_default' not in cur.executed
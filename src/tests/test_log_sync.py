@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.log_sync testləri: split_chunks və sync_log_files (server sorğuları yaddaşda saxtalanır)"""
+
+import os
+import time
+
+import pytest
+
+from database import error_queries
+from utils import log_sync
+from utils.log_sync import (STATE_INLINE, LogSyncManifest, MANIFEST_NAME, split_chunks,
+                            sync_log_files)
+
+USER_ID = 7
+
+
+class FakeLogServer:
+    """get_log_sync_state/upload_log_chunks-un yaddaşdakı əvəzi: {fayl adı: qeyd}"""
+
+    def __init__(self):
+        self.logs = {}
+        self.inline = set()
+        self.state_calls = 0
+        self.uploads = []
+
+    def get_log_sync_state(self, user_id, log_file_names):
+        self.state_calls += 1
+        state = {}
+        for name in log_file_names:
+            log = self.logs.get(name)
+            if log is not None:
+                synced = max((offset + size for offset, (size, _) in log['chunks'].items()), default=0)
+                state[name] = (log['id'], synced, name in self.inline)
+        return state
+
+    def upload_log_chunks(self, user_id, log_type, log_file_name, log_id, chunks, reset=False):
+        self.uploads.append((log_file_name, [(offset, size) for offset, size, _ in chunks], reset))
+        log = self.logs.get(log_file_name)
+        if log is None:
+            log = self.logs[log_file_name] = {'id': len(self.logs) + 1, 'chunks': {}}
+        assert log_id in (None, log['id'])
+        if reset:
+            log['chunks'].clear()
+        for offset, size, text in chunks:
+            log['chunks'].setdefault(offset, (size, text))
+        return log['id']
+
+    def content(self, name):
+        return ''.join(text for _, (_, text) in sorted(self.logs[name]['chunks'].items()))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeLogServer()
+    monkeypatch.setattr(error_queries, 'get_log_sync_state', fake.get_log_sync_state)
+    monkeypatch.setattr(error_queries, 'upload_log_chunks', fake.upload_log_chunks)
+    return fake
+
+
+def write_log(path, text, age=3600):
+    """Faylı yazır; age saniyə əvvəl dəyişdirilmiş kimi göstərilir (yarımçıq sətir yüklənsin)"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def append_log(path, text, age=3600):
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        f.write(text)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def manifest_entry(logs_dir, name):
+    return LogSyncManifest.load(os.path.join(logs_dir, MANIFEST_NAME.format(user_id=USER_ID))).get(name)
+
+
+# --- split_chunks ---
+
+def test_split_chunks_on_line_boundaries():
+    data = b''.join(f"sətir {i}\n".encode('utf-8') for i in range(100))
+    chunks = split_chunks(data, 1000, chunk_bytes=64)
+    assert all(text.endswith('\n') for _, _, text in chunks)
+    assert all(size <= 64 for _, size, _ in chunks)
+    # Offset-lər ardıcıldır və bütün baytları əhatə edir
+    offset = 1000
+    for chunk_offset, size, _ in chunks:
+        assert chunk_offset == offset
+        offset += size
+    assert offset == 1000 + len(data)
+    assert ''.join(text for _, _, text in chunks) == data.decode('utf-8')
+
+
+def test_split_chunks_cuts_long_lines_and_strips_nul():
+    data = b'x' * 150 + b'\x00\n'
+    chunks = split_chunks(data, 0, chunk_bytes=64)
+    assert [size for _, size, _ in chunks] == [64, 64, 24]
+    assert '\x00' not in ''.join(text for _, _, text in chunks)
+
+
+def test_split_chunks_empty():
+    assert split_chunks(b'', 10) == []
+
+
+# --- sync_log_files ---
+
+def test_initial_sync_and_unchanged_skip(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "birinci\nikinci\n")
+    result = sync_log_files(USER_ID, str(tmp_path))
+    assert result['files'] == 1 and result['bytes'] == path.stat().st_size
+    assert server.content('debug_console_1.log') == "birinci\nikinci\n"
+
+    calls = server.state_calls
+    result = sync_log_files(USER_ID, str(tmp_path))
+    assert result == {'files': 0, 'bytes': 0, 'skipped': 1}
+    assert server.state_calls == calls  # dəyişməyən fayl üçün server sorğusu yoxdur
+
+
+def test_appended_bytes_upload_from_previous_offset(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "əvvəl\n")
+    sync_log_files(USER_ID, str(tmp_path))
+    first_size = path.stat().st_size
+    append_log(path, "sonra\n")
+    sync_log_files(USER_ID, str(tmp_path))
+    name, offsets, reset = server.uploads[-1]
+    assert offsets[0][0] == first_size and not reset
+    assert server.content('debug_console_1.log') == "əvvəl\nsonra\n"
+    assert manifest_entry(str(tmp_path), name)['offset'] == path.stat().st_size
+
+
+def test_partial_last_line_waits_until_file_is_idle(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "tam sətir\nyarımçıq", age=0)
+    sync_log_files(USER_ID, str(tmp_path))
+    assert server.content('debug_console_1.log') == "tam sətir\n"
+    assert manifest_entry(str(tmp_path), 'debug_console_1.log')['offset'] < path.stat().st_size
+
+    write_log(path, "tam sətir\nyarımçıq", age=3600)
+    sync_log_files(USER_ID, str(tmp_path))
+    assert server.content('debug_console_1.log') == "tam sətir\nyarımçıq"
+
+
+def test_truncated_file_is_reuploaded_with_reset(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "köhnə məzmun uzun sətir\n" * 10)
+    sync_log_files(USER_ID, str(tmp_path))
+    write_log(path, "qısa\n")
+    sync_log_files(USER_ID, str(tmp_path))
+    _, offsets, reset = server.uploads[-1]
+    assert reset and offsets[0][0] == 0
+    assert server.content('debug_console_1.log') == "qısa\n"
+
+
+def test_replaced_file_with_same_size_is_reuploaded(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "aaaa\nbbbb\n")
+    sync_log_files(USER_ID, str(tmp_path))
+    write_log(path, "cccc\ndddd\n", age=1800)
+    sync_log_files(USER_ID, str(tmp_path))
+    assert server.uploads[-1][2] is True
+    assert server.content('debug_console_1.log') == "cccc\ndddd\n"
+
+
+def test_budget_carries_over_to_next_run(tmp_path, server):
+    first = tmp_path / 'debug_console_1.log'
+    second = tmp_path / 'realtime_debug_1.log'
+    write_log(first, ''.join(f"birinci fayl sətri {i}\n" for i in range(200)))
+    write_log(second, ''.join(f"ikinci fayl sətri {i}\n" for i in range(200)))
+    total = first.stat().st_size + second.stat().st_size
+    budget = 1500
+
+    runs = 0
+    uploaded = 0
+    while True:
+        result = sync_log_files(USER_ID, str(tmp_path), max_bytes=budget)
+        if not result['bytes']:
+            break
+        runs += 1
+        assert result['bytes'] <= budget
+        uploaded += result['bytes']
+        assert runs < 100
+    assert uploaded == total
+    assert runs >= total // budget
+    assert server.content('debug_console_1.log') == first.read_text(encoding='utf-8')
+    assert server.content('realtime_debug_1.log') == second.read_text(encoding='utf-8')
+
+
+def test_inline_files_are_not_chunked(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "log göndərici ilə yazılıb\n")
+    server.logs['debug_console_1.log'] = {'id': 1, 'chunks': {}}
+    server.inline.add('debug_console_1.log')
+    sync_log_files(USER_ID, str(tmp_path))
+    assert not server.uploads
+    assert manifest_entry(str(tmp_path), 'debug_console_1.log')['state'] == STATE_INLINE
+    assert log_sync.is_fully_synced(str(path))
+
+
+def test_is_fully_synced_follows_manifest_offset(tmp_path, server):
+    path = tmp_path / 'debug_console_1.log'
+    write_log(path, "tam sətir\nyarımçıq", age=0)
+    assert not log_sync.is_fully_synced(str(path))
+    sync_log_files(USER_ID, str(tmp_path))
+    assert not log_sync.is_fully_synced(str(path))
+    write_log(path, "tam sətir\nyarımçıq", age=3600)
+    sync_log_files(USER_ID, str(tmp_path))
+    assert log_sync.is_fully_synced(str(path))
+    # LOG_PATTERNS-ə uyğun gəlməyən fayllar sinxronizasiya olunmur
+    other = tmp_path / 'other.log'
+    write_log(other, "x\n")
+    assert log_sync.is_fully_synced(str(other))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.memory_diagnostics testləri: artım meyli, widget sayımı və hesabat"""
+
+import tkinter
+
+import pytest
+
+from utils import memory_diagnostics
+from utils.memory_diagnostics import (MemoryDiagnostics, count_python_tk_objects, count_tk_widgets,
+                                      _slope_per_hour)
+
+
+class FakeWidget:
+    def __init__(self, *children, images=()):
+        self.children = list(children)
+        self.images = images
+
+    def winfo_children(self):
+        return self.children
+
+    def image_names(self):
+        return self.images
+
+
+class Button(FakeWidget):
+    pass
+
+
+class Leaked(tkinter.Misc):
+    """Tk-sız tkinter obyekti - yalnız gc sayımı üçün"""
+
+    def __init__(self, master, name):
+        self.master = master
+        self._name = name
+        self.children = {}
+
+
+def test_slope_per_hour_is_linear_regression():
+    points = [(0, 10.0), (1800, 11.0), (3600, 12.0)]
+    assert _slope_per_hour(points) == pytest.approx(2.0)
+    assert _slope_per_hour(points[:2]) is None
+    assert _slope_per_hour([(5, 1.0)] * 3) is None
+
+
+def test_count_tk_widgets_walks_tree():
+    root = FakeWidget(Button(), FakeWidget(Button(), Button()), images=('img1', 'img2'))
+    counts, images = count_tk_widgets(root)
+    assert counts == {'FakeWidget': 2, 'Button': 3}
+    assert images == 2
+
+
+def test_destroyed_widget_still_referenced_is_counted():
+    parent = Leaked(None, 'parent')
+    alive = Leaked(parent, 'alive')
+    parent.children['alive'] = alive
+    dead = Leaked(parent, 'dead')
+    widgets, destroyed, _, _ = count_python_tk_objects()
+    assert widgets['Leaked'] >= 3
+    assert destroyed['Leaked'] >= 1
+    del dead
+
+
+def _entry(hour, rss_mb, widgets):
+    mb = 1024 * 1024
+    return {
+        'time': hour * 3600, 'rss': rss_mb * mb, 'traced': None, 'traced_peak': None,
+        'tk_widgets': widgets, 'py_widgets': widgets, 'destroyed_widgets': 0, 'tk_images': 0,
+        'py_images': 0, 'gc_objects': 1000, 'widget_classes': {'Button': (widgets, widgets, 0)},
+        'image_classes': {},
+    }
+
+
+def _diagnostics_with(entries):
+    diagnostics = MemoryDiagnostics()
+    for entry in entries:
+        diagnostics._store(entry, None)
+    return diagnostics
+
+
+def test_report_marks_flat_session_stable():
+    diagnostics = _diagnostics_with([_entry(hour, 100 + (hour % 2) * 0.5, 50) for hour in range(8)])
+    report = diagnostics.get_report()
+    assert report['stable'] is True
+    assert report['duration_hours'] == 7
+    assert report['widgets'][0][0] == 'Button' and report['widgets'][0][4] == 0
+    assert '✅ stabil' in diagnostics.format_report(report)
+
+
+def test_report_flags_growth_after_warmup():
+    # İlk nümunələr (yükləmə) artıma daxil edilmir
+    entries = [_entry(0, 50, 10), _entry(1, 90, 40)] + [_entry(hour, 90 + hour * 5, 40 + hour * 3) for hour in range(2, 8)]
+    report = _diagnostics_with(entries).get_report()
+    assert report['stable'] is False
+    assert report['rss_growth_mb_per_hour'] == pytest.approx(5.0)
+    assert report['widget_growth_per_hour'] == pytest.approx(3.0)
+    assert report['widgets'][0][4] == 40 + 7 * 3 - 10
+
+
+def test_empty_report_and_export(tmp_path):
+    diagnostics = MemoryDiagnostics()
+    assert diagnostics.get_report() is None
+    assert diagnostics.format_report() == 'Hələ nümunə yoxdur'
+    diagnostics._store(_entry(1, 100, 5), None)
+    path = diagnostics.export_report(str(tmp_path / 'memory.txt'))
+    content = open(path, encoding='utf-8').read()
+    assert 'vaxt;rss_mb;traced_mb;python_widgets' in content
+    assert ';100.0;;5' in content
+
+
+def test_sample_without_root_stores_entry(monkeypatch):
+    monkeypatch.setattr(memory_diagnostics, '_process_rss', lambda: 123)
+    diagnostics = MemoryDiagnostics()
+    done = []
+    assert diagnostics.sample_async(on_done=done.append)
+    assert done[0]['rss'] == 123 and done[0]['tk_widgets'] == 0
+    assert len(diagnostics.samples) == 1
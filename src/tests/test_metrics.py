@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.metrics testləri: LatencyHistogram, timed/instrument_package və ixrac"""
+
+import os
+import random
+import sys
+import types
+
+import pytest
+
+from utils import metrics
+from utils.metrics import LatencyHistogram, MetricsRegistry, instrument_package, timed
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 0
+    assert snapshot['p50'] is None and snapshot['p99'] is None
+
+
+def test_quantiles_within_relative_error():
+    random.seed(7)
+    values = [random.uniform(0.001, 2.0) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    quantiles = histogram.quantiles((0.5, 0.95, 0.99))
+    for q, estimate in quantiles.items():
+        exact = values[int(q * len(values)) - 1]
+        # Bucket-in yuxarı sərhədi qaytarılır: aşağı deyil, ~3%-dən çox yuxarı deyil
+        assert exact <= estimate * 1.0001
+        assert estimate <= exact * 1.04
+
+
+def test_snapshot_totals_and_bounds():
+    histogram = LatencyHistogram()
+    for value in (0.010, 0.020, 0.030, 5.0):
+        histogram.record(value)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 4
+    assert abs(snapshot['sum'] - 5.06) < 1e-9
+    assert snapshot['min'] == 0.010
+    assert snapshot['max'] == 5.0
+    # Quantil maksimumdan böyük ola bilməz
+    assert snapshot['p99'] == 5.0
+    assert snapshot['p50'] <= 0.020 * 1.04
+
+
+def test_zero_and_negative_durations():
+    histogram = LatencyHistogram()
+    histogram.record(0)
+    histogram.record(-0.5)
+    assert histogram.count == 2
+    assert histogram.quantiles((0.5,))[0.5] <= 0
+
+
+def test_timed_records_calls_and_errors():
+    registry = MetricsRegistry()
+
+    @timed('test.fails', registry=registry)
+    def fails():
+        raise ValueError('x')
+
+    with pytest.raises(ValueError):
+        fails()
+    row, = registry.get_operation_stats()
+    assert row['operation'] == 'test.fails'
+    assert row['count'] == 1 and row['errors'] == 1
+
+
+@pytest.fixture
+def fake_package(monkeypatch):
+    """İki alt modullu paket: queries (ölçülür) və helpers (isti yol, ölçülməməlidir)"""
+    package = types.ModuleType('fakepkg')
+    queries = types.ModuleType('fakepkg.queries')
+    helpers = types.ModuleType('fakepkg.helpers')
+    exec('def load():\n    return 1\n', queries.__dict__)
+    exec('def parse(value):\n    return value\n', helpers.__dict__)
+    queries.parse = helpers.parse   # import ilə götürülmüş istinad
+    package.load, package.parse = queries.load, helpers.parse
+    for module in (package, queries, helpers):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+    return package, queries, helpers
+
+
+def test_instrument_package_only_wraps_included_modules(fake_package):
+    package, queries, helpers = fake_package
+    original_parse = helpers.parse
+    assert instrument_package('fakepkg', 'fake', include=('queries',)) == 1
+    assert queries.load.metrics_operation == 'fake.queries.load'
+    assert package.load is queries.load
+    assert helpers.parse is original_parse
+    assert queries.parse is original_parse and package.parse is original_parse
+
+
+def test_export_on_exit_is_opt_in(monkeypatch):
+    registered = []
+    monkeypatch.setattr(metrics.atexit, 'register', registered.append)
+    monkeypatch.setattr(metrics, '_export_on_exit_registered', False)
+    metrics.enable_export_on_exit()
+    metrics.enable_export_on_exit()
+    assert registered == [metrics._export_on_exit]
+
+
+def test_default_export_applies_directory_limit(tmp_path, monkeypatch):
+    from utils import log_helper, log_rotation
+
+    limited = []
+
+    class Rotator:
+        def enforce_dir_limit(self, directory):
+            limited.append(directory)
+
+    monkeypatch.setattr(log_helper, 'get_debug_logs_dir', lambda: str(tmp_path))
+    monkeypatch.setattr(log_rotation, 'get_log_rotator', Rotator)
+    registry = MetricsRegistry()
+    registry.observe_operation('db.test', 0.01)
+    path = registry.export()
+    assert limited == [str(tmp_path)]
+    assert os.path.dirname(path) == str(tmp_path) and path.endswith('.prom')
+    assert 'operation="db.test"' in open(path, encoding='utf-8').read()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.migrations testləri: sıra, advisory lock, uğursuzluqda dayanma və pool keşi"""
+
+import importlib
+
+import psycopg2
+import pytest
+
+migrations = importlib.import_module('database.migrations')
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql.strip().split('\n')[0])
+        if sql.startswith("SELECT version FROM schema_migrations"):
+            if self.conn.applied is None:
+                raise psycopg2.errors.UndefinedTable('schema_migrations yoxdur')
+            self._result = [(version,) for version in sorted(self.conn.applied)]
+        elif sql.startswith("SELECT 1 FROM schema_migrations"):
+            self._result = [(1,)] if params[0] in self.conn.applied_elsewhere else []
+        elif sql.startswith("INSERT INTO schema_migrations"):
+            self.conn.inserted.append(params[0])
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+
+class FakeConnection:
+    def __init__(self, applied=None, applied_elsewhere=()):
+        self.applied = applied
+        self.applied_elsewhere = set(applied_elsewhere)
+        self.executed = []
+        self.inserted = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def install(monkeypatch):
+    """MIGRATIONS-u icra sırasını qeyd edən saxta 1-2-3 miqrasiyaları ilə əvəz edir; sıra siyahısını qaytarır"""
+    def install(fail_at=None):
+        order = []
+
+        def step(version):
+            def migrate(cur):
+                order.append(version)
+                if version == fail_at:
+                    raise psycopg2.ProgrammingError(f'{version} uğursuz')
+            return migrate
+
+        monkeypatch.setattr(migrations, 'MIGRATIONS', tuple(
+            (version, f'm{version}', step(version)) for version in (1, 2, 3)
+        ))
+        return order
+    return install
+
+
+def test_real_migrations_are_strictly_increasing():
+    versions = [version for version, _, _ in migrations.MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert migrations.LATEST_VERSION == versions[-1]
+
+
+def test_up_to_date_schema_only_reads_versions(install):
+    ran = install()
+    conn = FakeConnection(applied={1, 2, 3})
+    assert migrations.apply_migrations(conn) == {1, 2, 3}
+    assert conn.executed == ['SELECT version FROM schema_migrations']
+    assert ran == []
+
+
+def test_fresh_database_applies_all_in_order_under_lock(install):
+    ran = install()
+    conn = FakeConnection(applied=None)
+    assert migrations.apply_migrations(conn) == {1, 2, 3}
+    assert ran == [1, 2, 3]
+    assert conn.inserted == [1, 2, 3]
+    assert conn.executed.count('SELECT pg_advisory_xact_lock(%s)') == 3
+    assert any(sql.startswith('CREATE TABLE IF NOT EXISTS schema_migrations') for sql in conn.executed)
+
+
+def test_migration_applied_by_another_client_is_skipped(install):
+    ran = install()
+    conn = FakeConnection(applied={1}, applied_elsewhere={2})
+    assert migrations.apply_migrations(conn) == {1, 2, 3}
+    assert ran == [3]
+    assert conn.inserted == [3]
+
+
+def test_failed_migration_stops_later_ones(install):
+    ran = install(fail_at=2)
+    conn = FakeConnection(applied=set())
+    assert migrations.apply_migrations(conn) == {1}
+    assert ran == [1, 2]
+    assert conn.rollbacks >= 1
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.handed_out = 0
+
+    def getconn(self):
+        self.handed_out += 1
+        if isinstance(self.conn, Exception):
+            raise self.conn
+        return self.conn
+
+
+def test_ensure_schema_migrated_checks_each_pool_once(install, monkeypatch):
+    install()
+    pool = FakePool(FakeConnection(applied=None))
+    assert migrations.ensure_schema_migrated(pool)
+    assert migrations.ensure_schema_migrated(pool)
+    assert pool.handed_out == 1 and pool.conn.closed
+
+    monkeypatch.setattr(migrations, 'get_connection_pool', lambda: pool)
+    assert migrations.get_applied_migrations() == {1, 2, 3}
+    assert migrations.is_migration_applied(2)
+    assert migrations.get_schema_version() == 3
+
+
+def test_failed_check_is_retried_only_after_backoff(install, monkeypatch):
+    install()
+    clock = [1000.0]
+    monkeypatch.setattr(migrations.time, 'monotonic', lambda: clock[0])
+    pool = FakePool(psycopg2.OperationalError('baza əlçatan deyil'))
+    assert not migrations.ensure_schema_migrated(pool)
+    assert not migrations.ensure_schema_migrated(pool)
+    assert pool.handed_out == 1
+
+    clock[0] += migrations.MIGRATION_RETRY_SECONDS
+    pool.conn = FakeConnection(applied={1, 2, 3})
+    assert migrations.ensure_schema_migrated(pool)
+    assert pool.handed_out == 2
+
+
+def test_schema_version_stops_at_first_gap(install, monkeypatch):
+    install()
+    monkeypatch.setattr(migrations, 'get_applied_migrations', lambda: frozenset({1, 3}))
+    assert migrations.get_schema_version() == 1
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ui.month_calendar_canvas testləri: ay üzrə doluluq (sweep-line) və ay keşi"""
+
+from datetime import date
+
+from database.vacation_index import VacationIndex
+from ui.month_calendar_canvas import OccupancyCache, month_occupancy
+
+
+def vac(name, start, end):
+    return {'employee': name, 'start_date': start, 'end_date': end}
+
+
+def names(day_vacations):
+    return [vacation['employee'] for vacation in day_vacations]
+
+
+def test_occupancy_clips_to_month_and_keeps_start_order():
+    across = vac('A', date(2025, 1, 28), date(2025, 2, 3))
+    inside = vac('B', date(2025, 2, 2), date(2025, 2, 2))
+    tail = vac('C', date(2025, 2, 27), date(2025, 3, 5))
+    occupancy = month_occupancy([tail, inside, across], 2025, 2)
+    assert len(occupancy) == 29 and occupancy[0] == ()
+    assert names(occupancy[1]) == ['A']
+    assert names(occupancy[2]) == ['A', 'B']
+    assert names(occupancy[3]) == ['A']
+    assert occupancy[4] == ()
+    assert names(occupancy[28]) == ['C']
+
+
+def test_occupancy_skips_invalid_and_outside_vacations():
+    vacations = [
+        vac('yox', None, date(2025, 2, 3)),
+        vac('tərs', date(2025, 2, 5), date(2025, 2, 1)),
+        vac('əvvəl', date(2025, 1, 1), date(2025, 1, 31)),
+        vac('sonra', date(2025, 3, 1), date(2025, 3, 2)),
+    ]
+    assert all(day == () for day in month_occupancy(vacations, 2025, 2))
+
+
+def test_occupancy_tolerates_duplicate_vacation_objects():
+    shared = vac('A', date(2025, 2, 1), date(2025, 2, 2))
+    occupancy = month_occupancy([shared, shared], 2025, 2)
+    assert names(occupancy[1]) == ['A'] and names(occupancy[2]) == ['A']
+    assert occupancy[3] == ()
+
+
+def test_occupancy_matches_naive_day_scan():
+    vacations = [vac(str(n), date(2024, 2, 1 + n % 20), date(2024, 2, min(29, 3 + n % 20 + n % 7)))
+                 for n in range(40)]
+    occupancy = month_occupancy(vacations, 2024, 2)
+    for day in range(1, 30):
+        expected = {id(v) for v in vacations if v['start_date'] <= date(2024, 2, day) <= v['end_date']}
+        assert {id(v) for v in occupancy[day]} == expected
+
+
+def test_cache_reuses_months_and_evicts_least_recent():
+    cache = OccupancyCache(max_months=2)
+    cache.reset([vac('A', date(2025, 1, 5), date(2025, 1, 6))])
+    january = cache.get(2025, 1)
+    assert cache.get(2025, 1) is january
+    cache.get(2025, 2)
+    cache.get(2025, 1)
+    cache.get(2025, 3)
+    assert list(cache._months) == [(2025, 1), (2025, 3)]
+    cache.reset([])
+    assert cache.get(2025, 1) is not january
+
+
+def test_cache_reads_only_overlapping_vacations_from_index():
+    index = VacationIndex()
+    inside = vac('A', date(2025, 4, 10), date(2025, 4, 12))
+    outside = vac('B', date(2025, 6, 1), date(2025, 6, 2))
+    index.add(1, inside['start_date'], inside['end_date'], vacation=inside)
+    index.add(2, outside['start_date'], outside['end_date'], vacation=outside)
+    cache = OccupancyCache()
+    cache.reset([], index=index)
+    occupancy = cache.get(2025, 4)
+    assert names(occupancy[11]) == ['A']
+    assert all(day == () for day in cache.get(2025, 5))
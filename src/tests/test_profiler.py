@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.profiler testləri: collapsed/speedscope ixracı və profil sessiyası"""
+
+import json
+import os
+import threading
+import time
+
+from utils.profiler import MODE_CPROFILE, ProfilerSession, SamplingProfiler
+
+
+def outer():
+    pass
+
+
+def inner():
+    pass
+
+
+def _profiler_with(samples):
+    profiler = SamplingProfiler()
+    for thread_name, stack, count, seconds in samples:
+        key = (thread_name, tuple(func.__code__ for func in stack))
+        profiler.samples[key] += count
+        profiler.seconds[key] += seconds
+    return profiler
+
+
+def test_collapsed_format_is_sorted_by_count():
+    profiler = _profiler_with([
+        ('Main Thread', (outer,), 1, 0.01),
+        ('Main Thread', (outer, inner), 3, 0.03),
+    ])
+    lines = profiler.to_collapsed().splitlines()
+    line = f"inner (test_profiler.py:{inner.__code__.co_firstlineno})"
+    assert lines[0].startswith('Main_Thread;outer (test_profiler.py:')
+    assert lines[0].endswith(f"{line} 3")
+    assert lines[1].endswith(' 1') and ';inner' not in lines[1]
+
+
+def test_collapsed_format_escapes_separators():
+    profiler = _profiler_with([('iş; thread', (outer,), 2, 0.02)])
+    assert profiler.to_collapsed().startswith('iş:_thread;outer')
+
+
+def test_speedscope_has_one_profile_per_thread_weighted_by_seconds():
+    profiler = _profiler_with([
+        ('Main Thread', (outer, inner), 3, 0.3),
+        ('log-shipper', (outer,), 1, 0.5),
+    ])
+    data = json.loads(profiler.to_speedscope('test'))
+    assert [frame['name'] for frame in data['shared']['frames']] == ['outer', 'inner']
+    profiles = {profile['name']: profile for profile in data['profiles']}
+    assert data['profiles'][0]['name'] == 'log-shipper'
+    assert profiles['Main Thread']['samples'] == [[0, 1]]
+    assert profiles['Main Thread']['weights'] == [0.3]
+    assert profiles['log-shipper']['endValue'] == 0.5
+
+
+def test_sampler_records_other_threads_and_stops():
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait, name='busy-worker', daemon=True)
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    try:
+        deadline = time.monotonic() + 2
+        while profiler.sample_count < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        profiler.stop()
+        stop.set()
+    assert not profiler.running
+    assert any(thread_name == 'busy-worker' for thread_name, _ in profiler.samples)
+    assert not any(thread_name == 'SamplingProfiler' for thread_name, _ in profiler.samples)
+
+
+def test_session_writes_sampling_exports(tmp_path):
+    session = ProfilerSession()
+    assert session.start(interval=0.001)
+    assert not session.start()
+    time.sleep(0.01)
+    paths = session.stop(str(tmp_path))
+    assert [os.path.basename(path).split('.', 1)[1] for path in paths] == ['folded', 'speedscope.json']
+    assert all(os.path.exists(path) for path in paths)
+    assert not session.is_running() and session.stop(str(tmp_path)) == []
+
+
+def test_session_writes_cprofile_exports(tmp_path):
+    session = ProfilerSession()
+    assert session.start(MODE_CPROFILE)
+    outer()
+    paths = session.stop(str(tmp_path))
+    assert [os.path.splitext(path)[1] for path in paths] == ['.prof', '.txt']
+    assert 'cumulative' in open(paths[1], encoding='utf-8').read()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.query_cache testləri: TTL, LRU, teqlər və generation yarışı"""
+
+import importlib
+
+import pytest
+
+query_cache = importlib.import_module('database.query_cache')
+QueryCache = query_cache.QueryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = QueryCache()
+    monkeypatch.setattr(query_cache, '_query_cache', cache)
+    return cache
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = QueryCache(default_ttl=10)
+    cache.set('k', 'v')
+    clock[0] += 9
+    assert cache.get('k') == (True, 'v')
+    clock[0] += 1
+    assert cache.get('k') == (False, None)
+    assert cache.expirations == 1 and cache.get_stats()['tags'] == []
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = QueryCache(max_entries=2)
+    cache.set('a', 1, tags=('employees',))
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1) and cache.get('c') == (True, 3)
+    assert cache.evictions == 1
+
+
+def test_invalidate_tags_removes_all_tagged_entries(clock):
+    cache = QueryCache()
+    cache.set('a', 1, tags=('employees', 'vacations'))
+    cache.set('b', 2, tags=('vacations',))
+    cache.set('c', 3, tags=('departments',))
+    assert cache.invalidate_tags('vacations') == 2
+    assert cache.get('a') == (False, None)
+    assert cache.get('c') == (True, 3)
+    # 'a' 'employees' teqindən də çıxarılıb
+    assert cache.invalidate_tags('employees') == 0
+    assert cache.get_stats()['tags'] == ['departments']
+
+
+def test_stale_result_is_not_stored_after_invalidation(clock):
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate_tags('employees')
+    assert cache.set('k', 'köhnə', generation=generation) is False
+    assert cache.get('k') == (False, None)
+    assert cache.set('k', 'yeni', generation=cache.generation) is True
+
+
+def test_cached_query_returns_copies_and_skips_empty_results(shared_cache, clock):
+    calls = []
+
+    @query_cache.cached_query(tags=('departments',))
+    def load(kind):
+        calls.append(kind)
+        return [] if kind == 'boş' else ['İT', 'Maliyyə']
+
+    first = load('hamısı')
+    first.append('dəyişdirildi')
+    assert load('hamısı') == ['İT', 'Maliyyə']
+    assert load('boş') == [] and load('boş') == []
+    assert calls == ['hamısı', 'boş', 'boş']
+    assert shared_cache.get_stats()['functions']['test_query_cache.load'] == {'hits': 1, 'misses': 3}
+
+
+def test_write_during_read_does_not_cache_stale_value(shared_cache, clock):
+    @query_cache.invalidates_query_cache('employees')
+    def write():
+        pass
+
+    @query_cache.cached_query(tags=('employees',))
+    def read():
+        # Oxunan zaman başqa thread yazır
+        write()
+        return ['köhnə']
+
+    assert read() == ['köhnə']
+    assert shared_cache.get_stats()['size'] == 0
+
+
+def test_invalidates_query_cache_runs_even_when_write_fails(shared_cache, clock):
+    shared_cache.set('k', 1, tags=('vacations',))
+
+    @query_cache.invalidates_query_cache('vacations')
+    def write():
+        raise RuntimeError('yazı uğursuz')
+
+    with pytest.raises(RuntimeError):
+        write()
+    assert shared_cache.get('k') == (False, None)
+
+
+def test_unhashable_arguments_bypass_cache(shared_cache, clock):
+    @query_cache.cached_query()
+    def load(ids):
+        return list(ids)
+
+    assert load([1, 2]) == [1, 2]
+    assert shared_cache.get_stats()['size'] == 0
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.search_index testləri"""
+
+import pytest
+
+from database import search_index
+from database.employee_store import EmployeeStore
+from database.search_index import SearchIndex, az_fold, az_key, search_employees
+
+
+def make_store():
+    return EmployeeStore.from_name_dict({
+        'Əli Məmmədov': {'db_id': 1, 'department': 'Maliyyə', 'position': 'Mühasib',
+                         'username': 'ali.m', 'fin_code': '5ABC12D'},
+        'İsmayıl Həsənov': {'db_id': 2, 'department': 'İT', 'position': 'Proqramçı',
+                            'username': 'ismayil', 'fin_code': '7XYZ99K'},
+        'Aliyə Quliyeva': {'db_id': 3, 'department': 'Maliyyə', 'position': 'Direktor',
+                           'username': 'aliye', 'fin_code': '1QWE33R'},
+    })
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.sync(make_store())
+    return index
+
+
+def ids(results):
+    return [emp_id for emp_id, _ in results]
+
+
+def test_az_fold_and_key():
+    assert az_fold('İSMAYILOV') == 'ismayılov'
+    assert az_key('ƏLİYEV Şəbnəm') == 'eliyev sebnem'
+    assert az_fold(None) == ''
+
+
+def test_case_and_diacritics_insensitive(index):
+    for query in ('əli', 'ƏLİ', 'Əli'):
+        assert ids(index.search(query))[0] == 1
+    assert ids(index.search('ismayil')) == [2]
+    assert ids(index.search('İSMAYIL')) == [2]
+    assert ids(index.search('hesen')) == [2]
+
+
+def test_diacritic_match_ranks_higher(index):
+    results = dict(index.search('əli'))
+    plain = dict(index.search('eli'))
+    assert results[1] > plain.get(1, 0)
+
+
+def test_name_match_ranks_above_department(index):
+    name_score = dict(index.search('aliyə'))[3]
+    department_scores = dict(index.search('maliyyə'))
+    assert set(department_scores) == {1, 3}
+    assert max(department_scores.values()) < name_score
+
+
+def test_substring_and_multi_term_queries(index):
+    assert ids(index.search('sənov')) == [2]
+    assert ids(index.search('5abc')) == [1]
+    assert ids(index.search('ali mali')) == [3, 1]
+    assert index.search('xx') == []
+    assert index.search('   ') == []
+
+
+def test_short_terms_match_inside_words(index):
+    assert set(ids(index.search('li'))) == {1, 3}
+    assert ids(index.search('mm')) == [1]
+    assert set(ids(index.search('ə'))) == {1, 2, 3}
+
+
+def test_sync_is_incremental(index):
+    store = make_store()
+    assert index.sync(store) == (0, 0, 0)
+    store.remove_employee(3)
+    store.update_employee_fields(2, position='Analitik')
+    store.upsert_employee(4, {'name': 'Nərmin Cəfərova', 'department': 'İT'})
+    assert index.sync(store) == (1, 1, 1)
+    assert ids(index.search('analitik')) == [2]
+    assert ids(index.search('proqram')) == []
+    assert ids(index.search('cefer')) == [4]
+    assert 3 not in ids(index.search('ali'))
+
+
+def test_search_employees_syncs_once_per_store(monkeypatch):
+    monkeypatch.setattr(search_index, '_search_index', None)
+    monkeypatch.setattr(search_index, '_search_index_store', None)
+    store = make_store()
+    calls = []
+    original_sync = SearchIndex.sync
+    monkeypatch.setattr(SearchIndex, 'sync', lambda self, s: calls.append(s) or original_sync(self, s))
+    assert ids(search_employees(store, 'əli'))[0] == 1
+    search_employees(store, 'ismayil')
+    assert len(calls) == 1
+    updated = store.clone()
+    updated.remove_employee(1)
+    assert 1 not in ids(search_employees(updated, 'əli'))
+    assert len(calls) == 2
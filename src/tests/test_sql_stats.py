@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.sql_stats.normalize_sql testləri"""
+
+from database import sql_stats
+from database.sql_stats import MAX_NORMALIZE_CHARS, normalize_sql
+
+
+def test_literals_and_parameters_become_placeholders():
+    assert normalize_sql("SELECT * FROM employees WHERE id = 42 AND name = 'Əli'") == \
+        "SELECT * FROM employees WHERE id = ? AND name = ?"
+    assert normalize_sql("SELECT * FROM vacations WHERE employee_id = %s AND status = %(status)s") == \
+        "SELECT * FROM vacations WHERE employee_id = ? AND status = ?"
+
+
+def test_same_shape_normalizes_equal():
+    first = normalize_sql("SELECT name FROM employees WHERE id = 1")
+    second = normalize_sql("SELECT  name\n  FROM employees  WHERE id = 2 -- şərh")
+    assert first == second
+
+
+def test_lists_and_value_rows_are_collapsed():
+    assert normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3)") == "SELECT * FROM t WHERE id IN (?...)"
+    assert normalize_sql("SELECT * FROM t WHERE id = ANY(ARRAY[1, 2, 3])") == "SELECT * FROM t WHERE id = ANY(ARRAY[?...])"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z')") == \
+        "INSERT INTO t (a, b) VALUES (?...), ..."
+
+
+def test_bytes_and_non_text_input():
+    assert normalize_sql(b"SELECT 1") == "SELECT ?"
+
+    class Composed:
+        def __str__(self):
+            return "SELECT * FROM employees WHERE id = 5"
+
+    assert normalize_sql(Composed()) == "SELECT * FROM employees WHERE id = ?"
+
+
+def test_long_statements_are_truncated_and_not_cached():
+    values = ', '.join(f"({i}, 'ad {i}')" for i in range(2000))
+    query = f"INSERT INTO t (a, b) VALUES {values}"
+    assert len(query) > MAX_NORMALIZE_CHARS
+    sql_stats._normalize_cache.clear()
+    text = normalize_sql(query)
+    assert text.startswith("INSERT INTO t (a, b) VALUES (?...), ...")
+    assert text.endswith(' …')
+    assert not sql_stats._normalize_cache
+    # bytes da decode-dan əvvəl kəsilir
+    assert normalize_sql(query.encode('utf-8')).endswith(' …')
+    assert not sql_stats._normalize_cache
+
+
+def test_short_statements_are_cached():
+    sql_stats._normalize_cache.clear()
+    normalize_sql("SELECT * FROM employees WHERE id = 7")
+    assert "SELECT * FROM employees WHERE id = 7" in sql_stats._normalize_cache
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.performance_monitor donma detektoru testləri: heartbeat, histogram və stack-lərin aid edilməsi"""
+
+import threading
+from collections import Counter
+
+import pytest
+
+from utils import performance_monitor
+from utils.performance_monitor import MAX_STALL_SECONDS, PerformanceMonitor
+
+APP_FILE = '/app/src/ui/main_frame.py'
+LIB_FILE = performance_monitor._LIBRARY_PATHS[0] + '/tkinter/__init__.py'
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+        return f'after#{len(self.scheduled)}'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(performance_monitor.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _stack(handler):
+    return ((LIB_FILE, 10, 'mainloop'), (APP_FILE, 42, handler), (LIB_FILE, 99, 'update'))
+
+
+def test_late_heartbeat_records_a_stall(clock):
+    monitor = PerformanceMonitor()
+    root = FakeRoot()
+    monitor.attach(root, heartbeat_ms=100)
+    clock[0] += 0.1
+    monitor._heartbeat()
+    assert monitor.stall_count == 0 and monitor.ui_responsive
+
+    clock[0] += 0.1 + 0.8
+    monitor._heartbeat()
+    assert monitor.stall_count == 1
+    assert monitor.max_stall_seconds == pytest.approx(0.8)
+    assert len(root.scheduled) == 3
+
+
+def test_stall_is_attributed_to_dominant_stack():
+    monitor = PerformanceMonitor()
+    monitor._samples = Counter({_stack('refresh_list'): 5, _stack('on_click'): 1})
+    monitor._record_stall(1.5)
+    report = monitor.get_stall_report()
+    assert dict(report['histogram'])['1.0-2.0s'] == 1
+    top = report['top_stacks'][0]
+    assert top['handler'] == 'refresh_list (main_frame.py:42)'
+    assert top['stalls'] == 1 and top['samples'] == 5 and top['total_seconds'] == 1.5
+    on_click = next(item for item in report['top_stacks'] if item['handler'].startswith('on_click'))
+    assert on_click['stalls'] == 0 and on_click['samples'] == 1
+    assert monitor.get_blocking_operations()[0]['handler'] == 'refresh_list (main_frame.py:42)'
+
+
+def test_histogram_buckets_cover_threshold_to_overflow():
+    monitor = PerformanceMonitor()
+    for duration in (0.3, 0.7, 12.0):
+        monitor._record_stall(duration)
+    histogram = dict(monitor.get_stall_report()['histogram'])
+    assert histogram['0.25-0.5s'] == 1
+    assert histogram['0.5-1.0s'] == 1
+    assert histogram['>=10.0s'] == 1
+
+
+def test_sleep_sized_gap_is_ignored():
+    monitor = PerformanceMonitor()
+    monitor._samples = Counter({_stack('x'): 1})
+    monitor._record_stall(MAX_STALL_SECONDS + 1)
+    assert monitor.stall_count == 0 and not monitor._samples
+
+
+def test_handler_name_falls_back_to_innermost_frame():
+    assert PerformanceMonitor._handler_name(((LIB_FILE, 5, 'wait'),)) == 'wait (__init__.py:5)'
+    assert PerformanceMonitor._handler_name(None) == 'naməlum'
+
+
+def test_samples_of_a_new_stall_replace_previous_ones():
+    monitor = PerformanceMonitor()
+    monitor._main_thread_id = threading.get_ident()
+    monitor._sample_main_thread(last_beat=1.0)
+    monitor._sample_main_thread(last_beat=1.0)
+    assert sum(monitor._samples.values()) == 2
+    monitor._sample_main_thread(last_beat=2.0)
+    assert sum(monitor._samples.values()) == 1
+    key = next(iter(monitor._samples))
+    assert key[-1][2] == '_sample_main_thread'
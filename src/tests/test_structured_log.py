@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""utils.structured_log testləri: səviyyə/kateqoriya filtri, halqa buferi və fayl yazıcısı"""
+
+from utils.structured_log import (
+    DEBUG, ERROR, INFO, WARNING, DEFAULT_CATEGORY, LogCore, RingBuffer,
+    classify_message, format_args, print_level,
+)
+
+
+def test_print_level_reads_only_the_head():
+    assert print_level('❌ Bağlantı xətası') == ERROR
+    assert print_level('⚠️ yavaş sorğu') == WARNING
+    assert print_level('[DEBUG] refresh') == DEBUG
+    assert print_level('adi mesaj') == INFO
+    assert print_level('x' * 40 + ' ERROR') == INFO
+    assert print_level(42) == INFO
+
+
+def test_classify_message_uses_rules_in_order():
+    assert classify_message('🎬 loading gif') == ('animasiya', '🎬')
+    assert classify_message('Database connection açıldı')[0] == 'database'
+    assert classify_message('Login pəncərəsi')[0] == 'ui'
+    assert classify_message('heç nə') == DEFAULT_CATEGORY
+
+
+def test_classify_message_ignores_text_beyond_head():
+    assert classify_message('x' * 200 + ' database') == DEFAULT_CATEGORY
+
+
+def test_format_args_joins_with_sep():
+    assert format_args(('tək',)) == 'tək'
+    assert format_args(('a', 1, None)) == 'a 1 None'
+    assert format_args(('a', 'b'), sep='-') == 'a-b'
+
+
+def test_ring_buffer_reports_overwritten_records():
+    buffer = RingBuffer(capacity=4)
+    for number in range(6):
+        buffer.append(0.0, INFO, 'umumi', '📝', str(number))
+    records, lost = buffer.since(0)
+    assert [record.message for record in records] == ['2', '3', '4', '5']
+    assert lost == 2
+    assert [record.message for record in buffer.tail(2)] == ['4', '5']
+    records, lost = buffer.since(4, limit=1)
+    assert [record.message for record in records] == ['4'] and lost == 0
+
+
+def test_emit_filters_level_before_formatting():
+    core = LogCore(min_level=WARNING)
+
+    class Explodes:
+        def __str__(self):
+            raise AssertionError('filtrlənmiş mesaj formatlanmamalıdır')
+
+    assert core.emit(INFO, None, None, ('info', Explodes())) is None
+    assert core.filtered == 1 and core.emitted == 0
+
+
+def test_emit_filters_disabled_category():
+    core = LogCore()
+    core.set_disabled_categories(['database'])
+    assert core.emit(INFO, None, None, ('database connection',)) is None
+    record = core.emit(INFO, None, None, ('işçi siyahısı',))
+    assert record.category == 'employee'
+    assert core.filtered == 1 and core.emitted == 1
+
+
+def test_message_is_frozen_at_emit_time():
+    core = LogCore()
+    items = ['a']
+    record = core.emit(INFO, None, None, ('siyahı:', items))
+    items.append('b')
+    assert record.message == "siyahı: ['a']"
+    assert record.resolve().category == 'umumi'
+
+
+def test_drain_writes_pending_records(tmp_path):
+    core = LogCore()
+    path = tmp_path / 'debug_console.log'
+    core.attach_file(str(path), header_lines=('BAŞLADI',))
+    try:
+        core.emit(ERROR, 'database', None, ('❌ sorğu uğursuz',))
+        assert core.drain() == 1
+        assert core.get_stats()['pending'] == 0
+    finally:
+        core.stop()
+    content = path.read_text(encoding='utf-8')
+    assert 'BAŞLADI' in content
+    assert '[DATABASE] ❌ ❌ sorğu uğursuz' in content
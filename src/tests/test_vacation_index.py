@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""database.vacation_index testləri (nəticələr sadə tam yoxlama ilə müqayisə olunur)"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from database import vacation_index
+from database.employee_store import EmployeeStore
+from database.vacation_index import VacationIndex, counts_as_absence, get_vacation_index
+
+YEAR_START = date(2025, 1, 1)
+
+
+def build_store(seed=1, employees=60, per_employee=8):
+    random.seed(seed)
+    store = EmployeeStore.from_name_dict({
+        f'İşçi {emp_id}': {'db_id': emp_id, 'department': f'Şöbə {emp_id % 5}'} for emp_id in range(employees)
+    })
+    vac_id = 0
+    for emp_id in range(employees):
+        for _ in range(per_employee):
+            vac_id += 1
+            start = YEAR_START + timedelta(days=random.randint(0, 365))
+            store.upsert_vacation(emp_id, {
+                'db_id': vac_id,
+                'baslama': start,
+                'bitme': start + timedelta(days=random.choice([0, 3, 10, 30, 90])),
+                'status': random.choice(['approved', 'approved', 'pending']),
+                'aktiv_deyil': random.random() < 0.1,
+            })
+    return store
+
+
+def brute_force(store, first, last, department=None):
+    return {vacation['db_id'] for record, vacation in store.iter_vacations()
+            if counts_as_absence(vacation) and vacation['baslama'] <= last and vacation['bitme'] >= first
+            and (department is None or record['department'] == department)}
+
+
+def random_ranges(count, seed=2):
+    random.seed(seed)
+    for _ in range(count):
+        first = YEAR_START + timedelta(days=random.randint(-30, 400))
+        yield first, first + timedelta(days=random.randint(0, 20)), random.choice([None, 'Şöbə 3'])
+
+
+@pytest.fixture
+def store():
+    return build_store()
+
+
+def test_queries_match_brute_force(store):
+    index = VacationIndex.from_store(store)
+    for first, last, department in random_ranges(150):
+        assert {entry.key for entry in index.overlapping(first, last, department)} == \
+            brute_force(store, first, last, department)
+        assert index.count_on(first) == len(brute_force(store, first, first))
+        counts = index.daily_counts(first, last, department)
+        assert counts == [len(brute_force(store, first + timedelta(days=day), first + timedelta(days=day), department))
+                          for day in range((last - first).days + 1)]
+
+
+def test_sync_applies_edits_and_removals(store):
+    index = VacationIndex.from_store(store)
+    updated = store.clone()
+    removed_id = next(vacation['db_id'] for _, vacation in updated.iter_vacations() if counts_as_absence(vacation))
+    updated.remove_vacation(removed_id)
+    updated.upsert_vacation(1, {'db_id': 10000, 'baslama': date(2025, 5, 1), 'bitme': date(2025, 5, 3),
+                                'status': 'approved'})
+    assert index.sync(updated) == (1, 1)
+    assert removed_id not in index and 10000 in index
+    for first, last, department in random_ranges(100, seed=3):
+        assert {entry.key for entry in index.overlapping(first, last, department)} == \
+            brute_force(updated, first, last, department)
+    assert index.sync(updated) == (0, 0)
+
+
+def test_longest_vacation_removal_shrinks_window():
+    index = VacationIndex()
+    index.add('long', date(2025, 1, 1), date(2025, 6, 30), employee_id=1)
+    index.add('short', date(2025, 3, 1), date(2025, 3, 2), employee_id=2)
+    assert {entry.key for entry in index.absent_on(date(2025, 5, 1))} == {'long'}
+    index.remove('long')
+    assert index._max_length == 1
+    assert index.absent_on(date(2025, 5, 1)) == []
+    # Düzəliş (eyni açar) köhnə aralığı əvəz edir; səhv aralıq silir
+    index.add('short', date(2025, 4, 1), date(2025, 4, 5), employee_id=2)
+    assert index.count_on(date(2025, 3, 1)) == 0 and index.count_on(date(2025, 4, 3)) == 1
+    assert index.add('short', date(2025, 4, 5), date(2025, 4, 1)) is False
+    assert len(index) == 0
+
+
+def test_department_overlaps_and_max_concurrent():
+    index = VacationIndex()
+    index.add(1, date(2025, 3, 1), date(2025, 3, 10), employee_id=1, department='İT')
+    index.add(2, date(2025, 3, 5), date(2025, 3, 6), employee_id=2, department='İT')
+    index.add(3, date(2025, 3, 5), date(2025, 3, 6), employee_id=3, department='Maliyyə')
+    index.add(4, date(2025, 3, 8), date(2025, 3, 9), employee_id=4, department=None)
+    overlaps = index.department_overlaps('İT', date(2025, 3, 6), date(2025, 3, 7), exclude_employee=1)
+    assert [entry.key for entry in overlaps] == [2]
+    assert [entry.key for entry in index.department_overlaps(None, date(2025, 3, 1), date(2025, 3, 31))] == [4]
+    assert index.max_concurrent(date(2025, 3, 1), date(2025, 3, 31)) == (3, date(2025, 3, 5))
+    assert index.max_concurrent(date(2025, 3, 1), date(2025, 3, 31), department='İT') == (2, date(2025, 3, 5))
+    assert index.max_concurrent(date(2025, 4, 1), date(2025, 4, 30)) == (0, None)
+
+
+def test_get_vacation_index_syncs_once_per_store(monkeypatch, store):
+    monkeypatch.setattr(vacation_index, '_vacation_index', None)
+    monkeypatch.setattr(vacation_index, '_vacation_index_store', None)
+    calls = []
+    original_sync = VacationIndex.sync
+    monkeypatch.setattr(VacationIndex, 'sync', lambda self, s: calls.append(s) or original_sync(self, s))
+    first = get_vacation_index(store)
+    assert get_vacation_index(store) is first
+    assert get_vacation_index() is first
+    assert len(calls) == 1
+    get_vacation_index(store.clone())
+    assert len(calls) == 2
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ui.virtual_listbox.VirtualListbox testləri: update_items fərqi və klaviatura (Tk pəncərəsi açılmadan - yalnız model)"""
+
+import pytest
+
+from ui.virtual_listbox import VirtualListbox
+
+ROW_HEIGHT = 20
+VISIBLE_HEIGHT = 100
+
+
+@pytest.fixture
+def listbox(monkeypatch):
+    """Canvas yaradılmadan model hissəsi: çəkmə planlaşdırılmır, hündürlük sabitdir"""
+    widget = VirtualListbox.__new__(VirtualListbox)
+    widget.row_height = ROW_HEIGHT
+    widget._texts = []
+    widget._colors = []
+    widget._keys = None
+    widget._key_index = {}
+    widget._selection = set()
+    widget._top = 0
+    widget._redraw_pending = False
+    monkeypatch.setattr(widget, '_schedule_redraw', lambda: None, raising=False)
+    monkeypatch.setattr(widget, 'winfo_height', lambda: VISIBLE_HEIGHT, raising=False)
+    widget.generated = []
+    monkeypatch.setattr(widget, 'event_generate', widget.generated.append, raising=False)
+    return widget
+
+
+def rows(keys, suffix=''):
+    return [(f'{key}{suffix}', None, None) for key in keys]
+
+
+def test_first_update_is_full_reset(listbox):
+    result = listbox.update_items(rows('abc'), 'abc')
+    assert result['reset'] is True
+    assert listbox.get(0, 'end') == ('a', 'b', 'c')
+
+
+def test_no_change_returns_zero_counts(listbox):
+    listbox.update_items(rows('abc'), 'abc')
+    assert listbox.update_items(rows('abc'), 'abc') == {'inserted': 0, 'deleted': 0, 'changed': 0}
+
+
+def test_insert_delete_and_change_counts(listbox):
+    listbox.update_items(rows('abcde'), 'abcde')
+    items = [('a', None, None), ('b', 'red', None), ('x', None, None), ('d', None, None), ('e', None, None), ('f', None, None)]
+    result = listbox.update_items(items, 'abxdef')
+    assert result == {'inserted': 2, 'deleted': 1, 'changed': 1}
+    assert listbox.get(0, 'end') == ('a', 'b', 'x', 'd', 'e', 'f')
+    assert listbox.index_of_key('x') == 2
+    assert listbox.index_of_key('c') is None
+
+
+def test_selection_follows_key(listbox):
+    keys = [f'k{i}' for i in range(10)]
+    listbox.update_items(rows(keys), keys)
+    listbox._selection = {keys.index('k5')}
+    new_keys = ['new1', 'new2'] + [key for key in keys if key != 'k1']
+    listbox.update_items(rows(new_keys), new_keys)
+    assert listbox._selection == {new_keys.index('k5')}
+    # Seçilmiş sətir silinəndə seçim də gedir
+    remaining = [key for key in new_keys if key != 'k5']
+    listbox.update_items(rows(remaining), remaining)
+    assert listbox._selection == set()
+
+
+def test_scroll_anchor_stays_on_first_visible_row(listbox):
+    keys = [f'k{i}' for i in range(50)]
+    listbox.update_items(rows(keys), keys)
+    listbox._top = 10 * ROW_HEIGHT + 5           # k10 ən yuxarıda, 5 piksel kəsilib
+    new_keys = [f'n{i}' for i in range(3)] + keys[:4] + keys[5:]   # yuxarıda 3 əlavə, 1 silinmə
+    listbox.update_items(rows(new_keys), new_keys)
+    first_visible = int(listbox._top // ROW_HEIGHT)
+    assert listbox._keys[first_visible] == 'k10'
+    assert listbox._top % ROW_HEIGHT == 5
+
+
+def test_scroll_clamped_when_list_shrinks(listbox):
+    keys = [f'k{i}' for i in range(50)]
+    listbox.update_items(rows(keys), keys)
+    listbox._top = 40 * ROW_HEIGHT
+    listbox.update_items(rows(keys[:3]), keys[:3])
+    assert listbox._top == 0
+
+
+def test_reorder_keeps_rows_and_selection(listbox):
+    listbox.update_items(rows('abcd'), 'abcd')
+    listbox._selection = {1}
+    result = listbox.update_items(rows('dcba'), 'dcba')
+    assert result == {'inserted': 0, 'deleted': 0, 'changed': 0}
+    assert listbox.get(0, 'end') == ('d', 'c', 'b', 'a')
+    assert listbox._selection == {2}
+    assert listbox.index_of_key('a') == 3 and listbox.key_at(0) == 'd'
+
+
+def test_duplicate_keys_fall_back_to_reset(listbox):
+    listbox.update_items(rows('ab'), 'ab')
+    result = listbox.update_items(rows('aab'), 'aab')
+    assert result['reset'] is True
+    assert listbox.size() == 3
+
+
+def test_integer_and_tuple_keys(listbox):
+    keys = [('dept', 'İT'), 7, 3]
+    listbox.update_items(rows(['İT', 'Əli', 'Əli']), keys)
+    assert listbox.index_of_key(3) == 2
+    assert listbox.key_at(1) == 7 and listbox.key_at(5) is None
+
+
+def test_arrow_keys_move_selection_and_scroll(listbox):
+    keys = [f'k{i}' for i in range(30)]
+    listbox.update_items(rows(keys), keys)
+    assert listbox._on_key('down') == 'break'
+    assert listbox.curselection() == (0,)
+    listbox._on_key('up')
+    assert listbox.curselection() == (0,)
+    assert listbox.generated == ['<<ListboxSelect>>']     # seçim dəyişməyəndə hadisə yoxdur
+    listbox._on_key('next')
+    page = VISIBLE_HEIGHT // ROW_HEIGHT - 1
+    assert listbox.curselection() == (page,)
+    listbox._on_key('end')
+    assert listbox.curselection() == (29,)
+    # Seçilmiş sətir görünən sahədədir
+    assert listbox._top + VISIBLE_HEIGHT >= 30 * ROW_HEIGHT
+    listbox._on_key('prior')
+    assert listbox.curselection() == (29 - page,)
+    listbox._on_key('home')
+    assert listbox.curselection() == (0,) and listbox._top == 0
@@ -8,6 +8,9 @@ import logging
 
 def safe_date_format(date_value, format_str='%d.%m.%Y'):
     """Tarix dəyərini təhlükəsiz şəkildə format edir"""
+    # Bazadan gələn qeydlərdə tarix artıq date obyektidir - parse lazım deyil
+    if isinstance(date_value, date):
+        return date_value.strftime(format_str)
     if isinstance(date_value, str):
         try:
             return datetime.strptime(date_value, '%Y-%m-%d').strftime(format_str)
@@ -23,6 +26,8 @@ def safe_date_parse(date_value):
     # Debug mesajlarını azaldıq - yalnız xəta halında log yazırıq
     # logging.debug(f"safe_date_parse çağırıldı. Dəyər: {date_value}, Tip: {type(date_value)}")
     
+    if type(date_value) is date:
+        return date_value
     if isinstance(date_value, str):
         try:
             # Əvvəlcə ISO formatını yoxlayırıq
@@ -157,7 +162,11 @@ class CustomDateEntry(ttk.Frame):
 
 def mezuniyyet_muddetini_hesabla(baslama_str, bitme_str):
     """Məzuniyyət müddətini hesablayır (günlərlə)"""
-    logging.debug(f"mezuniyyet_muddetini_hesabla çağırıldı. Başlama: {baslama_str}, Bitmə: {bitme_str}")
+    # Tez yol: hər iki tarix artıq date obyektidir (records.Vacation)
+    if type(baslama_str) is date and type(bitme_str) is date:
+        return max(0, (bitme_str - baslama_str).days + 1)
+    
+    logging.debug("mezuniyyet_muddetini_hesabla çağırıldı. Başlama: %s, Bitmə: %s", baslama_str, bitme_str)
     
     try:
         # DÜZƏLİŞ: Təhlükəsiz tarix parse
@@ -186,7 +195,8 @@ def get_vacation_status_and_color(vacation, reference_date=None):
         vacation: məzuniyyət məlumatları
         reference_date: müqayisə tarixi (None olarsa, bu gün istifadə olunur)
     """
-    logging.debug(f"get_vacation_status_and_color çağırıldı. Vacation: {vacation}, Reference date: {reference_date}")
+    # Lazy formatlama: hər repaint-də bütün qeydi sətirə çevirməmək üçün
+    logging.debug("get_vacation_status_and_color çağırıldı. Vacation: %s, Reference date: %s", vacation, reference_date)
     
     today = reference_date if reference_date else date.today()
     status = vacation.get('status', 'approved')
@@ -201,7 +211,7 @@ def get_vacation_status_and_color(vacation, reference_date=None):
             start_dt = safe_date_parse(vacation['baslama'])
             end_dt = safe_date_parse(vacation['bitme'])
             
-            logging.debug(f"Status üçün tarixlər - Başlama: {start_dt}, Bitmə: {end_dt}")
+            logging.debug("Status üçün tarixlər - Başlama: %s, Bitmə: %s", start_dt, end_dt)
             
             if start_dt and end_dt:
                 if end_dt < today: 
@@ -2,11 +2,21 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import calendar
 import logging
 from datetime import datetime, date, timedelta
 from database import database
-from .components import Tooltip, safe_date_format, get_vacation_status_and_color
+from database.vacation_index import VacationIndex
+from database.sql_stats import sql_action
+from .components import safe_date_format, get_vacation_status_and_color
+from .month_calendar_canvas import MonthCalendarCanvas, OccupancyCache
+
+try:
+    from utils.metrics import timed
+except ImportError:
+    def timed(operation, registry=None):
+        def decorator(func):
+            return func
+        return decorator
 
 class DashboardCalendarFrame(ttk.Frame):
     def __init__(self, parent, main_app_ref):
@@ -36,6 +46,11 @@ class DashboardCalendarFrame(ttk.Frame):
         self.employee_colors = {}
         # DÜZƏLİŞ: vacations atributunu başlanğıcda boş list kimi təyin et
         self.vacations = []
+        # Ay -> gün üzrə məzuniyyətlər (sweep-line), vacations yenilənəndə sıfırlanır
+        self.occupancy_cache = OccupancyCache()
+        # "Kim hansı gün məzuniyyətdədir" sorğuları üçün interval indeksi (database.vacation_index)
+        self.vacation_index = VacationIndex()
+        self._prefetch_after_id = None
 
         self.create_widgets()
         
@@ -78,7 +93,11 @@ class DashboardCalendarFrame(ttk.Frame):
         print(f"🟡 [DEBUG] [UI THREAD] ⏱️ dashboard.load_data BAŞLADI (UI thread-də)")
         logging.debug("load_data başladı")
         
+        # SQL statistikası üçün UI əməliyyatı: şöbə filtri ilə yükləmə ayrıca görünür (N+1 aşkarlanması)
+        action_name = 'dashboard.department_filter' if getattr(self, 'selected_department_filter', None) else 'dashboard.load_data'
+        
         # OPTİMALLAŞDIRMA: Database işlərini asinxron thread-də et - UI bloklanmasın
+        @sql_action(action_name)
         def load_in_thread():
             thread_start = time.time()
             thread_id = threading.current_thread().ident
@@ -169,6 +188,7 @@ class DashboardCalendarFrame(ttk.Frame):
                         print(f"🟡 [DEBUG] [UI THREAD] ⏱️ dashboard.load_data UI refresh BAŞLADI")
                         
                         # OPTİMALLAŞDIRMA: Təqvim yeniləməsini asinxron et - UI bloklanmasın
+                        self._rebuild_vacation_index()
                         self.update_dashboard_data()
                         # calendar_frame yaradılıbmışdırsa yenilə - asinxron
                         if hasattr(self, 'calendar_frame') and self.calendar_frame.winfo_exists():
@@ -216,6 +236,14 @@ class DashboardCalendarFrame(ttk.Frame):
         load_time = time.time() - load_start
         print(f"🟡 [DEBUG] [UI THREAD] ⏱️ dashboard.load_data funksiyası bitdi: {load_time:.3f}s (thread başladıldı)")
 
+    def _rebuild_vacation_index(self):
+        """self.vacations yeniləndikdən sonra interval indeksini və ay keşini yenidən qurur"""
+        self.vacation_index.clear()
+        for position, vacation in enumerate(self.vacations):
+            self.vacation_index.add(position, vacation.get('start_date'), vacation.get('end_date'),
+                                    vacation.get('employee_id'), vacation=vacation)
+        self.occupancy_cache.reset(self.vacations, self.vacation_index)
+
     def create_dashboard_widgets(self, parent_frame):
         parent_frame.rowconfigure(0, weight=1)
 
@@ -253,7 +281,7 @@ class DashboardCalendarFrame(ttk.Frame):
 
             # Bu gün məzuniyyətdə olanlar (dəyişiklik yoxdur)
             today = date.today()
-            on_vacation_today = [v for v in self.vacations if v.get('start_date') and v.get('end_date') and v['start_date'] <= today <= v['end_date']]
+            on_vacation_today = [entry.vacation for entry in self.vacation_index.absent_on(today)]
             self.on_vacation_card.config(text=f"Bu Gün Məzuniyyətdə ({len(on_vacation_today)})")
             for vac in on_vacation_today:
                 link = ttk.Label(self.on_vacation_card, text=vac['employee'], foreground="purple", cursor="hand2", anchor="w")
@@ -314,7 +342,13 @@ class DashboardCalendarFrame(ttk.Frame):
             
             self.selected_department_filter = None
 
-        self.calendar_frame = ttk.Frame(parent_frame)
+        # Bütün ay tək Canvas-da çəkilir (ui.month_calendar_canvas) - gün/indikator widget-ləri yoxdur
+        self.calendar_frame = MonthCalendarCanvas(
+            parent_frame,
+            font_name=self.main_font,
+            color_for=lambda vac: self.employee_colors.get(vac['employee'], self.status_colors['gray']),
+            on_vacation_click=self.on_day_click,
+        )
         self.calendar_frame.pack(expand=True, fill='both')
     
     def _on_calendar_filter_change(self):
@@ -329,6 +363,7 @@ class DashboardCalendarFrame(ttk.Frame):
             self.load_data()  # Məlumatları yenidən yüklə
 
 
+    @timed('ui.update_calendar')
     def update_calendar(self):
         """Təqvim yeniləməsi - OPTİMALLAŞDIRILMIŞ VERSİYA"""
         import logging
@@ -348,140 +383,31 @@ class DashboardCalendarFrame(ttk.Frame):
         # OPTİMALLAŞDIRMA: Yalnız vacib loglar
         logging.debug(f"=== update_calendar başladı: {self.current_date.month}/{self.current_date.year}, {len(self.vacations)} məzuniyyət ===")
         
-        for widget in self.calendar_frame.winfo_children(): widget.destroy()
         month_names_az = ["Yanvar", "Fevral", "Mart", "Aprel", "May", "İyun", "İyul", "Avqust", "Sentyabr", "Oktyabr", "Noyabr", "Dekabr"]
-        self.month_year_label.config(text=f"{month_names_az[self.current_date.month - 1]} {self.current_date.year}")
-        days_of_week = ["B.e.", "Ç.a.", "Çər.", "C.a.", "Cüm.", "Şən.", "Baz."]
-        for i, day in enumerate(days_of_week):
-            self.calendar_frame.grid_columnconfigure(i, weight=1)
-            ttk.Label(self.calendar_frame, text=day, font=(self.main_font, 10, "bold"), anchor='center', relief='groove', padding=5).grid(row=0, column=i, sticky='nsew', pady=5)
-        for i in range(1, 8):
-            self.calendar_frame.grid_rowconfigure(i, weight=1, uniform="week_row")
-        month_calendar = calendar.monthcalendar(self.current_date.year, self.current_date.month)
-        today = date.today()
+        year, month = self.current_date.year, self.current_date.month
+        self.month_year_label.config(text=f"{month_names_az[month - 1]} {year}")
         
-        # OPTİMALLAŞDIRMA: Bütün günləri bir dəfəyə hesabla - batch processing
-        # Bütün günləri və onların məzuniyyətlərini bir dəfəyə hesabla
-        vacations_by_day = {}
-        for week in month_calendar:
-            for day_val in week:
-                if day_val == 0:
-                    continue
-                day_date = date(self.current_date.year, self.current_date.month, day_val)
-                # Bütün məzuniyyətləri bir dəfəyə filter et
-                vacations_on_this_day = [
-                    v for v in self.vacations 
-                    if v.get('start_date') and v.get('end_date') 
-                    and v['start_date'] <= day_date <= v['end_date']
-                ]
-                vacations_by_day[day_date] = vacations_on_this_day
-        # OPTİMALLAŞDIRMA: Bütün günləri bir dəfəyə render et - batch processing
-        for week_num, week in enumerate(month_calendar, 1):
-            for day_num_idx, day_val in enumerate(week):
-                if day_val == 0: 
-                    continue
-                day_date = date(self.current_date.year, self.current_date.month, day_val)
-                
-                # OPTİMALLAŞDIRMA: Vacations artıq hesablanıb - cache-dən götür
-                vacations_on_this_day = vacations_by_day.get(day_date, [])
-                
-                frame_config = {'relief': 'solid', 'borderwidth': 1}
-                is_weekend = day_num_idx >= 5
-                is_today = (day_date == today)
-                if is_today:
-                    frame_config['bg'] = '#e8f0fe'
-                    frame_config['highlightbackground'] = '#007bff'
-                    frame_config['highlightthickness'] = 2
-                elif is_weekend:
-                    frame_config['bg'] = '#f5f5f5'
-                else:
-                    frame_config['bg'] = 'white'
-                day_frame = tk.Frame(self.calendar_frame, **frame_config)
-                day_frame.vacation_date = day_date
-                try:
-                    day_frame.grid(row=week_num, column=day_num_idx, sticky='nsew')
-                    day_frame.grid_propagate(False)
-                    day_frame.configure(width=100, height=80)
-                    self.calendar_frame.grid_columnconfigure(day_num_idx, weight=1)
-                    self.calendar_frame.grid_rowconfigure(week_num, weight=1)
-                except tk.TclError as e:
-                    logging.debug(f"Day frame yaradılma xətası: {e}")
-                    continue
-                day_label = tk.Label(day_frame, text=str(day_val), font=(self.main_font, 9), anchor='ne', padx=4, pady=1)
-                try:
-                    day_label.place(relx=1.0, rely=0.0, anchor='ne')
-                except tk.TclError as e:
-                    logging.debug(f"Day label yerləşdirmə xətası: {e}")
-                
-                # OPTİMALLAŞDIRMA: Log mesajlarını azalt - yalnız vacib məlumatları logla
-                if not vacations_on_this_day:
-                    day_label.config(bg=frame_config['bg'])
-                else:
-                    # Kvadratlar üçün grid ölçüsünü təyin edirik
-                    num_vac = len(vacations_on_this_day)
-                    grid_size = 1
-                    if num_vac > 6:
-                        grid_size = 3
-                    elif num_vac > 2:
-                        grid_size = 2
-                    
-                    # Kvadratları yerləşdiririk
-                    for i, vac in enumerate(vacations_on_this_day):
-                        # OPTİMALLAŞDIRMA: Rəng hesablaması - log yoxdur
-                        if day_date > vac['end_date']:
-                            color = self.status_colors['red']  # Bitmiş
-                        elif vac['start_date'] <= day_date <= vac['end_date']:
-                            color = self.employee_colors.get(vac['employee'], self.status_colors['gray'])  # Aktiv
-                        else:
-                            color = self.status_colors['gray']  # Planlaşdırılan
-                        
-                        # Grid pozisiyasını hesablayırıq
-                        row = i // grid_size
-                        col = i % grid_size
-                        
-                        indicator = tk.Frame(day_frame, background=color, width=12, height=12, relief='ridge', borderwidth=1)
-                        try:
-                            indicator.grid(row=row, column=col, padx=1, pady=1, sticky='nsew')
-                            indicator.configure(background=color)
-                            day_frame.grid_columnconfigure(col, weight=1)
-                            day_frame.grid_rowconfigure(row, weight=1)
-                        except tk.TclError as e:
-                            logging.debug(f"Widget yaradılma xətası: {e}")
-                            continue
-                        
-                        # OPTİMALLAŞDIRMA: Rəng yoxlaması - yalnız xəta halında log
-                        try:
-                            actual_color = indicator.cget('background')
-                            if actual_color != color:
-                                indicator.configure(background=color)
-                        except tk.TclError:
-                            pass
-                        
-                        # OPTİMALLAŞDIRMA: Görünürlük yoxlaması - log yoxdur
-                        try:
-                            indicator.lift()
-                        except tk.TclError:
-                            pass
-                        # Tooltip
-                        tooltip_text = f"{vac['employee']}\n{vac['start_date'].strftime('%d.%m.%Y')} - {vac['end_date'].strftime('%d.%m.%Y')}"
-                        try:
-                            Tooltip(indicator, tooltip_text, font_name=self.main_font)
-                        except Exception:
-                            pass
-                        handler = lambda e, v=vac: self.on_day_click(v)
-                        try:
-                            indicator.bind("<Button-1>", handler)
-                        except tk.TclError:
-                            pass
-                    try:
-                        day_label.lift()
-                    except tk.TclError:
-                        pass
+        # Gün -> məzuniyyətlər: sweep-line ilə O(V + D), ay keşdədirsə yenidən hesablanmır
+        occupancy = self.occupancy_cache.get(year, month)
+        # Canvas item-ləri təkrar istifadə olunur - widget yaradılmır/silinmir
+        self.calendar_frame.show_month(year, month, occupancy, date.today())
+        
+        # Qonşu ayları boş vaxtda əvvəlcədən hesabla - "<"/">" dərhal açılsın
+        if self._prefetch_after_id:
+            self.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.after_idle(self._prefetch_adjacent_months)
         
         # OPTİMALLAŞDIRMA: Performans ölçməsi
         elapsed_time = time.time() - start_time
         logging.debug(f"=== update_calendar tamamlandı: {elapsed_time:.3f}s ===")
 
+    def _prefetch_adjacent_months(self):
+        self._prefetch_after_id = None
+        try:
+            self.occupancy_cache.prefetch(self.current_date.year, self.current_date.month)
+        except Exception as e:
+            logging.debug(f"Qonşu ayların hesablanması xətası: {e}")
+
     def on_day_click(self, vacation_info):
         """Günə klik edildikdə məzuniyyət məlumatlarını göstərir"""
         try:
@@ -628,29 +554,13 @@ class DashboardCalendarFrame(ttk.Frame):
             print(f"🔍 DEBUG: _highlight_vacation_days başladı: {start_date} - {end_date}")
             logging.info(f"_highlight_vacation_days: {start_date} - {end_date}")
             
-            # Məzuniyyət günlərini tap və işarələ
+            # Məzuniyyət günlərini Canvas-da işarələ (yalnız göstərilən ayın günləri)
+            days = []
             current_date = start_date
-            highlighted_days = []
-            found_days = 0
-            
-            print(f"🔍 DEBUG: Günlər axtarılır: {start_date} - {end_date}")
-            
             while current_date <= end_date:
-                print(f"🔍 DEBUG: Gün axtarılır: {current_date}")
-                # Günün grid pozisiyasını tap
-                day_widget = self._find_day_widget(current_date)
-                if day_widget:
-                    # Günü işarələ (qırmızı border)
-                    day_widget.configure(relief='solid', borderwidth=3, highlightbackground='red', highlightthickness=2)
-                    highlighted_days.append((day_widget, current_date))
-                    found_days += 1
-                    print(f"✅ DEBUG: Gün işarələndi: {current_date}")
-                    logging.info(f"Gün işarələndi: {current_date}")
-                else:
-                    print(f"❌ DEBUG: Gün widget tapılmadı: {current_date}")
-                
+                days.append(current_date)
                 current_date += timedelta(days=1)
-            
+            found_days = self.calendar_frame.highlight_days(days)
             print(f"📊 DEBUG: Cəmi {found_days} gün işarələndi")
             
             # İşçi adını göstər
@@ -667,94 +577,18 @@ class DashboardCalendarFrame(ttk.Frame):
             
             # 5 saniyədən sonra işarələri təmizlə
             print("⏳ DEBUG: 5 saniyədən sonra işarələr təmizlənəcək")
-            self.after(5000, lambda: self._clear_highlights(highlighted_days))
+            self.after(5000, self._clear_highlights)
             
         except Exception as e:
             print(f"❌ DEBUG: _highlight_vacation_days xətası: {e}")
             import logging
             logging.error(f"_highlight_vacation_days xətası: {e}")
 
-    def _find_day_widget(self, target_date):
-        """Verilmiş tarixə uyğun gün widget-ini tapır"""
-        try:
-            import logging
-            print(f"🔍 DEBUG: _find_day_widget axtarılır: {target_date}")
-            logging.debug(f"_find_day_widget axtarılır: {target_date}")
-            
-            # Kalendar frame-lərini yoxla
-            print(f"🔍 DEBUG: Self winfo_children sayı: {len(self.winfo_children())}")
-            for i, child in enumerate(self.winfo_children()):
-                print(f"🔍 DEBUG: Child {i}: {type(child)} - {child}")
-                if isinstance(child, ttk.Notebook):
-                    print(f"🔍 DEBUG: Notebook tapıldı, tab-lar yoxlanılır...")
-                    for tab_id in child.tabs():
-                        tab = child.nametowidget(tab_id)
-                        print(f"🔍 DEBUG: Tab: {tab} - {type(tab)}")
-                        if "calendar" in str(tab).lower():
-                            print(f"🔍 DEBUG: Calendar tab tapıldı, gün widget-ləri axtarılır...")
-                            # Calendar tab-də gün widget-lərini yoxla
-                            for day_widget in tab.winfo_children():
-                                if hasattr(day_widget, 'vacation_date'):
-                                    if day_widget.vacation_date == target_date:
-                                        print(f"✅ DEBUG: Gün widget tapıldı: {target_date}")
-                                        logging.debug(f"Gün widget tapıldı: {target_date}")
-                                        return day_widget
-                            
-                            # Əgər vacation_date atributu ilə tapılmadısa, bütün frame-ləri yoxla
-                            for frame in tab.winfo_children():
-                                if isinstance(frame, tk.Frame):
-                                    print(f"🔍 DEBUG: Frame tapıldı, uşaqlar yoxlanılır...")
-                                    for day_widget in frame.winfo_children():
-                                        if hasattr(day_widget, 'vacation_date'):
-                                            if day_widget.vacation_date == target_date:
-                                                print(f"✅ DEBUG: Gün widget tapıldı (frame içində): {target_date}")
-                                                logging.debug(f"Gün widget tapıldı (frame içində): {target_date}")
-                                                return day_widget
-                                        
-                                        # Əgər day_widget-in özü frame-dirsə, onun uşaqlarını da yoxla
-                                        if isinstance(day_widget, tk.Frame):
-                                            for sub_widget in day_widget.winfo_children():
-                                                if hasattr(sub_widget, 'vacation_date'):
-                                                    if sub_widget.vacation_date == target_date:
-                                                        print(f"✅ DEBUG: Gün widget tapıldı (sub-frame içində): {target_date}")
-                                                        logging.debug(f"Gün widget tapıldı (sub-frame içində): {target_date}")
-                                                        return sub_widget
-            
-            # Əgər hələ də tapılmadısa, bütün widget-ləri recursive olaraq yoxla
-            print(f"🔍 DEBUG: Recursive axtarış başladılır...")
-            def search_recursive(widget):
-                if hasattr(widget, 'vacation_date') and widget.vacation_date == target_date:
-                    print(f"✅ DEBUG: Gün widget tapıldı (recursive): {target_date}")
-                    logging.debug(f"Gün widget tapıldı (recursive): {target_date}")
-                    return widget
-                
-                for child in widget.winfo_children():
-                    result = search_recursive(child)
-                    if result:
-                        return result
-                return None
-            
-            for child in self.winfo_children():
-                result = search_recursive(child)
-                if result:
-                    return result
-            
-            print(f"❌ DEBUG: Gün widget tapılmadı: {target_date}")
-            logging.warning(f"Gün widget tapılmadı: {target_date}")
-            return None
-        except Exception as e:
-            print(f"❌ DEBUG: _find_day_widget xətası: {e}")
-            import logging
-            logging.error(f"_find_day_widget xətası: {e}")
-            return None
-
-    def _clear_highlights(self, highlighted_days):
+    def _clear_highlights(self):
         """İşarələnmiş günlərin işarələrini təmizləyir"""
         try:
-            for day_widget, date in highlighted_days:
-                if day_widget.winfo_exists():
-                    # Normal görünüşə qaytar
-                    day_widget.configure(relief='solid', borderwidth=1, highlightbackground='', highlightthickness=0)
+            if self.calendar_frame.winfo_exists():
+                self.calendar_frame.clear_highlights()
         except Exception as e:
             import logging
-            logging.error(f"_clear_highlights xətası: {e}")
\ No newline at end of file
+            logging.error(f"_clear_highlights xətası: {e}")
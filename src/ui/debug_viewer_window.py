@@ -17,6 +17,47 @@ import os
 import glob
 from pathlib import Path
 
+try:
+    from database.query_cache import get_query_cache_stats, clear_query_cache
+except ImportError:
+    try:
+        from src.database.query_cache import get_query_cache_stats, clear_query_cache
+    except ImportError:
+        get_query_cache_stats = None
+        clear_query_cache = None
+
+try:
+    from utils.performance_monitor import get_stall_report
+except ImportError:
+    try:
+        from src.utils.performance_monitor import get_stall_report
+    except ImportError:
+        get_stall_report = None
+
+try:
+    from ui.sql_stats_window import SqlStatsWindow
+except ImportError:
+    try:
+        from src.ui.sql_stats_window import SqlStatsWindow
+    except ImportError:
+        SqlStatsWindow = None
+
+try:
+    from ui.memory_diagnostics_window import MemoryDiagnosticsWindow
+except ImportError:
+    try:
+        from src.ui.memory_diagnostics_window import MemoryDiagnosticsWindow
+    except ImportError:
+        MemoryDiagnosticsWindow = None
+
+try:
+    from utils.profiler import start_profiling, stop_profiling, is_profiling, MODE_SAMPLING, MODE_CPROFILE
+except ImportError:
+    try:
+        from src.utils.profiler import start_profiling, stop_profiling, is_profiling, MODE_SAMPLING, MODE_CPROFILE
+    except ImportError:
+        start_profiling = None
+
 class DebugViewerWindow(tb.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -54,6 +95,7 @@ class DebugViewerWindow(tb.Toplevel):
         
         self.last_file_size = 0
         self.last_content = ""
+        self.last_stall_count = None
         
         self.create_widgets()
         self.start_monitoring()
@@ -109,6 +151,50 @@ class DebugViewerWindow(tb.Toplevel):
         )
         export_btn.pack(side='left', padx=10, pady=5)
         
+        # Sorğu keşini təmizləmə düyməsi
+        if clear_query_cache:
+            tb.Button(
+                control_frame,
+                text="🗃️ Keşi Təmizlə",
+                command=self.clear_query_cache,
+                bootstyle="secondary"
+            ).pack(side='left', padx=10, pady=5)
+        
+        # SQL statistikası (ən yavaş sorğular, N+1)
+        if SqlStatsWindow:
+            tb.Button(
+                control_frame,
+                text="🐢 SQL Statistikası",
+                command=self.open_sql_stats,
+                bootstyle="secondary"
+            ).pack(side='left', padx=10, pady=5)
+        
+        # Yaddaş diaqnostikası (widget sayları, tracemalloc fərqləri)
+        if MemoryDiagnosticsWindow:
+            tb.Button(
+                control_frame,
+                text="🧠 Yaddaş",
+                command=self.open_memory_diagnostics,
+                bootstyle="secondary"
+            ).pack(side='left', padx=10, pady=5)
+        
+        # Profiler (sampling - bütün thread-lər, və ya cProfile - əsas thread)
+        if start_profiling:
+            self.cprofile_var = tk.BooleanVar(value=False)
+            tb.Checkbutton(
+                control_frame,
+                text="cProfile",
+                variable=self.cprofile_var,
+                bootstyle="round-toggle"
+            ).pack(side='left', padx=(10, 0), pady=5)
+            self.profiler_btn = tb.Button(
+                control_frame,
+                text="⏹️ Profiler Dayandır" if is_profiling() else "🔥 Profiler Başlat",
+                command=self.toggle_profiler,
+                bootstyle="danger" if is_profiling() else "secondary"
+            )
+            self.profiler_btn.pack(side='left', padx=10, pady=5)
+        
         # Filter frame
         filter_frame = tb.Frame(control_frame)
         filter_frame.pack(side='right', padx=10, pady=5)
@@ -144,6 +230,20 @@ class DebugViewerWindow(tb.Toplevel):
         log_scrollbar.pack(side='right', fill='y')
         self.log_text.config(yscrollcommand=log_scrollbar.set)
         
+        # UI donmaları (performance_monitor heartbeat/watchdog)
+        if get_stall_report:
+            stall_frame = tb.LabelFrame(self, text="🧊 UI Donmaları", bootstyle="secondary")
+            stall_frame.pack(fill='x', padx=10, pady=5)
+            self.stall_text = tk.Text(
+                stall_frame,
+                font=('Consolas', 9),
+                height=10,
+                wrap='none',
+                bg='#1e1e1e',
+                fg='#ffffff'
+            )
+            self.stall_text.pack(fill='x', padx=5, pady=5)
+        
         # Alt düymələr
         bottom_frame = tb.Frame(self)
         bottom_frame.pack(fill='x', padx=10, pady=10)
@@ -152,15 +252,32 @@ class DebugViewerWindow(tb.Toplevel):
         self.stats_label = tb.Label(bottom_frame, text="📊 Stats: 0 operations", font=('Helvetica', 9))
         self.stats_label.pack(side='left')
         
+        # Sorğu keşi statistikası
+        self.cache_stats_label = tb.Label(bottom_frame, text="", font=('Helvetica', 9))
+        self.cache_stats_label.pack(side='left', padx=20)
+        
         tb.Button(bottom_frame, text="❌ Bağla", command=self.destroy, bootstyle="danger").pack(side='right')
         
     def start_monitoring(self):
         """Debug faylını izləməyə başladır"""
         self.monitor_timer = self.after(100, self.check_debug_file)
         
+    def _follow_rotation(self):
+        """Debug faylı ölçü limitində növbəti hissəyə keçibsə (log_rotation), yeni hissəni izləyir"""
+        try:
+            from utils.realtime_debug import get_debugger
+        except ImportError:
+            from src.utils.realtime_debug import get_debugger
+        handler = getattr(get_debugger(), 'file_handler', None)
+        if handler is not None and Path(handler.baseFilename) != self.debug_file_path:
+            self.debug_file_path = Path(handler.baseFilename)
+            self.last_file_size = 0
+            self.last_content = ""
+    
     def check_debug_file(self):
         """Debug faylını yoxlayır"""
         try:
+            self._follow_rotation()
             if self.debug_file_path.exists():
                 current_size = self.debug_file_path.stat().st_size
                 
@@ -184,6 +301,9 @@ class DebugViewerWindow(tb.Toplevel):
         except Exception as e:
             self.status_label.config(text=f"❌ Xəta: {e}", foreground='red')
         
+        self.update_cache_stats()
+        self.update_stall_report()
+        
         # Növbəti yoxlama
         self.monitor_timer = self.after(100, self.check_debug_file)
         
@@ -251,6 +371,74 @@ class DebugViewerWindow(tb.Toplevel):
         
         self.stats_label.config(text=stats_text)
     
+    def update_cache_stats(self):
+        """Sorğu keşinin hit/miss sayğaclarını göstərir"""
+        if not get_query_cache_stats:
+            return
+        stats = get_query_cache_stats()
+        text = (f"🗃️ Keş: {stats['hits']} hit | {stats['misses']} miss | "
+                f"{stats['hit_rate'] * 100:.0f}% | {stats['size']}/{stats['max_entries']} giriş | "
+                f"{stats['invalidations']} etibarsız")
+        if text != self.cache_stats_label.cget('text'):
+            self.cache_stats_label.config(text=text)
+    
+    def update_stall_report(self):
+        """Donma histogramını və ən çox vaxt aparan stack-ləri göstərir (yalnız yeni donma olanda)"""
+        if not get_stall_report:
+            return
+        report = get_stall_report()
+        if report is None or report['stalls'] == self.last_stall_count:
+            return
+        self.last_stall_count = report['stalls']
+        
+        lines = [f"Donma: {report['stalls']} | cəmi {report['total_seconds']:.1f}s | "
+                 f"maks {report['max_seconds']:.2f}s | hədd {report['threshold_ms']:.0f}ms"]
+        lines.append("  ".join(f"{label}: {count}" for label, count in report['histogram']))
+        lines.append("")
+        for index, entry in enumerate(report['top_stacks'], 1):
+            lines.append(f"#{index} {entry['handler']} - {entry['stalls']} donma, "
+                         f"{entry['total_seconds']:.2f}s, maks {entry['max_seconds']:.2f}s, {entry['samples']} nümunə")
+            lines.extend(entry['stack'].split('\n')[-4:])
+        
+        self.stall_text.config(state='normal')
+        self.stall_text.delete('1.0', tk.END)
+        self.stall_text.insert('1.0', '\n'.join(lines))
+        self.stall_text.config(state='disabled')
+    
+    def clear_query_cache(self):
+        """Sorğu keşini təmizləyir"""
+        clear_query_cache()
+        self.update_cache_stats()
+    
+    def open_sql_stats(self):
+        """SQL statistikası pəncərəsini açır (açıqdırsa önə gətirir)"""
+        window = getattr(self, 'sql_stats_window', None)
+        if window is not None and window.winfo_exists():
+            window.lift()
+            return
+        self.sql_stats_window = SqlStatsWindow(self)
+    
+    def open_memory_diagnostics(self):
+        """Yaddaş diaqnostikası pəncərəsini açır (açıqdırsa önə gətirir)"""
+        window = getattr(self, 'memory_window', None)
+        if window is not None and window.winfo_exists():
+            window.lift()
+            return
+        self.memory_window = MemoryDiagnosticsWindow(self)
+    
+    def toggle_profiler(self):
+        """Profileri başladır və ya dayandırıb nəticə fayllarını göstərir"""
+        if not is_profiling():
+            start_profiling(MODE_CPROFILE if self.cprofile_var.get() else MODE_SAMPLING)
+            self.profiler_btn.config(text="⏹️ Profiler Dayandır", bootstyle="danger")
+            return
+        try:
+            paths = stop_profiling()
+            messagebox.showinfo("Profiler", "Profil yazıldı:\n" + "\n".join(paths))
+        except Exception as e:
+            messagebox.showerror("Xəta", f"Profil yazılarkən xəta: {e}")
+        self.profiler_btn.config(text="🔥 Profiler Başlat", bootstyle="secondary")
+    
     def clear_log(self):
         """Log-u təmizləyir"""
         try:
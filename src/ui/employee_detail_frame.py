@@ -3,6 +3,7 @@
 import tkinter as tk
 from tkinter import ttk
 import logging
+from collections.abc import Mapping
 from .components import mezuniyyet_muddetini_hesabla
 from .vacation_tree import VacationTreeView
 # Database import - şərti import
@@ -38,7 +39,7 @@ class EmployeeDetailFrame(ttk.Frame):
         """Bu görünüşü seçilmiş işçinin məlumatları ilə yeniləyir."""
         try:
             # Məlumatları yoxla
-            if not info or not isinstance(info, dict):
+            if not info or not isinstance(info, Mapping):
                 logging.error(f"Yanlış info məlumatı: {info}")
                 error_label = ttk.Label(self, text="Məlumatlar yüklənə bilmədi", foreground="red")
                 error_label.pack(expand=True, fill='both')
@@ -120,8 +121,9 @@ class EmployeeDetailFrame(ttk.Frame):
                     
                     # Cari işçinin məlumatlarını yenilə
                     if 'name' in info and info['name']:
-                        updated_info = self.main_app_ref.data.get(info['name'], {})
-                        if updated_info and isinstance(updated_info, dict) and 'name' in updated_info:
+                        store = self.main_app_ref._employee_store()
+                        updated_info = store.get(info.get('db_id')) or store.get_by_name(info['name'], {})
+                        if updated_info and isinstance(updated_info, Mapping) and 'name' in updated_info:
                             # UI thread-də yenilə
                             self.after(0, lambda: self.update_data(updated_info, current_user))
                         else:
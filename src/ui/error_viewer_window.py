@@ -192,10 +192,11 @@ class ErrorViewerPage(tk.Frame):
         
         # Log fayllarını yüklə
         try:
-            from database.error_queries import get_user_logs, get_log_users
-            log_list = get_user_logs()
+            # Yalnız siyahı (məzmunsuz) - log məzmunu seçiləndə açılır
+            from database.error_queries import get_user_log_index
+            log_list = get_user_log_index()
             for row in log_list:
-                log_id, user_id, username, log_type, log_content, log_timestamp, log_file_name = row
+                log_id, user_id, username, log_type, log_timestamp, log_file_name, content_size = row
                 # Log növünü tərcümə et
                 log_type_display = {
                     'debug_console': 'Debug Console',
@@ -210,7 +211,8 @@ class ErrorViewerPage(tk.Frame):
                     'user_id': user_id,
                     'timestamp': log_timestamp.strftime('%d.%m.%Y %H:%M:%S') if log_timestamp else '',
                     'log_type': log_type_display,
-                    'content': log_content,
+                    'content': None,
+                    'content_size': content_size or 0,
                     'log_file_name': log_file_name,
                     'status': None
                 }
@@ -259,11 +261,16 @@ class ErrorViewerPage(tk.Frame):
                 log_type_match = (data.get('log_type') == log_type_map.get(log_type, log_type))
             
             # Axtarış filtr
-            search_match = (search_term == "") or (search_term in data.get('content', '').lower())
+            # Axtarış filtr (açılmamış loglarda fayl adı üzrə)
+            search_text = data.get('content') if data.get('content') is not None else (data.get('log_file_name') or '')
+            search_match = (search_term == "") or (search_term in search_text.lower())
 
             if status_match and user_match and log_type_match and search_match:
                 # Məzmunun ilk 100 simvolunu göstər
-                content_preview = data.get('content', '')[:100] + ('...' if len(data.get('content', '')) > 100 else '')
+                if data.get('content') is None:
+                    content_preview = f"{data.get('log_file_name') or ''} ({self._format_size(data.get('content_size', 0))})"
+                else:
+                    content_preview = data['content'][:100] + ('...' if len(data['content']) > 100 else '')
                 
                 # Tag təyin et
                 if data.get('status') == 'Həll Edilib':
@@ -311,8 +318,8 @@ class ErrorViewerPage(tk.Frame):
             selected_key = selected_items[0]
             error_details = self.all_errors.get(selected_key)
             if error_details:
-                # Məzmunu göstər
-                content = error_details.get('content', '')
+                # Məzmunu göstər (log ilk dəfə açılanda bazadan alınır)
+                content = self._ensure_log_content(error_details)
                 if error_details.get('log_file_name'):
                     content = f"Fayl: {error_details['log_file_name']}\n\n{content}"
                 self.details_text.insert('1.0', content)
@@ -341,6 +348,24 @@ class ErrorViewerPage(tk.Frame):
 
         self.details_text.config(state='disabled')
 
+    def _ensure_log_content(self, details):
+        """Logun məzmununu lazım olanda bazadan alır və açır (bir dəfə, sonra yaddaşda qalır)"""
+        if details.get('content') is None and 'content_size' in details:
+            try:
+                from database.error_queries import get_log_content
+                details['content'] = get_log_content(details['id']) or ''
+            except Exception as e:
+                print(f"Log məzmunu yüklənərkən xəta: {e}")
+                return ''
+        return details.get('content') or ''
+
+    @staticmethod
+    def _format_size(size):
+        if size >= 1024 * 1024:
+            return f"{size / (1024 * 1024):.1f} MB"
+        if size >= 1024:
+            return f"{size / 1024:.1f} KB"
+        return f"{size} B"
          
     def on_escape(self):
         """Geri qayıtma funksiyası"""
@@ -470,6 +495,7 @@ class ErrorViewerPage(tk.Frame):
         
         try:
             log_details = self.selected_log_details
+            self._ensure_log_content(log_details)
             log_id = log_details.get('id')
             log_type = log_details.get('log_type', 'Bilinməyən')
             username = log_details.get('user', 'Bilinməyən')
@@ -11,6 +11,7 @@ import math
 import threading
 import importlib
 import inspect
+from collections.abc import Mapping
 logging.basicConfig(level=logging.DEBUG)
 
 # ttkbootstrap import etməyə çalış, əgər yoxdursa ttk istifadə et
@@ -38,6 +39,18 @@ except ImportError:
     def log_performance(*args, **kwargs): pass
     def log_sync_event(*args, **kwargs): pass
 
+# Metrikalar (əməliyyat müddəti histogramları) - şərti import
+try:
+    try:
+        from utils.metrics import timed
+    except ImportError:
+        from src.utils.metrics import timed
+except ImportError:
+    def timed(operation, registry=None):
+        def decorator(func):
+            return func
+        return decorator
+
 # Düzgün importlar əlavə edildi
 from .components import mezuniyyet_muddetini_hesabla, CustomDateEntry, VacationPanel
 
@@ -48,23 +61,26 @@ from .user_management_window import UserManagementPage
 from .employee_form_window import EmployeeFormWindow
 from .archive_window import ArchiveWindow
 from .error_viewer_window import ErrorViewerPage
+from .virtual_listbox import VirtualListbox
 # from .tools_window import ToolsWindow  # Silindi
 
 
 # Proyekt importları
-from database import database, command_queries, session_queries
+from database import database, command_queries, session_queries, heartbeat_queries
+from database.employee_store import EmployeeStore, NO_DEPARTMENT
+from database.search_index import search_employees, get_search_index
+from database.sql_stats import sql_action
 from utils.updater import UpdaterService
 from core.real_time_notifier import init_notifier, get_notifier, stop_notifier
 import tkinter as tk
 
 # Debug manager import
+# Print intercept-i core.main tətbiq başlayanda aktivləşdirir - bu modulun importu yan təsirsizdir
 try:
-    from utils.debug_manager import show_debug_window, debug_log, setup_debug_print_intercept
-    setup_debug_print_intercept()  # Print intercept'ini aktivləşdir
+    from utils.debug_manager import show_debug_window, debug_log
 except ImportError:
     try:
-        from src.utils.debug_manager import show_debug_window, debug_log, setup_debug_print_intercept
-        setup_debug_print_intercept()  # Print intercept'ini aktivləşdir
+        from src.utils.debug_manager import show_debug_window, debug_log
     except ImportError:
         def show_debug_window():
             pass
@@ -73,6 +89,12 @@ except ImportError:
 
 # Dashboard imports removed
 
+# Heartbeat intervalı (ms) - əmrlər, bildiriş sayı və məlumat versiyası bir sorğu ilə yoxlanılır
+HEARTBEAT_INTERVAL_MS = 5000
+
+# Axtarış debounce-u (ms) - sorğu yazma dayandıqdan sonra arxa fonda icra olunur
+SEARCH_DEBOUNCE_MS = 200
+
 class MainAppFrame(ttk.Frame):
     def __init__(self, parent, current_user, version_info, logout_callback):
         import time
@@ -122,8 +144,10 @@ class MainAppFrame(ttk.Frame):
         self.opened_windows = []  # Açıq pəncərələri izləmək üçün
         self.current_vacation_window = None  # Məzuniyyət pəncərəsini izləmək üçün
         self.notif_window = None
-        self.command_check_timer = None
-        self.auto_refresh_timer = None
+        self.heartbeat_timer = None
+        self.fallback_timer = None
+        self._heartbeat_in_flight = False
+        self._heartbeat_data_version = None
         self.master_logout_timer_id = None
         self.is_admin = self.current_user['role'].strip() == 'admin'
 
@@ -694,13 +718,13 @@ class MainAppFrame(ttk.Frame):
 
     def start_background_tasks(self):
         """Arxa fonda işləyən periodik yoxlamaları başladır."""
-        self.command_check_timer = self.after(5000, self._check_for_commands)  # 5 saniyədə bir
-        self.auto_refresh_timer = self.after(300000, self._auto_refresh_data)   # 5 dəqiqə - performans üçün artırıldı
+        # Əmrlər, bildiriş sayı və məlumat versiyası tək heartbeat sorğusu ilə yoxlanılır
+        self.heartbeat_timer = self.after(HEARTBEAT_INTERVAL_MS, self._heartbeat)
 
     def stop_background_tasks(self):
         """Pəncərə məhv edilməzdən əvvəl periodik yoxlamaları dayandırır."""
-        if self.command_check_timer: self.after_cancel(self.command_check_timer)
-        if self.auto_refresh_timer: self.after_cancel(self.auto_refresh_timer)
+        if self.heartbeat_timer: self.after_cancel(self.heartbeat_timer)
+        if self.fallback_timer: self.after_cancel(self.fallback_timer)
         if self.master_logout_timer_id: self.after_cancel(self.master_logout_timer_id)
 
     def destroy(self):
@@ -1907,8 +1931,8 @@ class MainAppFrame(ttk.Frame):
         except:
             pass
         
-        # Listbox-un görünüşünü yaxşılaşdır - daha modern və gözəl
-        self.employee_listbox = tk.Listbox(
+        # Virtual siyahı (Canvas) - yalnız görünən sətirlər çəkilir, tk.Listbox API-si ilə uyğundur
+        self.employee_listbox = VirtualListbox(
             listbox_frame, 
             font=(self.main_font, 10),  # Font ölçüsü azaldıldı - daha kompakt
             relief="flat", 
@@ -1919,7 +1943,6 @@ class MainAppFrame(ttk.Frame):
             fg='#333333',  # Tünd boz mətn
             selectbackground='#ffffff',  # Ağ seçim fonu - gri highlight yoxdur
             selectforeground='#333333',  # Tünd boz seçilmiş mətn
-            activestyle='none',  # Aktiv stil yoxdur - mouse hover highlight-ı bloklayır
             borderwidth=0,  # Border yoxdur
             highlightcolor='#ffffff',  # Ağ focus rəngi - highlight yoxdur
             cursor='hand2',  # Əl kursoru
@@ -2011,17 +2034,11 @@ class MainAppFrame(ttk.Frame):
             # Button-1 basılıdırsa və ya yaxın zamanda basıldıqsa, normal davranışa icazə ver
         
         def on_listbox_key(e):
-            """Keyboard event handler - klaviatura ilə gezinməni bloklayır"""
-            # Arrow keys və digər navigation keys-i blokla
+            """Keyboard event handler - klaviatura ilə gezinmə klik kimi etibarlı seçimdir"""
+            # VirtualListbox Up/Down/Prior/Next/Home/End ilə seçimi özü dəyişir (sinif bağlaması);
+            # bu, istifadəçinin öz hərəkətidir - <<ListboxSelect>> bloklanmasın
             if e.keysym in ['Up', 'Down', 'Prior', 'Next', 'Home', 'End']:
-                # Yalnız Button-1 basılı olduqda və ya yaxın zamanda basıldıqda icazə ver
-                current_time = time.time()
-                time_since_click = current_time - self._listbox_last_click_time
-                allow_selection = self._listbox_button1_pressed or time_since_click < 0.3
-                
-                if not allow_selection:
-                    print(f"🔍 [DEBUG] Keyboard navigation bloklandı: {e.keysym}")
-                    return "break"  # Keyboard navigation-u blokla
+                self._listbox_last_click_time = time.time()
         
         # Button-1 event-dən əvvəl scroll pozisyonunu saxla
         # Motion event-i Button-1-dən ƏVVƏL bind et ki, avtomatik seçim bloklansın
@@ -2049,7 +2066,10 @@ class MainAppFrame(ttk.Frame):
                     pass
                 return  # Event-i blokla
             
-            # Button-1 basıldıqda və ya yaxın zamanda basıldıqsa, normal handler-i çağır
+            # Button-1 basıldıqda və ya yaxın zamanda basıldıqsa (və ya klaviatura), normal handler-i çağır
+            selection = self.employee_listbox.curselection()
+            if selection:
+                self._last_valid_selection = selection[0]
             self.on_employee_select(event)
         
         self.employee_listbox.bind("<<ListboxSelect>>", on_listbox_select_wrapper)
@@ -2207,6 +2227,7 @@ class MainAppFrame(ttk.Frame):
         elif icon_type == 'hide':
             self.delete_employee()
     
+    @sql_action('ui.on_employee_select')
     def on_employee_select(self, event=None):
         import traceback
         
@@ -2318,7 +2339,7 @@ class MainAppFrame(ttk.Frame):
         # logging.info("İşçi seçildi - real vaxtda məlumatlar yenilənir...")
         # self.data = database.load_data_for_user(self.current_user)
         
-        info = self.data.get(selected_name)
+        info = self._selected_employee_record(selected_name)
         if not info:
             logging.debug("İşçi məlumatı tapılmadı, çıxırıq.")
             print("❌ DEBUG: İşçi məlumatı tapılmadı, çıxırıq.")
@@ -2425,13 +2446,12 @@ class MainAppFrame(ttk.Frame):
         target_department = None
         logging.info(f"Data-dan employee_id {employee_id} axtarılır...")
         print(f"🔍 DEBUG: Data-dan employee_id {employee_id} axtarılır...")
-        for name, data in self.data.items():
-            if data.get('db_id') == employee_id:
-                target_name = name
-                target_department = data.get('department', 'Şöbə təyin edilməyib')
-                logging.info(f"Tapılan target_name: {target_name}, şöbə: {target_department}")
-                print(f"✅ DEBUG: Tapılan target_name: {target_name}, şöbə: {target_department}")
-                break
+        data = self._employee_store().get_by_id(employee_id)
+        if data is not None:
+            target_name = data.get('name')
+            target_department = data.get('department') or NO_DEPARTMENT
+            logging.info(f"Tapılan target_name: {target_name}, şöbə: {target_department}")
+            print(f"✅ DEBUG: Tapılan target_name: {target_name}, şöbə: {target_department}")
                 
         if not target_name:
             logging.error(f"employee_id {employee_id} üçün target_name tapılmadı")
@@ -2623,6 +2643,7 @@ class MainAppFrame(ttk.Frame):
         logging.warning(f"Qrup açıldıqdan sonra da {target_name} tapılmadı")
         print(f"⚠️ DEBUG: Qrup açıldıqdan sonra da {target_name} tapılmadı")
 
+    @timed('ui.load_and_refresh_data')
     def load_and_refresh_data(self, selection_to_keep=None, load_full_data=False):
         """
         Məlumatları yükləyir - lazy loading ilə optimallaşdırılıb
@@ -2678,6 +2699,7 @@ class MainAppFrame(ttk.Frame):
         thread_create_start = time.time()
         print(f"🟢 [DEBUG] ⏱️ Thread yaradılır...")
         
+        @sql_action('ui.load_and_refresh_data')
         def load_data_async():
             thread_start_time = time.time()
             thread_id = threading.current_thread().ident
@@ -3011,6 +3033,7 @@ class MainAppFrame(ttk.Frame):
     def _load_employee_list_async(self):
         """İşçi siyahısını asinxron şəkildə yükləyir - UI donmasın"""
         import threading
+        @sql_action('ui.load_employee_list')
         def load_in_thread():
             try:
                 self._load_employee_list_only()
@@ -3043,6 +3066,7 @@ class MainAppFrame(ttk.Frame):
         """Tam məlumatları asinxron şəkildə yükləyir (işçilər + vacation məlumatları) - UI bloklanmır"""
         import threading
         import time
+        @sql_action('ui.load_full_data')
         def load_in_thread():
             thread_start = time.time()
             print(f"🔵 [DEBUG] _load_full_data_async thread başladı")
@@ -3141,8 +3165,17 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"_check_employee_selection_after_load xətası: {e}", exc_info=True)
         
+    def _employee_store(self):
+        """self.data-nı EmployeeStore kimi qaytarır (köhnə dict formatı gəlibsə çevirir)"""
+        data = getattr(self, 'data', None)
+        if not isinstance(data, EmployeeStore):
+            data = EmployeeStore.from_name_dict(data or {})
+            self.data = data
+        return data
+
+    @timed('ui.refresh_employee_list')
     def refresh_employee_list(self, selection_to_keep=None):
-        """İşçi siyahısını yeniləyir - asinxron batch processing ilə UI bloklanmır"""
+        """İşçi siyahısını yeniləyir - əvvəlki siyahı ilə açar üzrə fərq tətbiq olunur, yalnız görünən sətirlər çəkilir"""
         import time
         import threading
         import traceback
@@ -3152,12 +3185,6 @@ class MainAppFrame(ttk.Frame):
         print(f"🔍 [DEBUG] refresh_employee_list çağırıldı: selection_to_keep={selection_to_keep}")
         print(f"🔍 [DEBUG] Çağırılan yer:\n{caller_stack}")
         
-        # Əgər artıq refresh işləyirsə, gözlə
-        if hasattr(self, '_refresh_in_progress') and self._refresh_in_progress:
-            print(f"⚠️ [DEBUG] refresh_employee_list: Artıq refresh işləyir, gözləyirəm...")
-            self.after(100, lambda: self.refresh_employee_list(selection_to_keep))
-            return
-        
         refresh_start = time.time()
         thread_id = threading.current_thread().ident
         thread_name = threading.current_thread().name
@@ -3169,106 +3196,64 @@ class MainAppFrame(ttk.Frame):
             logging.warning("employee_listbox tapılmadı!")
             return
         
-        # Scroll pozisyonunu logla və saxla (listbox təmizlənmədən əvvəl)
-        scroll_pos_to_preserve = None
-        try:
-            if hasattr(self, 'employee_listbox'):
-                try:
-                    first_visible_before = self.employee_listbox.index("@0,0")
-                    last_visible_before = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
-                    scroll_pos_to_preserve = first_visible_before
-                    print(f"🔍 [DEBUG] refresh_employee_list BAŞLAMADAN ƏVVƏL: scroll pozisyonu: first_visible={first_visible_before}, last_visible={last_visible_before}, scroll_pos_to_preserve={scroll_pos_to_preserve}")
-                except Exception as e:
-                    print(f"🔍 [DEBUG] refresh_employee_list BAŞLAMADAN ƏVVƏL: scroll pozisyonu alına bilmədi: {e}")
-        except Exception as e:
-            print(f"🔍 [DEBUG] refresh_employee_list BAŞLAMADAN ƏVVƏL: scroll pozisyonu xətası: {e}")
-        
-        # Cari seçimi saxla (listbox təmizlənmədən əvvəl)
-        current_selection_name = None
-        current_idx_before = None
-        if not selection_to_keep:
-            try:
-                current_selection = self.employee_listbox.curselection()
-                if current_selection:
-                    current_idx_before = current_selection[0]
-                    current_item_text = self.employee_listbox.get(current_idx_before)
-                    # İşçi adını çıxar (● və ya ○ işarələrini və digər məlumatları sil)
-                    current_selection_name = current_item_text.replace("● ", "").replace("○ ", "").split(" [")[0].split(" (")[0].strip()
-                    print(f"🔍 [DEBUG] Cari seçim tapıldı (listbox təmizlənmədən əvvəl): index={current_idx_before}, name={current_selection_name}, item_text={current_item_text[:50]}")
-            except Exception as e:
-                print(f"🔍 [DEBUG] Cari seçimi alma xətası: {e}")
-                import traceback
-                print(f"🔍 [DEBUG] Cari seçimi alma xəta traceback:\n{traceback.format_exc()}")
-        
-        # Əgər selection_to_keep None idisə və cari seçim varsa, onu istifadə et
-        if not selection_to_keep and current_selection_name:
-            selection_to_keep = current_selection_name
-            print(f"🔍 [DEBUG] selection_to_keep None idi, cari seçim istifadə edildi: {selection_to_keep}")
-        
-        print(f"🔍 [DEBUG] refresh_employee_list: selection_to_keep={selection_to_keep}, current_idx_before={current_idx_before}")
-        
-        delete_start = time.time()
-        print(f"🔵 [DEBUG] [UI THREAD] ⏱️ listbox.delete çağırılır...")
-        self.employee_listbox.delete(0, tb.END)
-        delete_time = time.time() - delete_start
-        print(f"🔵 [DEBUG] [UI THREAD] ⏱️ listbox təmizləndi: {delete_time:.3f}s")
-        if delete_time > 0.1:
-            print(f"⚠️ [DEBUG] [UI THREAD] ⚠️ listbox.delete() ÇOX UZUN: {delete_time:.3f}s - UI BLOKLANIR!")
         
         if not hasattr(self, 'data') or not self.data: 
             print(f"⚠️ [DEBUG] [UI THREAD] refresh_employee_list: Data yoxdur! hasattr data: {hasattr(self, 'data')}, data: {getattr(self, 'data', None)}")
             logging.warning(f"Data yoxdur! hasattr data: {hasattr(self, 'data')}, data: {getattr(self, 'data', None)}")
+            self.employee_listbox.update_items([], [])
             return
         
         print(f"🔵 [DEBUG] [UI THREAD] refresh_employee_list: Data ölçü: {len(self.data)}, User: {self.current_user.get('name', 'unknown')}")
         logging.info(f"refresh_employee_list çağırıldı. Data ölçü: {len(self.data)}, User: {self.current_user.get('name', 'unknown')}")
         
         # Təhlükəsizlik yoxlaması: Adi istifadəçi yalnız öz adını görə bilər
+        # Şöbə qruplaşdırması EmployeeStore-un şöbə indeksindən götürülür (hər yeniləmədə dict yenidən qruplaşdırılmır)
         filter_start = time.time()
+        store = self._employee_store()
+        departments_dict = {}
+        search_ranks = None
         if self.current_user['role'].strip() != 'admin':
             # Adi istifadəçi üçün yalnız öz adını göstəririk
             current_user_name = self.current_user.get('name', '')
-            filtered_data = {}
-            # Yalnız öz adını göstər
-            if current_user_name in self.data:
-                filtered_data[current_user_name] = self.data[current_user_name]
+            emp_data = store.get_by_name(current_user_name)
+            if emp_data is not None:
+                dept = emp_data.get('department') or NO_DEPARTMENT
+                departments_dict[dept] = [(current_user_name, emp_data)]
         else:
             # Admin üçün bütün məlumatları göstəririk (filtr varsa tətbiq edilir)
-            filtered_data = self.data.copy()
-            
-            # Filtr tətbiq et (şöbə və axtarış)
             if hasattr(self, 'selected_department_filter') and self.selected_department_filter:
-                filtered_data = {name: data for name, data in filtered_data.items() 
-                               if isinstance(data, dict) and data.get('department', '') == self.selected_department_filter}
-            
-            if hasattr(self, 'search_text') and self.search_text:
-                search_lower = self.search_text.lower()
-                filtered_data = {name: data for name, data in filtered_data.items() 
-                               if search_lower in name.lower() or 
-                               (isinstance(data, dict) and search_lower in data.get('department', '').lower())}
+                departments = [self.selected_department_filter]
+            else:
+                departments = store.departments()
+            for dept in departments:
+                employees = store.employees_in_department(dept)
+                if employees:
+                    departments_dict[dept] = employees
+            
+            # Axtarış: nəticələr arxa fonda search_index ilə hesablanır (_run_search); burada yalnız
+            # hazır ID -> sıra xəritəsi tətbiq edilir. Nəticə hələ gəlməyibsə siyahı filtrsiz qalır.
+            search_ranks = getattr(self, '_search_results', None) if getattr(self, 'search_text', '') else None
+            if search_ranks is not None:
+                departments_dict = {
+                    dept: [(name, data) for name, data in employees if data.get('db_id') in search_ranks]
+                    for dept, employees in departments_dict.items()
+                }
+                departments_dict = {dept: employees for dept, employees in departments_dict.items() if employees}
+                if getattr(self, '_search_store', None) is not store:
+                    # Axtarışdan sonra məlumat yeniləndi - yeni anbar üzrə sorğunu təkrarla
+                    self._schedule_search()
         
         filter_time = time.time() - filter_start
-        print(f"🔵 [DEBUG] [UI THREAD] refresh_employee_list: Filtr tətbiq edildi: {filter_time:.3f}s, filtered_data ölçü: {len(filtered_data)}")
+        filtered_count = sum(len(employees) for employees in departments_dict.values())
+        print(f"🔵 [DEBUG] [UI THREAD] refresh_employee_list: Filtr tətbiq edildi: {filter_time:.3f}s, filtered_data ölçü: {filtered_count}")
         
-        # Şöbələr üzrə qruplaşdırma
         group_start = time.time()
-        departments_dict = {}
-        for name, emp_data in filtered_data.items():
-            if isinstance(emp_data, dict):
-                dept = emp_data.get('department', 'Şöbə təyin edilməyib')
-            else:
-                dept = 'Şöbə təyin edilməyib'
-            
-            if dept not in departments_dict:
-                departments_dict[dept] = []
-            departments_dict[dept].append((name, emp_data))
         
         group_time = time.time() - group_start
         print(f"🔵 [DEBUG] refresh_employee_list: Qruplaşdırma bitdi: {group_time:.3f}s, departments: {len(departments_dict)}")
         
         # Hazırlıq: Şöbələri və işçiləri hazırla
         prep_start = time.time()
-        restored_idx = -1
         
         # Şöbələrin gizlənməsi üçün dictionary
         if not hasattr(self, 'department_visibility'):
@@ -3281,6 +3266,9 @@ class MainAppFrame(ttk.Frame):
         
         # Filtr tətbiq olunubsa, yalnız seçilmiş şöbəni göstər
         filtered_departments = sorted(departments_dict.keys())
+        if search_ranks is not None:
+            # Axtarış zamanı ən yaxşı nəticəsi olan şöbə yuxarıda
+            filtered_departments.sort(key=lambda dept: min(search_ranks[data['db_id']] for _, data in departments_dict[dept]))
         if hasattr(self, 'selected_department_filter') and self.selected_department_filter:
             filtered_departments = [dept for dept in filtered_departments if dept == self.selected_department_filter]
         
@@ -3289,6 +3277,7 @@ class MainAppFrame(ttk.Frame):
         
         # Bütün item-ləri hazırla (listbox-a yazmadan)
         all_items = []  # [(item_text, fg_color, bg_color, is_dept_header, name_for_selection), ...]
+        item_keys = []  # diff açarları: işçi ID-si və ya ('dept', şöbə)
         
         for dept in filtered_departments:
             # Şöbə başlığı
@@ -3299,15 +3288,20 @@ class MainAppFrame(ttk.Frame):
                 if hasattr(self, 'selected_department_filter') and self.selected_department_filter == dept:
                     self.department_visibility[dept] = True
                 
-                is_expanded = self.department_visibility.get(dept, False)
+                # Axtarış zamanı nəticəsi olan şöbələr müvəqqəti açıq göstərilir (department_visibility dəyişmir)
+                is_expanded = self.department_visibility.get(dept, False) or search_ranks is not None
                 expand_indicator = "▼" if is_expanded else "▶"
                 dept_header = f"{expand_indicator} {dept}"
                 all_items.append((dept_header, '#1976d2', '#f5f5f5', True, None))
+                item_keys.append(('dept', dept))
             
             # Şöbədəki işçilər
-            should_show_employees = True if not self.is_admin else self.department_visibility.get(dept, True)
+            should_show_employees = True if not self.is_admin else (self.department_visibility.get(dept, True) or search_ranks is not None)
             if should_show_employees:
-                employees_in_dept = sorted(departments_dict[dept], key=lambda x: x[0])
+                if search_ranks is not None:
+                    employees_in_dept = sorted(departments_dict[dept], key=lambda x: search_ranks[x[1]['db_id']])
+                else:
+                    employees_in_dept = sorted(departments_dict[dept], key=lambda x: x[0])
                 for name, employee_data in employees_in_dept:
                     if isinstance(employee_data, bool):
                         is_active_account = employee_data
@@ -3337,265 +3331,57 @@ class MainAppFrame(ttk.Frame):
                         bg_color = "#ffffff"
                     
                     all_items.append((display_name, color, bg_color, False, name))
+                    # Açar işçi ID-sidir - eyni adlı işçilər ayrı sətirlərdir
+                    item_keys.append(employee_data.get('db_id', name) if isinstance(employee_data, Mapping) else name)
         
         prep_time = time.time() - prep_start
         print(f"🔵 [DEBUG] [UI THREAD] Hazırlıq bitdi: {prep_time:.3f}s, items: {len(all_items)}")
         
-        # OPTİMALLAŞDIRMA: Asinxron batch processing ilə listbox-a yaz
-        self._refresh_in_progress = True
-        batch_size = 50  # OPTİMALLAŞDIRMA: 10-dan 50-yə artırdıq - daha az batch, daha sürətli
-        self._refresh_batch_index = 0
-        self._refresh_items = all_items
-        self._refresh_selection_to_keep = selection_to_keep
-        self._refresh_start_time = refresh_start
-        self._refresh_delete_time = delete_time
-        self._refresh_filter_time = filter_time
-        self._refresh_group_time = group_time
-        self._refresh_display_start_time = time.time()  # Display başlanğıc vaxtı
-        self._refresh_batch_count = 0  # OPTİMALLAŞDIRMA: Batch sayğacı
-        
-        def process_batch():
-            try:
-                batch_start = time.time()
-                start_idx = self._refresh_batch_index
-                end_idx = min(start_idx + batch_size, len(self._refresh_items))
-                
-                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ process_batch BAŞLADI: batch={self._refresh_batch_count}, start_idx={start_idx}, end_idx={end_idx}, total={len(self._refresh_items)}")
-                
-                if start_idx >= len(self._refresh_items):
-                    # Bitdi
-                    self._refresh_in_progress = False
-                    display_end_time = time.time()
-                    display_time = display_end_time - self._refresh_display_start_time
-                    
-                    print(f"🔵 [DEBUG] [UI THREAD] ⏱️ process_batch: Bütün batch-lər bitdi, display_time: {display_time:.3f}s")
-                    
-                    # Seçimi bərpa et
-                    restore_start = time.time()
-                    if hasattr(self, 'employee_listbox'):
-                        restored_idx = -1
-                        restored_name = None
-                        
-                        print(f"🔍 [DEBUG] [UI THREAD] Seçim bərpa prosesi başladı: selection_to_keep={self._refresh_selection_to_keep}, total_items={len(self._refresh_items)}")
-                        
-                        # Əgər selection_to_keep None deyilsə, onu tap
-                        if self._refresh_selection_to_keep:
-                            print(f"🔍 [DEBUG] [UI THREAD] selection_to_keep axtarılır: '{self._refresh_selection_to_keep}'")
-                            for idx, (_, _, _, _, name) in enumerate(self._refresh_items):
-                                if name == self._refresh_selection_to_keep:
-                                    restored_idx = idx
-                                    restored_name = name
-                                    print(f"🔍 [DEBUG] selection_to_keep tapıldı: name={name}, index={idx}")
-                                    break
-                            if restored_idx == -1:
-                                print(f"🔍 [DEBUG] [UI THREAD] ⚠️ selection_to_keep tapılmadı: '{self._refresh_selection_to_keep}'")
-                                # İlk 5 item-in adlarını göster
-                                print(f"🔍 [DEBUG] [UI THREAD] İlk 5 item: {[(idx, name) for idx, (_, _, _, _, name) in enumerate(self._refresh_items[:5])]}")
-                        else:
-                            print(f"🔍 [DEBUG] [UI THREAD] selection_to_keep None, seçim bərpa edilməyəcək")
-                        # selection_to_keep artıq refresh_employee_list başında təyin olunub (cari seçimdən)
-                        # Burada yalnız selection_to_keep varsa onu tapırıq
-                        
-                        if restored_idx != -1:
-                            sel_start = time.time()
-                            print(f"🔵 [DEBUG] [UI THREAD] ⏱️ Seçim bərpa edilir: index={restored_idx}, name={restored_name}, selection_to_keep={self._refresh_selection_to_keep}")
-                            
-                            # Event'i geçici olaraq devre dışı bırak ki, selection_set() <<ListboxSelect>> event'ini tetiklemesin
-                            # Bu, otomatik gezinməyə səbəb olan döngünü qırır
-                            try:
-                                # Scroll pozisyonunu selection_set-dən əvvəl saxla
-                                scroll_pos_before = None
-                                try:
-                                    scroll_pos_before = self.employee_listbox.index("@0,0")
-                                    print(f"🔍 [DEBUG] [UI THREAD] selection_set-dən ƏVVƏL scroll pozisyonu: first_visible={scroll_pos_before}")
-                                except:
-                                    pass
-                                
-                                # Event binding'i geçici olaraq kaldır
-                                self.employee_listbox.unbind("<<ListboxSelect>>")
-                                print(f"🔍 [DEBUG] <<ListboxSelect>> event'i geçici olaraq kaldırıldı (restore üçün)")
-                                
-                                # Seçimin görünür olub olmadığını selection_set-dən ƏVVƏL yoxla
-                                first_visible_before_set = None
-                                last_visible_before_set = None
-                                try:
-                                    first_visible_before_set = self.employee_listbox.index("@0,0")
-                                    last_visible_before_set = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
-                                    print(f"🔍 [DEBUG] [UI THREAD] selection_set-dən ƏVVƏL görünürlük: restored_idx={restored_idx}, first_visible={first_visible_before_set}, last_visible={last_visible_before_set}, görünür={first_visible_before_set <= restored_idx <= last_visible_before_set}")
-                                except Exception as e:
-                                    print(f"🔍 [DEBUG] [UI THREAD] selection_set-dən ƏVVƏL görünürlük xətası: {e}")
-                                
-                                self.employee_listbox.selection_set(restored_idx)
-                                sel_time1 = time.time() - sel_start
-                                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ selection_set bitdi: {sel_time1:.3f}s, index={restored_idx}")
-                                
-                                # selection_set-dən SONRA scroll pozisyonunu yoxla (Tkinter otomatik scroll edib edilmədiyini görmək üçün)
-                                try:
-                                    first_visible_after_set = self.employee_listbox.index("@0,0")
-                                    last_visible_after_set = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
-                                    print(f"🔍 [DEBUG] [UI THREAD] selection_set-dən SONRA scroll pozisyonu: first_visible={first_visible_after_set}, last_visible={last_visible_after_set}")
-                                    
-                                    # Əgər Tkinter otomatik scroll etmişsə və seçim artıq görünürsə, scroll pozisyonunu geri qaytar
-                                    if scroll_pos_before is not None and first_visible_before_set is not None:
-                                        if first_visible_before_set <= restored_idx <= last_visible_before_set:
-                                            # Seçim əvvəldən görünürdü, scroll pozisyonu dəyişməməlidir
-                                            if first_visible_after_set != first_visible_before_set:
-                                                print(f"🔍 [DEBUG] [UI THREAD] ⚠️ Tkinter otomatik scroll etdi! Əvvəl: {first_visible_before_set}, sonra: {first_visible_after_set}, geri qaytarılır...")
-                                                self.employee_listbox.see(scroll_pos_before)
-                                                try:
-                                                    first_visible_restored = self.employee_listbox.index("@0,0")
-                                                    print(f"🔍 [DEBUG] [UI THREAD] ✅ Scroll pozisyonu geri qaytarıldı: {first_visible_restored}")
-                                                except:
-                                                    pass
-                                            else:
-                                                print(f"🔍 [DEBUG] [UI THREAD] ✅ Scroll pozisyonu dəyişmədi (gözlənilən)")
-                                except Exception as e:
-                                    print(f"🔍 [DEBUG] [UI THREAD] selection_set-dən SONRA scroll pozisyonu xətası: {e}")
-                                
-                                # Event binding'i geri qaytar
-                                self.employee_listbox.bind("<<ListboxSelect>>", self.on_employee_select)
-                                print(f"🔍 [DEBUG] <<ListboxSelect>> event'i geri qaytarıldı (restore üçün)")
-                                
-                                # Scroll pozisyonunu yalnız seçim görünür deyilsə dəyişdir
-                                # Bu, kullanıcı manuel scroll yaptığında pozisyonu korur
-                                try:
-                                    # Seçimin görünür olub olmadığını yoxla
-                                    first_visible = self.employee_listbox.index("@0,0")
-                                    last_visible = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
-                                    listbox_height = self.employee_listbox.winfo_height()
-                                    total_items = self.employee_listbox.size()
-                                    
-                                    print(f"🔍 [DEBUG] [UI THREAD] Scroll kontrolü (final): restored_idx={restored_idx}, first_visible={first_visible}, last_visible={last_visible}, listbox_height={listbox_height}, total_items={total_items}, scroll_pos_to_preserve={scroll_pos_to_preserve}")
-                                    
-                                    # Seçim görünür deyilsə, scroll et
-                                    if restored_idx < first_visible or restored_idx > last_visible:
-                                        print(f"🔍 [DEBUG] [UI THREAD] ⚠️ Seçim görünür deyil, scroll ediləcək: restored_idx={restored_idx}, first_visible={first_visible}, last_visible={last_visible}")
-                                        sel_start2 = time.time()
-                                        self.employee_listbox.see(restored_idx)
-                                        sel_time3 = time.time() - sel_start2
-                                        
-                                        # Scroll sonrası pozisyonu yoxla
-                                        try:
-                                            first_visible_after = self.employee_listbox.index("@0,0")
-                                            last_visible_after = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
-                                            print(f"🔵 [DEBUG] [UI THREAD] ⏱️ see bitdi (scroll edildi): {sel_time3:.3f}s, restored_idx={restored_idx}, scroll sonrası: first_visible={first_visible_after}, last_visible={last_visible_after}")
-                                        except:
-                                            print(f"🔵 [DEBUG] [UI THREAD] ⏱️ see bitdi (scroll edildi): {sel_time3:.3f}s, restored_idx={restored_idx}")
-                                    else:
-                                        print(f"🔵 [DEBUG] [UI THREAD] ✅ Seçim artıq görünür, scroll edilmədi: restored_idx={restored_idx}, first_visible={first_visible}, last_visible={last_visible}")
-                                        
-                                        # Əgər scroll pozisyonu dəyişibsə və seçim görünürsə, scroll pozisyonunu geri qaytar
-                                        if scroll_pos_to_preserve is not None and first_visible != scroll_pos_to_preserve:
-                                            print(f"🔍 [DEBUG] [UI THREAD] ⚠️ Scroll pozisyonu dəyişib! Əvvəl: {scroll_pos_to_preserve}, indi: {first_visible}, geri qaytarılır...")
-                                            try:
-                                                self.employee_listbox.see(scroll_pos_to_preserve)
-                                                restored_first_visible = self.employee_listbox.index("@0,0")
-                                                print(f"🔍 [DEBUG] [UI THREAD] ✅ Scroll pozisyonu geri qaytarıldı: {restored_first_visible}")
-                                            except Exception as e:
-                                                print(f"🔍 [DEBUG] [UI THREAD] Scroll pozisyonu geri qaytarma xətası: {e}")
-                                except Exception as e:
-                                    # Xəta halında scroll etmə (otomatik gezinməyə səbəb olmasın)
-                                    import traceback
-                                    print(f"🔍 [DEBUG] Scroll kontrolü xətası: {e}, scroll edilmədi")
-                                    print(f"🔍 [DEBUG] Scroll kontrolü xəta traceback:\n{traceback.format_exc()}")
-                                    
-                            except Exception as e:
-                                print(f"❌ [DEBUG] Event binding xətası: {e}")
-                                import traceback
-                                print(f"❌ [DEBUG] Event binding xəta traceback:\n{traceback.format_exc()}")
-                                # Xəta halında sadəcə selection_set et
-                                self.employee_listbox.selection_set(restored_idx)
-                                sel_time1 = time.time() - sel_start
-                                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ selection_set bitdi (xəta halında): {sel_time1:.3f}s")
-                        else:
-                            print(f"🔍 [DEBUG] Seçim bərpa edilmədi: selection_to_keep={self._refresh_selection_to_keep}, restored_idx={restored_idx}")
-                            # Seçim yoxdursa, heç bir şey seçmə (otomatik gezinməyə səbəb olmasın)
-                            try:
-                                # Event'i geçici olaraq kaldır və seçimi təmizlə
-                                self.employee_listbox.unbind("<<ListboxSelect>>")
-                                self.employee_listbox.selection_clear(0, tb.END)
-                                self.employee_listbox.bind("<<ListboxSelect>>", self.on_employee_select)
-                                print(f"🔍 [DEBUG] Seçim təmizləndi (selection_to_keep=None)")
-                            except Exception as e:
-                                print(f"❌ [DEBUG] Seçim təmizləmə xətası: {e}")
-                            
-                            # activate() çağrısını kaldırdıq - otomatik gezinməyə səbəb olur
-                            # selection_set() kifayətdir və otomatik gezinməyə səbəb olmur
-                    
-                    restore_time = time.time() - restore_start
-                    print(f"🔵 [DEBUG] [UI THREAD] ⏱️ Seçim bərpa tamamlandı: {restore_time:.3f}s")
-                    
-                    total_time = time.time() - self._refresh_start_time
-                    print(f"🔵 [DEBUG] [UI THREAD] ⏱️ refresh_employee_list TAM BİTDİ: {total_time:.3f}s (delete: {self._refresh_delete_time:.3f}s, filter: {self._refresh_filter_time:.3f}s, group: {self._refresh_group_time:.3f}s, display: {display_time:.3f}s)")
-                    return
-                
-                # DEBUG: Batch-i işlə - DETALLI LOGLAR
-                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ Batch işləməyə başladı: {start_idx}-{end_idx-1}/{len(self._refresh_items)}")
-                insert_start = time.time()
-                
-                for idx in range(start_idx, end_idx):
-                    item_start = time.time()
-                    item_text, fg_color, bg_color, is_dept, name = self._refresh_items[idx]
-                    
-                    size_start = time.time()
-                    item_index = self.employee_listbox.size()
-                    size_time = time.time() - size_start
-                    if size_time > 0.01:
-                        print(f"⚠️ [DEBUG] [UI THREAD] ⏱️ listbox.size() çox uzun: {size_time:.3f}s")
-                    
-                    insert_item_start = time.time()
-                    self.employee_listbox.insert(tb.END, item_text)
-                    insert_item_time = time.time() - insert_item_start
-                    if insert_item_time > 0.01:
-                        print(f"⚠️ [DEBUG] [UI THREAD] ⏱️ listbox.insert() çox uzun: {insert_item_time:.3f}s, item: {item_text[:50]}")
-                    
-                    config_start = time.time()
-                    self.employee_listbox.itemconfig(item_index, {'fg': fg_color, 'bg': bg_color})
-                    config_time = time.time() - config_start
-                    if config_time > 0.01:
-                        print(f"⚠️ [DEBUG] [UI THREAD] ⏱️ itemconfig() çox uzun: {config_time:.3f}s, item: {item_text[:50]}")
-                    
-                    item_time = time.time() - item_start
-                    if item_time > 0.05:  # 50ms-dən çox çəkərsə
-                        print(f"⚠️ [DEBUG] [UI THREAD] ⏱️ Item işləməsi çox uzun: {item_time:.3f}s, item: {item_text[:50]}")
-                
-                insert_time = time.time() - insert_start
-                batch_time = time.time() - batch_start
-                self._refresh_batch_count += 1
-                
-                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ Batch bitdi: batch={self._refresh_batch_count}, batch_time={batch_time:.3f}s, insert_time={insert_time:.3f}s, items={end_idx - start_idx}")
-                
-                # Növbəti batch-i planla
-                self._refresh_batch_index = end_idx
-                
-                # DEBUG: update_idletasks() çağırışı
-                if self._refresh_batch_count % 3 == 0:
-                    idletasks_start = time.time()
-                    print(f"🔵 [DEBUG] [UI THREAD] ⏱️ update_idletasks() çağırılır (batch={self._refresh_batch_count})...")
-                    self.update_idletasks()
-                    idletasks_time = time.time() - idletasks_start
-                    print(f"🔵 [DEBUG] [UI THREAD] ⏱️ update_idletasks() bitdi: {idletasks_time:.3f}s")
-                    if idletasks_time > 0.1:
-                        print(f"⚠️ [DEBUG] [UI THREAD] ⚠️ update_idletasks() ÇOX UZUN: {idletasks_time:.3f}s - UI BLOKLANIR!")
-                
-                # DEBUG: after() çağırışı
-                after_start = time.time()
-                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ after(1, process_batch) çağırılır...")
-                self.after(1, process_batch)
-                after_time = time.time() - after_start
-                print(f"🔵 [DEBUG] [UI THREAD] ⏱️ after() bitdi: {after_time:.3f}s")
-                if after_time > 0.01:
-                    print(f"⚠️ [DEBUG] [UI THREAD] ⚠️ after() çox uzun: {after_time:.3f}s")
-                
-            except Exception as e:
-                print(f"❌ [DEBUG] [UI THREAD] Batch processing xətası: {e}")
-                import traceback
-                print(f"❌ [DEBUG] [UI THREAD] Batch processing xəta traceback:\n{traceback.format_exc()}")
-                self._refresh_in_progress = False
-        
-        # İlk batch-i başlat - 0ms gecikmə ilə dərhal başlat
-        print(f"🔵 [DEBUG] [UI THREAD] İlk batch planlanır, items: {len(all_items)}")
-        self.after(0, process_batch)
+        # Əvvəlki siyahı ilə açar üzrə fərq: yalnız əlavə/silmə/dəyişən sətirlər tətbiq olunur (ui.virtual_listbox).
+        # Seçim açara, scroll görünən ilk sətrə bağlıdır - heç biri sonradan bərpa edilmir.
+        display_start = time.time()
+        diff_stats = self.employee_listbox.update_items(
+            [(item_text, fg_color, bg_color) for item_text, fg_color, bg_color, _, _ in all_items], item_keys)
+        
+        # Çağıran konkret işçini seçmək istəyirsə (məs. yeni əlavə olunan) - select event yaratmır
+        if selection_to_keep:
+            restored_idx = self._employee_row_index(store, selection_to_keep)
+            if restored_idx is None:
+                print(f"🔍 [DEBUG] [UI THREAD] ⚠️ selection_to_keep tapılmadı: '{selection_to_keep}'")
+            elif self.employee_listbox.curselection() != (restored_idx,):
+                self.employee_listbox.selection_clear(0, tb.END)
+                self.employee_listbox.selection_set(restored_idx)
+                first_visible = self.employee_listbox.index("@0,0")
+                last_visible = self.employee_listbox.index("@0,{}".format(self.employee_listbox.winfo_height()))
+                # Scroll yalnız seçim görünmürsə dəyişir
+                if restored_idx < first_visible or restored_idx > last_visible:
+                    self.employee_listbox.see(restored_idx)
+        
+        display_time = time.time() - display_start
+        total_time = time.time() - refresh_start
+        print(f"🔵 [DEBUG] [UI THREAD] ⏱️ refresh_employee_list TAM BİTDİ: {total_time:.3f}s (filter: {filter_time:.3f}s, group: {group_time:.3f}s, display: {display_time:.3f}s, items: {len(all_items)}, diff: {diff_stats})")
+
+    def _employee_row_index(self, store, name):
+        """Adın siyahıdakı sətri: cari seçim həmin adlı işçidirsə o, yoxsa adın ilk işçisi"""
+        listbox = self.employee_listbox
+        for index in listbox.curselection():
+            if store.name_of(listbox.key_at(index)) == name:
+                return index
+        return listbox.index_of_key(store.id_of(name))
+
+    def _selected_employee_record(self, selected_name):
+        """
+        Seçilmiş sətrin işçi qeydi - sətirlər işçi ID-si ilə açarlanır, ona görə eyni adlı
+        işçilərdən məhz seçilən qaytarılır. Seçim bu adda deyilsə ad üzrə axtarılır.
+        """
+        store = self._employee_store()
+        listbox = getattr(self, 'employee_listbox', None)
+        if listbox is not None:
+            for index in listbox.curselection():
+                record = store.get(listbox.key_at(index))
+                if record is not None and record.get('name') == selected_name:
+                    return record
+        return store.get_by_name(selected_name)
 
     def get_selected_employee_name(self):
         if not hasattr(self, 'employee_listbox') or not self.employee_listbox.curselection(): return None, None
@@ -3610,11 +3396,12 @@ class MainAppFrame(ttk.Frame):
         # Təhlükəsizlik yoxlaması: Adi istifadəçi yalnız öz şöbəsinin işçilərini seçə bilər
         if self.current_user['role'].strip() != 'admin':
             current_user_name = self.current_user.get('name', '')
-            current_user_data = self.data.get(current_user_name, {})
-            current_user_department = current_user_data.get('department', '') if isinstance(current_user_data, dict) else ''
+            store = self._employee_store()
+            current_user_data = store.get_by_name(current_user_name, {})
+            current_user_department = current_user_data.get('department', '') if isinstance(current_user_data, Mapping) else ''
             
-            selected_emp_data = self.data.get(clean_name, {})
-            selected_emp_department = selected_emp_data.get('department', '') if isinstance(selected_emp_data, dict) else ''
+            selected_emp_data = store.get_by_name(clean_name, {})
+            selected_emp_department = selected_emp_data.get('department', '') if isinstance(selected_emp_data, Mapping) else ''
             
             if selected_emp_department != current_user_department:
                 # Adi istifadəçi başqa şöbənin işçisini seçməyə çalışırsa, öz məlumatını qaytarırıq
@@ -3699,6 +3486,10 @@ class MainAppFrame(ttk.Frame):
             close_btn.pack(side='right')
             
             self.search_text = ""
+            self._clear_search_results()
+            # İndeksi əvvəlcədən arxa fonda qur - ilk sorğu gözləməsin
+            threading.Thread(target=get_search_index, args=(self._employee_store(),),
+                             daemon=True, name="SearchIndexWarmup").start()
         else:
             # Panel varsa bağla
             self._close_search()
@@ -3711,13 +3502,74 @@ class MainAppFrame(ttk.Frame):
             self.search_text = ""
             if hasattr(self, 'search_var'):
                 self.search_var.set("")
+            self._clear_search_results()
             self.refresh_employee_list()
     
     def _on_search_change(self):
-        """Axtarış mətnində dəyişiklik olduqda çağırılır"""
+        """Axtarış mətnində dəyişiklik olduqda çağırılır - sorğu debounce ilə arxa fonda icra olunur"""
         if hasattr(self, 'search_var'):
             self.search_text = self.search_var.get()
-            self.refresh_employee_list()
+            if not self.search_text.strip():
+                self._clear_search_results()
+                self.refresh_employee_list()
+                return
+            self._schedule_search()
+    
+    def _schedule_search(self):
+        """Yazma dayanandan SEARCH_DEBOUNCE_MS sonra axtarışı başladır (hər düymədə yox)"""
+        if getattr(self, '_search_after_id', None):
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+    
+    def _run_search(self):
+        """Axtarışı arxa fon thread-ində icra edir; nəticə after(0) ilə UI-a qaytarılır"""
+        self._search_after_id = None
+        query = getattr(self, 'search_text', '')
+        if not query.strip():
+            return
+        self._search_generation = getattr(self, '_search_generation', 0) + 1
+        generation = self._search_generation
+        # Anbar copy-on-write-dır (yeniləmələr surətdə edilir), ona görə thread onu təhlükəsiz oxuyur
+        store = self._employee_store()
+        
+        def search_async():
+            try:
+                search_start = time.time()
+                ranked = search_employees(store, query)
+                print(f"🔍 [DEBUG] Axtarış '{query}': {len(ranked)} nəticə, {time.time() - search_start:.3f}s")
+            except Exception as e:
+                logging.error(f"Axtarış xətası: {e}", exc_info=True)
+                ranked = None
+            try:
+                self.after(0, self._apply_search_results, generation, store, ranked)
+            except Exception:
+                pass  # Pəncərə artıq bağlanıb
+        
+        threading.Thread(target=search_async, daemon=True, name="EmployeeSearch").start()
+    
+    def _apply_search_results(self, generation, store, ranked):
+        """Arxa fon axtarışının nəticəsini tətbiq edir (köhnə sorğuların nəticəsi atılır)"""
+        if generation != getattr(self, '_search_generation', 0) or not getattr(self, 'search_text', ''):
+            return
+        if ranked is None:
+            return
+        self._search_results = {emp_id: rank for rank, (emp_id, _) in enumerate(ranked)}
+        self._search_store = store
+        self.refresh_employee_list()
+    
+    def _clear_search_results(self):
+        if getattr(self, '_search_after_id', None):
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+            self._search_after_id = None
+        self._search_generation = getattr(self, '_search_generation', 0) + 1
+        self._search_results = None
+        self._search_store = None
     
     def _toggle_filter(self):
         """Filtr panelini açır/bağlayır"""
@@ -3779,11 +3631,8 @@ class MainAppFrame(ttk.Frame):
                 try:
                     dept_options = ["Bütün şöbələr"]
                     if hasattr(self, 'data') and self.data:
-                        unique_depts = set()
-                        for emp_data in self.data.values():
-                            if isinstance(emp_data, dict) and emp_data.get('department'):
-                                unique_depts.add(emp_data.get('department'))
-                        dept_options.extend(sorted(unique_depts))
+                        dept_options.extend(dept for dept in self._employee_store().departments()
+                                            if dept != NO_DEPARTMENT)
                 except:
                     dept_options = ["Bütün şöbələr"]
             
@@ -3845,7 +3694,7 @@ class MainAppFrame(ttk.Frame):
             return
         
         # İşçi məlumatlarını al
-        employee_info = self.data.get(selected_name, {})
+        employee_info = self._selected_employee_record(selected_name) or {}
         if not employee_info or isinstance(employee_info, (str, bool)):
             messagebox.showerror("Xəta", "İşçi məlumatları tapılmadı!")
             return
@@ -3917,12 +3766,8 @@ class MainAppFrame(ttk.Frame):
             return
             
         # İşçi ID-sini tapırıq
-        employee_id = None
-        if hasattr(self, 'data') and self.data:
-            for name, info in self.data.items():
-                if name == selected_name and isinstance(info, dict):
-                    employee_id = info.get('db_id')
-                    break
+        employee_record = self._selected_employee_record(selected_name)
+        employee_id = employee_record.get('db_id') if employee_record else None
         
         if not employee_id:
             messagebox.showerror("Xəta", f"'{selected_name}' işçisinin ID-si tapılmadı!")
@@ -3965,12 +3810,8 @@ class MainAppFrame(ttk.Frame):
             return
             
         # İşçi ID-sini tapırıq
-        employee_id = None
-        if hasattr(self, 'data') and self.data:
-            for name, info in self.data.items():
-                if name == selected_name and isinstance(info, dict):
-                    employee_id = info.get('db_id')
-                    break
+        employee_record = self._selected_employee_record(selected_name)
+        employee_id = employee_record.get('db_id') if employee_record else None
         
         if not employee_id:
             messagebox.showerror("Xəta", f"'{selected_name}' işçisinin ID-si tapılmadı!")
@@ -4114,12 +3955,8 @@ class MainAppFrame(ttk.Frame):
         _, selected_name = self.get_selected_employee_name()
         if selected_name:
             # İşçi ID-sini tapırıq
-            employee_id = None
-            if hasattr(self, 'data') and self.data:
-                for name, info in self.data.items():
-                    if name == selected_name and isinstance(info, dict):
-                        employee_id = info.get('db_id')
-                        break
+            employee_record = self._selected_employee_record(selected_name)
+            employee_id = employee_record.get('db_id') if employee_record else None
             
             if not employee_id:
                 messagebox.showerror("Xəta", f"'{selected_name}' işçisinin ID-si tapılmadı!")
@@ -4330,7 +4167,7 @@ class MainAppFrame(ttk.Frame):
             messagebox.showwarning("Xəbərdarlıq", "Yalnız admin arxiv pəncərəsini aça bilər!")
             return
             
-        win = ArchiveWindow(self, self.data, self.current_user)
+        win = ArchiveWindow(self, self._employee_store().by_name(), self.current_user)
         self.opened_windows.append(win)
         self._center_toplevel(win)
 
@@ -4349,13 +4186,14 @@ class MainAppFrame(ttk.Frame):
                     return
                 
                 # İşçinin tam məlumatlarını veritabanından al
-                if selected_name in self.data:
-                    employee_to_edit = self.data[selected_name].copy()  # Kopya yarat
+                selected_data = self._selected_employee_record(selected_name)
+                if selected_data is not None:
+                    employee_to_edit = selected_data.copy()  # Kopya yarat
                     employee_to_edit['name'] = selected_name
                     
                     # İşçinin ID-sini əlavə et
-                    if 'db_id' in self.data[selected_name]:
-                        employee_to_edit['id'] = self.data[selected_name]['db_id']
+                    if 'db_id' in selected_data:
+                        employee_to_edit['id'] = selected_data['db_id']
                     
                     logging.info(f"İşçi məlumatları yükləndi: {selected_name} - {employee_to_edit}")
                 else:
@@ -4459,40 +4297,7 @@ class MainAppFrame(ttk.Frame):
                 print(f"🔵 [DEBUG] _update_notification_button: Database sorğusu bitdi, unread_count={unread_count}")
                 
                 # UI thread-də badge-i yenilə
-                def update_ui():
-                    try:
-                        # Badge-i tap
-                        badge = None
-                        if hasattr(self.notifications_button, 'badge'):
-                            badge = self.notifications_button.badge
-                        elif hasattr(self.notifications_button, 'winfo_children'):
-                            # Container-dan badge-i tap
-                            for child in self.notifications_button.winfo_children():
-                                if hasattr(child, 'badge'):
-                                    badge = child.badge
-                                    break
-                        
-                        if badge:
-                            if unread_count > 0:
-                                # Badge-i göstər və sayını yenilə
-                                badge.config(text=str(unread_count) if unread_count < 100 else '99+')
-                                # Badge-i iconun sağ yuxarı küncünə yerləşdir - yarısı icondan çıxacaq
-                                badge.place(relx=1.0, rely=0.0, anchor='ne', x=2, y=-2)
-                                
-                                # Animasiya başlat (əgər işləmirsə)
-                                if not hasattr(self.notifications_button, 'animation_running'):
-                                    self.notifications_button.animation_running = False
-                                if not self.notifications_button.animation_running:
-                                    self._start_notification_badge_animation(badge)
-                            else:
-                                # Badge-i gizlət və animasiyanı dayandır
-                                badge.place_forget()
-                                self._stop_notification_badge_animation()
-                    except Exception as e:
-                        logging.warning(f"Bildiriş düyməsi UI yenilənərkən xəta: {e}")
-                
-                # UI thread-də yenilə
-                self.after(0, update_ui)
+                self.after(0, self._apply_unread_count, unread_count)
             except Exception as e:
                 logging.warning(f"Bildiriş düyməsi yenilənərkən xəta: {e}")
                 print(f"❌ [DEBUG] _update_notification_button xətası: {e}")
@@ -4501,6 +4306,41 @@ class MainAppFrame(ttk.Frame):
         thread = threading.Thread(target=update_badge_async, daemon=True, name="NotificationUpdate")
         thread.start()
     
+    def _apply_unread_count(self, unread_count):
+        """Oxunmamış bildiriş sayını badge-ə tətbiq edir (UI thread-də çağırılır)"""
+        if not hasattr(self, 'notifications_button'):
+            return
+        try:
+            # Badge-i tap
+            badge = None
+            if hasattr(self.notifications_button, 'badge'):
+                badge = self.notifications_button.badge
+            elif hasattr(self.notifications_button, 'winfo_children'):
+                # Container-dan badge-i tap
+                for child in self.notifications_button.winfo_children():
+                    if hasattr(child, 'badge'):
+                        badge = child.badge
+                        break
+            
+            if badge:
+                if unread_count > 0:
+                    # Badge-i göstər və sayını yenilə
+                    badge.config(text=str(unread_count) if unread_count < 100 else '99+')
+                    # Badge-i iconun sağ yuxarı küncünə yerləşdir - yarısı icondan çıxacaq
+                    badge.place(relx=1.0, rely=0.0, anchor='ne', x=2, y=-2)
+                    
+                    # Animasiya başlat (əgər işləmirsə)
+                    if not hasattr(self.notifications_button, 'animation_running'):
+                        self.notifications_button.animation_running = False
+                    if not self.notifications_button.animation_running:
+                        self._start_notification_badge_animation(badge)
+                else:
+                    # Badge-i gizlət və animasiyanı dayandır
+                    badge.place_forget()
+                    self._stop_notification_badge_animation()
+        except Exception as e:
+            logging.warning(f"Bildiriş düyməsi UI yenilənərkən xəta: {e}")
+
     def _start_notification_badge_animation(self, badge):
         """Bildiriş badge animasiyasını başlat - yanıb-sönmə"""
         if not badge or not badge.winfo_exists():
@@ -4552,26 +4392,6 @@ class MainAppFrame(ttk.Frame):
                 except Exception:
                     pass
     
-    def _auto_refresh_data(self):
-        if not self.vacation_panel_active:
-            # Avtomatik yeniləmə zamanı yalnız bildirişləri yeniləyirik
-            self._update_notification_button()
-            # Məlumatları yalnız hər 2 dəqiqədə bir yeniləyirik (daha tez refresh)
-            if not hasattr(self, '_last_data_refresh'):
-                self._last_data_refresh = 0
-            
-            import time
-            current_time = time.time()
-            if current_time - self._last_data_refresh > 120:  # 2 dəqiqə - daha tez refresh
-                logging.info("Avtomatik yeniləmə - məlumatlar yenilənir...")
-                self.data = database.load_data_for_user(self.current_user, force_refresh=False)
-                self._last_data_refresh = current_time
-                self.refresh_employee_list()
-                
-                # Status mesajı göstər
-                self.update_status_label.config(text="🔄 Avtomatik yeniləmə tamamlandı")
-        self.auto_refresh_timer = self.after(60000, self._auto_refresh_data)  # 1 dəqiqə - daha tez refresh
-    
     def _check_for_update(self):
         """Versiya yoxlamasını edir"""
         logging.info("_check_for_update çağırıldı")
@@ -4585,11 +4405,56 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"Versiya yoxlaması zamanı xəta: {e}")
 
-    def _check_for_commands(self):
-        command = command_queries.get_pending_commands(self.current_user['id'])
-        if command:
-            self._handle_system_command(command)
-        self.command_check_timer = self.after(5000, self._check_for_commands)  # 5 saniyədə bir
+    def _heartbeat(self):
+        """
+        Periodik heartbeat: gözləyən əmr, oxunmamış bildiriş sayı və tenant məlumat versiyası
+        bir sorğu ilə arxa fonda alınır. Məlumatlar yalnız versiya dəyişəndə yenidən yüklənir.
+        """
+        self.heartbeat_timer = self.after(HEARTBEAT_INTERVAL_MS, self._heartbeat)
+        if self._heartbeat_in_flight:
+            return  # Əvvəlki sorğu hələ bitməyib
+        self._heartbeat_in_flight = True
+        user_id = self.current_user['id']
+        
+        import threading
+        def heartbeat_async():
+            try:
+                result = heartbeat_queries.get_heartbeat(user_id)
+                if result is None:
+                    return
+                data = None
+                data_version = result['data_version']
+                # Yüklənmiş məlumatların versiyası ilə müqayisə et (köhnə sxemdə - əvvəlki heartbeat ilə)
+                known_version = database.get_loaded_data_version()
+                if known_version is None:
+                    known_version = self._heartbeat_data_version
+                if data_version is not None and known_version is not None and data_version != known_version:
+                    if self.vacation_panel_active:
+                        data_version = known_version  # Panel bağlanandan sonrakı heartbeat yeniləyəcək
+                    else:
+                        logging.info("Heartbeat - məlumat versiyası dəyişib, məlumatlar yenilənir...")
+                        data = database.load_data_for_user(self.current_user, force_refresh=False)
+                        if data is self.data:
+                            data = None  # Delta sinxronizasiya dəyişiklik tapmadı - repaint lazım deyil
+                # İlk heartbeat yalnız versiyanı yadda saxlayır (məlumatlar artıq yüklənib)
+                self._heartbeat_data_version = data_version
+                self.after(0, self._apply_heartbeat, result, data)
+            except Exception as e:
+                logging.warning(f"Heartbeat xətası: {e}")
+            finally:
+                self._heartbeat_in_flight = False
+        
+        threading.Thread(target=heartbeat_async, daemon=True, name="Heartbeat").start()
+
+    def _apply_heartbeat(self, result, data=None):
+        """Heartbeat nəticəsini UI-a tətbiq edir (UI thread-də)"""
+        if result.get('command'):
+            self._handle_system_command(result['command'])
+        self._apply_unread_count(result.get('unread_count', 0))
+        if data is not None:
+            self.data = data
+            self.refresh_employee_list()
+            self.update_status_label.config(text="🔄 Avtomatik yeniləmə tamamlandı")
 
     def _handle_system_command(self, command):
         command_queries.mark_command_as_executed(command['id'])
@@ -4866,8 +4731,8 @@ class MainAppFrame(ttk.Frame):
                     self.vacation_form_panel.set_mode(is_edit_mode, vacation, employee_name)
                     
                     # İşçi məlumatlarını panel-ə təyin et (çap üçün)
-                    if employee_name and hasattr(self, 'data') and employee_name in self.data:
-                        employee_data = self.data[employee_name]
+                    employee_data = self._employee_store().get_by_name(employee_name) if employee_name else None
+                    if employee_data is not None:
                         self.vacation_form_panel.set_employee_data(employee_data)
                         print(f"🔧 DEBUG: İşçi məlumatları panel-ə təyin edildi: {employee_name}")
                     else:
@@ -5100,12 +4965,13 @@ class MainAppFrame(ttk.Frame):
                 messagebox.showerror("Xəta", "Məlumatlar yüklənməyib.", parent=self)
                 return
             
-            if self.current_panel_employee not in self.data:
+            panel_employee = self._employee_store().get_by_name(self.current_panel_employee)
+            if panel_employee is None:
                 print(f"❌ DEBUG: current_panel_employee '{self.current_panel_employee}' data-də tapılmadı!")
                 messagebox.showerror("Xəta", f"İşçi '{self.current_panel_employee}' tapılmadı.", parent=self)
                 return
             
-            emp_id = self.data[self.current_panel_employee].get('db_id')
+            emp_id = panel_employee.get('db_id')
             if not emp_id:
                 print(f"❌ DEBUG: emp_id tapılmadı!")
                 messagebox.showerror("Xəta", "İşçi ID-si tapılmadı.", parent=self)
@@ -5766,41 +5632,14 @@ class MainAppFrame(ttk.Frame):
         try:
             logging.info("Fallback refresh sistemi başladıldı")
             
-            # İşçilər bölməsini dərhal yenilə
-            self.after(1000, self._force_refresh_employee_list)
-            
-            # Hər 30 saniyədə bir refresh et
-            self.fallback_timer = self.after(30000, self._fallback_refresh_cycle)
+            # İşçilər bölməsini dərhal yenilə; sonrakı dəyişiklikləri heartbeat məlumat versiyası ilə tapır
+            if self.fallback_timer:
+                self.after_cancel(self.fallback_timer)
+            self.fallback_timer = self.after(1000, self._force_refresh_employee_list)
             
         except Exception as e:
             logging.error(f"Fallback refresh sistemi başladılarkən xəta: {e}")
     
-    def _fallback_refresh_cycle(self):
-        """Fallback refresh döngüsü"""
-        try:
-            if not self.vacation_panel_active:
-                logging.info("Fallback refresh - məlumatlar yenilənir...")
-                
-                # Məlumatları yenilə
-                self.data = database.load_data_for_user(self.current_user, force_refresh=False)
-                
-                # İşçi siyahısını yenilə
-                self.refresh_employee_list()
-                
-                # Bildirişləri yenilə
-                self._update_notification_button()
-                
-                # Status mesajı göstər
-                self.update_status_label.config(text="🔄 Fallback refresh tamamlandı")
-                
-            # Növbəti refresh-i planla
-            self.fallback_timer = self.after(30000, self._fallback_refresh_cycle)
-            
-        except Exception as e:
-            logging.error(f"Fallback refresh döngüsündə xəta: {e}")
-            # Xəta olduqda da növbəti refresh-i planla
-            self.fallback_timer = self.after(60000, self._fallback_refresh_cycle)
-    
     def _force_refresh_employee_list(self):
         """İşçilər siyahısını məcburi yeniləyir"""
         try:
@@ -5857,7 +5696,7 @@ class MainAppFrame(ttk.Frame):
                 # İşçi dəyişiklikləri - dərhal refresh
                 self.after(0, self._immediate_employee_refresh, change_type, details)
                 
-            elif change_type in ['notifications_deleted', 'error_resolved', 'error_deleted']:
+            elif change_type in ['notifications_deleted', 'notification_created', 'notification_updated', 'notification_deleted', 'error_resolved', 'error_deleted']:
                 # Bildiriş dəyişiklikləri - dərhal refresh
                 self.after(0, self._immediate_notification_refresh, change_type, details)
                 
@@ -5878,6 +5717,7 @@ class MainAppFrame(ttk.Frame):
             # Xəta olduqda da refresh et
             self.after(200, self._immediate_local_refresh, change_type, details)
     
+    @sql_action('ui.refresh.vacation')
     def _immediate_vacation_refresh(self, change_type, details=None):
         """Məzuniyyət dəyişiklikləri üçün dərhal refresh"""
         try:
@@ -5887,11 +5727,9 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.invalidate_cache()
             
-            # Məlumatları force refresh ilə yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
-            
-            # İşçi siyahısını yenilə
-            self.refresh_employee_list()
+            # Məlumatları yenilə; tenant versiyası dəyişməyibsə siyahı yenidən çəkilmir
+            if self._reload_data():
+                self.refresh_employee_list()
             
             # Cari işçi seçilmişsə, onun məlumatlarını da yenilə
             if hasattr(self, 'employee_listbox') and self.employee_listbox.curselection():
@@ -5916,6 +5754,7 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"Məzuniyyət refresh xətası: {e}")
     
+    @sql_action('ui.refresh.employee')
     def _immediate_employee_refresh(self, change_type, details=None):
         """İşçi dəyişiklikləri üçün dərhal refresh"""
         try:
@@ -5925,11 +5764,9 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.invalidate_cache()
             
-            # Məlumatları force refresh ilə yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
-            
-            # İşçi siyahısını yenilə
-            self.refresh_employee_list()
+            # Məlumatları yenilə; tenant versiyası dəyişməyibsə siyahı yenidən çəkilmir
+            if self._reload_data():
+                self.refresh_employee_list()
             
             # Bildirişləri yenilə
             self._update_notification_button()
@@ -5939,6 +5776,7 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"İşçi refresh xətası: {e}")
     
+    @sql_action('ui.refresh.notification')
     def _immediate_notification_refresh(self, change_type, details=None):
         """Bildiriş dəyişiklikləri üçün dərhal refresh"""
         try:
@@ -5952,6 +5790,7 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"Bildiriş refresh xətası: {e}")
     
+    @sql_action('ui.refresh.system')
     def _immediate_system_refresh(self, change_type, details=None):
         """Sistem dəyişiklikləri üçün dərhal refresh"""
         try:
@@ -5961,11 +5800,9 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.invalidate_cache()
             
-            # Məlumatları force refresh ilə yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
-            
-            # İşçi siyahısını yenilə
-            self.refresh_employee_list()
+            # Məlumatları yenilə; tenant versiyası dəyişməyibsə siyahı yenidən çəkilmir
+            if self._reload_data():
+                self.refresh_employee_list()
             
             # Bildirişləri yenilə
             self._update_notification_button()
@@ -5986,6 +5823,7 @@ class MainAppFrame(ttk.Frame):
         except Exception as e:
             logging.error(f"Sistem refresh xətası: {e}")
     
+    @sql_action('ui.refresh.local')
     def _immediate_local_refresh(self, change_type, details=None):
         """Lokal refresh - real-time signal alındıqda"""
         # Log silmə siqnallarını yoxla
@@ -6041,11 +5879,9 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.invalidate_cache()
             
-            # Məlumatları yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
-            
-            # İşçi siyahısını yenilə
-            self.refresh_employee_list()
+            # Məlumatları yenilə; tenant versiyası dəyişməyibsə siyahı yenidən çəkilmir
+            if self._reload_data():
+                self.refresh_employee_list()
             
             # Bildirişləri yenilə
             self._update_notification_button()
@@ -6113,6 +5949,17 @@ class MainAppFrame(ttk.Frame):
         thread = threading.Thread(target=send_in_background, daemon=True)
         thread.start()
     
+    def _reload_data(self, force_refresh=True):
+        """
+        Məlumatları (delta sinxronizasiya ilə) yenidən yükləyir.
+        Tenant məlumat versiyası dəyişməyibsə eyni anbar qaytarılır - onda False qaytarır
+        və çağıran tərəf refresh_employee_list-i atlaya bilər.
+        """
+        data = database.load_data_for_user(self.current_user, force_refresh=force_refresh)
+        changed = data is not self.data
+        self.data = data
+        return changed
+    
     def manual_refresh_data(self):
         """Manual olaraq məlumatları yeniləyir"""
         try:
@@ -6122,11 +5969,16 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.invalidate_cache()
             
-            # Məlumatları force refresh ilə yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
-            
-            # İşçi siyahısını yenilə
-            self.refresh_employee_list()
+            # Tenant versiyası yüklənmiş məlumatlarınkı ilə eynidirsə, yenidən yükləmə lazım deyil
+            loaded_version = database.get_loaded_data_version()
+            if loaded_version is not None and database.get_tenant_data_version() == loaded_version:
+                logging.info(f"Manual refresh: məlumat versiyası dəyişməyib ({loaded_version})")
+            else:
+                # Məlumatları tam yenidən yüklə (delta sinxronizasiya atlanılır)
+                self.data = database.load_data_for_user(self.current_user, force_refresh=True, full_reload=True)
+                
+                # İşçi siyahısını yenilə
+                self.refresh_employee_list()
             
             # Bildirişləri yenilə
             self._update_notification_button()
@@ -6163,8 +6015,8 @@ class MainAppFrame(ttk.Frame):
             from utils import cache
             cache.clear_all_cache()
             
-            # Məlumatları force refresh ilə yenilə
-            self.data = database.load_data_for_user(self.current_user, force_refresh=True)
+            # Məlumatları tam yenidən yüklə (delta sinxronizasiya atlanılır)
+            self.data = database.load_data_for_user(self.current_user, force_refresh=True, full_reload=True)
             
             # İşçi siyahısını yenilə
             self.refresh_employee_list()
@@ -6267,7 +6119,7 @@ class MainAppFrame(ttk.Frame):
             # İstifadəçinin məlumatlarını data-dan tap
             logging.info(f"Data-dan istifadəçi məlumatları axtarılır: {current_user_name}")
             print(f"🔍 DEBUG: Data-dan istifadəçi məlumatları axtarılır: {current_user_name}")
-            user_info = self.data.get(current_user_name)
+            user_info = self._employee_store().get_by_name(current_user_name)
             logging.info(f"Tapılan user_info: {user_info}")
             print(f"📋 DEBUG: Tapılan user_info keys: {list(user_info.keys()) if user_info else 'None'}")
             
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yaddaş diaqnostikası pəncərəsi: widget sayları, yaddaş artımı və ən çox böyüyən ayırma yerləri
+"""
+
+import ttkbootstrap as tb
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+try:
+    from utils.memory_diagnostics import get_memory_diagnostics
+except ImportError:
+    from src.utils.memory_diagnostics import get_memory_diagnostics
+
+REFRESH_INTERVAL_MS = 10000
+
+
+class MemoryDiagnosticsWindow(tb.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("🧠 Yaddaş Diaqnostikası")
+        self.geometry("1100x650")
+        self.transient(parent)
+        self.diagnostics = get_memory_diagnostics()
+        self.refresh_timer = None
+        self.create_widgets()
+        self.refresh()
+        if not self.diagnostics.samples:
+            self.take_sample()
+
+    def create_widgets(self):
+        control_frame = tb.Frame(self)
+        control_frame.pack(fill='x', padx=10, pady=5)
+        self.tracing_btn = tb.Button(control_frame, command=self.toggle_tracing)
+        self.tracing_btn.pack(side='left', padx=5)
+        self._update_tracing_button()
+        tb.Button(control_frame, text="📸 Nümunə Al", command=self.take_sample,
+                  bootstyle="info").pack(side='left', padx=5)
+        tb.Button(control_frame, text="📤 Export", command=self.export_report,
+                  bootstyle="info").pack(side='left', padx=5)
+        tb.Button(control_frame, text="❌ Bağla", command=self.destroy,
+                  bootstyle="danger").pack(side='right', padx=5)
+
+        text_frame = tb.Frame(self)
+        text_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        self.report_text = tk.Text(
+            text_frame,
+            font=('Consolas', 9),
+            wrap='none',
+            bg='#1e1e1e',
+            fg='#ffffff'
+        )
+        scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.report_text.yview)
+        self.report_text.config(yscrollcommand=scrollbar.set)
+        self.report_text.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+
+    def _update_tracing_button(self):
+        if self.diagnostics.is_tracing():
+            self.tracing_btn.config(text="⏹️ tracemalloc Dayandır", bootstyle="danger")
+        else:
+            self.tracing_btn.config(text="▶️ tracemalloc Başlat", bootstyle="secondary")
+
+    def toggle_tracing(self):
+        if self.diagnostics.is_tracing():
+            self.diagnostics.stop_tracing()
+        else:
+            self.diagnostics.start_tracing()
+        self._update_tracing_button()
+
+    def take_sample(self):
+        """Nümunəni arxa fonda götürür; hazır olanda hesabat yenilənir"""
+        self.diagnostics.sample_async(self._on_sample)
+
+    def _on_sample(self, entry):
+        if self.winfo_exists():
+            self.refresh(reschedule=False)
+
+    def refresh(self, reschedule=True):
+        """Hesabatı yenidən göstərir (nümunələri after() taymeri götürür)"""
+        position = self.report_text.yview()[0]
+        self.report_text.config(state='normal')
+        self.report_text.delete('1.0', tk.END)
+        self.report_text.insert('1.0', self.diagnostics.format_report())
+        self.report_text.config(state='disabled')
+        self.report_text.yview_moveto(position)
+        if reschedule:
+            self.refresh_timer = self.after(REFRESH_INTERVAL_MS, self.refresh)
+
+    def export_report(self):
+        try:
+            path = self.diagnostics.export_report()
+            messagebox.showinfo("Uğurlu", f"Yaddaş hesabatı yazıldı: {path}", parent=self)
+        except Exception as e:
+            messagebox.showerror("Xəta", f"Export xətası: {e}", parent=self)
+
+    def destroy(self):
+        if self.refresh_timer:
+            self.after_cancel(self.refresh_timer)
+            self.refresh_timer = None
+        super().destroy()
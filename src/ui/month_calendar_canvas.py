@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ay təqvimi - tək Canvas üzərində çəkilir (DashboardCalendarFrame üçün)
+
+Köhnə təqvim hər yeniləmədə ~42 gün Frame-i, hər məzuniyyət-gün üçün ayrıca indikator
+Frame-i, Tooltip və binding yaradırdı. Burada:
+  - 42 gün xanası və indikatorlar Canvas item-ləridir; item ID-ləri təkrar istifadə olunur
+    (coords/itemconfigure), artıq indikatorlar gizlədilir
+  - gün -> məzuniyyətlər xəritəsi sweep-line ilə O(V + D) qurulur (month_occupancy)
+  - bir ortaq tooltip pəncərəsi; hansı məzuniyyətin üzərində olduğumuz koordinatdan
+    hesablanır (hit-test), ayrıca binding yoxdur
+  - OccupancyCache ayları yadda saxlayır, qonşu aylar əvvəlcədən hesablanır
+"""
+
+import calendar
+import tkinter as tk
+from datetime import date
+
+WEEKDAY_NAMES = ["B.e.", "Ç.a.", "Çər.", "C.a.", "Cüm.", "Şən.", "Baz."]
+WEEKS = 6                   # ay ən çox 6 həftəyə düşür
+HEADER_HEIGHT = 28
+DAY_LABEL_HEIGHT = 16       # gün nömrəsi üçün xananın yuxarı hissəsi
+MAX_INDICATORS = 9          # xanada ən çox 3x3 kvadrat, qalanı "+N" kimi göstərilir
+INDICATOR_PAD = 2
+
+DAY_BG = 'white'
+WEEKEND_BG = '#f5f5f5'
+TODAY_BG = '#e8f0fe'
+TODAY_OUTLINE = '#007bff'
+CELL_OUTLINE = '#c8c8c8'
+HIGHLIGHT_OUTLINE = 'red'
+HEADER_BG = '#f0f0f0'
+
+
+def month_occupancy(vacations, year, month):
+    """
+    Ayın hər günü üçün həmin gün davam edən məzuniyyətlər (sweep-line, O(V + D)).
+    Nəticə: indeksi gün nömrəsi olan siyahı (0-cı element boşdur), hər element tuple.
+    Məzuniyyətlər başlama sırası ilə gəlir, ona görə kvadratlar günlər arasında yerini saxlayır.
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    first, last = date(year, month, 1), date(year, month, days_in_month)
+    starts = [[] for _ in range(days_in_month + 2)]
+    ends = [[] for _ in range(days_in_month + 2)]
+    for vacation in vacations:
+        start, end = vacation.get('start_date'), vacation.get('end_date')
+        if not start or not end or end < first or start > last or end < start:
+            continue
+        starts[max(start, first).day].append(vacation)
+        ends[min(end, last).day + 1].append(vacation)
+
+    occupancy = [()] * (days_in_month + 1)
+    active = {}
+    for day in range(1, days_in_month + 1):
+        for vacation in ends[day]:
+            active.pop(id(vacation), None)
+        for vacation in starts[day]:
+            active[id(vacation)] = vacation
+        occupancy[day] = tuple(active.values())
+    return occupancy
+
+
+class OccupancyCache:
+    """
+    (il, ay) -> month_occupancy nəticəsi; məzuniyyət siyahısı dəyişəndə reset() çağırılır.
+    index (database.vacation_index.VacationIndex) verilibsə, ay üçün yalnız həmin ayla
+    kəsişən məzuniyyətlər götürülür - bütün siyahı gəzilmir.
+    """
+
+    def __init__(self, max_months=12):
+        self.max_months = max_months
+        self._vacations = []
+        self._index = None
+        self._months = {}
+
+    def reset(self, vacations, index=None):
+        self._vacations = vacations
+        self._index = index
+        self._months.clear()
+
+    def get(self, year, month):
+        key = (year, month)
+        occupancy = self._months.pop(key, None)
+        if occupancy is None:
+            vacations = self._vacations
+            if self._index is not None:
+                first = date(year, month, 1)
+                last = date(year, month, calendar.monthrange(year, month)[1])
+                vacations = [entry.vacation for entry in self._index.overlapping(first, last)]
+            occupancy = month_occupancy(vacations, year, month)
+        self._months[key] = occupancy   # sona köçür - ən son istifadə olunan
+        while len(self._months) > self.max_months:
+            del self._months[next(iter(self._months))]
+        return occupancy
+
+    def prefetch(self, year, month):
+        """Əvvəlki və növbəti ayı hesablayır ki, ay dəyişəndə gözləmə olmasın"""
+        for delta in (-1, 1):
+            other_year, other_month = shift_month(year, month, delta)
+            if (other_year, other_month) not in self._months:
+                self.get(other_year, other_month)
+
+
+def shift_month(year, month, delta):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+class MonthCalendarCanvas(tk.Canvas):
+    """
+    Ay təqvimi: başlıq sətri + 6x7 gün xanası. show_month() ilə doldurulur.
+    color_for(vacation) indikator rəngini, on_vacation_click(vacation) klik davranışını verir.
+    """
+
+    def __init__(self, parent, font_name="Segoe UI", color_for=None, on_vacation_click=None, **kwargs):
+        kwargs.setdefault('background', DAY_BG)
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(parent, **kwargs)
+        self.font_name = font_name
+        self.color_for = color_for or (lambda vacation: '#85929E')
+        self.on_vacation_click = on_vacation_click
+
+        self.year = None
+        self.month = None
+        self.today = None
+        self.occupancy = [()]
+        self._weeks = []
+        self._highlighted = set()
+        self._cell_width = 1
+        self._cell_height = 1
+
+        self._header_items = []
+        self._cell_items = []        # [(rect, day_text, overflow_text), ...] - 42 xana
+        self._indicator_pool = []    # təkrar istifadə olunan indikator düzbucaqlıları
+        self._create_items()
+
+        self._tooltip = None
+        self._tooltip_label = None
+        self._tooltip_key = None
+
+        self.bind('<Configure>', lambda event: self._render())
+        self.bind('<Motion>', self._on_motion)
+        self.bind('<Leave>', lambda event: self._hide_tooltip())
+        self.bind('<Button-1>', self._on_click)
+
+    # --- Item-lər ---
+
+    def _create_items(self):
+        for name in WEEKDAY_NAMES:
+            rect = self.create_rectangle(0, 0, 0, 0, fill=HEADER_BG, outline=CELL_OUTLINE)
+            text = self.create_text(0, 0, text=name, font=(self.font_name, 10, 'bold'))
+            self._header_items.append((rect, text))
+        for _ in range(WEEKS * 7):
+            rect = self.create_rectangle(0, 0, 0, 0, fill=DAY_BG, outline=CELL_OUTLINE)
+            day_text = self.create_text(0, 0, anchor='ne', font=(self.font_name, 9))
+            overflow_text = self.create_text(0, 0, anchor='se', font=(self.font_name, 8, 'bold'),
+                                             fill='#555555', state='hidden')
+            self._cell_items.append((rect, day_text, overflow_text))
+
+    def _indicator(self, index):
+        while len(self._indicator_pool) <= index:
+            self._indicator_pool.append(self.create_rectangle(0, 0, 0, 0, outline='#666666', state='hidden'))
+        return self._indicator_pool[index]
+
+    # --- Məlumat ---
+
+    def show_month(self, year, month, occupancy, today=None):
+        """Ayı göstərir; occupancy - month_occupancy() nəticəsi"""
+        self.year, self.month = year, month
+        self.today = today or date.today()
+        self.occupancy = occupancy
+        self._weeks = calendar.monthcalendar(year, month)
+        self._highlighted = set()
+        self._hide_tooltip()
+        self._render()
+
+    def highlight_days(self, days):
+        """Göstərilən ayın günlərini qırmızı çərçivə ilə işarələyir (date obyektləri)"""
+        self._highlighted = {day.day for day in days if (day.year, day.month) == (self.year, self.month)}
+        self._render()
+        return len(self._highlighted)
+
+    def clear_highlights(self):
+        if self._highlighted:
+            self._highlighted = set()
+            self._render()
+
+    # --- Çəkmə ---
+
+    def _render(self):
+        width = max(self.winfo_width(), 7 * 20)
+        height = max(self.winfo_height(), HEADER_HEIGHT + WEEKS * 20)
+        cell_width = width / 7.0
+        cell_height = (height - HEADER_HEIGHT) / float(WEEKS)
+        self._cell_width, self._cell_height = cell_width, cell_height
+
+        for column, (rect, text) in enumerate(self._header_items):
+            x0 = column * cell_width
+            self.coords(rect, x0, 0, x0 + cell_width - 1, HEADER_HEIGHT - 2)
+            self.coords(text, x0 + cell_width / 2, HEADER_HEIGHT / 2 - 1)
+
+        used = 0
+        for index, (rect, day_text, overflow_text) in enumerate(self._cell_items):
+            row, column = divmod(index, 7)
+            day = self._day_at(row, column)
+            if not day:
+                self.itemconfigure(rect, state='hidden')
+                self.itemconfigure(day_text, state='hidden')
+                self.itemconfigure(overflow_text, state='hidden')
+                continue
+            x0 = column * cell_width
+            y0 = HEADER_HEIGHT + row * cell_height
+            x1, y1 = x0 + cell_width - 1, y0 + cell_height - 1
+            is_today = date(self.year, self.month, day) == self.today
+            if day in self._highlighted:
+                outline, outline_width = HIGHLIGHT_OUTLINE, 3
+            elif is_today:
+                outline, outline_width = TODAY_OUTLINE, 2
+            else:
+                outline, outline_width = CELL_OUTLINE, 1
+            fill = TODAY_BG if is_today else (WEEKEND_BG if column >= 5 else DAY_BG)
+            self.coords(rect, x0, y0, x1, y1)
+            self.itemconfigure(rect, state='normal', fill=fill, outline=outline, width=outline_width)
+            self.coords(day_text, x1 - 4, y0 + 2)
+            self.itemconfigure(day_text, state='normal', text=str(day))
+
+            vacations = self.occupancy[day] if day < len(self.occupancy) else ()
+            for slot, (ix0, iy0, ix1, iy1) in enumerate(self._indicator_boxes(row, column, len(vacations))):
+                item = self._indicator(used)
+                used += 1
+                self.coords(item, ix0, iy0, ix1, iy1)
+                self.itemconfigure(item, state='normal', fill=self.color_for(vacations[slot]))
+            hidden_count = len(vacations) - MAX_INDICATORS
+            if hidden_count > 0:
+                self.coords(overflow_text, x1 - 3, y1 - 2)
+                self.itemconfigure(overflow_text, state='normal', text=f"+{hidden_count}")
+                self.tag_raise(overflow_text)
+            else:
+                self.itemconfigure(overflow_text, state='hidden')
+
+        for item in self._indicator_pool[used:]:
+            self.itemconfigure(item, state='hidden')
+
+    def _day_at(self, row, column):
+        if row >= len(self._weeks):
+            return 0
+        return self._weeks[row][column]
+
+    def _indicator_boxes(self, row, column, count):
+        """Xanadakı indikator kvadratlarının koordinatları (köhnə grid düzülüşü: 1, 2, 3 sütun)"""
+        count = min(count, MAX_INDICATORS)
+        if not count:
+            return []
+        grid_size = 3 if count > 6 else (2 if count > 2 else 1)
+        rows = (count + grid_size - 1) // grid_size
+        x0 = column * self._cell_width + INDICATOR_PAD
+        y0 = HEADER_HEIGHT + row * self._cell_height + DAY_LABEL_HEIGHT
+        area_width = self._cell_width - 2 * INDICATOR_PAD - 1
+        area_height = self._cell_height - DAY_LABEL_HEIGHT - INDICATOR_PAD - 1
+        box_width = area_width / grid_size
+        box_height = area_height / rows
+        boxes = []
+        for slot in range(count):
+            slot_row, slot_column = divmod(slot, grid_size)
+            bx = x0 + slot_column * box_width
+            by = y0 + slot_row * box_height
+            boxes.append((bx + 1, by + 1, bx + box_width - 1, by + box_height - 1))
+        return boxes
+
+    # --- Hit-test, tooltip və klik ---
+
+    def hit_test(self, x, y):
+        """(gün, məzuniyyət və ya None, xanadakı bütün məzuniyyətlər) - xana yoxdursa None"""
+        if y < HEADER_HEIGHT or self.year is None:
+            return None
+        column = int(x // self._cell_width)
+        row = int((y - HEADER_HEIGHT) // self._cell_height)
+        if not (0 <= column < 7 and 0 <= row < WEEKS):
+            return None
+        day = self._day_at(row, column)
+        if not day:
+            return None
+        vacations = self.occupancy[day] if day < len(self.occupancy) else ()
+        for slot, (ix0, iy0, ix1, iy1) in enumerate(self._indicator_boxes(row, column, len(vacations))):
+            if ix0 <= x <= ix1 and iy0 <= y <= iy1:
+                return day, vacations[slot], vacations
+        return day, None, vacations
+
+    def _tooltip_text(self, hit):
+        day, vacation, vacations = hit
+        if vacation is not None:
+            return (f"{vacation.get('employee', '')}\n"
+                    f"{vacation['start_date'].strftime('%d.%m.%Y')} - {vacation['end_date'].strftime('%d.%m.%Y')}")
+        if len(vacations) > MAX_INDICATORS:
+            # "+N" xanası: göstərilməyən işçilərin adları
+            names = [other.get('employee', '') for other in vacations[MAX_INDICATORS:]]
+            return "\n".join(names[:20] + ([f"... (+{len(names) - 20})"] if len(names) > 20 else []))
+        return None
+
+    def _on_motion(self, event):
+        hit = self.hit_test(event.x, event.y)
+        text = self._tooltip_text(hit) if hit else None
+        if not text:
+            self._hide_tooltip()
+            self.configure(cursor='')
+            return
+        self.configure(cursor='hand2' if hit[1] is not None else '')
+        key = (hit[0], id(hit[1]))
+        if key != self._tooltip_key:
+            self._tooltip_key = key
+            self._show_tooltip(text, event.x_root + 25, event.y_root + 25)
+
+    def _show_tooltip(self, text, x, y):
+        try:
+            if self._tooltip is None or not self._tooltip.winfo_exists():
+                self._tooltip = tk.Toplevel(self)
+                self._tooltip.wm_overrideredirect(True)
+                self._tooltip_label = tk.Label(self._tooltip, justify='left', background="#ffffe0",
+                                               relief='solid', borderwidth=1, font=(self.font_name, 8))
+                self._tooltip_label.pack(ipadx=1)
+            self._tooltip_label.configure(text=text)
+            self._tooltip.wm_geometry(f"+{x}+{y}")
+            self._tooltip.deiconify()
+            self._tooltip.lift()
+        except tk.TclError as e:
+            print(f"Tooltip xətası (təhlükəsiz): {e}")
+
+    def _hide_tooltip(self):
+        self._tooltip_key = None
+        if self._tooltip is not None:
+            try:
+                self._tooltip.withdraw()
+            except tk.TclError:
+                self._tooltip = None
+
+    def _on_click(self, event):
+        hit = self.hit_test(event.x, event.y)
+        if hit and hit[1] is not None and self.on_vacation_click:
+            self._hide_tooltip()
+            self.on_vacation_click(hit[1])
+
+    def destroy(self):
+        if self._tooltip is not None:
+            try:
+                self._tooltip.destroy()
+            except tk.TclError:
+                pass
+            self._tooltip = None
+        super().destroy()
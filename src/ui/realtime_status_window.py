@@ -6,13 +6,20 @@ import logging
 from datetime import datetime
 from core.real_time_notifier import get_notifier, send_manual_refresh
 
+try:
+    from utils.metrics import get_metrics_registry
+except ImportError:
+    get_metrics_registry = None
+
+METRICS_REFRESH_TICKS = 4  # metrika cədvəli hər 4 status yeniləməsində (2 saniyə) yenilənir
+
 class RealtimeStatusWindow(tb.Toplevel):
     def __init__(self, parent, current_user):
         super().__init__(parent)
         self.parent = parent
         self.current_user = current_user
         self.title("🔄 Real-Time Status Monitor")
-        self.geometry("700x600")
+        self.geometry("900x800")
         self.resizable(True, True)
         
         # Pəncərəni mərkəzləşdir
@@ -22,6 +29,7 @@ class RealtimeStatusWindow(tb.Toplevel):
         self.transient(parent)
         self.grab_set()
         
+        self.metrics_tick = 0
         self.create_widgets()
         self.update_status()
         
@@ -32,9 +40,9 @@ class RealtimeStatusWindow(tb.Toplevel):
     def center_window(self):
         """Pəncərəni mərkəzləşdirir"""
         self.update_idletasks()
-        x = (self.winfo_screenwidth() // 2) - (700 // 2)
-        y = (self.winfo_screenheight() // 2) - (600 // 2)
-        self.geometry(f"700x600+{x}+{y}")
+        x = (self.winfo_screenwidth() // 2) - (900 // 2)
+        y = (self.winfo_screenheight() // 2) - (800 // 2)
+        self.geometry(f"900x800+{x}+{y}")
         
     def create_widgets(self):
         """Widget-ləri yaradır"""
@@ -106,6 +114,24 @@ class RealtimeStatusWindow(tb.Toplevel):
         )
         force_refresh_btn.pack(fill='x', padx=10, pady=5)
         
+        # Əməliyyat metrikaları (utils.metrics)
+        if get_metrics_registry:
+            metrics_frame = tb.LabelFrame(self, text="📈 Əməliyyat Metrikaları (ms)", bootstyle="secondary")
+            metrics_frame.pack(fill='both', expand=True, padx=10, pady=5)
+            
+            columns = ('operation', 'count', 'errors', 'p50', 'p95', 'p99', 'max')
+            self.metrics_tree = ttk.Treeview(metrics_frame, columns=columns, show='headings', height=8)
+            headings = {'operation': 'Əməliyyat', 'count': 'Say', 'errors': 'Xəta',
+                        'p50': 'p50', 'p95': 'p95', 'p99': 'p99', 'max': 'Maks'}
+            for column in columns:
+                self.metrics_tree.heading(column, text=headings[column])
+                self.metrics_tree.column(column, width=320 if column == 'operation' else 70,
+                                         anchor='w' if column == 'operation' else 'e')
+            metrics_scrollbar = ttk.Scrollbar(metrics_frame, orient='vertical', command=self.metrics_tree.yview)
+            self.metrics_tree.config(yscrollcommand=metrics_scrollbar.set)
+            self.metrics_tree.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+            metrics_scrollbar.pack(side='right', fill='y')
+        
         # Real-time log
         log_frame = tb.LabelFrame(self, text="📝 Real-Time Log", bootstyle="secondary")
         log_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -132,6 +158,12 @@ class RealtimeStatusWindow(tb.Toplevel):
         clear_log_btn = tb.Button(bottom_frame, text="🗑️ Log Təmizlə", command=self.clear_log, bootstyle="secondary")
         clear_log_btn.pack(side='left')
         
+        if get_metrics_registry:
+            tb.Button(bottom_frame, text="📤 Prometheus", command=lambda: self.export_metrics('prom'),
+                      bootstyle="info").pack(side='left', padx=5)
+            tb.Button(bottom_frame, text="📤 JSON", command=lambda: self.export_metrics('json'),
+                      bootstyle="info").pack(side='left')
+        
         tb.Button(bottom_frame, text="❌ Bağla", command=self.destroy, bootstyle="danger").pack(side='right')
         
     def update_status(self):
@@ -143,7 +175,9 @@ class RealtimeStatusWindow(tb.Toplevel):
                 
                 # Connection status
                 connection_status = status.get('connection_status', 'unknown')
-                if connection_status == 'websocket_connected':
+                if connection_status == 'db_listen_connected':
+                    self.connection_status_label.config(text="🟢 LISTEN/NOTIFY Bağlı", foreground='green')
+                elif connection_status == 'websocket_connected':
                     self.connection_status_label.config(text="🟢 WebSocket Bağlı", foreground='green')
                 elif connection_status == 'polling_active':
                     self.connection_status_label.config(text="🟡 Polling Aktiv", foreground='orange')
@@ -211,9 +245,39 @@ class RealtimeStatusWindow(tb.Toplevel):
             logging.error(f"Status yenilənərkən xəta: {e}")
             self.connection_status_label.config(text="❌ Xəta baş verdi", foreground='red')
             
+    def update_metrics(self):
+        """Metrika cədvəlini yeniləyir (ən çox ümumi vaxt aparan əməliyyatlar yuxarıda)"""
+        if not get_metrics_registry:
+            return
+        def ms(value):
+            return f"{value * 1000:.1f}" if value is not None else "-"
+        rows = sorted(get_metrics_registry().get_operation_stats(), key=lambda row: row['sum'], reverse=True)
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+        for row in rows:
+            self.metrics_tree.insert('', 'end', values=(
+                row['operation'], row['count'], row['errors'],
+                ms(row['p50']), ms(row['p95']), ms(row['p99']), ms(row['max'])
+            ))
+    
+    def export_metrics(self, fmt):
+        """Metrikləri debug_logs qovluğuna ixrac edir"""
+        try:
+            path = get_metrics_registry().export(fmt=fmt)
+            self.add_log_entry(f"📤 Metrikalar ixrac edildi: {path}")
+            messagebox.showinfo("Uğurlu", f"Metrikalar ixrac edildi:\n{path}", parent=self)
+        except Exception as e:
+            logging.error(f"Metrika ixracı xətası: {e}")
+            messagebox.showerror("Xəta", f"Metrika ixracı xətası: {e}", parent=self)
+    
     def start_status_update(self):
         """Status yeniləmə timer-ini başladır"""
         self.update_status()
+        if self.metrics_tick % METRICS_REFRESH_TICKS == 0:
+            try:
+                self.update_metrics()
+            except Exception as e:
+                logging.error(f"Metrikalar yenilənərkən xəta: {e}")
+        self.metrics_tick += 1
         self.status_timer = self.after(500, self.start_status_update)  # 0.5 saniyədə bir yenilə
         
     def stop_status_update(self):
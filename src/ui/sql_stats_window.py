@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL statistikası pəncərəsi: ən yavaş sorğular, cəmi vaxta görə sorğular və N+1 şübhələri
+"""
+
+import ttkbootstrap as tb
+from tkinter import ttk
+
+try:
+    from database.sql_stats import get_sql_stats, reset_sql_stats
+except ImportError:
+    from src.database.sql_stats import get_sql_stats, reset_sql_stats
+
+REFRESH_INTERVAL_MS = 3000
+
+
+class SqlStatsWindow(tb.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("🐢 SQL Statistikası")
+        self.geometry("1100x600")
+        self.transient(parent)
+        self.refresh_timer = None
+        self.create_widgets()
+        self.refresh()
+
+    def _make_tree(self, parent, columns):
+        """columns = [(açar, başlıq, en, anchor)]"""
+        frame = tb.Frame(parent)
+        tree = ttk.Treeview(frame, columns=[key for key, _, _, _ in columns], show='headings')
+        for key, heading, width, anchor in columns:
+            tree.heading(key, text=heading)
+            tree.column(key, width=width, anchor=anchor, stretch=(key == 'sql'))
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        return frame, tree
+
+    def create_widgets(self):
+        top_frame = tb.Frame(self)
+        top_frame.pack(fill='x', padx=10, pady=5)
+        self.summary_label = tb.Label(top_frame, text="", font=('Helvetica', 10, 'bold'))
+        self.summary_label.pack(side='left')
+        tb.Button(top_frame, text="🔄 Yenilə", command=self.refresh, bootstyle="info").pack(side='right', padx=5)
+        tb.Button(top_frame, text="🗑️ Sıfırla", command=self.reset, bootstyle="warning").pack(side='right', padx=5)
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill='both', expand=True, padx=10, pady=5)
+
+        frame, self.slow_tree = self._make_tree(notebook, [
+            ('ms', "Müddət (ms)", 90, 'e'),
+            ('rows', "Sətir", 60, 'e'),
+            ('caller', "Çağıran", 220, 'w'),
+            ('action', "Əməliyyat", 200, 'w'),
+            ('sql', "Sorğu", 500, 'w'),
+        ])
+        notebook.add(frame, text="Ən yavaş")
+
+        frame, self.total_tree = self._make_tree(notebook, [
+            ('total', "Cəmi (ms)", 90, 'e'),
+            ('calls', "Çağırış", 60, 'e'),
+            ('avg', "Orta (ms)", 80, 'e'),
+            ('max', "Maks (ms)", 80, 'e'),
+            ('rows', "Sətir", 70, 'e'),
+            ('errors', "Xəta", 50, 'e'),
+            ('caller', "Çağıran", 200, 'w'),
+            ('sql', "Sorğu", 450, 'w'),
+        ])
+        notebook.add(frame, text="Cəmi vaxt")
+
+        frame, self.n_plus_one_tree = self._make_tree(notebook, [
+            ('repeats', "Təkrar", 70, 'e'),
+            ('occurrences', "Dəfə", 60, 'e'),
+            ('action', "Əməliyyat", 220, 'w'),
+            ('caller', "Çağıran", 220, 'w'),
+            ('sql', "Sorğu", 500, 'w'),
+        ])
+        notebook.add(frame, text="N+1")
+
+    @staticmethod
+    def _fill(tree, rows):
+        tree.delete(*tree.get_children())
+        for values in rows:
+            tree.insert('', 'end', values=values)
+
+    def refresh(self):
+        """Statistikanı yenidən oxuyur (pəncərə açıq olduqca periodik)"""
+        stats = get_sql_stats()
+        self.summary_label.config(
+            text=f"Sorğu: {stats['total_statements']} | cəmi {stats['total_seconds'] * 1000:.0f} ms | "
+                 f"N+1 şübhəsi: {len(stats['n_plus_one'])}")
+        self._fill(self.slow_tree, [
+            (f"{entry['duration'] * 1000:.1f}", '' if entry['rows'] is None or entry['rows'] < 0 else entry['rows'],
+             entry['caller'], entry['action'], ('❌ ' if entry['failed'] else '') + entry['sql'])
+            for entry in stats['slowest']
+        ])
+        self._fill(self.total_tree, [
+            (f"{item['total'] * 1000:.1f}", item['calls'], f"{item['avg'] * 1000:.1f}",
+             f"{item['max'] * 1000:.1f}", item['rows'], item['errors'], ', '.join(item['callers']), item['sql'])
+            for item in stats['statements']
+        ])
+        self._fill(self.n_plus_one_tree, [
+            (issue['max_repeats'], issue['occurrences'], issue['action'], issue['caller'], issue['sql'])
+            for issue in stats['n_plus_one']
+        ])
+        self.refresh_timer = self.after(REFRESH_INTERVAL_MS, self.refresh)
+
+    def reset(self):
+        reset_sql_stats()
+        if self.refresh_timer:
+            self.after_cancel(self.refresh_timer)
+        self.refresh()
+
+    def destroy(self):
+        if self.refresh_timer:
+            self.after_cancel(self.refresh_timer)
+            self.refresh_timer = None
+        super().destroy()
@@ -339,9 +339,6 @@ class ToolsPage(tk.Frame):
     def load_data(self):
         """Məlumatları yükləyir"""
         try:
-            # Cədvəlləri yalnız lazım olduqda yarat (əvvəlcə yoxla)
-            self.ensure_tables_exist()
-            
             # Məlumatları yüklə
             self.load_departments()
             self.load_positions()
@@ -350,37 +347,6 @@ class ToolsPage(tk.Frame):
             print(f"Alətlər paneli yüklənərkən xəta: {e}")
             messagebox.showerror("Xəta", f"Alətlər paneli yüklənərkən xəta: {e}")
     
-    def ensure_tables_exist(self):
-        """Cədvəllərin mövcudluğunu yoxlayır və lazım olduqda yaradır"""
-        try:
-            # Əvvəlcə cədvəllərin mövcudluğunu yoxla - EXE rejimi üçün alternativ import
-            try:
-                from database.departments_positions_queries import check_tables_exist
-            except ImportError:
-                try:
-                    from src.database.departments_positions_queries import check_tables_exist
-                except ImportError:
-                    # Əgər import alınmasa, cədvəlləri yarat
-                    create_departments_table()
-                    create_positions_table()
-                    initialize_default_data()
-                    return
-            
-            if not check_tables_exist():
-                print("Cədvəllər mövcud deyil, yaradılır...")
-                create_departments_table()
-                create_positions_table()
-                initialize_default_data()
-                print("Cədvəllər uğurla yaradıldı")
-            else:
-                print("Cədvəllər artıq mövcuddur")
-        except Exception as e:
-            print(f"Cədvəl yoxlaması xətası: {e}")
-            # Xəta baş verdikdə cədvəlləri yenidən yarat
-            create_departments_table()
-            create_positions_table()
-            initialize_default_data()
-    
     def show_loading(self):
         """Loading göstəricisini göstərir"""
         self.loading_frame = tk.Frame(self, bg=self.colors['background'])
@@ -402,9 +368,6 @@ class ToolsPage(tk.Frame):
     def load_data_async(self):
         """Məlumatları arxa fonda yükləyir"""
         try:
-            # Cədvəlləri yalnız lazım olduqda yarat
-            self.ensure_tables_exist()
-            
             # UI yeniləməsini ana thread-də et
             self.after(0, self.load_data_ui)
         except Exception as e:
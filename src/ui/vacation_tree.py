@@ -3,24 +3,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import tkinter.font as tkFont
-from datetime import datetime, date
+from datetime import date
 from database import database
+from database.records import parse_date
+from database.vacation_index import get_vacation_index
 from database.bulk_operations import bulk_delete_vacations_threaded, bulk_update_vacation_status_threaded
-from .components import Tooltip, get_vacation_status_and_color, mezuniyyet_muddetini_hesabla
+from .components import Tooltip, get_vacation_status_and_color, mezuniyyet_muddetini_hesabla, safe_date_format, safe_date_parse
 from .progress_indicator import ProgressIndicator, BulkOperationDialog
 
-def safe_date_format(date_value, format_str='%d.%m.%Y'):
-    """Tarix dəyərini təhlükəsiz şəkildə format edir"""
-    if isinstance(date_value, str):
-        try:
-            return datetime.strptime(date_value, '%Y-%m-%d').strftime(format_str)
-        except ValueError:
-            return str(date_value)
-    elif hasattr(date_value, 'strftime'):
-        return date_value.strftime(format_str)
-    else:
-        return str(date_value)
-
 class VacationTreeView(ttk.Frame):
     def __init__(self, parent, main_app, employee_info, current_user, refresh_callback):
         super().__init__(parent)
@@ -374,14 +364,22 @@ class VacationTreeView(ttk.Frame):
             tags = self.tree.item(item_id, 'tags')
             data.append((item_id, values, tags))
 
+        # Tarix sütunları üçün göstərilən sətri yenidən parse etmirik - qeyddəki date obyektindən istifadə edirik
+        date_fields = {'start_date': 'baslama', 'end_date': 'bitme', 'created_at': 'yaradilma_tarixi'}
+        vacations_by_iid = {str(vacation.get('db_id')): vacation
+                            for vacation in self.employee_info.get("goturulen_icazeler", [])}
+        col_index = self.tree["columns"].index(col)
+
         def sort_key(item):
             values = item[1]
-            col_index = self.tree["columns"].index(col)
             val = values[col_index]
             
-            if col in ['start_date', 'end_date', 'created_at']:
-                try: return datetime.strptime(val, '%d.%m.%Y')
-                except (ValueError, TypeError): return datetime.min
+            if col in date_fields:
+                vacation = vacations_by_iid.get(str(item[0]))
+                parsed = parse_date(vacation.get(date_fields[col])) if vacation else None
+                if parsed is None:
+                    parsed = parse_date(val)
+                return parsed or date.min
             if col in ['duration', 'countdown']:
                 try: return int(val.split()[0])
                 except (ValueError, IndexError): return 0
@@ -455,10 +453,7 @@ class VacationTreeView(ttk.Frame):
             if status_text == "[Davam edən]":
                 try:
                     # DÜZƏLİŞ: Tarix emalı təhlükəsiz şəkildə
-                    if isinstance(vacation['bitme'], str):
-                        end_dt = datetime.strptime(vacation['bitme'], '%Y-%m-%d').date()
-                    else:
-                        end_dt = vacation['bitme']
+                    end_dt = safe_date_parse(vacation['bitme'])
                     qalan_gun = (end_dt - today).days + 1
                     if qalan_gun > 0: 
                         qalan_gun_str = f"{qalan_gun} gün"
@@ -588,7 +583,45 @@ class VacationTreeView(ttk.Frame):
     def _get_vacation_by_id(self, item_id):
         return next((v for v in self.employee_info.get("goturulen_icazeler", []) if str(v['db_id']) == str(item_id)), None)
 
+    def _confirm_department_overlap(self, vac_id):
+        """
+        Təsdiqdən əvvəl: eyni şöbədən həmin tarixlərdə məzuniyyətdə olanları göstərir.
+        Üst-üstə düşmə yoxdursa və ya istifadəçi razıdırsa True qaytarır.
+        """
+        try:
+            vacation = self._get_vacation_by_id(vac_id)
+            start = parse_date(vacation.get('baslama')) if vacation else None
+            end = parse_date(vacation.get('bitme')) if vacation else None
+            store_getter = getattr(self.main_app_ref, '_employee_store', None)
+            if not start or not end or store_getter is None:
+                return True
+            store = store_getter()
+            index = get_vacation_index(store)
+            department = self.employee_info.get('department')
+            employee_id = self.employee_info.get('db_id')
+            overlaps = index.department_overlaps(department, start, end, exclude_employee=employee_id)
+            if not overlaps:
+                return True
+            peak, peak_day = index.max_concurrent(start, end, department, exclude_employee=employee_id)
+            lines = [f"• {store.name_of(entry.employee_id) or entry.employee_id}: "
+                     f"{safe_date_format(entry.start)} - {safe_date_format(entry.end)}"
+                     for entry in overlaps[:15]]
+            if len(overlaps) > 15:
+                lines.append(f"... (+{len(overlaps) - 15})")
+            return messagebox.askyesno(
+                "Üst-üstə Düşən Məzuniyyətlər",
+                f"Bu tarixlərdə ({safe_date_format(start)} - {safe_date_format(end)}) şöbədən "
+                f"{len(overlaps)} nəfər məzuniyyətdədir "
+                f"(eyni gündə ən çox {peak} nəfər, {safe_date_format(peak_day)}):\n\n"
+                + "\n".join(lines) + "\n\nYenə də təsdiqləmək istəyirsiniz?",
+                parent=self)
+        except Exception as e:
+            print(f"⚠️ Üst-üstə düşmə yoxlaması xətası: {e}")
+            return True
+
     def _handle_request_action(self, vac_id, new_status):
+        if new_status == 'approved' and not self._confirm_department_overlap(vac_id):
+            return
         database.update_vacation_status(vac_id, new_status, self.current_user['name'])
         
         # Real-time notification göndər
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VirtualListbox - yalnız görünən sətirləri çəkən Canvas əsaslı siyahı
+
+tk.Listbox hər sətir üçün Tk elementi saxlayır: 1000+ işçidə delete/insert/itemconfig
+bir neçə saniyə çəkir və siyahı yanıb-sönür. Burada sətirlər Python siyahısında saxlanılır
+(mətn, fg, bg) və ekranda görünən qədər (hündürlük / sətir hündürlüyü + 1) canvas
+düzbucaqlı + mətn cütü təkrar istifadə olunur - yeniləmənin qiyməti işçi sayından asılı deyil.
+
+API tk.Listbox ilə uyğundur (insert, delete, get, size, itemconfig, curselection,
+selection_set/clear, see, nearest, index("@x,y"), yview, <<ListboxSelect>>; Canvas-ın
+eyniadlı metodları Listbox mənasındadır), ona görə
+mövcud seçim/scroll kodu dəyişmədən işləyir. Klaviatura: Up/Down, Prior/Next (səhifə),
+Home/End seçimi dəyişir və seçilmiş sətri görünən sahədə saxlayır.
+Bütün siyahını bir dəfəyə vermək üçün set_items().
+
+update_items() sətirlərin açarları (məs. işçi ID-si) üzrə əvvəlki və yeni siyahının fərqini
+açar -> indeks lüğəti ilə tapır (O(n), sıra dəyişməsi də daxil) və yalnız əlavə/silmə/yerində
+dəyişiklik tətbiq edir: seçim açara bağlıdır, scroll isə görünən ilk saxlanılan sətrə - ona
+görə heç biri sonradan bərpa edilmir, elə yerində qalır.
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+
+_BINDTAG = 'VirtualListbox'
+
+
+def _is_end(value):
+    return isinstance(value, str) and value == tk.END
+
+
+class VirtualListbox(tk.Canvas):
+    def __init__(self, master, font=None, width=20, height=10, bg='#ffffff', fg='#000000',
+                 selectbackground='#cce8ff', selectforeground=None, row_padding=2,
+                 yscrollcommand=None, **kwargs):
+        # Yalnız tk.Listbox-a aid seçimlər qəbul olunur, amma istifadə edilmir
+        for option in ('activestyle', 'selectmode', 'exportselection'):
+            kwargs.pop(option, None)
+        kwargs.setdefault('takefocus', 1)   # tk.Listbox kimi Tab/klik ilə fokus alır
+        self._font = tkfont.Font(master, font=font) if font else tkfont.nametofont('TkDefaultFont')
+        self.row_height = self._font.metrics('linespace') + row_padding
+        super().__init__(master, width=width * self._font.measure('0'), height=height * self.row_height,
+                         bg=bg, **kwargs)
+        self._font_spec = font or 'TkDefaultFont'
+        self.default_fg = fg
+        self.default_bg = bg
+        self.select_bg = selectbackground
+        self.select_fg = selectforeground
+        self._yscrollcommand = yscrollcommand
+
+        self._texts = []
+        self._colors = []           # [(fg, bg)] - None: default
+        self._keys = None           # update_items üçün sətir açarları (set_items/update_items verir)
+        self._key_index = {}        # açar -> indeks (_keys ilə birlikdə yenilənir)
+        self._selection = set()
+        self._top = 0               # piksel ilə scroll mövqeyi
+        self._pool = []             # [(rect_id, text_id)] - görünən sətirlər üçün təkrar istifadə olunur
+        self._redraw_pending = False
+
+        tags = list(self.bindtags())
+        tags.insert(1, _BINDTAG)
+        self.bindtags(tuple(tags))
+        # Sinif bağlamaları widget bağlamalarından SONRA işləyir (tk.Listbox kimi)
+        self.bind_class(_BINDTAG, '<Button-1>', lambda e: e.widget._on_click(e))
+        self.bind_class(_BINDTAG, '<MouseWheel>', lambda e: e.widget._on_wheel(-1 if e.delta > 0 else 1))
+        self.bind_class(_BINDTAG, '<Button-4>', lambda e: e.widget._on_wheel(-1))
+        self.bind_class(_BINDTAG, '<Button-5>', lambda e: e.widget._on_wheel(1))
+        self.bind_class(_BINDTAG, '<Up>', lambda e: e.widget._on_key('up'))
+        self.bind_class(_BINDTAG, '<Down>', lambda e: e.widget._on_key('down'))
+        self.bind_class(_BINDTAG, '<Prior>', lambda e: e.widget._on_key('prior'))
+        self.bind_class(_BINDTAG, '<Next>', lambda e: e.widget._on_key('next'))
+        self.bind_class(_BINDTAG, '<Home>', lambda e: e.widget._on_key('home'))
+        self.bind_class(_BINDTAG, '<End>', lambda e: e.widget._on_key('end'))
+        self.bind('<Configure>', lambda e: self._schedule_redraw(), add=True)
+
+    # --- Konfiqurasiya ---
+
+    def configure(self, cnf=None, **kwargs):
+        if not cnf and not kwargs:
+            return super().configure()
+        if cnf and 'yscrollcommand' in cnf:
+            cnf = dict(cnf)
+            self._yscrollcommand = cnf.pop('yscrollcommand')
+        if 'yscrollcommand' in kwargs:
+            self._yscrollcommand = kwargs.pop('yscrollcommand')
+        if not cnf and not kwargs:
+            return None
+        return super().configure(cnf, **kwargs)
+
+    config = configure
+
+    # --- Model ---
+
+    def set_items(self, items, keys=None):
+        """Bütün sətirləri əvəz edir: items = [(mətn, fg, bg)]; scroll mövqeyi saxlanılır, seçim təmizlənir"""
+        self._texts = [text for text, _, _ in items]
+        self._colors = [(fg, bg) for _, fg, bg in items]
+        self._set_keys(list(keys) if keys is not None else None)
+        self._selection.clear()
+        self._clamp_top()
+        self._schedule_redraw()
+
+    def update_items(self, items, keys):
+        """
+        Açar üzrə fərqi tətbiq edir: items = [(mətn, fg, bg)], keys = unikal açarlar (eyni uzunluqda).
+        Seçilmiş açarlar seçili qalır, görünən ilk saxlanılan sətir ekranda eyni yerdə qalır.
+        Qaytarır: {'inserted', 'deleted', 'changed'} (tam əvəzləmədə 'reset': True).
+        """
+        keys = list(keys)
+        old_keys = self._keys
+        new_index = {key: position for position, key in enumerate(keys)}
+        if old_keys is None or len(old_keys) != len(self._texts) or len(new_index) != len(keys):
+            # Əvvəlki açarlar yoxdur və ya yeni açarlar unikal deyil - tam əvəzləmə
+            self.set_items(items, keys)
+            return {'inserted': len(keys), 'deleted': 0, 'changed': 0, 'reset': True}
+
+        new_texts = [text for text, _, _ in items]
+        new_colors = [(fg, bg) for _, fg, bg in items]
+        old_texts, old_colors, old_index = self._texts, self._colors, self._key_index
+        same_order = old_keys == keys
+        changed = 0
+        if same_order:
+            inserted = deleted = 0
+            for position in range(len(keys)):
+                if old_texts[position] != new_texts[position] or old_colors[position] != new_colors[position]:
+                    changed += 1
+            if not changed:
+                return {'inserted': 0, 'deleted': 0, 'changed': 0}
+        else:
+            kept = 0
+            for key, new in new_index.items():
+                old = old_index.get(key)
+                if old is None:
+                    continue
+                kept += 1
+                if old_texts[old] != new_texts[new] or old_colors[old] != new_colors[new]:
+                    changed += 1
+            inserted = len(keys) - kept
+            deleted = len(old_keys) - kept
+
+            # Scroll lövbəri: görünən ilk saxlanılan sətir eyni piksel mövqeyində qalır
+            first = int(self._top // self.row_height)
+            for old in range(first, len(old_keys)):
+                new = new_index.get(old_keys[old])
+                if new is not None:
+                    self._top += (new - old) * self.row_height
+                    break
+            self._selection = {new_index[old_keys[old]] for old in self._selection
+                               if old_keys[old] in new_index}
+
+        self._texts = new_texts
+        self._colors = new_colors
+        self._keys = keys
+        self._key_index = new_index
+        self._clamp_top()
+        self._schedule_redraw()
+        return {'inserted': inserted, 'deleted': deleted, 'changed': changed}
+
+    def _set_keys(self, keys):
+        self._keys = keys
+        self._key_index = {key: position for position, key in enumerate(keys)} if keys is not None else {}
+
+    def index_of_key(self, key):
+        """Açarın cari indeksi; yoxdursa None"""
+        return self._key_index.get(key)
+
+    def key_at(self, index):
+        """index-dəki sətrin açarı; açar verilməyibsə None"""
+        if self._keys is None or not 0 <= index < len(self._keys):
+            return None
+        return self._keys[index]
+
+    def size(self):
+        return len(self._texts)
+
+    def index(self, index):
+        if _is_end(index):
+            return len(self._texts)
+        if isinstance(index, str) and index.startswith('@'):
+            y = int(index[1:].split(',')[1])
+            return max(0, self.nearest(y))
+        if isinstance(index, str) and index in ('active', 'anchor'):
+            return min(self._selection) if self._selection else 0
+        return int(index)
+
+    def _range(self, first, last):
+        first = self.index(first)
+        last = first if last is None else (len(self._texts) - 1 if _is_end(last) else self.index(last))
+        return first, last
+
+    def insert(self, index, *elements):
+        position = len(self._texts) if _is_end(index) else self.index(index)
+        self._texts[position:position] = [str(element) for element in elements]
+        self._set_keys(None)
+        self._colors[position:position] = [(None, None)] * len(elements)
+        if position <= (max(self._selection) if self._selection else -1):
+            self._selection = {i + len(elements) if i >= position else i for i in self._selection}
+        self._schedule_redraw()
+
+    def delete(self, first, last=None):
+        first, last = self._range(first, last)
+        if last < first:
+            return
+        del self._texts[first:last + 1]
+        self._set_keys(None)
+        del self._colors[first:last + 1]
+        removed = last - first + 1
+        self._selection = {i if i < first else i - removed for i in self._selection if not first <= i <= last}
+        self._clamp_top()
+        self._schedule_redraw()
+
+    def get(self, first, last=None):
+        if last is None:
+            return self._texts[self.index(first)]
+        first, last = self._range(first, last)
+        return tuple(self._texts[first:last + 1])
+
+    def itemconfig(self, index, cnf=None, **kwargs):
+        options = dict(cnf or {}, **kwargs)
+        index = self.index(index)
+        fg, bg = self._colors[index]
+        fg = options.get('fg', options.get('foreground', fg))
+        bg = options.get('bg', options.get('background', bg))
+        self._colors[index] = (fg, bg)
+        if self._is_visible(index):
+            self._schedule_redraw()
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, index, option):
+        fg, bg = self._colors[self.index(index)]
+        if option in ('fg', 'foreground'):
+            return fg or self.default_fg
+        if option in ('bg', 'background'):
+            return bg or self.default_bg
+        return ''
+
+    # --- Seçim ---
+
+    def curselection(self):
+        return tuple(sorted(self._selection))
+
+    def selection_set(self, first, last=None):
+        first, last = self._range(first, last)
+        new = self._selection | set(range(max(0, first), min(last, len(self._texts) - 1) + 1))
+        if new != self._selection:
+            self._selection = new
+            self._schedule_redraw()
+
+    select_set = selection_set
+
+    def selection_clear(self, first, last=None):
+        first, last = self._range(first, last)
+        new = {i for i in self._selection if not first <= i <= last}
+        if new != self._selection:
+            self._selection = new
+            self._schedule_redraw()
+
+    select_clear = selection_clear
+
+    def selection_includes(self, index):
+        return self.index(index) in self._selection
+
+    def activate(self, index):
+        pass
+
+    def _on_click(self, event):
+        self.focus_set()
+        index = self.nearest(event.y)
+        if index < 0:
+            return
+        self._selection = {index}
+        self._schedule_redraw()
+        self.event_generate('<<ListboxSelect>>')
+
+    def _key_target(self, key):
+        """Klaviatura hərəkətinin hədəf indeksi (tk.Listbox browse rejimi kimi)"""
+        last = len(self._texts) - 1
+        current = min(self._selection) if self._selection else None
+        page = max(1, self.winfo_height() // self.row_height - 1)
+        if key == 'home':
+            return 0
+        if key == 'end':
+            return last
+        if current is None:
+            return 0
+        step = {'up': -1, 'down': 1, 'prior': -page, 'next': page}[key]
+        return min(max(current + step, 0), last)
+
+    def _on_key(self, key):
+        if not self._texts:
+            return 'break'
+        index = self._key_target(key)
+        self.see(index)
+        if self._selection != {index}:
+            self._selection = {index}
+            self._schedule_redraw()
+            self.event_generate('<<ListboxSelect>>')
+        return 'break'
+
+    # --- Scroll ---
+
+    def _max_top(self):
+        return max(0, len(self._texts) * self.row_height - self.winfo_height())
+
+    def _clamp_top(self):
+        self._top = min(max(0, self._top), self._max_top())
+
+    def nearest(self, y):
+        if not self._texts:
+            return -1
+        return min(len(self._texts) - 1, max(0, int((self._top + y) // self.row_height)))
+
+    def _is_visible(self, index):
+        first = int(self._top // self.row_height)
+        return first <= index <= first + self.winfo_height() // self.row_height + 1
+
+    def see(self, index):
+        index = self.index(index)
+        top = index * self.row_height
+        bottom = top + self.row_height
+        height = self.winfo_height()
+        if top < self._top:
+            self._top = top
+        elif bottom > self._top + height:
+            self._top = bottom - height
+        else:
+            return
+        self._clamp_top()
+        self._schedule_redraw()
+
+    def yview(self, *args):
+        total = len(self._texts) * self.row_height
+        if not args:
+            if total <= 0:
+                return 0.0, 1.0
+            return self._top / total, min(1.0, (self._top + self.winfo_height()) / total)
+        if args[0] == 'moveto':
+            self._top = float(args[1]) * total
+        elif args[0] == 'scroll':
+            step = self.row_height if args[2] == 'units' else max(self.row_height, self.winfo_height() - self.row_height)
+            self._top += int(args[1]) * step
+        else:
+            self._top = self.index(args[0]) * self.row_height
+        self._clamp_top()
+        self._schedule_redraw()
+
+    def _on_wheel(self, direction):
+        self.yview('scroll', direction * 3, 'units')
+
+    # --- Çəkmə ---
+
+    def _item_config(self, item, **options):
+        # itemconfigure Listbox mənasında yenidən təyin olunub - canvas elementi üçün əsl metod
+        tk.Canvas.itemconfigure(self, item, **options)
+
+    def _schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self):
+        """Yalnız görünən sətirləri mövcud canvas elementləri ilə çəkir"""
+        self._redraw_pending = False
+        if not self.winfo_exists():
+            return
+        width = self.winfo_width()
+        height = self.winfo_height()
+        self._clamp_top()
+        first = int(self._top // self.row_height)
+        offset = first * self.row_height - self._top
+        visible = min(len(self._texts) - first, height // self.row_height + 2)
+
+        while len(self._pool) < visible:
+            rect = self.create_rectangle(0, 0, 0, 0, width=0)
+            text = self.create_text(0, 0, anchor='w', font=self._font_spec)
+            self._pool.append((rect, text))
+
+        for slot, (rect, text) in enumerate(self._pool):
+            index = first + slot
+            if slot >= visible:
+                self._item_config(rect, state='hidden')
+                self._item_config(text, state='hidden')
+                continue
+            fg, bg = self._colors[index]
+            fg, bg = fg or self.default_fg, bg or self.default_bg
+            if index in self._selection:
+                bg = self.select_bg or bg
+                fg = self.select_fg or fg
+            y = offset + slot * self.row_height
+            self.coords(rect, 0, y, width, y + self.row_height)
+            self._item_config(rect, fill=bg, state='normal')
+            self.coords(text, 2, y + self.row_height / 2)
+            self._item_config(text, text=self._texts[index], fill=fg, state='normal')
+
+        if self._yscrollcommand:
+            self._yscrollcommand(*self.yview())
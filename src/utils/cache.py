@@ -4,6 +4,7 @@ import json
 import os
 import time
 import logging
+from collections.abc import Mapping
 from datetime import datetime
 import base64
 from cryptography.fernet import Fernet
@@ -134,7 +135,7 @@ def save_cache(data):
 
 def _serialize_data(data):
     """Date obyektlərini string-ə çevirir"""
-    if isinstance(data, dict):
+    if isinstance(data, Mapping):
         return {key: _serialize_data(value) for key, value in data.items()}
     elif isinstance(data, list):
         return [_serialize_data(item) for item in data]
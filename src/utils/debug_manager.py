@@ -2,13 +2,26 @@
 # -*- coding: utf-8 -*-
 """
 Debug Manager - Debug mesajlarını kategorilərə bölünmüş şəkildə göstərir və idarə edir
+Qeydlər strukturlaşdırılmış log nüvəsindədir (utils.structured_log): filtr formatlamadan
+əvvəl yoxlanılır, fayla arxa fon yazıcısı yazır.
 """
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import threading
 from datetime import datetime
-from collections import deque
+
+try:
+    from utils.structured_log import (
+        DEBUG, WARNING, ERROR, LEVEL_NAMES, get_log_core, level_from_name, print_level,
+    )
+except ImportError:
+    from src.utils.structured_log import (
+        DEBUG, WARNING, ERROR, LEVEL_NAMES, get_log_core, level_from_name, print_level,
+    )
+
+# debug_log çağırışlarının səviyyəsi emoji-yə görə
+_EMOJI_LEVELS = {'❌': ERROR, '⚠️': WARNING}
 
 class DebugManager:
     """Debug mesajlarını kategorilərə görə yönətmək"""
@@ -29,7 +42,8 @@ class DebugManager:
         self.window = None
         self.text_widget = None
         self.checkboxes = {}
-        self.message_queue = deque(maxlen=1000)  # Son 1000 mesaj (azaldıldı)
+        self.core = get_log_core()  # Mesajlar nüvənin halqa buferindədir
+        self.min_level = DEBUG
         self.lock = threading.Lock()
         self.auto_scroll = True
         self.is_logging = False  # Sonsuz loop'u önlemek üçün flag
@@ -40,7 +54,7 @@ class DebugManager:
         self.console_output_enabled = False  # Konsola print default: OFF
         self.settings_file_path = self._default_settings_path()
         self._after_job_id = None  # Tk after job id to throttle UI updates
-        self._render_index = 0  # Last rendered message index in queue snapshot
+        self._render_seq = 0  # Pəncərədə göstərilmiş son qeydin növbəti seq nömrəsi
         self._load_settings_safely()
 
     def _default_settings_path(self):
@@ -64,8 +78,11 @@ class DebugManager:
                     for k, v in categories.items():
                         if k in self.enabled_categories and isinstance(v, bool):
                             self.enabled_categories[k] = v
+                if isinstance(data.get('min_level'), str):
+                    self.min_level = level_from_name(data['min_level'])
         except Exception:
             pass
+        self._sync_core_filters()
         
         # Logging handler əlavə et
         self._setup_logging_handler()
@@ -76,12 +93,18 @@ class DebugManager:
             payload = {
                 'console_output_enabled': self.console_output_enabled,
                 'enabled_categories': self.enabled_categories,
+                'min_level': LEVEL_NAMES.get(self.min_level, 'DEBUG'),
             }
             with open(self.settings_file_path, 'w', encoding='utf-8') as f:
                 json.dump(payload, f, ensure_ascii=False, indent=2)
         except Exception:
             pass
     
+    def _sync_core_filters(self):
+        """Söndürülmüş kateqoriyalar və minimum səviyyə nüvəyə ötürülür (formatlamadan əvvəl filtr)"""
+        self.core.set_min_level(self.min_level)
+        self.core.set_disabled_categories(c for c, enabled in self.enabled_categories.items() if not enabled)
+
     def _save_settings(self):
         """Yadda Saxla düyməsi üçün"""
         self._save_settings_safely()
@@ -91,12 +114,8 @@ class DebugManager:
             self.text_widget.see("end")
     
     def _setup_logging_handler(self):
-        """Logging handler əlavə et - log faylına yazmaq üçün"""
+        """Log faylı nüvənin arxa fon yazıcısına verilir, standart logging nüvəyə yönləndirilir"""
         try:
-            import os
-            import sys
-            import logging
-            
             # Log helper istifadə et
             try:
                 from utils.log_helper import get_log_file_path, archive_existing_log
@@ -109,28 +128,16 @@ class DebugManager:
             # Yeni log faylının yolunu al (timestamp ilə)
             self.log_file_path = get_log_file_path('debug_console.log', with_timestamp=True)
             
-            # File handler yarad
-            self.log_file_handler = logging.FileHandler(self.log_file_path, encoding='utf-8', mode='w')
-            self.log_file_handler.setLevel(logging.DEBUG)
-            formatter = logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-            self.log_file_handler.setFormatter(formatter)
-            
-            # Logger-ə əlavə et
-            logger = logging.getLogger('debug_console')
-            logger.setLevel(logging.DEBUG)
-            logger.addHandler(self.log_file_handler)
-            self.logger = logger
-            
-            # İlk mesajı yaz
-            logger.info("=" * 80)
-            logger.info("DEBUG LOG FAYLI BAŞLADI")
-            logger.info(f"Log faylı yolu: {self.log_file_path}")
-            logger.info("=" * 80)
+            # Fayla yazma və bazaya göndərmə arxa fon yazıcısındadır
+            self.core.attach_file(self.log_file_path, header_lines=(
+                "=" * 80,
+                "DEBUG LOG FAYLI BAŞLADI",
+                f"Log faylı yolu: {self.log_file_path}",
+                "=" * 80,
+            ), ship_log_type='debug_console')
         except Exception as e:
             # Xəta olsa belə davam et
             self.log_file_path = None
-            self.logger = None
-            pass
         try:
             import logging
             
@@ -141,50 +148,12 @@ class DebugManager:
                 
                 def emit(self, record):
                     try:
-                        if getattr(self.debug_manager, 'is_logging', False):
-                            return  # Sonsuz loopdan qaç
-                        
-                        msg = self.format(record)
-                        level = record.levelname
-                        name = record.name.lower()
-                        
-                        # Kateqoriya təyini
-                        if 'database' in msg.lower() or 'connection' in msg.lower() or 'offline database' in msg.lower():
-                            cat, emoji = 'database', '🗄️'
-                        elif 'ui' in msg.lower() or 'frame' in msg.lower() or 'widget' in msg.lower() or 'login' in msg.lower():
-                            cat, emoji = 'ui', '🖥️'
-                        elif 'vacation' in msg.lower() or 'məzuniyyət' in msg.lower():
-                            cat, emoji = 'vacation', '🏖️'
-                        elif 'employee' in msg.lower() or 'işçi' in msg.lower():
-                            cat, emoji = 'employee', '👤'
-                        elif 'performance' in msg.lower() or 'yavaş' in msg.lower():
-                            cat, emoji = 'performance', '⚡'
-                        elif 'signal' in msg.lower() or 'notification' in msg.lower():
-                            cat, emoji = 'signal', '📡'
-                        elif 'animation' in msg.lower() or 'gif' in msg.lower() or 'loading' in msg.lower():
-                            cat, emoji = 'animasiya', '🎬'
-                        elif 'calendar' in msg.lower() or 'takvim' in msg.lower():
-                            cat, emoji = 'takvim', '📅'
-                        else:
-                            cat, emoji = 'umumi', '📝'
-                        
-                        # Emoji level-ə görə
-                        if level == 'DEBUG':
-                            emoji = '🔍'
-                        elif level == 'INFO':
-                            emoji = 'ℹ️'
-                        elif level == 'WARNING':
-                            emoji = '⚠️'
-                        elif level == 'ERROR':
-                            emoji = '❌'
-                        
-                        # Debug manager-a göndər
-                        self.debug_manager.is_logging = True
-                        try:
-                            self.debug_manager.log(cat, msg, emoji)
-                        finally:
-                            self.debug_manager.is_logging = False
-                            
+                        manager = self.debug_manager
+                        # Səviyyə formatlamadan əvvəl yoxlanılır
+                        if manager.is_logging or record.levelno < manager.core.min_level:
+                            return
+                        # Kateqoriya nüvədə mesajdan təyin olunur, emoji səviyyədən
+                        manager._emit(record.levelno, None, None, (self.format(record),))
                     except Exception:
                         pass
             
@@ -212,15 +181,23 @@ class DebugManager:
         self.console_output_enabled = bool(enabled)
         self._save_settings_safely()
 
+    def set_min_level(self, level):
+        """Minimum log səviyyəsi ('DEBUG', 'INFO', 'WARNING', 'ERROR') - aşağı səviyyələr formatlanmır"""
+        self.min_level = level_from_name(level, self.min_level)
+        self._sync_core_filters()
+        self._save_settings_safely()
+
     def enable_category(self, category: str):
         if category in self.enabled_categories:
             self.enabled_categories[category] = True
+            self._sync_core_filters()
             self._save_settings_safely()
             self._refresh_display()
 
     def disable_category(self, category: str):
         if category in self.enabled_categories:
             self.enabled_categories[category] = False
+            self._sync_core_filters()
             self._save_settings_safely()
             self._refresh_display()
 
@@ -237,6 +214,7 @@ class DebugManager:
                     self.enabled_categories[c] = False
                     changed = True
         if changed:
+            self._sync_core_filters()
             self._save_settings_safely()
             self._refresh_display()
         
@@ -331,6 +309,7 @@ class DebugManager:
         """Kategori açar/bağlar"""
         with self.lock:
             self.enabled_categories[category] = enabled
+            self._sync_core_filters()
             # Ayarları avtomatik yadda saxla
             self._save_settings_safely()
             # Köhnə mesajları güncelle - async şəkildə (UI-ni bloklamamaq üçün)
@@ -372,50 +351,22 @@ class DebugManager:
         else:
             _async_show()
     
-    def log(self, category, message, emoji="📝"):
+    def log(self, category, message, emoji="📝", level=None):
         """
-        Debug mesajı əlavə et - Non-blocking versiya və log faylına yaz
+        Debug mesajı əlavə et - Non-blocking versiya
+        Söndürülmüş kateqoriya/səviyyə dərhal atılır; fayla yazma arxa fon yazıcısındadır
         """
+        if level is None:
+            level = _EMOJI_LEVELS.get(emoji, DEBUG)
+        self._emit(level, category, emoji, (message,))
+    
+    def _emit(self, level, category, emoji, args, sep=' '):
+        """Qeydi nüvəyə yazır və pəncərə açıqdırsa yeniləməni planlaşdırır"""
         try:
-            # Mesajı sadəcə queue-ya əlavə et, UI yeniləməni gecikdir
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            log_entry = {
-                'timestamp': timestamp,
-                'category': category,
-                'emoji': emoji,
-                'message': message
-            }
-            
-            with self.lock:
-                self.message_queue.append(log_entry)
-            
-            # Log faylına yaz (EXE-də görmək üçün)
-            if hasattr(self, 'logger') and self.logger:
-                try:
-                    full_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    log_message = f"[{full_timestamp}] [{category.upper()}] {emoji} {message}"
-                    self.logger.debug(log_message)
-                    
-                    # Verilənlər bazasına da yaz
-                    try:
-                        try:
-                            from utils.log_helper import log_to_database_async
-                        except ImportError:
-                            from src.utils.log_helper import log_to_database_async
-                        
-                        log_file_name = getattr(self, 'log_file_path', None)
-                        if log_file_name:
-                            log_file_name = os.path.basename(log_file_name)
-                        log_to_database_async('debug_console', log_message, log_file_name)
-                    except Exception:
-                        pass
-                except Exception:
-                    pass
-            
+            record = self.core.emit(level, category, emoji, args, sep)
             # UI yeniləməni gecikdir (non-blocking)
-            if self.text_widget and self.enabled_categories.get(category, False):
+            if record is not None and self.text_widget:
                 self._schedule_update()
-                
         except Exception:
             # Xətaları udur ki, proqram dayanmasın
             pass
@@ -445,33 +396,30 @@ class DebugManager:
         if not self.text_widget or not self.text_widget.winfo_exists():
             return
         try:
-            # Take a snapshot of the queue
-            with self.lock:
-                snapshot = list(self.message_queue)
-            total = len(snapshot)
-            # If messages were dropped due to maxlen, clamp render index
-            if self._render_index > total:
-                self._render_index = total
-            start = max(0, self._render_index)
             # Limit how many we render per batch to avoid UI stalls
-            batch = snapshot[start:][:200]
+            batch, _ = self.core.buffer.since(self._render_seq, limit=200)
             if not batch:
                 return
-            for entry in batch:
-                if self.enabled_categories.get(entry['category'], False):
-                    self._add_simple_message(entry)
-            self._render_index = start + len(batch)
+            for record in batch:
+                if self.enabled_categories.get(record.resolve().category, False):
+                    self._add_simple_message(record)
+            self._render_seq = batch[-1].seq + 1
+            if len(batch) == 200:
+                self._schedule_update()
             if self.auto_scroll:
                 self.text_widget.see("end")
         except Exception:
             pass
     
-    def _add_simple_message(self, entry):
+    @staticmethod
+    def _format_record(record):
+        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        return f"[{timestamp}] {record.emoji} {record.message}\n"
+    
+    def _add_simple_message(self, record):
         """Sadə mesaj əlavə et"""
         try:
-            # Sadə format
-            message_text = f"[{entry['timestamp']}] {entry['emoji']} {entry['message']}\n"
-            self.text_widget.insert("end", message_text)
+            self.text_widget.insert("end", self._format_record(record))
         except Exception:
             pass
     
@@ -491,19 +439,17 @@ class DebugManager:
                 self.text_widget.insert("end", "🔍 DEBUG YÖNƏTİCİSİ\n")
                 self.text_widget.insert("end", "=" * 80 + "\n\n")
                 
-                # Enabled kategorilerin mesajlarını göster - batch şəkildə
-                with self.lock:
-                    snapshot = list(self.message_queue)
-                
                 # Mesajları batch-lərə böl və tədricən göstər - UI-ni bloklamamaq üçün
                 batch_size = 30  # Batch ölçüsünü daha da azaltdım (50-dən 30-a)
-                total = len(snapshot)
                 
-                # Çox mesaj varsa, yalnız son mesajları göstər (ilk 300 mesajı atla - daha az yüklə)
+                # Çox mesaj varsa, yalnız son mesajları göstər (buferdəki köhnələr göstərilmir)
                 max_messages_to_show = 300  # 500-dən 300-ə azaldıldı
-                start_from = max(0, total - max_messages_to_show) if total > max_messages_to_show else 0
-                snapshot = snapshot[start_from:]
+                buffer = self.core.buffer
+                snapshot = buffer.tail(max_messages_to_show)
+                start_from = min(buffer.next_seq, buffer.capacity) - len(snapshot)
                 total = len(snapshot)
+                if snapshot:
+                    self._render_seq = snapshot[-1].seq + 1
                 
                 # Əgər çox mesaj varsa, istifadəçiyə bildir
                 if start_from > 0:
@@ -518,10 +464,9 @@ class DebugManager:
                         # Batch mesajlarını topla
                         batch_messages = []
                         for i in range(start_idx, end_idx):
-                            entry = snapshot[i]
-                            if self.enabled_categories.get(entry['category'], False):
-                                message_text = f"[{entry['timestamp']}] {entry['emoji']} {entry['message']}\n"
-                                batch_messages.append(message_text)
+                            record = snapshot[i]
+                            if self.enabled_categories.get(record.resolve().category, False):
+                                batch_messages.append(self._format_record(record))
                         
                         # Bütün batch mesajlarını bir dəfədə insert et (daha sürətli)
                         if batch_messages:
@@ -587,7 +532,11 @@ def is_category_enabled(category):
     return get_debug_manager().is_enabled(category)
 
 def setup_debug_print_intercept():
-    """Print funksiyasını intercept et və debug manager-a göndər"""
+    """
+    Print funksiyasını intercept et və log nüvəsinə göndər
+    Səviyyə ilk arqumentin başından təyin olunur; söndürülmüş səviyyə/kateqoriya üçün
+    mesaj birləşdirilmir, vaxt damğası formatlanmır (utils.structured_log)
+    """
     import builtins
     if hasattr(builtins, '_original_print_'):
         return builtins._original_print_  # Zaten intercept edilmiş
@@ -596,95 +545,41 @@ def setup_debug_print_intercept():
     builtins._original_print_ = original_print
     
     def debug_print(*args, **kwargs):
+        # Manager (və log faylı) ilk print-də yaradılır - import zamanı deyil
+        manager = _debug_manager
+        if manager is None:
+            manager = get_debug_manager()
+            manager.log('umumi', 'Print intercept aktivləşdirildi', '🔧')
+        core = manager.core
         # Konsola çıxışı idarə et
-        manager = get_debug_manager()
-        if manager is None or manager.console_output_enabled:
+        if manager.console_output_enabled:
             try:
                 original_print(*args, **kwargs)
             except UnicodeEncodeError:
                 pass
         
-        # Log faylına da yaz (EXE-də görmək üçün)
-        if manager and hasattr(manager, 'logger') and manager.logger:
-            try:
-                message = ' '.join(str(arg) for arg in args)
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                manager.logger.debug(f"[{timestamp}] {message}")
-            except Exception:
-                pass
-        
-        # Debug manager var mı ve aktif mi kontrol et
-        manager = _debug_manager if manager is None else manager
-        if manager is None or manager.is_logging:
+        if not args or manager.is_logging:
             return  # Sonsuz loop'u önle
         
-        # Mesajı hızlıca oluştur
-        try:
-            message = ' '.join(str(arg) for arg in args)
-        except:
-            return  # Hata durumunda devam etme
-        
-        # Debug test mesajı əlavə et
-        if not hasattr(debug_print, '_test_sent'):
-            debug_print._test_sent = True
-            try:
-                debug_log('umumi', 'Print intercept aktivləşdirildi', '🔧')
-            except:
-                pass
-        
-        # Kategori təyin et (basit ve hızlı)
-        category = None
-        emoji = '📝'
-        
-        # Hızlı kategori tespiti - sadece birkaç karakter kontrol et
-        msg_lower = message.lower()
-        
-        if '🟢' in message or '🎬' in message or 'loading' in msg_lower or 'gif' in msg_lower:
-            category = 'animasiya'
-            emoji = '🎬'
-        elif 'məzuniyyət' in message or 'kvadrat' in message or '🎯' in message or 'takvim' in msg_lower:
-            category = 'takvim'
-            emoji = '📅'
-        elif 'veritabanı' in msg_lower or 'connection' in msg_lower or 'database' in msg_lower or 'offline database' in msg_lower:
-            category = 'database'
-            emoji = '🗄️'
-        elif any(word in message for word in ['Panel', 'Widget', 'Frame', 'UI', 'Login', 'window', 'pəncərə']):
-            category = 'ui'
-            emoji = '🖥️'
-        elif 'məzuniyyət' in message or 'vacation' in msg_lower:
-            category = 'vacation'
-            emoji = '🏖️'
-        elif 'işçi' in message or 'employee' in msg_lower:
-            category = 'employee'
-            emoji = '👤'
-        elif 'debug' in msg_lower or 'DEBUG' in message:
-            category = 'umumi'
-            emoji = '🔍'
-        elif 'warning' in msg_lower or 'WARNING' in message:
-            category = 'umumi'
-            emoji = '⚠️'
-        elif 'info' in msg_lower or 'INFO' in message:
-            category = 'umumi'
-            emoji = 'ℹ️'
-        else:
-            category = 'umumi'
-            emoji = '📝'
+        # Səviyyə filtri - heç nə formatlanmadan
+        level = print_level(args[0])
+        if level < core.min_level:
+            core.filtered += 1
+            return
         
-        # HER ZAMAN logla (gösterilmesi kategoriye bağlı)
-        manager.is_logging = True
-        try:
-            manager.log(category, message, emoji)
-        finally:
-            manager.is_logging = False
+        # Kateqoriya nüvədə (söndürülmüş kateqoriya varsa dərhal, yoxsa oxunanda) təyin olunur
+        manager._emit(level, None, None, args, kwargs.get('sep'))
     
     # Print'i değiştir
     builtins.print = debug_print
     return original_print
 
-def configure_debug(categories_on=None, categories_off=None, console_output=None):
-    """Runtime konfiqurasiya: kateqoriyalar və konsol çıxışı."""
+def configure_debug(categories_on=None, categories_off=None, console_output=None, min_level=None):
+    """Runtime konfiqurasiya: kateqoriyalar, konsol çıxışı və minimum səviyyə."""
     mgr = get_debug_manager()
     if console_output is not None:
         mgr.set_console_output(bool(console_output))
+    if min_level is not None:
+        mgr.set_min_level(min_level)
     mgr.set_enabled_categories(categories_on, categories_off)
 
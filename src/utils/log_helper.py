@@ -98,7 +98,8 @@ def archive_existing_log(log_name):
 def log_to_database_async(log_type, log_content, log_file_name=None):
     """
     Log məlumatını verilənlər bazasına asinxron yazır
-    Xəta olsa belə proqramı dayandırmır
+    Sətir log göndəricinin növbəsinə qoyulur və toplu yazılır (utils.log_shipper);
+    çağıran heç vaxt gözləmir. Xəta olsa belə proqramı dayandırmır
     
     Args:
         log_type: Log növü (debug_console, realtime_debug, email_service, unified_app_debug)
@@ -111,26 +112,12 @@ def log_to_database_async(log_type, log_content, log_file_name=None):
             # İstifadəçi ID yoxdursa, yazmırıq
             return
         
-        # Verilənlər bazasına yazmaq üçün import et
         try:
-            from database.error_queries import log_to_database
+            from utils.log_shipper import get_log_shipper
         except ImportError:
-            try:
-                from src.database.error_queries import log_to_database
-            except ImportError:
-                return
-        
-        # Asinxron yazmaq üçün thread istifadə et
-        import threading
-        def write_log():
-            try:
-                log_to_database(user_id, log_type, log_content, log_file_name)
-            except Exception:
-                # Xəta olsa belə davam et
-                pass
+            from src.utils.log_shipper import get_log_shipper
         
-        thread = threading.Thread(target=write_log, daemon=True)
-        thread.start()
+        get_log_shipper().enqueue(user_id, log_type, log_content, log_file_name)
     except Exception:
         # Xəta olsa belə davam et
         pass
@@ -209,6 +196,7 @@ def sync_existing_logs_to_database(user_id):
     Mövcud log fayllarını verilənlər bazasına sinxronlaşdırır
     Proqram başlayanda və ya login zamanı çağırılmalıdır
     ƏVVƏLCƏ silmə siqnallarını yoxlayır və faylları silir
+    Lokal manifest sayəsində yalnız dəyişmiş faylların əlavə olunmuş hissələri yüklənir (utils.log_sync)
     
     Args:
         user_id: İstifadəçi ID-si
@@ -217,80 +205,27 @@ def sync_existing_logs_to_database(user_id):
         # ƏVVƏLCƏ: Silmə siqnallarını yoxla və faylları sil
         check_and_process_deletion_signals(user_id)
         
+        # Log partisiyalarının texniki xidməti (yeni aylar yaradılır, köhnələr bütöv silinir)
+        try:
+            from database.log_storage import run_log_maintenance
+        except ImportError:
+            from src.database.log_storage import run_log_maintenance
+        run_log_maintenance()
+        
         debug_logs_dir = get_debug_logs_dir()
         if not os.path.exists(debug_logs_dir):
             return
         
-        # Verilənlər bazasına yazmaq üçün import et
         try:
-            from database.error_queries import log_to_database, get_user_logs
+            from utils.log_sync import sync_log_files
         except ImportError:
-            try:
-                from src.database.error_queries import log_to_database, get_user_logs
-            except ImportError:
-                return
-        
-        # Bazada mövcud log fayllarının siyahısını al (duplikat yoxlamaq üçün)
-        existing_logs = {}
-        try:
-            user_logs = get_user_logs(user_id=user_id, limit=10000)
-            for log in user_logs:
-                log_file_name = log[6]  # log_file_name sütunu
-                if log_file_name:
-                    existing_logs[log_file_name] = True
-        except Exception:
-            pass
+            from src.utils.log_sync import sync_log_files
         
-        # Log fayllarını tap və sinxronlaşdır
-        log_patterns = {
-            'debug_console': 'debug_console_*.log',
-            'realtime_debug': 'realtime_debug_*.log',
-            'email_service': 'email_service_*.log',
-            'unified_app_debug': 'unified_app_debug_*.log'
-        }
+        result = sync_log_files(user_id, debug_logs_dir)
         
-        import glob
-        synced_count = 0
-        
-        for log_type, pattern in log_patterns.items():
-            log_files = glob.glob(os.path.join(debug_logs_dir, pattern))
-            
-            for log_file_path in log_files:
-                try:
-                    log_file_name = os.path.basename(log_file_path)
-                    
-                    # Əgər bu fayl artıq bazada varsa, atla
-                    if log_file_name in existing_logs:
-                        continue
-                    
-                    # Faylın məzmununu oxu
-                    try:
-                        with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            log_content = f.read()
-                    except Exception:
-                        # Əgər oxuya bilməsək, atla
-                        continue
-                    
-                    # Əgər fayl boşdursa, atla
-                    if not log_content.strip():
-                        continue
-                    
-                    # Bazaya yaz
-                    try:
-                        log_to_database(user_id, log_type, log_content, log_file_name)
-                        synced_count += 1
-                    except Exception:
-                        # Xəta olsa belə davam et
-                        pass
-                        
-                except Exception:
-                    # Xəta olsa belə davam et
-                    pass
-        
-        if synced_count > 0:
-            print(f"✅ {synced_count} log faylı verilənlər bazasına sinxronlaşdırıldı")
+        if result['files'] > 0:
+            print(f"✅ {result['files']} log faylı verilənlər bazasına sinxronlaşdırıldı ({result['bytes'] // 1024} KB)")
         
     except Exception as e:
         # Xəta olsa belə davam et - sinxronlaşdırma proqramı dayandırmamalıdır
         pass
-
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log Rotation - log fayllarının ölçü limiti və debug_logs qovluğunun ümumi limiti
+
+Hər log faylı MAX_FILE_BYTES-a çatanda bağlanır və yazma eyni adın növbəti hissəsinə
+(debug_console_<vaxt>.log -> debug_console_<vaxt>_part2.log) keçir. Köhnə adlar yerində
+qalır ki, log_sync və bazadakı log_file_name-lər dəyişməsin. Bağlanmış hissə serverə tam
+yüklənibsə (log_sync manifesti) arxa fon thread-ində gzip ilə sıxılır (<ad>.log.gz) və
+orijinalı silinir; yüklənməyibsə növbəti sinxronizasiyanı gözləyir (retry_deferred).
+Sonra qovluğun ümumi ölçüsü MAX_DIR_BYTES-dan böyükdürsə ən köhnə fayllar silinir
+(açıq və hələ yüklənməmiş fayllara toxunulmur).
+
+İstifadə edənlər: RealtimeDebugger, email_service, unified_app_debug (RotatingLogHandler)
+və DebugManager-in structured_log yazıcısı (RotatingLogFile).
+"""
+
+import gzip
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+MAX_FILE_BYTES = 5 * 1024 * 1024        # bir log faylının maksimum ölçüsü
+MAX_DIR_BYTES = 200 * 1024 * 1024       # debug_logs qovluğunun maksimum ümumi ölçüsü
+COMPRESS_LEVEL = 6
+MIN_FILE_AGE = 60                       # bundan təzə fayllar qovluq limiti üçün silinmir (saniyə)
+
+_PART_RE = re.compile(r'^(?P<stem>.*?)(?:_part(?P<part>\d+))?$')
+
+
+def next_part_path(path):
+    """debug_console_X.log -> debug_console_X_part2.log -> ..._part3.log (mövcud olmayan ilk ad)"""
+    directory, name = os.path.split(path)
+    base, ext = os.path.splitext(name)
+    match = _PART_RE.match(base)
+    stem, part = match.group('stem'), int(match.group('part') or 1)
+    while True:
+        part += 1
+        candidate = os.path.join(directory, f"{stem}_part{part}{ext}")
+        if not os.path.exists(candidate) and not os.path.exists(candidate + '.gz'):
+            return candidate
+
+
+def _is_fully_synced(path):
+    try:
+        from utils.log_sync import is_fully_synced
+    except ImportError:
+        from src.utils.log_sync import is_fully_synced
+    return is_fully_synced(path)
+
+
+class LogRotator:
+    """Bağlanmış log hissələrini sıxan və qovluq limitini saxlayan arxa fon thread-i"""
+
+    def __init__(self, max_dir_bytes=MAX_DIR_BYTES):
+        self.max_dir_bytes = max_dir_bytes
+        self._queue = queue.Queue()
+        self._active = set()            # yazılan fayllar - silinmir/sıxılmır
+        self._deferred = set()          # bağlanıb, amma hələ serverə tam yüklənməyib
+        self._lock = threading.Lock()
+        self._thread = None
+        self.compressed = 0
+        self.deleted = 0
+        self.freed_bytes = 0
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="log-rotator")
+                self._thread.start()
+
+    def register(self, path):
+        with self._lock:
+            self._active.add(os.path.abspath(path))
+
+    def unregister(self, path):
+        with self._lock:
+            self._active.discard(os.path.abspath(path))
+
+    def submit(self, path):
+        """Bağlanmış log faylını sıxılma növbəsinə qoyur"""
+        self.unregister(path)
+        self._queue.put(('compress', path))
+        self._ensure_thread()
+
+    def retry_deferred(self):
+        """Yüklənməni gözləyən hissələri yenidən sıxılma növbəsinə qoyur (log_sync-dən sonra)"""
+        with self._lock:
+            deferred = list(self._deferred)
+            self._deferred.clear()
+        for path in deferred:
+            self._queue.put(('compress', path))
+        if deferred:
+            self._ensure_thread()
+
+    def request_cleanup(self, directory):
+        """Qovluq limitinin yoxlanmasını növbəyə qoyur"""
+        self._queue.put(('cleanup', directory))
+        self._ensure_thread()
+
+    def _run(self):
+        while True:
+            action, target = self._queue.get()
+            try:
+                if action == 'compress':
+                    self._compress(target)
+                    self._enforce_dir_limit(os.path.dirname(target))
+                else:
+                    self._enforce_dir_limit(target)
+            except Exception as e:
+                print(f"⚠️ Log rotasiyası xətası ({target}): {e}")
+
+    def _compress(self, path):
+        if not os.path.exists(path):
+            return
+        if not _is_fully_synced(path):
+            # log_sync .log.gz oxumur - yüklənməmiş hissə itməsin deyə sıxılma təxirə salınır
+            with self._lock:
+                self._deferred.add(path)
+            return
+        gz_path = path + '.gz'
+        tmp_path = gz_path + '.tmp'
+        with open(path, 'rb') as source, gzip.open(tmp_path, 'wb', compresslevel=COMPRESS_LEVEL) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(tmp_path, gz_path)
+        os.remove(path)
+        self.compressed += 1
+
+    def enforce_dir_limit(self, directory):
+        """Qovluq limitini çağıran thread-də dərhal tətbiq edir (məs. çıxışda metrics ixracından əvvəl)"""
+        try:
+            self._enforce_dir_limit(directory)
+        except OSError as e:
+            print(f"⚠️ Log rotasiyası xətası ({directory}): {e}")
+
+    def _enforce_dir_limit(self, directory):
+        """
+        Qovluq limiti aşılıbsa ən köhnə faylları silir (gizli/manifest, açıq fayllar və serverə
+        hələ tam yüklənməmiş hissələr xaric)
+        """
+        if not directory or not os.path.isdir(directory):
+            return
+        with self._lock:
+            active = set(self._active)
+            deferred = {os.path.abspath(path) for path in self._deferred}
+        files = []
+        total = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith('.'):
+                    continue
+                stat = entry.stat()
+                total += stat.st_size
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        if total <= self.max_dir_bytes:
+            return
+        now = time.time()
+        for mtime, size, path in sorted(files):
+            if total <= self.max_dir_bytes:
+                break
+            abs_path = os.path.abspath(path)
+            if abs_path in active or abs_path in deferred or now - mtime < MIN_FILE_AGE:
+                continue
+            if not _is_fully_synced(path):
+                # Yüklənməmiş hissə silinərsə log serverə heç vaxt çatmaz
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.deleted += 1
+            self.freed_bytes += size
+
+    def get_stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'active_files': len(self._active),
+            'deferred': len(self._deferred),
+            'compressed': self.compressed,
+            'deleted': self.deleted,
+            'freed_bytes': self.freed_bytes,
+        }
+
+
+_rotator = None
+_rotator_lock = threading.Lock()
+
+
+def get_log_rotator():
+    global _rotator
+    if _rotator is None:
+        with _rotator_lock:
+            if _rotator is None:
+                _rotator = LogRotator()
+    return _rotator
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """
+    logging handler: fayl max_bytes-a çatanda növbəti hissəyə keçir, köhnəsi arxa fonda sıxılır.
+    Cari fayl: self.baseFilename (bazaya göndərilən log_file_name üçün də bu istifadə olunmalıdır).
+    """
+
+    def __init__(self, filename, max_bytes=MAX_FILE_BYTES, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, encoding=encoding)
+        self.rotator = get_log_rotator()
+        self.rotator.register(self.baseFilename)
+        self.rotator.request_cleanup(os.path.dirname(self.baseFilename))
+
+    @property
+    def current_file_name(self):
+        return os.path.basename(self.baseFilename)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        finished = self.baseFilename
+        self.baseFilename = next_part_path(finished)
+        self.rotator.register(self.baseFilename)
+        self.rotator.submit(finished)
+        self.stream = self._open()
+
+    def close(self):
+        self.rotator.unregister(self.baseFilename)
+        super().close()
+
+
+class RotatingLogFile:
+    """Fayl obyekti kimi yazılan (structured_log yazıcısı) log faylı, eyni rotasiya qaydası ilə"""
+
+    def __init__(self, path, max_bytes=MAX_FILE_BYTES, encoding='utf-8'):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.encoding = encoding
+        self.rotator = get_log_rotator()
+        self._file = open(self.path, 'w', encoding=encoding)
+        self._size = 0
+        self.rotator.register(self.path)
+        self.rotator.request_cleanup(os.path.dirname(self.path))
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def write(self, text):
+        # Azərbaycan hərfləri və emoji bir neçə baytdır - limit bayt ilə yoxlanılır
+        size = len(text.encode(self.encoding, errors='replace'))
+        if self._size and self._size + size > self.max_bytes:
+            self.rotate()
+        self._file.write(text)
+        self._size += size
+        return len(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def rotate(self):
+        self._file.close()
+        finished = self.path
+        self.path = next_part_path(finished)
+        self._file = open(self.path, 'w', encoding=self.encoding)
+        self._size = 0
+        self.rotator.register(self.path)
+        self.rotator.submit(finished)
+
+    def close(self):
+        self.rotator.unregister(self.path)
+        self._file.close()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log Shipper - log sətirlərini verilənlər bazasına toplu göndərir
+
+Əvvəllər hər DebugManager.log, hər tutulan print və hər RealtimeDebugger.log_operation
+üçün ayrıca thread, ayrıca bağlantı, SELECT və UPDATE/INSERT icra olunurdu.
+İndi log_to_database_async sətri məhdud yaddaş növbəsinə qoyur və dərhal qayıdır;
+tək arxa fon işçisi növbəni ölçü (BATCH_SIZE) və ya vaxt (FLUSH_INTERVAL) üzrə
+boşaldır və sətirləri fayl üzrə qruplaşdırıb bir statement ilə yazır.
+
+Baza yavaş və ya əlçatmaz olduqda növbə dolur - o zaman əvvəlcə aşağı prioritetli
+(debug/print) sətirlər atılır, xətalar ən sona qədər saxlanılır. Log yazan kod
+(UI thread-i daxil olmaqla) heç vaxt gözləmir.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+
+# Prioritetlər: növbə dolanda əvvəlcə aşağı prioritet atılır
+PRIORITY_LOW = 0      # debug konsolu, print intercept, realtime debug
+PRIORITY_NORMAL = 1   # tətbiq və email servis logları
+PRIORITY_HIGH = 2     # xəta sətirləri
+PRIORITIES = (PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH)
+
+LOG_TYPE_PRIORITIES = {
+    'debug_console': PRIORITY_LOW,
+    'realtime_debug': PRIORITY_LOW,
+    'unified_app_debug': PRIORITY_NORMAL,
+    'email_service': PRIORITY_NORMAL,
+}
+_ERROR_MARKERS = ('ERROR', 'CRITICAL', 'Traceback', 'Xəta', 'XƏTA', '❌')
+
+MAX_QUEUE_SIZE = 5000        # növbədəki maksimum sətir
+BATCH_SIZE = 200             # bu qədər sətir yığılanda dərhal göndərilir
+MAX_BATCH_LINES = 2000       # bir partiyada maksimum sətir
+FLUSH_INTERVAL = 2.0         # saniyə - az log olanda da bu qədərdən gec göndərilmir
+HIGH_WATER_RATIO = 0.75      # növbə bu qədər dolubsa aşağı prioritetli sətirlər qəbul edilmir
+SLOW_FLUSH_SECONDS = 2.0     # bundan yavaş yazı bazanın yüklü olduğunu göstərir
+RETRY_MIN_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def classify_priority(log_type, log_content):
+    """Sətrin prioritetini log növü və məzmununa görə təyin edir"""
+    if log_content and any(marker in log_content for marker in _ERROR_MARKERS):
+        return PRIORITY_HIGH
+    return LOG_TYPE_PRIORITIES.get(log_type, PRIORITY_NORMAL)
+
+
+class LogShipper:
+    """Məhdud növbə + tək işçi thread-i ilə toplu log göndərici"""
+
+    def __init__(self, writer=None, max_queue_size=MAX_QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self._writer = writer
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Prioritet üzrə növbələr; elementlər (seq, user_id, log_type, log_content, log_file_name)
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._size = 0
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._flush_requested = False
+        self._in_flight = 0
+        self._pressure = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.suppressed = 0
+        self.dropped = {priority: 0 for priority in PRIORITIES}
+        self.last_flush_ms = None
+        self.last_error = None
+
+    # --- Həyat dövrü ---
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name="log-shipper")
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Qalan sətirləri göndərməyə çalışır və işçini dayandırır"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def flush(self, timeout=2.0):
+        """Növbənin göndərilməsini tələb edir və boşalana qədər (maks. timeout) gözləyir"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._size or self._in_flight) and self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # --- Növbə ---
+
+    def enqueue(self, user_id, log_type, log_content, log_file_name=None, priority=None):
+        """
+        Sətri növbəyə qoyur; heç vaxt bloklanmır.
+        Qəbul olunubsa True, prioritetə görə atılıbsa False qaytarır.
+        """
+        if not log_content:
+            return False
+        if threading.current_thread() is self._thread:
+            # İşçinin öz çıxışı (bağlantı xəbərdarlıqları, print) yenidən növbəyə düşməsin
+            self.suppressed += 1
+            return False
+        if priority is None:
+            priority = classify_priority(log_type, log_content)
+
+        with self._cond:
+            if self._pressure and priority == PRIORITY_LOW and self._size >= self.max_queue_size * HIGH_WATER_RATIO:
+                self.dropped[priority] += 1
+                return False
+            if self._size >= self.max_queue_size and not self._drop_lower_than(priority):
+                self.dropped[priority] += 1
+                return False
+            self._seq += 1
+            self._queues[priority].append((self._seq, user_id, log_type, log_content, log_file_name))
+            self._size += 1
+            self.enqueued += 1
+            if self._size >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _drop_lower_than(self, priority):
+        """Yer açmaq üçün ən aşağı prioritetli ən köhnə sətri atır (eyni prioritet daxil)"""
+        for candidate in PRIORITIES:
+            if candidate > priority:
+                break
+            queue = self._queues[candidate]
+            if queue:
+                queue.popleft()
+                self._size -= 1
+                self.dropped[candidate] += 1
+                return True
+        return False
+
+    def _take_batch(self):
+        """Növbədən ən çox MAX_BATCH_LINES sətri gəliş sırası ilə götürür"""
+        items = []
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                items.append((priority,) + queue.popleft())
+        self._size = 0
+        items.sort(key=lambda item: item[1])
+        if len(items) > MAX_BATCH_LINES:
+            # Artıq qalanlar növbəyə qayıdır
+            for item in items[MAX_BATCH_LINES:]:
+                self._queues[item[0]].append(item[1:])
+                self._size += 1
+            items = items[:MAX_BATCH_LINES]
+        return items
+
+    def _requeue(self, items):
+        """Uğursuz partiyanı növbənin əvvəlinə qaytarır; yer çatmırsa aşağı prioritet atılır"""
+        with self._cond:
+            for item in reversed(items):
+                priority = item[0]
+                if self._size >= self.max_queue_size and not self._drop_lower_than(priority):
+                    self.dropped[priority] += 1
+                    continue
+                self._queues[priority].appendleft(item[1:])
+                self._size += 1
+
+    @staticmethod
+    def group_entries(items):
+        """
+        Sətirləri (user_id, log_file_name) üzrə birləşdirir - hər fayl partiyada bir dəfə yazılır.
+        Fayl adı olmayan sətirlər (user_id, log_type) üzrə bir qeydə yığılır.
+        """
+        grouped = {}
+        for _priority, _seq, user_id, log_type, log_content, log_file_name in items:
+            key = (user_id, log_file_name) if log_file_name else (user_id, None, log_type)
+            entry = grouped.get(key)
+            if entry is None:
+                grouped[key] = [user_id, log_type, [log_content], log_file_name]
+            else:
+                entry[2].append(log_content)
+        return [(user_id, log_type, '\n'.join(lines), log_file_name)
+                for user_id, log_type, lines, log_file_name in grouped.values()]
+
+    # --- İşçi ---
+
+    def _resolve_writer(self):
+        if self._writer is None:
+            try:
+                from database.error_queries import append_logs_batch
+            except ImportError:
+                from src.database.error_queries import append_logs_batch
+            self._writer = append_logs_batch
+        return self._writer
+
+    def _run(self):
+        delay = RETRY_MIN_DELAY
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while self._running and self._size < self.batch_size and not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._running:
+                    return
+                self._flush_requested = False
+                if not self._size:
+                    self._cond.notify_all()
+                    continue
+                items = self._take_batch()
+                self._in_flight = len(items)
+
+            started = time.monotonic()
+            try:
+                self._resolve_writer()(self.group_entries(items))
+                elapsed = time.monotonic() - started
+                self.written += len(items)
+                self.batches += 1
+                self.last_flush_ms = elapsed * 1000
+                self.last_error = None
+                self._pressure = elapsed >= SLOW_FLUSH_SECONDS
+                delay = RETRY_MIN_DELAY
+                failed = False
+            except Exception as e:
+                self.failed_batches += 1
+                self.last_error = str(e)
+                self._pressure = True
+                self._requeue(items)
+                failed = True
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+                if failed:
+                    # Baza əlçatmazdır - növbə dolsa da yazan kod gözləmir, sadəcə sətirlər atılır
+                    self._cond.wait(delay)
+                    delay = min(delay * 2, RETRY_MAX_DELAY)
+
+    # --- Statistika ---
+
+    def get_stats(self):
+        with self._cond:
+            queued = {priority: len(queue) for priority, queue in self._queues.items()}
+        return {
+            'running': self._running,
+            'queued': sum(queued.values()),
+            'queued_by_priority': queued,
+            'max_queue_size': self.max_queue_size,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'dropped': dict(self.dropped),
+            'suppressed': self.suppressed,
+            'pressure': self._pressure,
+            'last_flush_ms': self.last_flush_ms,
+            'last_error': self.last_error,
+        }
+
+
+_log_shipper = None
+_log_shipper_lock = threading.Lock()
+
+
+def get_log_shipper():
+    """Qlobal log göndəricini qaytarır (ilk çağırışda yaradılır və başladılır)"""
+    global _log_shipper
+    if _log_shipper is None:
+        with _log_shipper_lock:
+            if _log_shipper is None:
+                shipper = LogShipper()
+                shipper.start()
+                atexit.register(shipper.stop, 2.0)
+                _log_shipper = shipper
+    return _log_shipper
+
+
+def get_log_shipper_stats():
+    return _log_shipper.get_stats() if _log_shipper else None
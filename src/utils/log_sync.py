@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log Sync - lokal log fayllarının inkremental (manifest əsaslı) sinxronizasiyası
+
+Hər fayl üçün lokal manifestdə (fayl, ölçü, mtime, yüklənmiş offset, məzmun hash-ləri)
+saxlanılır. Girişdə yalnız dəyişmiş fayllar üçün serverə bir metadata sorğusu göndərilir
+və faylın yalnız əlavə olunmuş bayt aralığı hissələrlə yüklənir (user_log_chunks,
+011 miqrasiyasından sonra sıxılmış user_log_segments - database.log_storage).
+Dəyişməmiş fayllar nə oxunur, nə də serverə göndərilir.
+
+Log göndəricinin (utils.log_shipper) canlı yazdığı fayllar serverdə log_content-dədir -
+belə fayllar hissə-hissə yüklənmir ki, məzmun təkrarlanmasın.
+
+Rotasiya olunmuş hissələr (utils.log_rotation) yalnız is_fully_synced() təsdiqləyəndən sonra
+.log.gz-yə sıxılır - sıxılmış fayllar burada oxunmur.
+"""
+
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_NAME = '.log_sync_manifest_{user_id}.json'
+MANIFEST_VERSION = 1
+
+CHUNK_BYTES = 64 * 1024              # bir hissənin maksimum ölçüsü
+HASH_BYTES = 4096                    # baş/son hash-i üçün oxunan bayt
+MAX_UPLOAD_BYTES_PER_RUN = 2 * 1024 * 1024  # bir girişdə yüklənən maksimum həcm - qalanı növbəti dəfə
+FINAL_AFTER_SECONDS = 60             # bu qədər dəyişməyən faylın yarımçıq son sətri də yüklənir
+
+STATE_CHUNKED = 'chunked'            # hissə-hissə yüklənir
+STATE_INLINE = 'inline'              # log göndərici/köhnə yükləmə ilə yazılıb - toxunulmur
+
+LOG_PATTERNS = {
+    'debug_console': 'debug_console_*.log',
+    'realtime_debug': 'realtime_debug_*.log',
+    'email_service': 'email_service_*.log',
+    'unified_app_debug': 'unified_app_debug_*.log',
+}
+
+
+class LogSyncManifest:
+    """Sinxronizasiya manifesti: {fayl adı: giriş}; atomik yazılır"""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION and isinstance(data.get('files'), dict):
+                manifest.files = data['files']
+        except (OSError, ValueError):
+            pass
+        return manifest
+
+    def get(self, name):
+        return self.files.get(name)
+
+    def set(self, name, entry):
+        self.files[name] = entry
+        self.dirty = True
+
+    def prune(self, existing_names):
+        """Diskdə olmayan (silinmiş) faylların girişlərini çıxarır"""
+        for name in [name for name in self.files if name not in existing_names]:
+            del self.files[name]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _hash_range(f, start, end):
+    """Faylın [start, end) aralığının sha1-i (ən çox HASH_BYTES)"""
+    start = max(start, end - HASH_BYTES, 0)
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def split_chunks(data, base_offset, chunk_bytes=CHUNK_BYTES):
+    """
+    Baytları sətir sərhədlərində hissələrə bölür: [(offset, ölçü, mətn)].
+    Çox uzun sətir olduqda hissə chunk_bytes-da kəsilir.
+    """
+    chunks = []
+    position = 0
+    while position < len(data):
+        end = min(position + chunk_bytes, len(data))
+        if end < len(data):
+            newline = data.rfind(b'\n', position, end)
+            if newline >= position:
+                end = newline + 1
+        piece = data[position:end]
+        text = piece.decode('utf-8', errors='replace').replace('\x00', '')
+        chunks.append((base_offset + position, len(piece), text))
+        position = end
+    return chunks
+
+
+def _read_appended(f, offset, size, final):
+    """offset-dən sonrakı baytları oxuyur; fayl hələ yazılırsa yarımçıq son sətir saxlanılır"""
+    f.seek(offset)
+    data = f.read(size - offset)
+    if not final:
+        newline = data.rfind(b'\n')
+        data = data[:newline + 1] if newline >= 0 else b''
+    return data
+
+
+def list_log_files(logs_dir):
+    """[(fayl adı, tam yol, log növü)] - LOG_PATTERNS üzrə"""
+    files = []
+    for log_type, pattern in LOG_PATTERNS.items():
+        for path in glob.glob(os.path.join(logs_dir, pattern)):
+            files.append((os.path.basename(path), path, log_type))
+    return files
+
+
+def is_fully_synced(path):
+    """
+    Fayl serverə tam yüklənibmi: hansısa istifadəçinin manifestində offset faylın ölçüsünə
+    bərabərdir və ya fayl log göndərici ilə yazılıb (inline). Sinxronizasiya olunmayan
+    (LOG_PATTERNS-ə uyğun gəlməyən) fayllar üçün True.
+    """
+    logs_dir, name = os.path.split(os.path.abspath(path))
+    if not any(fnmatch.fnmatch(name, pattern) for pattern in LOG_PATTERNS.values()):
+        return True
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    for manifest_path in glob.glob(os.path.join(logs_dir, MANIFEST_NAME.format(user_id='*'))):
+        entry = LogSyncManifest.load(manifest_path).get(name)
+        if entry and (entry.get('state') == STATE_INLINE or entry.get('offset') == size):
+            return True
+    return False
+
+
+def _release_synced_parts():
+    """Sinxronizasiyadan sonra gözləyən rotasiya hissələrinin sıxılmasını yenidən növbəyə qoyur"""
+    try:
+        try:
+            from utils.log_rotation import get_log_rotator
+        except ImportError:
+            from src.utils.log_rotation import get_log_rotator
+        get_log_rotator().retry_deferred()
+    except Exception:
+        pass
+
+
+def sync_log_files(user_id, logs_dir, max_bytes=MAX_UPLOAD_BYTES_PER_RUN):
+    """
+    Dəyişmiş log fayllarının yeni hissələrini yükləyir.
+    Qaytarır: {'files': yüklənən fayl sayı, 'bytes': yüklənən bayt, 'skipped': dəyişməyən fayl sayı}
+    """
+    try:
+        from database.error_queries import get_log_sync_state, upload_log_chunks
+    except ImportError:
+        from src.database.error_queries import get_log_sync_state, upload_log_chunks
+
+    result = {'files': 0, 'bytes': 0, 'skipped': 0}
+    manifest = LogSyncManifest.load(os.path.join(logs_dir, MANIFEST_NAME.format(user_id=user_id)))
+    files = list_log_files(logs_dir)
+    manifest.prune({name for name, _, _ in files})
+
+    # 1) Lokal yoxlama: ölçü və mtime dəyişməyibsə fayl oxunmur və serverə sorğu getmir
+    pending = []
+    for name, path, log_type in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entry = manifest.get(name)
+        if stat.st_size == 0 or (entry and (entry.get('state') == STATE_INLINE or
+                                            (entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime
+                                             and entry.get('offset') == stat.st_size))):
+            result['skipped'] += 1
+            continue
+        pending.append((name, path, log_type, stat, entry))
+
+    if not pending:
+        manifest.save()
+        _release_synced_parts()
+        return result
+
+    # 2) Dəyişmiş fayllar üçün serverdəki vəziyyət - bir sorğu, məzmunsuz
+    server_state = get_log_sync_state(user_id, [name for name, _, _, _, _ in pending])
+    if server_state is None:
+        manifest.save()
+        return result
+
+    # 3) Yalnız əlavə olunmuş bayt aralıqları
+    budget = max_bytes
+    now = time.time()
+    for name, path, log_type, stat, entry in pending:
+        if budget <= 0:
+            break
+        log_id, synced_bytes, has_inline_content = server_state.get(name, (None, 0, False))
+        if has_inline_content:
+            manifest.set(name, {'state': STATE_INLINE, 'log_type': log_type, 'log_id': log_id})
+            continue
+
+        size = stat.st_size
+        try:
+            with open(path, 'rb') as f:
+                head_len = min(size, HASH_BYTES)
+                head_hash = _hash_range(f, 0, head_len)
+                offset = min(synced_bytes, size)
+                reset = False
+                if entry:
+                    # Fayl əvəz olunubsa (baş hissə və ya yüklənmiş hissənin sonu dəyişib) yenidən yüklənir
+                    entry_offset = entry.get('offset', 0)
+                    entry_head_len = entry.get('head_len', 0)
+                    if (entry_offset > size or entry_head_len > size or
+                            entry.get('head_hash') != _hash_range(f, 0, entry_head_len) or
+                            (entry_offset == offset and entry.get('tail_hash') != _hash_range(f, 0, offset))):
+                        reset = log_id is not None
+                        offset = 0
+                elif synced_bytes > size:
+                    reset = log_id is not None
+                    offset = 0
+
+                final = now - stat.st_mtime >= FINAL_AFTER_SECONDS
+                end = min(size, offset + budget)
+                data = _read_appended(f, offset, end, final and end == size)
+                if not data and end < size:
+                    # Büdcədən uzun sətir - kəsilmiş şəkildə yüklənir
+                    data = _read_appended(f, offset, end, True)
+                new_offset = offset + len(data)
+                tail_hash = _hash_range(f, 0, new_offset)
+        except OSError:
+            continue
+
+        chunks = split_chunks(data, offset)
+        if chunks or reset:
+            log_id = upload_log_chunks(user_id, log_type, name, log_id, chunks, reset=reset)
+            if log_id is None:
+                break  # Baza problemi - qalanı növbəti girişdə
+            result['files'] += 1
+            result['bytes'] += len(data)
+            budget -= len(data)
+
+        fully_synced = new_offset == size
+        manifest.set(name, {
+            'state': STATE_CHUNKED,
+            'log_type': log_type,
+            'log_id': log_id,
+            'size': size,
+            'mtime': stat.st_mtime if fully_synced else None,
+            'offset': new_offset,
+            'head_len': head_len,
+            'head_hash': head_hash,
+            'tail_hash': tail_hash,
+        })
+        manifest.save()
+
+    manifest.save()
+    _release_synced_parts()
+    return result
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory Diagnostics - uzun sessiyalarda yaddaş və Tk widget sızmalarını izləyir
+Hər CENSUS_INTERVAL saniyədən bir (Tk after()):
+  - Tk-da canlı widget-lər sinif üzrə sayılır (winfo_children ağacı) və Tk şəkilləri (image_names) -
+    Tk yalnız əsas thread-dən çağırıla bildiyi üçün bu hissə əsas thread-dədir
+  - qalan hissə arxa fon thread-indədir (UI donmasın), hazır nümunə after() ilə geri göndərilir:
+  - Python-da yaşayan tkinter obyektləri sayılır (gc): destroy olunub, amma referansı
+    qalan widget-lər (Python sayı > Tk sayı) və PhotoImage-lər sızma əlamətidir
+  - prosesin RSS yaddaşı qeyd olunur
+tracemalloc aktivdirsə, eyni anda snapshot alınır və həm ilk (baseline), həm əvvəlki
+snapshot ilə müqayisə olunur: ən sürətlə böyüyən ayırma yerləri (fayl:sətir) göstərilir.
+Bütün nümunələr üzrə xətti reqressiya ilə saatlıq artım hesablanır - 8 saatlıq sessiyanın
+stabil olduğunu (artım STABLE_GROWTH_MB_PER_HOUR-dan az) göstərmək üçün.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+
+CENSUS_INTERVAL = 300            # nümunə intervalı (saniyə)
+TRACEMALLOC_FRAMES = 6           # ayırma yeri üçün saxlanılan frame sayı
+TOP_GROWTH = 15                  # hesabatda ən çox böyüyən ayırma yerlərinin sayı
+MAX_SAMPLES = 24 * 3600 // CENSUS_INTERVAL  # 24 saatlıq tarixçə
+WARMUP_SAMPLES = 2               # ilk nümunələr (yükləmə) artım hesabına daxil edilmir
+STABLE_GROWTH_MB_PER_HOUR = 2.0  # bundan az artım stabil sayılır
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _process_rss():
+    """Prosesin RSS yaddaşı (bayt); məlum deyilsə None"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+
+def _slope_per_hour(points):
+    """[(saniyə, dəyər)] üzrə xətti reqressiya meyli (dəyər/saat); nöqtə azdırsa None"""
+    if len(points) < 3:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    denominator = sum((t - mean_t) ** 2 for t, _ in points)
+    if denominator == 0:
+        return None
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / denominator * 3600
+
+
+def count_tk_widgets(root):
+    """Tk-da canlı widget-lər (sinif üzrə) və Tk şəkillərinin sayı - yalnız əsas thread-dən"""
+    counts = Counter()
+    stack = [root]
+    while stack:
+        widget = stack.pop()
+        counts[type(widget).__name__] += 1
+        try:
+            stack.extend(widget.winfo_children())
+        except Exception:
+            pass
+    try:
+        images = len(root.image_names())
+    except Exception:
+        images = None
+    return counts, images
+
+
+def count_python_tk_objects():
+    """gc-də yaşayan tkinter obyektləri: (widget-lər sinif üzrə, destroy olunmuş widget-lər, şəkillər, gc obyekt sayı)"""
+    import tkinter
+    widgets = Counter()
+    destroyed = Counter()
+    images = Counter()
+    objects = gc.get_objects()
+    for obj in objects:
+        try:
+            if isinstance(obj, tkinter.Misc):
+                name = type(obj).__name__
+                widgets[name] += 1
+                # destroy() widget-i master.children-dən çıxarır; kök (Tk) həmişə canlıdır
+                master = getattr(obj, 'master', None)
+                if master is not None and getattr(master, 'children', {}).get(getattr(obj, '_name', None)) is not obj:
+                    destroyed[name] += 1
+            elif isinstance(obj, tkinter.Image):
+                images[type(obj).__name__] += 1
+        except Exception:
+            continue
+    return widgets, destroyed, images, len(objects)
+
+
+class MemoryDiagnostics:
+    """Periodik yaddaş/widget nümunələri, tracemalloc snapshot fərqləri və artım hesabatı"""
+
+    def __init__(self, interval=CENSUS_INTERVAL):
+        self.interval = interval
+        self.root = None
+        self.started_at = None
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._baseline = None
+        self._baseline_at = None
+        self._previous = None
+        self._previous_at = None
+        self._top_growth = []
+        self._recent_growth = []
+        self._first_widgets = None
+        self._census_running = False
+
+    # --- İdarə ---
+
+    def attach(self, root):
+        """Tk kökünə periodik nümunə götürməni qoşur (əsas thread-dən)"""
+        self.root = root
+        self.started_at = time.time()
+        if self._after_id is None:
+            self._after_id = root.after(1000, self._tick)
+
+    def detach(self):
+        if self.root is not None and self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self.root = None
+
+    def start_tracing(self, frames=TRACEMALLOC_FRAMES):
+        """tracemalloc-u başladır (overhead var - yalnız diaqnostika üçün) və baseline alır"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        with self._lock:
+            self._baseline = self._previous = self._take_snapshot()
+            self._baseline_at = self._previous_at = time.time()
+            self._top_growth = []
+            self._recent_growth = []
+        print("🧠 tracemalloc başladı - baseline snapshot alındı")
+
+    def stop_tracing(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with self._lock:
+            self._baseline = self._previous = None
+        print("🧠 tracemalloc dayandırıldı")
+
+    @staticmethod
+    def is_tracing():
+        return tracemalloc.is_tracing()
+
+    # --- Nümunələr ---
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self.sample_async()
+        except Exception as e:
+            print(f"⚠️ Yaddaş nümunəsi alınmadı: {e}")
+        if self.root is not None:
+            try:
+                self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+            except Exception:
+                self.root = None
+
+    def sample(self):
+        """Bir nümunə götürür və dərhal saxlayır (Tk sayımı üçün əsas thread-dən çağırılmalıdır)"""
+        now = time.time()
+        tk_counts = count_tk_widgets(self.root) if self.root is not None else (Counter(), None)
+        entry, growth = self._census(now, tk_counts)
+        self._store(entry, growth)
+        return entry
+
+    def sample_async(self, on_done=None):
+        """
+        Əsas thread-də yalnız Tk widget-lərini sayır; gc sayımı və tracemalloc snapshot/fərqi
+        arxa fon thread-indədir. Hazır nümunə root.after() ilə əsas thread-də saxlanılır və
+        on_done(entry) çağırılır. Əvvəlki sayım hələ bitməyibsə False qaytarır.
+        """
+        root = self.root
+        if root is None:
+            entry = self.sample()
+            if on_done is not None:
+                on_done(entry)
+            return True
+        with self._lock:
+            if self._census_running:
+                return False
+            self._census_running = True
+        now = time.time()
+        try:
+            tk_counts = count_tk_widgets(root)
+        except Exception:
+            with self._lock:
+                self._census_running = False
+            raise
+
+        def finish(entry, growth):
+            self._store(entry, growth)
+            if on_done is not None:
+                on_done(entry)
+
+        def census_in_thread():
+            try:
+                entry, growth = self._census(now, tk_counts)
+            except Exception as e:
+                print(f"⚠️ Yaddaş nümunəsi alınmadı: {e}")
+                with self._lock:
+                    self._census_running = False
+                return
+            try:
+                root.after(0, finish, entry, growth)
+            except Exception:
+                # Pəncərə bağlanıbsa nümunə birbaşa saxlanılır
+                self._store(entry, growth)
+
+        threading.Thread(target=census_in_thread, daemon=True, name="MemoryCensus").start()
+        return True
+
+    def _census(self, now, tk_counts):
+        """gc sayımı, RSS və tracemalloc snapshot fərqləri - Tk-ya toxunmur (arxa fon thread-i)"""
+        tk_widgets, tk_images = tk_counts
+        py_widgets, destroyed, py_images, gc_objects = count_python_tk_objects()
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+        entry = {
+            'time': now,
+            'rss': _process_rss(),
+            'traced': traced[0] if traced else None,
+            'traced_peak': traced[1] if traced else None,
+            'tk_widgets': sum(tk_widgets.values()),
+            'py_widgets': sum(py_widgets.values()),
+            'destroyed_widgets': sum(destroyed.values()),
+            'tk_images': tk_images,
+            'py_images': sum(py_images.values()),
+            'gc_objects': gc_objects,
+            'widget_classes': {name: (tk_widgets.get(name, 0), py_widgets.get(name, 0), destroyed.get(name, 0))
+                               for name in set(tk_widgets) | set(py_widgets)},
+            'image_classes': dict(py_images),
+        }
+        growth = None
+        with self._lock:
+            baseline, baseline_at = self._baseline, self._baseline_at
+            previous, previous_at = self._previous, self._previous_at
+        if traced is not None and baseline is not None:
+            snapshot = self._take_snapshot()
+            growth = (snapshot, now,
+                      self._diff(snapshot, baseline, now - baseline_at),
+                      self._diff(snapshot, previous, now - previous_at))
+        return entry, growth
+
+    def _store(self, entry, growth):
+        with self._lock:
+            self._census_running = False
+            if self._first_widgets is None:
+                self._first_widgets = dict(entry['widget_classes'])
+            self.samples.append(entry)
+            # Bu arada tracemalloc dayandırılıb/yenidən başladılıbsa köhnə fərq atılır
+            if growth is not None and self._baseline is not None:
+                snapshot, taken_at, top_growth, recent_growth = growth
+                self._top_growth = top_growth
+                self._recent_growth = recent_growth
+                self._previous, self._previous_at = snapshot, taken_at
+
+    @staticmethod
+    def _diff(snapshot, reference, elapsed):
+        """reference-dən (elapsed saniyə əvvəl) bəri ən çox böyüyən ayırma yerləri"""
+        elapsed = max(1.0, elapsed)
+        growth = []
+        for stat in snapshot.compare_to(reference, 'traceback')[:TOP_GROWTH * 3]:
+            if stat.size_diff <= 0:
+                continue
+            frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+            growth.append({
+                'site': frames[-1] if frames else '?',
+                'traceback': ' <- '.join(reversed(frames)),
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+                'per_hour': stat.size_diff / elapsed * 3600,
+            })
+            if len(growth) >= TOP_GROWTH:
+                break
+        return growth
+
+    # --- Hesabat ---
+
+    def get_report(self):
+        with self._lock:
+            samples = list(self.samples)
+            top_growth = list(self._top_growth)
+            recent_growth = list(self._recent_growth)
+            first_widgets = dict(self._first_widgets or {})
+        if not samples:
+            return None
+        last = samples[-1]
+        steady = samples[WARMUP_SAMPLES:] if len(samples) > WARMUP_SAMPLES + 2 else samples
+
+        def slope(key, scale=1.0):
+            points = [(s['time'], s[key] / scale) for s in steady if s[key] is not None]
+            return _slope_per_hour(points)
+
+        rss_growth = slope('rss', 1024 * 1024)
+        traced_growth = slope('traced', 1024 * 1024)
+        widget_growth = slope('py_widgets')
+        reference = traced_growth if traced_growth is not None else rss_growth
+        widgets = sorted(((name, tk, py, destroyed, py - first_widgets.get(name, (0, 0, 0))[1])
+                          for name, (tk, py, destroyed) in last['widget_classes'].items()),
+                         key=lambda row: (row[4], row[2]), reverse=True)
+        return {
+            'started_at': self.started_at,
+            'duration_hours': (last['time'] - samples[0]['time']) / 3600,
+            'samples': len(samples),
+            'tracing': tracemalloc.is_tracing(),
+            'rss_mb': last['rss'] / 1024 / 1024 if last['rss'] is not None else None,
+            'traced_mb': last['traced'] / 1024 / 1024 if last['traced'] is not None else None,
+            'traced_peak_mb': last['traced_peak'] / 1024 / 1024 if last['traced_peak'] is not None else None,
+            'rss_growth_mb_per_hour': rss_growth,
+            'traced_growth_mb_per_hour': traced_growth,
+            'widget_growth_per_hour': widget_growth,
+            'stable': None if reference is None else
+                      reference < STABLE_GROWTH_MB_PER_HOUR and (widget_growth is None or widget_growth < 1),
+            'tk_widgets': last['tk_widgets'],
+            'py_widgets': last['py_widgets'],
+            'destroyed_widgets': last['destroyed_widgets'],
+            'tk_images': last['tk_images'],
+            'py_images': last['py_images'],
+            'image_classes': last['image_classes'],
+            'gc_objects': last['gc_objects'],
+            'widgets': widgets,                 # (sinif, Tk-da, Python-da, destroy olunmuş, ilk nümunədən artım)
+            'top_growth': top_growth,           # baseline-dan bəri
+            'recent_growth': recent_growth,     # əvvəlki nümunədən bəri
+            'history': [(s['time'], s['rss'], s['traced'], s['py_widgets']) for s in samples],
+        }
+
+    def format_report(self, report=None):
+        report = report or self.get_report()
+        if report is None:
+            return "Hələ nümunə yoxdur"
+
+        def mb(value):
+            return "-" if value is None else f"{value:.1f} MB"
+
+        def rate(value, unit):
+            return "-" if value is None else f"{value:+.2f} {unit}/saat"
+
+        verdict = {True: "✅ stabil", False: "⚠️ böyüyür", None: "❔ məlumat azdır"}[report['stable']]
+        lines = [
+            f"Sessiya: {report['duration_hours']:.1f} saat, {report['samples']} nümunə | {verdict}",
+            f"RSS: {mb(report['rss_mb'])} ({rate(report['rss_growth_mb_per_hour'], 'MB')}) | "
+            f"tracemalloc: {mb(report['traced_mb'])}, pik {mb(report['traced_peak_mb'])} "
+            f"({rate(report['traced_growth_mb_per_hour'], 'MB')})",
+            f"Widget: Tk {report['tk_widgets']}, Python {report['py_widgets']}, "
+            f"destroy olunmuş amma yaşayan {report['destroyed_widgets']} ({rate(report['widget_growth_per_hour'], 'widget')}) | "
+            f"Şəkil: Tk {report['tk_images']}, Python {report['py_images']} | gc obyekt: {report['gc_objects']}",
+            "",
+            f"{'Sinif':<28}{'Tk':>8}{'Python':>8}{'Ölü':>8}{'Artım':>8}",
+        ]
+        for name, tk, py, destroyed, growth in report['widgets'][:20]:
+            lines.append(f"{name:<28}{tk:>8}{py:>8}{destroyed:>8}{growth:>+8}")
+        for title, key in (("Baseline-dan bəri ən çox böyüyən yerlər", 'top_growth'),
+                           ("Son intervalda böyüyən yerlər", 'recent_growth')):
+            if report[key]:
+                lines.append("")
+                lines.append(title + ":")
+                for item in report[key]:
+                    lines.append(f"  {item['size_diff'] / 1024:+10.1f} KB {item['count_diff']:+8} obj "
+                                 f"{item['per_hour'] / 1024 / 1024:+7.2f} MB/saat  {item['traceback']}")
+        if not report['tracing']:
+            lines.append("")
+            lines.append("tracemalloc aktiv deyil - ayırma yerlərini görmək üçün yaddaş izləməni başladın")
+        return '\n'.join(lines)
+
+    def export_report(self, path=None):
+        """Hesabatı və nümunə tarixçəsini debug_logs qovluğuna yazır; yolu qaytarır"""
+        if path is None:
+            try:
+                from utils.log_helper import get_debug_logs_dir
+            except ImportError:
+                from src.utils.log_helper import get_debug_logs_dir
+            path = os.path.join(get_debug_logs_dir(), f"memory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        report = self.get_report()
+        lines = [self.format_report(report), "", "vaxt;rss_mb;traced_mb;python_widgets"]
+        for timestamp, rss, traced, widgets in (report['history'] if report else []):
+            lines.append(f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S};"
+                         f"{'' if rss is None else f'{rss / 1048576:.1f}'};"
+                         f"{'' if traced is None else f'{traced / 1048576:.1f}'};{widgets}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+
+_memory_diagnostics = None
+
+
+def get_memory_diagnostics():
+    global _memory_diagnostics
+    if _memory_diagnostics is None:
+        _memory_diagnostics = MemoryDiagnostics()
+    return _memory_diagnostics
+
+
+def start_memory_diagnostics(root):
+    """Periodik widget/yaddaş nümunələrini başladır (tracemalloc-suz, overhead azdır)"""
+    diagnostics = get_memory_diagnostics()
+    diagnostics.attach(root)
+    return diagnostics
+
+
+def get_memory_report():
+    """Yaddaş hesabatı; diaqnostika başladılmayıbsa None"""
+    return _memory_diagnostics.get_report() if _memory_diagnostics else None
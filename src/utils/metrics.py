@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics - sayğaclar, göstəricilər (gauge) və gecikmə histogramları
+
+monitor_operation yalnız 1 saniyədən uzun çağırışları print edirdi, ui_optimizer isə
+sadə siyahılar saxlayırdı - buraxılışları müqayisə etmək üçün rəqəm yox idi.
+Registry hər əməliyyat üçün çağırış/xəta sayğacı və HDR üslubunda (log-xətti
+bucket-lər, ~3% dəqiqlik) gecikmə histogramı saxlayır: p50/p95/p99, min/maks.
+Nəticə Prometheus mətn və ya JSON faylına (debug_logs qovluğu) ixrac olunur və
+RealtimeStatusWindow-da göstərilir. Çıxışda avtomatik ixrac yalnız istəyə görədir
+(MEZUNIYYET_METRICS_EXPORT=1 və ya enable_export_on_exit()) - testlər və skriptlər
+debug_logs-a fayl yazmasın.
+
+İstifadə:
+    @timed('ui.refresh_employee_list')
+    def refresh_employee_list(...): ...
+
+    instrument_module(module, 'db')  # modulun bütün açıq funksiyaları
+    instrument_package('database', 'db', include=('user_queries', ...))  # yalnız bu alt modullar
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+SUB_BUCKET_BITS = 6          # hər ikinin qüvvəti daxilində 32 xətti bucket -> ~3% nisbi xəta
+QUANTILES = (0.5, 0.95, 0.99)
+OPERATION_DURATION = 'operation_duration_seconds'
+OPERATION_CALLS = 'operation_calls_total'
+OPERATION_ERRORS = 'operation_errors_total'
+EXPORT_ON_EXIT_ENV = 'MEZUNIYYET_METRICS_EXPORT'   # '1' - çıxışda metrikləri debug_logs-a yaz
+
+
+class Counter:
+    """Yalnız artan sayğac"""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Cari dəyər; fn verilibsə dəyər oxunanda hesablanır"""
+
+    def __init__(self, fn=None):
+        self.value = 0
+        self.fn = fn
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return None
+        return self.value
+
+
+class LatencyHistogram:
+    """
+    HDR üslubunda histogram: dəyərlər mikrosaniyə ilə log-xətti bucket-lərə yığılır.
+    Yaddaş dəyər diapazonundan asılı deyil, yalnız dolu bucket-lər saxlanılır.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(micros):
+        magnitude = max(0, micros.bit_length() - SUB_BUCKET_BITS)
+        return (magnitude << SUB_BUCKET_BITS) | (micros >> magnitude)
+
+    @staticmethod
+    def _bucket_value(index):
+        """Bucket-in yuxarı sərhədi (mikrosaniyə)"""
+        magnitude = index >> SUB_BUCKET_BITS
+        return (((index & ((1 << SUB_BUCKET_BITS) - 1)) + 1) << magnitude) - 1
+
+    def record(self, seconds):
+        micros = int(seconds * 1e6) if seconds > 0 else 0
+        index = self._bucket(micros)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def quantiles(self, quantiles=QUANTILES):
+        """{q: saniyə} - bucket-in yuxarı sərhədi, maksimumdan böyük olmamaq şərtilə"""
+        with self._lock:
+            if not self.count:
+                return {q: None for q in quantiles}
+            items = sorted(self._counts.items())
+            count, maximum = self.count, self.max
+        result = {}
+        for q in quantiles:
+            target = max(1, int(q * count + 0.999999))
+            seen = 0
+            for index, bucket_count in items:
+                seen += bucket_count
+                if seen >= target:
+                    result[q] = min(self._bucket_value(index) / 1e6, maximum)
+                    break
+        return result
+
+    def snapshot(self):
+        values = self.quantiles()
+        with self._lock:
+            return {
+                'count': self.count,
+                'sum': self.total,
+                'min': self.min,
+                'max': self.max,
+                'p50': values[0.5],
+                'p95': values[0.95],
+                'p99': values[0.99],
+            }
+
+
+class MetricsRegistry:
+    """Ad + etiketlər üzrə metrikalar; thread-safe"""
+
+    def __init__(self):
+        self._metrics = {}       # (növ, ad, etiketlər) -> metrika
+        self._lock = threading.Lock()
+        self.info = {}           # ixraca əlavə olunan məlumat (məs. app_version)
+        self.started_at = time.time()
+
+    def _get(self, kind, factory, name, labels):
+        key = (kind, name, tuple(sorted(labels.items())) if labels else ())
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = factory()
+        return metric
+
+    def counter(self, name, **labels):
+        return self._get('counter', Counter, name, labels)
+
+    def gauge(self, name, fn=None, **labels):
+        gauge = self._get('gauge', Gauge, name, labels)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, **labels):
+        return self._get('histogram', LatencyHistogram, name, labels)
+
+    def set_info(self, key, value):
+        self.info[key] = value
+
+    def observe_operation(self, operation, seconds, failed=False):
+        """Əməliyyat çağırışını qeyd edir: müddət histogramı + çağırış/xəta sayğacları"""
+        self.histogram(OPERATION_DURATION, operation=operation).record(seconds)
+        self.counter(OPERATION_CALLS, operation=operation).inc()
+        if failed:
+            self.counter(OPERATION_ERRORS, operation=operation).inc()
+
+    def reset(self):
+        """Sayğac və histogramları sıfırlayır (gauge-lər qalır)"""
+        with self._lock:
+            for key in [key for key in self._metrics if key[0] != 'gauge']:
+                del self._metrics[key]
+            self.started_at = time.time()
+
+    # --- Oxuma / ixrac ---
+
+    def snapshot(self):
+        with self._lock:
+            items = list(self._metrics.items())
+        result = {'counters': [], 'gauges': [], 'histograms': []}
+        for (kind, name, labels), metric in sorted(items, key=lambda item: item[0]):
+            entry = {'name': name, 'labels': dict(labels)}
+            if kind == 'counter':
+                entry['value'] = metric.value
+                result['counters'].append(entry)
+            elif kind == 'gauge':
+                entry['value'] = metric.get()
+                result['gauges'].append(entry)
+            else:
+                entry.update(metric.snapshot())
+                result['histograms'].append(entry)
+        return result
+
+    def get_operation_stats(self):
+        """Əməliyyat cədvəli (UI üçün): [{'operation', 'count', 'errors', 'p50', 'p95', 'p99', 'max', 'sum'}]"""
+        snapshot = self.snapshot()
+        errors = {entry['labels'].get('operation'): entry['value']
+                  for entry in snapshot['counters'] if entry['name'] == OPERATION_ERRORS}
+        rows = []
+        for entry in snapshot['histograms']:
+            if entry['name'] != OPERATION_DURATION:
+                continue
+            operation = entry['labels'].get('operation')
+            rows.append({
+                'operation': operation,
+                'count': entry['count'],
+                'errors': errors.get(operation, 0),
+                'p50': entry['p50'],
+                'p95': entry['p95'],
+                'p99': entry['p99'],
+                'max': entry['max'],
+                'sum': entry['sum'],
+            })
+        return rows
+
+    def to_json(self):
+        data = {
+            'exported_at': datetime.now().isoformat(),
+            'uptime_seconds': time.time() - self.started_at,
+            'info': dict(self.info),
+        }
+        data.update(self.snapshot())
+        return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+
+    def to_prometheus(self):
+        """Prometheus mətn formatı; histogramlar summary (kvantillər + _sum/_count) kimi"""
+        def fmt_labels(labels, extra=None):
+            pairs = list(labels.items()) + (list(extra.items()) if extra else [])
+            if not pairs:
+                return ''
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+            return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+        snapshot = self.snapshot()
+        lines = []
+        if self.info:
+            lines.append('# TYPE app_info gauge')
+            lines.append(f"app_info{fmt_labels(self.info)} 1")
+        typed = set()
+        for kind, entries in (('counter', snapshot['counters']), ('gauge', snapshot['gauges'])):
+            for entry in entries:
+                if entry['value'] is None:
+                    continue
+                if entry['name'] not in typed:
+                    typed.add(entry['name'])
+                    lines.append(f"# TYPE {entry['name']} {kind}")
+                lines.append(f"{entry['name']}{fmt_labels(entry['labels'])} {entry['value']}")
+        for entry in snapshot['histograms']:
+            if entry['name'] not in typed:
+                typed.add(entry['name'])
+                lines.append(f"# TYPE {entry['name']} summary")
+            for q, key in zip(QUANTILES, ('p50', 'p95', 'p99')):
+                if entry[key] is not None:
+                    lines.append(f"{entry['name']}{fmt_labels(entry['labels'], {'quantile': q})} {entry[key]:.6f}")
+            lines.append(f"{entry['name']}_sum{fmt_labels(entry['labels'])} {entry['sum']:.6f}")
+            lines.append(f"{entry['name']}_count{fmt_labels(entry['labels'])} {entry['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path=None, fmt='prom'):
+        """
+        Metrikləri fayla yazır (default: debug_logs/metrics_<vaxt>.prom); yolu qaytarır.
+        Default qovluqda əvvəlcə log_rotation-un qovluq limiti tətbiq olunur.
+        """
+        if path is None:
+            try:
+                from utils.log_helper import get_debug_logs_dir
+                from utils.log_rotation import get_log_rotator
+            except ImportError:
+                from src.utils.log_helper import get_debug_logs_dir
+                from src.utils.log_rotation import get_log_rotator
+            directory = get_debug_logs_dir()
+            get_log_rotator().enforce_dir_limit(directory)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(directory, f"metrics_{timestamp}.{'json' if fmt == 'json' else 'prom'}")
+        content = self.to_json() if fmt == 'json' else self.to_prometheus()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        return path
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    return _registry
+
+
+def timed(operation, registry=None):
+    """Dekorator: funksiyanın müddətini və nəticəsini (xəta/uğur) operation adı ilə qeyd edir"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                (registry or _registry).observe_operation(operation, time.perf_counter() - started, failed)
+        wrapper.metrics_operation = operation
+        return wrapper
+    return decorator
+
+
+def instrument_module(module, prefix):
+    """
+    Modulun özündə təyin olunmuş açıq funksiyalarını timed ilə əvəz edir
+    (modul daxilindəki çağırışlar da ölçülür). Əməliyyat adı: prefix.modul.funksiya.
+    Generator funksiyaları və artıq ölçülənlər ötürülür. {orijinal: ölçülən} qaytarır.
+    """
+    short_name = module.__name__.rsplit('.', 1)[-1]
+    replaced = {}
+    for name, value in list(vars(module).items()):
+        if name.startswith('_') or not inspect.isfunction(value):
+            continue
+        if getattr(value, '__module__', None) != module.__name__ or hasattr(value, 'metrics_operation'):
+            continue
+        if inspect.isgeneratorfunction(value):
+            continue
+        wrapped = timed(f"{prefix}.{short_name}.{name}")(value)
+        setattr(module, name, wrapped)
+        replaced[value] = wrapped
+    return replaced
+
+
+def instrument_package(package_name, prefix, include=None, exclude=()):
+    """
+    Paketin yüklənmiş alt modullarını (include verilibsə yalnız onları) ölçür; sonra paketdə
+    və bütün alt modullarda import ilə götürülmüş köhnə funksiya istinadlarını da ölçülən
+    versiyaya dəyişir.
+    """
+    submodules = [(name.rsplit('.', 1)[-1], module) for name, module in list(sys.modules.items())
+                  if module is not None and name.startswith(package_name + '.')]
+    modules = [module for short_name, module in submodules
+               if (include is None or short_name in include) and short_name not in exclude]
+    replaced = {}
+    for module in modules:
+        replaced.update(instrument_module(module, prefix))
+    package = sys.modules.get(package_name)
+    for module in [module for _, module in submodules] + ([package] if package is not None else []):
+        for name, value in list(vars(module).items()):
+            if inspect.isfunction(value) and value in replaced:
+                setattr(module, name, replaced[value])
+    return len(replaced)
+
+
+def _register_default_gauges():
+    """Digər alt sistemlərin vəziyyəti (oxunanda hesablanır, modul yoxdursa None)"""
+    def shipper_queue():
+        try:
+            from utils.log_shipper import get_log_shipper_stats
+        except ImportError:
+            from src.utils.log_shipper import get_log_shipper_stats
+        stats = get_log_shipper_stats()
+        return stats['queued'] if stats else None
+
+    def query_cache(key):
+        def read():
+            try:
+                from database.query_cache import get_query_cache_stats
+            except ImportError:
+                from src.database.query_cache import get_query_cache_stats
+            return get_query_cache_stats()[key]
+        return read
+
+    def ui_stalls():
+        try:
+            from utils.performance_monitor import get_stall_report
+        except ImportError:
+            from src.utils.performance_monitor import get_stall_report
+        report = get_stall_report()
+        return report['stalls'] if report else None
+
+    _registry.gauge('log_shipper_queued', shipper_queue)
+    _registry.gauge('query_cache_entries', query_cache('size'))
+    _registry.gauge('query_cache_hit_ratio', query_cache('hit_rate'))
+    _registry.gauge('ui_stalls', ui_stalls)
+
+
+def _export_on_exit():
+    try:
+        if any(row['count'] for row in _registry.get_operation_stats()):
+            _registry.export()
+    except Exception:
+        pass
+
+
+_export_on_exit_registered = False
+
+
+def enable_export_on_exit():
+    """Proqram bağlananda metrikləri debug_logs-a ixrac edir (bir dəfə qeydiyyat)"""
+    global _export_on_exit_registered
+    if not _export_on_exit_registered:
+        _export_on_exit_registered = True
+        atexit.register(_export_on_exit)
+
+
+_register_default_gauges()
+if os.environ.get(EXPORT_ON_EXIT_ENV) == '1':
+    enable_export_on_exit()
+
+
+__all__ = [
+    'Counter', 'Gauge', 'LatencyHistogram', 'MetricsRegistry', 'get_metrics_registry',
+    'timed', 'instrument_module', 'instrument_package', 'enable_export_on_exit',
+]
@@ -2,16 +2,37 @@
 # -*- coding: utf-8 -*-
 """
 Performance Monitor - UI bloklanmasını izləyir və loglaşdırır
+Tk after() heartbeat + watchdog thread: donma zamanı əsas thread-in stack-i nümunələnir
 """
 
 import time
 import threading
 import sys
+import sysconfig
 import traceback
-from collections import deque
+from collections import Counter, deque
+
+HEARTBEAT_MS = 100           # Tk after() heartbeat intervalı
+STALL_THRESHOLD = 0.25       # heartbeat bu qədər (saniyə) gecikərsə UI donmuş sayılır
+WATCHDOG_INTERVAL = 0.05     # watchdog yoxlama və stack nümunə intervalı
+STACK_DEPTH = 12             # nümunədə saxlanılan ən daxili frame sayı
+MAX_STALL_SECONDS = 120      # bundan uzun fasilə yuxu/hibernasiya sayılır və nəzərə alınmır
+STALL_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0)  # histogram sərhədləri (saniyə), ilk sərhəd STALL_THRESHOLD-dur
+TOP_STACKS = 10
+
+_LIBRARY_PATHS = tuple(p for p in {sysconfig.get_paths().get('stdlib'), sysconfig.get_paths().get('purelib')} if p)
+
+
+def _is_app_frame(filename):
+    return not filename.startswith(_LIBRARY_PATHS) and 'site-packages' not in filename
+
 
 class PerformanceMonitor:
-    """UI bloklanmasını izləyir"""
+    """
+    UI donma detektoru: Tk after() heartbeat-i əsas thread-də vaxtı qeyd edir, watchdog
+    thread-i heartbeat gecikəndə əsas thread-in stack-ini (sys._current_frames) nümunələyir.
+    Donmalar müddət histogramına və ən çox vaxt aparan stack-lərə yığılır.
+    """
     
     def __init__(self):
         self.monitoring = False
@@ -19,6 +40,48 @@ class PerformanceMonitor:
         self.blocking_operations = deque(maxlen=100)
         self.last_check_time = time.time()
         self.ui_responsive = True
+        # Heartbeat
+        self.root = None
+        self.heartbeat_ms = HEARTBEAT_MS
+        self.stall_threshold = STALL_THRESHOLD
+        self._after_id = None
+        self._main_thread_id = None
+        self._last_beat = None
+        # Donma statistikası
+        self._lock = threading.Lock()
+        self._samples = Counter()      # cari donma zamanı toplanan stack nümunələri
+        self._stall_started = None
+        self.stall_count = 0
+        self.total_stall_seconds = 0.0
+        self.max_stall_seconds = 0.0
+        self.histogram = [0] * (len(STALL_BUCKETS) + 1)
+        self._stack_stats = {}         # stack açarı -> [nümunə, donma sayı, cəmi saniyə, maks saniyə]
+        
+    def attach(self, root, heartbeat_ms=HEARTBEAT_MS):
+        """Tk kökünə heartbeat qoşur (əsas thread-dən çağırılmalıdır)"""
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self._main_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        if self._after_id is None:
+            self._after_id = root.after(self.heartbeat_ms, self._heartbeat)
+    
+    def _heartbeat(self):
+        """Əsas thread: son heartbeat vaxtını yeniləyir; gecikmə olubsa donmanı qeyd edir"""
+        now = time.monotonic()
+        previous = self._last_beat
+        self._last_beat = now
+        self.last_check_time = time.time()
+        if previous is not None:
+            stall = now - previous - self.heartbeat_ms / 1000.0
+            if stall >= self.stall_threshold:
+                self._record_stall(stall)
+            else:
+                self.ui_responsive = True
+        try:
+            self._after_id = self.root.after(self.heartbeat_ms, self._heartbeat)
+        except Exception:
+            self._after_id = None  # Pəncərə bağlanıb
         
     def start_monitoring(self):
         """Monitoring-i başlat"""
@@ -26,7 +89,7 @@ class PerformanceMonitor:
             return
         
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True, name="ui-stall-watchdog")
         self.monitor_thread.start()
         print("🔍 Performance monitor başladıldı")
     
@@ -35,53 +98,139 @@ class PerformanceMonitor:
         self.monitoring = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=1)
+        if self._after_id is not None and self.root is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
         print("🛑 Performance monitor dayandırıldı")
     
     def _monitor_loop(self):
-        """Monitoring loop"""
+        """Watchdog: heartbeat gecikibsə əsas thread-in stack-ini nümunələyir"""
         while self.monitoring:
             try:
-                current_time = time.time()
-                elapsed = current_time - self.last_check_time
-                
-                # Əgər 1 saniyədən çox keçibsə, UI bloklanıb deməkdir
-                if elapsed > 1.0:
-                    self._log_blocking_operation(elapsed)
-                
-                self.last_check_time = current_time
-                time.sleep(0.1)  # 100ms interval
+                last_beat = self._last_beat
+                if last_beat is not None and self._main_thread_id is not None:
+                    lag = time.monotonic() - last_beat - self.heartbeat_ms / 1000.0
+                    if lag >= self.stall_threshold:
+                        self.ui_responsive = False
+                        self._sample_main_thread(last_beat)
+                time.sleep(WATCHDOG_INTERVAL)
             except Exception:
                 pass
     
-    def _log_blocking_operation(self, duration):
-        """Bloklanan əməliyyatı logla"""
-        try:
-            import traceback
-            stack = traceback.extract_stack()
-            # Son 5 frame-i götür
-            relevant_frames = stack[-5:] if len(stack) > 5 else stack
-            stack_str = "\n".join([f"  {f.filename}:{f.lineno} in {f.name}" for f in relevant_frames])
-            
-            operation = {
-                'duration': duration,
-                'timestamp': time.time(),
-                'stack': stack_str
-            }
-            self.blocking_operations.append(operation)
-            
-            print(f"⚠️ UI bloklanması aşkar edildi: {duration:.2f}s")
-            print(f"Stack trace:\n{stack_str}")
-        except Exception:
-            pass
+    def _sample_main_thread(self, last_beat):
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=STACK_DEPTH)
+        key = tuple((f.filename, f.lineno, f.name) for f in stack)
+        with self._lock:
+            if self._stall_started != last_beat:
+                # Yeni donma - əvvəlki nümunələr artıq heartbeat tərəfindən götürülüb
+                self._stall_started = last_beat
+                self._samples.clear()
+            self._samples[key] += 1
+    
+    def _record_stall(self, duration):
+        """Əsas thread: bitmiş donmanı histogram və stack statistikasına əlavə edir"""
+        with self._lock:
+            samples = self._samples
+            self._samples = Counter()
+            self._stall_started = None
+        if duration > MAX_STALL_SECONDS:
+            return  # Kompüter yuxu rejimində olub
+        
+        with self._lock:
+            self.stall_count += 1
+            self.total_stall_seconds += duration
+            self.max_stall_seconds = max(self.max_stall_seconds, duration)
+            bucket = len(STALL_BUCKETS)
+            for index, bound in enumerate(STALL_BUCKETS):
+                if duration < bound:
+                    bucket = index
+                    break
+            self.histogram[bucket] += 1
+            # Donma ən çox nümunələnən stack-ə aid edilir
+            dominant = samples.most_common(1)[0][0] if samples else None
+            for key, count in samples.items():
+                stats = self._stack_stats.setdefault(key, [0, 0, 0.0, 0.0])
+                stats[0] += count
+                if key == dominant:
+                    stats[1] += 1
+                    stats[2] += duration
+                    stats[3] = max(stats[3], duration)
+        
+        self.ui_responsive = False
+        stack_str = self._format_stack(dominant) if dominant else "  (nümunə yoxdur)"
+        self.blocking_operations.append({
+            'duration': duration,
+            'timestamp': time.time(),
+            'stack': stack_str,
+            'handler': self._handler_name(dominant),
+        })
+        print(f"⚠️ UI bloklanması aşkar edildi: {duration:.2f}s - {self._handler_name(dominant)}")
+    
+    @staticmethod
+    def _format_stack(key):
+        return "\n".join(f"  {filename}:{lineno} in {name}" for filename, lineno, name in key)
+    
+    @staticmethod
+    def _handler_name(key):
+        """Stack-də ən daxili tətbiq (kitabxana olmayan) frame-i"""
+        if not key:
+            return "naməlum"
+        for filename, lineno, name in reversed(key):
+            if _is_app_frame(filename):
+                return f"{name} ({filename.replace(chr(92), '/').rsplit('/', 1)[-1]}:{lineno})"
+        filename, lineno, name = key[-1]
+        return f"{name} ({filename.replace(chr(92), '/').rsplit('/', 1)[-1]}:{lineno})"
     
     def mark_ui_responsive(self):
-        """UI-nin responsive olduğunu qeyd et"""
+        """UI-nin responsive olduğunu qeyd et (yalnız əsas thread-dən heartbeat sayılır)"""
         self.last_check_time = time.time()
         self.ui_responsive = True
+        if threading.get_ident() == self._main_thread_id:
+            self._last_beat = time.monotonic()
     
     def get_blocking_operations(self):
         """Bloklanan əməliyyatları qaytar"""
         return list(self.blocking_operations)
+    
+    def get_stall_report(self, top=TOP_STACKS):
+        """Donma histogramı və ən çox vaxt aparan stack-lər (debug pəncərəsi üçün)"""
+        with self._lock:
+            bounds = (self.stall_threshold,) + STALL_BUCKETS
+            labels = [f"{low}-{high}s" for low, high in zip(bounds, bounds[1:])]
+            labels.append(f">={STALL_BUCKETS[-1]}s")
+            stacks = sorted(self._stack_stats.items(), key=lambda item: (item[1][2], item[1][0]), reverse=True)[:top]
+            return {
+                'running': self.monitoring and self._after_id is not None,
+                'heartbeat_ms': self.heartbeat_ms,
+                'threshold_ms': self.stall_threshold * 1000,
+                'stalls': self.stall_count,
+                'total_seconds': self.total_stall_seconds,
+                'max_seconds': self.max_stall_seconds,
+                'histogram': list(zip(labels, self.histogram)),
+                'top_stacks': [{
+                    'handler': self._handler_name(key),
+                    'stack': self._format_stack(key),
+                    'samples': samples,
+                    'stalls': stalls,
+                    'total_seconds': total,
+                    'max_seconds': longest,
+                } for key, (samples, stalls, total, longest) in stacks],
+            }
+    
+    def reset_stall_stats(self):
+        with self._lock:
+            self.stall_count = 0
+            self.total_stall_seconds = 0.0
+            self.max_stall_seconds = 0.0
+            self.histogram = [0] * (len(STALL_BUCKETS) + 1)
+            self._stack_stats.clear()
+            self.blocking_operations.clear()
 
 # Global instance
 _performance_monitor = None
@@ -97,6 +246,17 @@ def start_monitoring():
     """Monitoring-i başlat"""
     get_performance_monitor().start_monitoring()
 
+def start_stall_detector(root):
+    """Tk kökünə heartbeat qoşur və watchdog-u başladır (əsas thread-dən)"""
+    monitor = get_performance_monitor()
+    monitor.attach(root)
+    monitor.start_monitoring()
+    return monitor
+
+def get_stall_report():
+    """UI donma hesabatı; monitor başladılmayıbsa None"""
+    return _performance_monitor.get_stall_report() if _performance_monitor else None
+
 def stop_monitoring():
     """Monitoring-i dayandır"""
     get_performance_monitor().stop_monitoring()
@@ -108,19 +268,28 @@ def mark_ui_responsive():
 def monitor_operation(operation_name):
     """
     Decorator - funksiyanın icra vaxtını izləyir
+    Hər çağırış metrics registry-yə yazılır; uzun çağırışlar həm də print olunur
     """
+    try:
+        from utils.metrics import get_metrics_registry
+    except ImportError:
+        from src.utils.metrics import get_metrics_registry
+    registry = get_metrics_registry()
+    
     def decorator(func):
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
+                registry.observe_operation(operation_name, elapsed)
                 # Yalnız uzun əməliyyatları logla (1 saniyədən çox)
                 if elapsed > 1.0:
                     print(f"⏱️ {operation_name} tamamlandı: {elapsed:.2f}s")
                 return result
             except Exception as e:
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
+                registry.observe_operation(operation_name, elapsed, failed=True)
                 print(f"❌ {operation_name} xəta ilə bitdi ({elapsed:.2f}s): {e}")
                 raise
         return wrapper
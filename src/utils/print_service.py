@@ -6,7 +6,8 @@ Bu modul məzuniyyət məlumatlarını HTML formatında hazırlayır və çap ed
 import os
 import tempfile
 import webbrowser
-from datetime import datetime
+from collections.abc import Mapping
+from datetime import date, datetime
 from typing import Dict, Any, Optional
 import csv
 import json
@@ -29,6 +30,20 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+def _as_date(value, strict=False):
+    """date/datetime obyektini date kimi qaytarır, 'YYYY-MM-DD' sətrini parse edir.
+    Parse alınmasa strict=True olduqda ValueError atır, əks halda None qaytarır."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        if strict:
+            raise
+        return None
+
 def calculate_vacation_days_used(vacations):
     """
     Məzuniyyətlərdən istifadə edilmiş günləri hesablayır
@@ -42,30 +57,20 @@ def calculate_vacation_days_used(vacations):
     used_days = 0
     
     for vacation in vacations:
-        if isinstance(vacation, dict):
+        if isinstance(vacation, Mapping):
             # Tarixlərdən müddəti hesabla
             start_date = vacation.get('baslama', vacation.get('baslangic', ''))
             end_date = vacation.get('bitme', '')
             
             if start_date and end_date:
                 try:
-                    # datetime.date object-i handle et
-                    if hasattr(start_date, 'strftime'):
-                        start_str = start_date.strftime('%Y-%m-%d')
-                    else:
-                        start_str = str(start_date)
-                    
-                    if hasattr(end_date, 'strftime'):
-                        end_str = end_date.strftime('%Y-%m-%d')
-                    else:
-                        end_str = str(end_date)
-                    
-                    start_dt = datetime.strptime(start_str, '%Y-%m-%d')
-                    end_dt = datetime.strptime(end_str, '%Y-%m-%d')
+                    # Bazadan gələn qeydlərdə tarix artıq date obyektidir - sətirə çevirib yenidən parse etmirik
+                    start_dt = _as_date(start_date, strict=True)
+                    end_dt = _as_date(end_date, strict=True)
                     days = (end_dt - start_dt).days + 1
                     used_days += days
                     
-                    print(f"DEBUG: Məzuniyyət {start_str} - {end_str}: {days} gün")
+                    print(f"DEBUG: Məzuniyyət {start_dt} - {end_dt}: {days} gün")
                     
                 except Exception as e:
                     print(f"DEBUG: Tarix hesablama xətası: {e}")
@@ -952,59 +957,21 @@ def generate_all_vacations_html(employee_data: Dict[str, Any], company_name: str
     vacations_html = ""
     if vacations:
         for i, vacation in enumerate(vacations, 1):
-            if isinstance(vacation, dict):
+            if isinstance(vacation, Mapping):
                 start_date = vacation.get('baslama', vacation.get('baslangic', ''))
                 end_date = vacation.get('bitme', '')
                 note = vacation.get('qeyd', '')
                 status = vacation.get('status', 'Bitmiş')
                 
-                # Tarixləri format et - datetime.date və string formatlarını handle et
-                if start_date:
-                    try:
-                        if hasattr(start_date, 'strftime'):  # datetime.date object
-                            start_date_formatted = start_date.strftime('%d.%m.%Y')
-                            start_date_str = start_date.strftime('%Y-%m-%d')
-                        else:  # string
-                            start_dt = datetime.strptime(str(start_date), '%Y-%m-%d')
-                            start_date_formatted = start_dt.strftime('%d.%m.%Y')
-                            start_date_str = str(start_date)
-                    except:
-                        start_date_formatted = str(start_date)
-                        start_date_str = str(start_date)
-                else:
-                    start_date_formatted = ''
-                    start_date_str = ''
+                # Tarixlər bir dəfə date obyektinə çevrilir (bazadan gələn qeydlərdə artıq date-dir)
+                start_dt = _as_date(start_date)
+                end_dt = _as_date(end_date)
+                start_date_formatted = start_dt.strftime('%d.%m.%Y') if start_dt else str(start_date or '')
+                end_date_formatted = end_dt.strftime('%d.%m.%Y') if end_dt else str(end_date or '')
                 
-                if end_date:
-                    try:
-                        if hasattr(end_date, 'strftime'):  # datetime.date object
-                            end_date_formatted = end_date.strftime('%d.%m.%Y')
-                            end_date_str = end_date.strftime('%Y-%m-%d')
-                        else:  # string
-                            end_dt = datetime.strptime(str(end_date), '%Y-%m-%d')
-                            end_date_formatted = end_dt.strftime('%d.%m.%Y')
-                            end_date_str = str(end_date)
-                    except:
-                        end_date_formatted = str(end_date)
-                        end_date_str = str(end_date)
-                else:
-                    end_date_formatted = ''
-                    end_date_str = ''
-                
-                # Müddəti yenidən hesabla (daha dəqiq)
-                if start_date_str and end_date_str:
-                    try:
-                        start_dt = datetime.strptime(start_date_str, '%Y-%m-%d')
-                        end_dt = datetime.strptime(end_date_str, '%Y-%m-%d')
-                        calculated_duration = (end_dt - start_dt).days + 1
-                        duration_formatted = f"{calculated_duration} gün"
-                    except:
-                        # Əgər hesablama uğursuz olarsa, database-dən gələn dəyəri istifadə et
-                        duration = vacation.get('muddet', 0)
-                        if isinstance(duration, str):
-                            duration_formatted = duration
-                        else:
-                            duration_formatted = f"{duration} gün"
+                # Müddəti hesabla
+                if start_dt and end_dt:
+                    duration_formatted = f"{(end_dt - start_dt).days + 1} gün"
                 else:
                     # Tarixlər yoxdursa, database-dən gələn dəyəri istifadə et
                     duration = vacation.get('muddet', 0)
@@ -1473,59 +1440,23 @@ def generate_compact_all_vacations_html(employee_data: Dict[str, Any], company_n
     vacations_html = ""
     if vacations:
         for i, vacation in enumerate(vacations, 1):
-            if isinstance(vacation, dict):
+            if isinstance(vacation, Mapping):
                 start_date = vacation.get('baslama', vacation.get('baslangic', ''))
                 end_date = vacation.get('bitme', '')
                 note = vacation.get('qeyd', '')
                 status = vacation.get('status', 'Bitmiş')
                 
-                # Tarixləri format et
-                if start_date:
-                    try:
-                        if hasattr(start_date, 'strftime'):
-                            start_date_formatted = start_date.strftime('%d.%m.%Y')
-                            start_date_str = start_date.strftime('%Y-%m-%d')
-                        else:
-                            start_dt = datetime.strptime(str(start_date), '%Y-%m-%d')
-                            start_date_formatted = start_dt.strftime('%d.%m.%Y')
-                            start_date_str = str(start_date)
-                    except:
-                        start_date_formatted = str(start_date)
-                        start_date_str = str(start_date)
-                else:
-                    start_date_formatted = ''
-                    start_date_str = ''
-                
-                if end_date:
-                    try:
-                        if hasattr(end_date, 'strftime'):
-                            end_date_formatted = end_date.strftime('%d.%m.%Y')
-                            end_date_str = end_date.strftime('%Y-%m-%d')
-                        else:
-                            end_dt = datetime.strptime(str(end_date), '%Y-%m-%d')
-                            end_date_formatted = end_dt.strftime('%d.%m.%Y')
-                            end_date_str = str(end_date)
-                    except:
-                        end_date_formatted = str(end_date)
-                        end_date_str = str(end_date)
-                else:
-                    end_date_formatted = ''
-                    end_date_str = ''
+                # Tarixlər bir dəfə date obyektinə çevrilir (bazadan gələn qeydlərdə artıq date-dir)
+                start_dt = _as_date(start_date)
+                end_dt = _as_date(end_date)
+                start_date_formatted = start_dt.strftime('%d.%m.%Y') if start_dt else str(start_date or '')
+                end_date_formatted = end_dt.strftime('%d.%m.%Y') if end_dt else str(end_date or '')
                 
-                # Müddəti yenidən hesabla
-                if start_date_str and end_date_str:
-                    try:
-                        start_dt = datetime.strptime(start_date_str, '%Y-%m-%d')
-                        end_dt = datetime.strptime(end_date_str, '%Y-%m-%d')
-                        calculated_duration = (end_dt - start_dt).days + 1
-                        duration_formatted = f"{calculated_duration} gün"
-                    except:
-                        duration = vacation.get('muddet', 0)
-                        if isinstance(duration, str):
-                            duration_formatted = duration
-                        else:
-                            duration_formatted = f"{duration} gün"
+                # Müddəti hesabla
+                if start_dt and end_dt:
+                    duration_formatted = f"{(end_dt - start_dt).days + 1} gün"
                 else:
+                    # Tarixlər yoxdursa, database-dən gələn dəyəri istifadə et
                     duration = vacation.get('muddet', 0)
                     if isinstance(duration, str):
                         duration_formatted = duration
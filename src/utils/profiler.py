@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiler - istifadəçi maşınında (EXE) yavaş sessiyanın profilini çıxarmaq üçün
+sampling rejimi: ayrıca thread bütün thread-lərin stack-ini (sys._current_frames) müəyyən
+intervalla nümunələyir; eyni stack-lər sayğacla yığılır, ona görə yaddaş və overhead azdır.
+Nəticə debug_logs qovluğuna collapsed-stack (.folded, flamegraph.pl/speedscope) və
+speedscope JSON (.speedscope.json) faylları kimi yazılır.
+cprofile rejimi: yalnız əsas thread üçün deterministik cProfile (.prof + mətn xülasəsi).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+SAMPLE_INTERVAL = 0.005      # nümunə intervalı (saniyə) - ~200 Hz
+MAX_STACK_DEPTH = 128        # bundan dərin stack-lər kəsilir (kökə yaxın frame-lər atılır)
+MAX_DURATION = 600           # unudulmuş profiler bu qədər saniyədən sonra özü dayanır
+PSTATS_TOP = 60              # cProfile mətn xülasəsində sətir sayı
+
+MODE_SAMPLING = 'sampling'
+MODE_CPROFILE = 'cprofile'
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Bütün thread-lər üzrə stack nümunələyicisi"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, max_duration=MAX_DURATION):
+        self.interval = interval
+        self.max_duration = max_duration
+        self.samples = Counter()         # (thread adı, (code, ...) kökdən yarpağa) -> say
+        self.seconds = Counter()         # eyni açar -> ölçülmüş vaxt (GIL səbəbindən nümunələr gecikə bilər)
+        self.sample_count = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_duration
+        names = {}
+        last_tick = time.monotonic()
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            elapsed, last_tick = now - last_tick, now
+            if now > deadline:
+                print(f"⚠️ Profiler {self.max_duration}s sonra avtomatik dayandırıldı")
+                break
+            frames = sys._current_frames()
+            if len(names) != len(frames) or any(thread_id not in names for thread_id in frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                key = (names.get(thread_id, str(thread_id)), tuple(stack))
+                self.samples[key] += 1
+                self.seconds[key] += elapsed
+            self.sample_count += 1
+        self.stopped_at = time.time()
+
+    # --- Eksport ---
+
+    def to_collapsed(self):
+        """Brendan Gregg collapsed formatı: 'thread;f1;f2 say' (hər stack bir sətir)"""
+        labels = {}
+        lines = []
+        for (thread_name, stack), count in self.samples.most_common():
+            parts = [thread_name.replace(';', ':').replace(' ', '_')]
+            for code in stack:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code).replace(';', ':')
+                parts.append(label)
+            lines.append(f"{';'.join(parts)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_speedscope(self, name="Mezuniyyet profili"):
+        """speedscope.app 'sampled' formatı, hər thread ayrıca profil (çəki = saniyə)"""
+        frame_index = {}
+        frames = []
+        profiles = {}
+        for (thread_name, stack), seconds in self.seconds.items():
+            indices = []
+            for code in stack:
+                index = frame_index.get(code)
+                if index is None:
+                    index = frame_index[code] = len(frames)
+                    frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+                indices.append(index)
+            profile = profiles.setdefault(thread_name, {'samples': [], 'weights': []})
+            profile['samples'].append(indices)
+            profile['weights'].append(seconds)
+        return json.dumps({
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'mezuniyyet-profiler',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': thread_name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(profile['weights']),
+                'samples': profile['samples'],
+                'weights': profile['weights'],
+            } for thread_name, profile in sorted(profiles.items(), key=lambda item: -sum(item[1]['weights']))],
+        })
+
+
+class ProfilerSession:
+    """Debug pəncərəsindən başladılıb dayandırılan profil sessiyası (sampling və ya cProfile)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.mode = None
+        self.started_at = None
+        self._sampler = None
+        self._cprofile = None
+
+    def is_running(self):
+        return self.mode is not None
+
+    def start(self, mode=MODE_SAMPLING, interval=SAMPLE_INTERVAL):
+        """Profili başladır; cprofile rejimi yalnız çağıran (əsas) thread-i ölçür"""
+        with self._lock:
+            if self.mode is not None:
+                return False
+            if mode == MODE_CPROFILE:
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            else:
+                mode = MODE_SAMPLING
+                self._sampler = SamplingProfiler(interval)
+                self._sampler.start()
+            self.mode = mode
+            self.started_at = datetime.now()
+            print(f"🔥 Profiler başladı ({mode})")
+            return True
+
+    def stop(self, directory=None):
+        """Profili dayandırır və faylları yazır; yazılmış faylların yollarını qaytarır"""
+        with self._lock:
+            if self.mode is None:
+                return []
+            mode, started_at = self.mode, self.started_at
+            sampler, profile = self._sampler, self._cprofile
+            self.mode = self._sampler = self._cprofile = None
+        if profile is not None:
+            profile.disable()
+        if sampler is not None:
+            sampler.stop()
+
+        if directory is None:
+            try:
+                from utils.log_helper import get_debug_logs_dir
+            except ImportError:
+                from src.utils.log_helper import get_debug_logs_dir
+            directory = get_debug_logs_dir()
+        base = os.path.join(directory, f"profile_{started_at.strftime('%Y%m%d_%H%M%S')}")
+        paths = []
+        if sampler is not None:
+            paths.append(_write_text(f"{base}.folded", sampler.to_collapsed()))
+            paths.append(_write_text(f"{base}.speedscope.json", sampler.to_speedscope(f"Mezuniyyet {started_at:%Y-%m-%d %H:%M:%S}")))
+            print(f"🔥 Profiler dayandı: {sampler.sample_count} nümunə, {len(sampler.samples)} fərqli stack")
+        else:
+            prof_path = f"{base}.prof"
+            profile.dump_stats(prof_path)
+            paths.append(prof_path)
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(PSTATS_TOP)
+            paths.append(_write_text(f"{base}.txt", summary.getvalue()))
+            print(f"🔥 Profiler dayandı ({mode})")
+        return paths
+
+
+def _write_text(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+_profiler_session = None
+
+
+def get_profiler():
+    global _profiler_session
+    if _profiler_session is None:
+        _profiler_session = ProfilerSession()
+    return _profiler_session
+
+
+def start_profiling(mode=MODE_SAMPLING, interval=SAMPLE_INTERVAL):
+    return get_profiler().start(mode, interval)
+
+
+def stop_profiling(directory=None):
+    return get_profiler().stop(directory)
+
+
+def is_profiling():
+    return _profiler_session is not None and _profiler_session.is_running()
@@ -46,8 +46,13 @@ class RealtimeDebugger:
         logger = logging.getLogger('realtime_debug')
         logger.setLevel(logging.DEBUG)
         
-        # Fayl handler - hər dəfə yeni fayl yaradır
-        file_handler = logging.FileHandler(self.debug_file_path, encoding='utf-8', mode='w')
+        # Fayl handler - hər dəfə yeni fayl yaradır, ölçü limitində növbəti hissəyə keçir
+        try:
+            from utils.log_rotation import RotatingLogHandler
+        except ImportError:
+            from src.utils.log_rotation import RotatingLogHandler
+        file_handler = RotatingLogHandler(self.debug_file_path)
+        self.file_handler = file_handler
         file_handler.setLevel(logging.DEBUG)
         
         # Format
@@ -82,10 +87,8 @@ DETAILS: {json.dumps(details, indent=2, ensure_ascii=False) if details else 'Non
             except ImportError:
                 from src.utils.log_helper import log_to_database_async
             
-            log_file_name = str(self.debug_file_path) if hasattr(self, 'debug_file_path') else None
-            if log_file_name:
-                import os
-                log_file_name = os.path.basename(log_file_name)
+            # Rotasiyadan sonra cari hissənin adı
+            log_file_name = self.file_handler.current_file_name if hasattr(self, 'file_handler') else None
             log_to_database_async('realtime_debug', message, log_file_name)
         except Exception:
             pass
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structured Log - aşağı xərcli strukturlaşdırılmış log nüvəsi
+
+Print intercept əvvəllər hər print üçün vaxt damğası formatlayır, fayla yazır,
+mesajı kiçik hərfə çevirib kateqoriya axtarır və DebugManager.log çağırırdı -
+söndürülmüş kateqoriyalar üçün də. İndi:
+  - səviyyə və kateqoriya yoxlaması heç bir mətn formatlanmadan əvvəl edilir
+    (söndürülmüş səviyyə/kateqoriya üçün çağırış bir neçə müqayisədən ibarətdir)
+  - qeydlər əvvəlcədən ayrılmış halqa buferinə (RingBuffer) yazılır; arqumentlər yalnız
+    filtrdən keçəndə birləşdirilir, vaxt damğası və kateqoriya isə oxunanda hesablanır
+  - fayla yazma və bazaya göndərmə tək arxa fon yazıcısındadır
+
+Ölçmə: python -m utils.structured_log (run_benchmark)
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime
+
+try:
+    from utils.log_rotation import RotatingLogFile
+except ImportError:
+    from src.utils.log_rotation import RotatingLogFile
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS_BY_NAME = {name: level for level, name in LEVEL_NAMES.items()}
+
+RING_CAPACITY = 4096       # halqa buferindəki qeyd sayı (dolanda ən köhnələr üzərinə yazılır)
+WRITE_INTERVAL = 0.5       # saniyə - yazıcı ən gec bu qədərdən bir fayla yazır
+WRITE_BATCH = 256          # bu qədər yazılmamış qeyd yığılanda yazıcı dərhal oyadılır
+
+# Print mesajının kateqoriyası (ilk arqument üzrə, sıra vacibdir):
+# (kateqoriya, emoji, dəqiq alt sətirlər, kiçik hərflə axtarılan alt sətirlər)
+_CATEGORY_RULES = (
+    ('animasiya', '🎬', ('🟢', '🎬'), ('loading', 'gif')),
+    ('takvim', '📅', ('məzuniyyət', 'kvadrat', '🎯'), ('takvim',)),
+    ('database', '🗄️', (), ('veritabanı', 'connection', 'database')),
+    ('ui', '🖥️', ('Panel', 'Widget', 'Frame', 'UI', 'Login', 'window', 'pəncərə'), ()),
+    ('vacation', '🏖️', (), ('vacation',)),
+    ('employee', '👤', ('işçi',), ('employee',)),
+    ('umumi', '🔍', (), ('debug',)),
+    ('umumi', '⚠️', (), ('warning',)),
+    ('umumi', 'ℹ️', (), ('info',)),
+)
+DEFAULT_CATEGORY = ('umumi', '📝')
+
+_LEVEL_EMOJIS = {DEBUG: '🔍', INFO: 'ℹ️', WARNING: '⚠️', ERROR: '❌'}
+_PRINT_LEVEL_HEAD = 16     # print səviyyəsi mesajın ilk bu qədər simvolundan təyin olunur
+_CLASSIFY_HEAD = 80        # kateqoriya mesajın ilk bu qədər simvolundan təyin olunur
+
+
+def level_from_name(name, default=DEBUG):
+    if isinstance(name, int):
+        return name
+    return LEVELS_BY_NAME.get(str(name).upper(), default)
+
+
+def print_level(first_arg):
+    """Print-in səviyyəsi - yalnız ilk arqumentin başına baxılır (❌ / ⚠️ / DEBUG)"""
+    if not isinstance(first_arg, str):
+        return INFO
+    head = first_arg[:_PRINT_LEVEL_HEAD]
+    if '❌' in head or 'ERROR' in head:
+        return ERROR
+    if '⚠' in head or 'WARNING' in head:
+        return WARNING
+    if 'DEBUG' in head:
+        return DEBUG
+    return INFO
+
+
+def classify_message(first_arg):
+    """
+    Mesajın (kateqoriya, emoji) cütü - yalnız mətnin başı yoxlanılır (print_level kimi),
+    ona görə uzun mesajlar söndürülmüş kateqoriya olanda bütövlükdə kiçildilmir
+    """
+    text = first_arg if isinstance(first_arg, str) else str(first_arg)
+    head = text[:_CLASSIFY_HEAD]
+    lowered = head.lower()
+    for category, emoji, words, lower_words in _CATEGORY_RULES:
+        for word in words:
+            if word in head:
+                return category, emoji
+        for word in lower_words:
+            if word in lowered:
+                return category, emoji
+    return DEFAULT_CATEGORY
+
+
+def format_args(args, sep=' '):
+    """print arqumentlərini bir mətnə birləşdirir (tək mətn arqumenti olduğu kimi qaytarılır)"""
+    if len(args) == 1 and isinstance(args[0], str):
+        return args[0]
+    try:
+        return (sep or ' ').join(str(arg) for arg in args)
+    except Exception:
+        return '<formatlanmayan mesaj>'
+
+
+class LogRecord:
+    """
+    Halqa buferindəki qeyd. Mesaj filtrdən keçən anda birləşdirilir (sonradan dəyişən
+    obyektlər qeydə təsir etmir), kateqoriya isə lazım olanda hesablanır.
+    """
+    __slots__ = ('seq', 'created', 'level', 'category', 'emoji', 'message')
+
+    def __init__(self, seq, created, level, category, emoji, message):
+        self.seq = seq
+        self.created = created
+        self.level = level
+        self.category = category
+        self.emoji = emoji
+        self.message = message
+
+    def resolve(self):
+        """Kateqoriyası verilməmiş (print) qeydlər üçün kateqoriya və emoji təyin edir"""
+        if self.category is None:
+            self.category, emoji = classify_message(self.message) if self.message else DEFAULT_CATEGORY
+            if self.emoji is None:
+                self.emoji = emoji
+        elif self.emoji is None:
+            self.emoji = _LEVEL_EMOJIS.get(self.level, '📝')
+        return self
+
+
+class RingBuffer:
+    """Əvvəlcədən ayrılmış sabit ölçülü halqa buferi; hər qeydin artan seq nömrəsi var"""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def next_seq(self):
+        return self._next_seq
+
+    def append(self, created, level, category, emoji, message):
+        with self._lock:
+            seq = self._next_seq
+            record = LogRecord(seq, created, level, category, emoji, message)
+            self._slots[seq % self.capacity] = record
+            self._next_seq = seq + 1
+        return record
+
+    def since(self, seq, limit=None):
+        """
+        seq-dən başlayan qeydlər: (qeydlər, üzərinə yazılıb itən qeyd sayı).
+        Oxucu geri qalıbsa, buferdə qalan ən köhnə qeyddən başlanır.
+        """
+        with self._lock:
+            end = self._next_seq
+            start = max(seq, end - self.capacity, 0)
+            if limit is not None:
+                end = min(end, start + limit)
+            capacity = self.capacity
+            slots = self._slots
+            records = [slots[index % capacity] for index in range(start, end)]
+        return records, start - seq if start > seq else 0
+
+    def tail(self, count):
+        """Son count qeyd"""
+        records, _ = self.since(max(self._next_seq - count, 0))
+        return records
+
+
+class LogCore:
+    """
+    Səviyyə/kateqoriya filtri + halqa buferi + arxa fon fayl yazıcısı.
+    emit() çağıran thread-də yalnız filtr yoxlaması və buferə əlavə edilir.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, min_level=DEBUG):
+        self.buffer = RingBuffer(capacity)
+        self.min_level = min_level
+        self._disabled_categories = frozenset()
+        self.emitted = 0
+        self.filtered = 0
+        # Yazıcı
+        self._file = None
+        self.file_path = None
+        self._ship_log_type = None
+        self._written_seq = 0
+        self._wake = threading.Event()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._stopping = False
+        self.written = 0
+        self.lost = 0
+        self.last_write_ms = None
+
+    # --- Filtr ---
+
+    def set_min_level(self, level):
+        self.min_level = level_from_name(level)
+
+    def set_disabled_categories(self, categories):
+        self._disabled_categories = frozenset(categories)
+
+    def is_enabled(self, level, category=None):
+        """Formatlamadan əvvəl yoxlama: səviyyə və (verilibsə) kateqoriya açıqdırmı"""
+        return level >= self.min_level and category not in self._disabled_categories
+
+    # --- Yazma ---
+
+    def emit(self, level, category, emoji, args, sep=' '):
+        """
+        Qeydi buferə yazır; filtrdən keçməyibsə None qaytarır.
+        category None-dursa (print) kateqoriya yalnız hansısa kateqoriya söndürülübsə
+        burada, əks halda oxunanda təyin edilir. Arqumentlər yalnız filtrdən keçəndən
+        sonra birləşdirilir.
+        """
+        if level < self.min_level:
+            self.filtered += 1
+            return None
+        disabled = self._disabled_categories
+        if disabled:
+            if category is None and args:
+                category, classified_emoji = classify_message(args[0])
+                if emoji is None:
+                    emoji = classified_emoji
+            if category in disabled:
+                self.filtered += 1
+                return None
+        record = self.buffer.append(time.time(), level, category, emoji, format_args(args, sep))
+        self.emitted += 1
+        if self._writer is not None and record.seq - self._written_seq >= WRITE_BATCH:
+            self._wake.set()
+        return record
+
+    # --- Fayl yazıcısı ---
+
+    def attach_file(self, path, header_lines=(), ship_log_type=None):
+        """
+        Qeydləri path faylına yazan arxa fon yazıcısını başladır (ölçü limitində növbəti hissəyə keçir - log_rotation).
+        ship_log_type verilibsə yazılan bloklar bazaya da göndərilir (log_to_database_async).
+        """
+        with self._writer_lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = RotatingLogFile(path)
+            self.file_path = self._file.path
+            self._ship_log_type = ship_log_type
+            stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for line in header_lines:
+                self._file.write(f"{stamp} - {line}\n")
+            self._file.flush()
+            self._written_seq = self.buffer.next_seq
+            if self._writer is None:
+                if ship_log_type:
+                    # Göndərici əvvəl yaradılsın ki, çıxışda (atexit LIFO) bizdən sonra dayansın
+                    try:
+                        try:
+                            from utils.log_shipper import get_log_shipper
+                        except ImportError:
+                            from src.utils.log_shipper import get_log_shipper
+                        get_log_shipper()
+                    except Exception:
+                        pass
+                self._writer = threading.Thread(target=self._run_writer, daemon=True, name="log-writer")
+                self._writer.start()
+                atexit.register(self.stop)
+
+    def _run_writer(self):
+        while not self._stopping:
+            self._wake.wait(WRITE_INTERVAL)
+            self._wake.clear()
+            self.drain()
+
+    def drain(self):
+        """Yazılmamış qeydləri fayla yazır (yazıcı thread-i və stop() çağırır)"""
+        with self._writer_lock:
+            if self._file is None:
+                return 0
+            records, lost = self.buffer.since(self._written_seq)
+            if not records:
+                return 0
+            started = time.monotonic()
+            self.lost += lost
+            lines = []
+            for record in records:
+                record.resolve()
+                stamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
+                lines.append(f"{stamp} - [{record.category.upper()}] {record.emoji} {record.message}")
+            block = '\n'.join(lines)
+            try:
+                self._file.write(block + '\n')
+                self._file.flush()
+            except (OSError, ValueError):
+                pass
+            self._written_seq = records[-1].seq + 1
+            self.written += len(records)
+            self.last_write_ms = (time.monotonic() - started) * 1000
+            ship_log_type = self._ship_log_type
+            # Rotasiyadan sonra fayl adı dəyişir - bazaya cari hissənin adı ilə göndərilir
+            self.file_path = self._file.path
+            file_name = self._file.name
+
+        if ship_log_type:
+            try:
+                try:
+                    from utils.log_helper import log_to_database_async
+                except ImportError:
+                    from src.utils.log_helper import log_to_database_async
+                log_to_database_async(ship_log_type, block, file_name)
+            except Exception:
+                pass
+        return len(records)
+
+    def stop(self):
+        """Qalan qeydləri yazır və yazıcını dayandırır"""
+        self._stopping = True
+        self._wake.set()
+        writer = self._writer
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=2.0)
+        self.drain()
+        with self._writer_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._writer = None
+
+    # --- Statistika ---
+
+    def get_stats(self):
+        return {
+            'min_level': LEVEL_NAMES.get(self.min_level, self.min_level),
+            'disabled_categories': sorted(self._disabled_categories),
+            'capacity': self.buffer.capacity,
+            'emitted': self.emitted,
+            'filtered': self.filtered,
+            'written': self.written,
+            'pending': self.buffer.next_seq - self._written_seq if self._file is not None else 0,
+            'lost': self.lost,
+            'last_write_ms': self.last_write_ms,
+            'file_path': self.file_path,
+        }
+
+
+_log_core = None
+_log_core_lock = threading.Lock()
+
+
+def get_log_core():
+    """Qlobal log nüvəsi (DebugManager və print intercept istifadə edir)"""
+    global _log_core
+    if _log_core is None:
+        with _log_core_lock:
+            if _log_core is None:
+                _log_core = LogCore()
+    return _log_core
+
+
+def run_benchmark(iterations=100000):
+    """
+    Print intercept yolunun çağırış başına xərci (mikrosaniyə):
+    açıq kateqoriya, söndürülmüş kateqoriya və söndürülmüş səviyyə.
+    """
+    def measure(core, message):
+        first_arg = message
+        started = time.perf_counter()
+        for _ in range(iterations):
+            level = print_level(first_arg)
+            if level >= core.min_level:
+                core.emit(level, None, None, (first_arg,))
+        return (time.perf_counter() - started) / iterations * 1e6
+
+    message = "🔍 [DEBUG] refresh_employee_list: 125 işçi, filtr=''"
+    results = {}
+
+    core = LogCore()
+    results['enabled_us'] = measure(core, message)
+
+    core = LogCore()
+    core.set_disabled_categories(['employee'])
+    results['disabled_category_us'] = measure(core, message)
+
+    core = LogCore(min_level=INFO)
+    results['disabled_level_us'] = measure(core, message)
+
+    # Əvvəlki yol ilə müqayisə: vaxt damğası + birləşdirmə + kiçik hərf + kateqoriya axtarışı
+    started = time.perf_counter()
+    for _ in range(iterations):
+        text = ' '.join(str(arg) for arg in (message,))
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lowered = text.lower()
+        'loading' in lowered or 'database' in lowered or 'employee' in lowered
+        datetime.now().strftime("%H:%M:%S.%f")
+    results['legacy_formatting_us'] = (time.perf_counter() - started) / iterations * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name:>24}: {value:.3f} µs/çağırış")
@@ -10,6 +10,11 @@ import time
 from collections import deque
 from typing import Dict, List, Callable, Any
 
+try:
+    from utils.metrics import get_metrics_registry
+except ImportError:
+    from src.utils.metrics import get_metrics_registry
+
 class RefreshManager:
     """UI refresh əməliyyatlarını idarə edən sinif"""
     
@@ -127,7 +132,7 @@ class RefreshManager:
             self.batch_timer = None
 
 class PerformanceMonitor:
-    """Performans monitorinqi"""
+    """Performans monitorinqi - müddətlər metrics registry histogramlarına yazılır (ui.<ad>)"""
     
     def __init__(self):
         self.operation_times = {}
@@ -142,6 +147,7 @@ class PerformanceMonitor:
         """Əməliyyatı bitirir və vaxtı qeyd edir"""
         if operation_name in self.operation_times:
             duration = time.time() - self.operation_times[operation_name]
+            get_metrics_registry().observe_operation(f"ui.{operation_name}", duration)
             
             # Operation count artır
             if operation_name not in self.operation_counts: